@@ -7,20 +7,91 @@ Modes:
 - beta: Warnings allowed (exit 0)
 - stable: Warnings = errors (exit 1)
 
+Moteurs:
+- rows: moteur de référence ligne par ligne (csv.DictReader, stdlib seule)
+- columnar: moteur colonne par colonne (pandas/numpy), chaque règle = masque booléen
+- auto: columnar si pandas est installé, sinon rows (défaut)
+
+Profils (QA_PROFILE, défaut = QA_MODE) : chaque règle du registre RULES
+déclare ses colonnes, sa sévérité maximale et une classe de coût.
+- quick: règles "cheap" uniquement (comparaisons de chaînes, pre-commit)
+- beta / stable: toutes les règles
+
+Cache incrémental: les issues de chaque ligne sont mémorisées par hash de
+contenu dans .qubits_linter_cache.json (à côté du CSV) ; seules les lignes
+modifiées sont re-vérifiées. Le cache est invalidé si les règles changent.
+
 Usage:
   QA_MODE=beta python qubits_linter.py    # Beta mode (default)
   QA_MODE=stable python qubits_linter.py  # Strict mode
+  QA_ENGINE=rows python qubits_linter.py  # Moteur de référence
+  QA_CACHE=0 python qubits_linter.py      # Sans cache incrémental
+  QA_PROFILE=quick QA_ENGINE=rows python qubits_linter.py  # Pre-commit (<100 ms)
+  QA_STREAM=1 python qubits_linter.py     # Mémoire constante (gros catalogues)
+  python qubits_linter.py --workers 8     # Shards en parallèle (exports multi-millions)
+
+Sorties : QC_REPORT.md, QC_REPORT.jsonl + QC_REPORT.sarif (dashboards), QC_RULES.json
 """
 
+import argparse
+import contextlib
 import csv
+import hashlib
+import inspect
+import io
+import itertools
+import json
 import re
 import os
+import shutil
 import sys
-from typing import List, Dict, Tuple
-from dataclasses import dataclass, field
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from dataclasses import asdict, dataclass, field
 
 # Validation mode from environment
 QA_MODE = os.getenv("QA_MODE", "beta")  # "beta" or "stable"
+QA_ENGINE = os.getenv("QA_ENGINE", "auto")  # "auto", "rows" or "columnar"
+QA_CACHE = os.getenv("QA_CACHE", "1") != "0"  # Cache incrémental (QA_CACHE=0 pour désactiver)
+QA_STREAM = os.getenv("QA_STREAM", "0") == "1"  # Rapport en mémoire constante (sans cache)
+
+# Taille des blocs lus par le mode streaming
+STREAM_CHUNK_ROWS = 50_000
+
+# Taille des blocs lus pour découper le CSV en shards (--workers)
+SHARD_SCAN_BYTES = 8 * 1024 * 1024
+
+# Sévérités du rapport, dans l'ordre d'affichage
+SEVERITY_ICONS = {'ERROR': '❌', 'WARNING': '⚠️', 'INFO': 'ℹ️'}
+SARIF_LEVELS = {'ERROR': 'error', 'WARNING': 'warning', 'INFO': 'note'}
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+# Classes de coût des règles, de la moins chère à la plus chère
+COST_CLASSES = ('cheap', 'parse', 'regex')
+
+# Profil → classes de coût exécutées
+PROFILES = {
+    'quick': ('cheap',),
+    'beta': COST_CLASSES,
+    'stable': COST_CLASSES,
+}
+QA_PROFILE = os.getenv("QA_PROFILE", QA_MODE if QA_MODE in PROFILES else "beta")  # "quick", "beta" or "stable"
+
+# Cache sidecar du mode incrémental, un par profil (à incrémenter si son format change)
+CACHE_FILE = ".qubits_linter_cache.{profile}.json"
+CACHE_VERSION = 2
+
+# Motifs partagés par les deux moteurs
+GHZ_PATTERN = r'([\d.]+)\s*GHz'
+DOI_PATTERN = r'10\.\d{4,}/[\w\-.;()/]+'
+GHZ_RE = re.compile(GHZ_PATTERN)
+DOI_RE = re.compile(DOI_PATTERN)
+
+# Colonnes lues par le rapport ; celles des règles viennent du registre
+A_CONFIRMER_COLUMNS = ('Systeme', 'Classe', 'DOI')
+REPORT_COLUMNS = A_CONFIRMER_COLUMNS + ('Verification_statut',)
 
 @dataclass
 class LintIssue:
@@ -32,6 +103,13 @@ class LintIssue:
     message: str
     valeur_actuelle: str
     suggestion: str = ""
+    regle: str = ""  # Nom de la règle du registre qui a produit l'issue
+
+@dataclass
+class RuleTiming:
+    """Temps cumulé et nombre d'issues d'une règle"""
+    duree_s: float = 0.0
+    issues: int = 0
 
 @dataclass
 class LintStats:
@@ -42,27 +120,78 @@ class LintStats:
     infos: int = 0
     systemes_ok: int = 0
     issues: List[LintIssue] = field(default_factory=list)
+    regles: Dict[str, RuleTiming] = field(default_factory=dict)
 
 class QubitsLinter:
     """Linter pour le dataset des qubits biologiques"""
     
-    def __init__(self, csv_path: str = "biological_qubits.csv"):
+    def __init__(self, csv_path: str = "biological_qubits.csv", engine: str = QA_ENGINE,
+                 cache_path: Optional[str] = None, profile: str = QA_PROFILE,
+                 workers: int = 1, byte_range: Optional[Tuple[int, int, int]] = None):
         self.csv_path = csv_path
+        self.workers = workers  # >1 : shards linted in parallel processes (sans cache)
+        self.byte_range = byte_range  # (fin de l'en-tête, début, fin) : lint d'un seul shard
+        self.engine = self._resolve_engine(engine)
+        self.profile = profile
+        self.rules = select_rules(profile)
+        self._current_rule = ""
+        self.cache_path = cache_path  # None = pas de cache incrémental
+        self.cache_hits = 0
         self.stats = LintStats()
         self.data = []
+        self.records = []  # Enregistrements bruts (mode incrémental uniquement)
+        self._a_confirmer = None  # Lignes a_confirmer issues du cache (mode incrémental)
+        self.columns = []
+        self.frame = None  # DataFrame (moteur columnar uniquement)
+        self._columns = {}
+    
+    @staticmethod
+    def _resolve_engine(engine: str) -> str:
+        """Résout 'auto' en 'columnar' si pandas est disponible, sinon 'rows'"""
+        if engine not in ('auto', 'rows', 'columnar'):
+            raise ValueError(f"Moteur inconnu : {engine} (auto, rows, columnar)")
+        if engine != 'auto':
+            return engine
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            return 'rows'
+        return 'columnar'
         
+    def _shard_bytes(self) -> bytes:
+        """En-tête + plage d'octets du shard, formant un CSV autonome"""
+        header_end, start, end = self.byte_range
+        with open(self.csv_path, 'rb') as f:
+            header = f.read(header_end)
+            f.seek(start)
+            return header + f.read(end - start)
+    
+    def _open_text(self):
+        """Flux texte du CSV (ou du shard), ouvert comme le fait load_csv"""
+        if self.byte_range is None:
+            return open(self.csv_path, 'r', encoding='utf-8')
+        return io.TextIOWrapper(io.BytesIO(self._shard_bytes()), encoding='utf-8')
+    
+    def _csv_source(self):
+        """Source pour pandas : le chemin, ou le shard en mémoire"""
+        if self.byte_range is None:
+            return self.csv_path
+        return io.BytesIO(self._shard_bytes())
+    
     def load_csv(self) -> List[Dict]:
         """Charge le CSV"""
-        with open(self.csv_path, 'r', encoding='utf-8') as f:
+        with self._open_text() as f:
             reader = csv.DictReader(f)
             self.data = list(reader)
+            self.columns = list(reader.fieldnames or [])
             self.stats.total_lignes = len(self.data)
         return self.data
     
     def add_issue(self, ligne: int, systeme: str, colonne: str, severite: str, 
-                  message: str, valeur: str, suggestion: str = ""):
-        """Ajoute une issue"""
-        issue = LintIssue(ligne, systeme, colonne, severite, message, valeur, suggestion)
+                  message: str, valeur: str, suggestion: str = "", regle: str = ""):
+        """Ajoute une issue (attribuée à la règle en cours si regle n'est pas fourni)"""
+        issue = LintIssue(ligne, systeme, colonne, severite, message, valeur, suggestion,
+                          regle or self._current_rule)
         self.stats.issues.append(issue)
         
         if severite == "ERROR":
@@ -101,7 +230,7 @@ class QubitsLinter:
         
         if defaut == 'NV' and freq:
             # Extraire la fréquence numérique
-            match = re.search(r'([\d.]+)\s*GHz', freq)
+            match = GHZ_RE.search(freq)
             if match:
                 freq_val = float(match.group(1))
                 if abs(freq_val - 2.87) > 0.3:
@@ -128,7 +257,7 @@ class QubitsLinter:
         if defaut == 'VV':
             freq = row.get('Frequence', '').strip()
             if freq and freq != 'NA':
-                match = re.search(r'([\d.]+)\s*GHz', freq)
+                match = GHZ_RE.search(freq)
                 if match:
                     freq_val = float(match.group(1))
                     if not (0.8 <= freq_val <= 1.5):
@@ -189,7 +318,7 @@ class QubitsLinter:
         doi = row.get('DOI', '').strip()
         systeme = row.get('Systeme', 'Inconnu')
         
-        if doi and not re.match(r'10\.\d{4,}/[\w\-.;()/]+', doi):
+        if doi and not DOI_RE.match(doi):
             self.add_issue(idx+2, systeme, 'DOI', 'WARNING',
                            f'Format DOI potentiellement invalide', doi,
                            'Format attendu : 10.xxxx/yyyyy')
@@ -244,103 +373,968 @@ class QubitsLinter:
             except ValueError:
                 pass  # Déjà géré par d'autres checks
     
+    # ------------------------------------------------------------------
+    # Moteur columnar : chaque colonne est parsée une fois, chaque règle
+    # est évaluée comme un masque booléen sur toutes les lignes.
+    # Les méthodes _col_* reproduisent exactement les check_* ci-dessus.
+    # ------------------------------------------------------------------
+    
+    def read_columns(self) -> set:
+        """Colonnes lues par les règles sélectionnées et par le rapport"""
+        return set(REPORT_COLUMNS).union(*(rule.columns for rule in self.rules))
+    
+    def load_columns(self):
+        """Charge uniquement les colonnes lues par les règles, en chaînes brutes"""
+        import pandas as pd
+        wanted = self.read_columns()
+        self.frame = pd.read_csv(self._csv_source(), dtype=str, keep_default_na=False,
+                                 na_filter=False, encoding='utf-8',
+                                 usecols=lambda name: name in wanted).fillna('')
+        self.stats.total_lignes = len(self.frame)
+        self._columns = {}
+        return self.frame
+    
+    def _column(self, name: str, default: str = '', strip: bool = True):
+        """Colonne (strippée par défaut), parsée une seule fois puis mémorisée"""
+        import pandas as pd
+        key = (name, strip)
+        if key not in self._columns:
+            if name in self.frame.columns:
+                values = self.frame[name]
+                self._columns[key] = values.str.strip() if strip else values
+            else:
+                self._columns[key] = pd.Series([default] * len(self.frame),
+                                               index=self.frame.index, dtype=str)
+        return self._columns[key]
+    
+    def _systemes(self):
+        """Colonne Systeme telle que lue par les check_* (non strippée)"""
+        return self._column('Systeme', 'Inconnu', strip=False)
+    
+    @staticmethod
+    def _map_unique(values, func):
+        """Applique func une seule fois par valeur distincte puis diffuse le résultat"""
+        import numpy as np
+        import pandas as pd
+        codes, uniques = pd.factorize(values)
+        mapped = np.array([func(u) for u in uniques], dtype=object)
+        return mapped[codes]
+    
+    @classmethod
+    def _parse_floats(cls, values):
+        """Parse float() par valeur distincte → (valeurs float64, masque parsable)"""
+        import numpy as np
+        
+        def parse(text):
+            try:
+                return float(text)
+            except ValueError:
+                return None
+        
+        parsed = cls._map_unique(values, parse)
+        ok = np.array([v is not None for v in parsed], dtype=bool)
+        return np.where(ok, parsed, np.nan).astype(float), ok
+    
+    @classmethod
+    def _extract_ghz(cls, values):
+        """Fréquence en GHz (première correspondance GHZ_RE) → (valeurs, masque trouvé)"""
+        import numpy as np
+        
+        def extract(text):
+            match = GHZ_RE.search(text)
+            return float(match.group(1)) if match else None
+        
+        parsed = cls._map_unique(values, extract)
+        found = np.array([v is not None for v in parsed], dtype=bool)
+        return np.where(found, parsed, np.nan).astype(float), found
+    
+    @staticmethod
+    def _absent(values):
+        """Masque des valeurs vides ou NA"""
+        return ((values == '') | (values == 'NA')).to_numpy()
+    
+    @staticmethod
+    def _emit(found: list, mask, systemes, colonne: str, severite: str,
+              message, valeurs, suggestion: str = ""):
+        """Transforme un masque en LintIssue.
+        
+        Seules les lignes signalées sont matérialisées. message peut être une
+        chaîne ou une fonction de la valeur, valeurs une Series ou une fonction
+        de la position.
+        """
+        import numpy as np
+        positions = np.flatnonzero(mask)
+        if len(positions) == 0:
+            return
+        noms = systemes.iloc[positions].tolist()
+        if callable(valeurs):
+            vals = [valeurs(pos) for pos in positions]
+        else:
+            vals = valeurs.iloc[positions].tolist()
+        for pos, systeme, valeur in zip(positions.tolist(), noms, vals):
+            msg = message(valeur) if callable(message) else message
+            found.append((pos, LintIssue(pos + 2, systeme, colonne, severite,
+                                         msg, valeur, suggestion)))
+    
+    def _col_contraste(self, found: list):
+        contraste = self._column('Contraste_%')
+        present = ~self._absent(contraste)
+        val, ok = self._parse_floats(contraste)
+        hors_plage = (val < 0) | (val > 100)
+        self._emit(found, present & ok & hors_plage, self._systemes(), 'Contraste_%', 'ERROR',
+                   'Contraste hors plage [0-100]%', contraste,
+                   'Vérifier source ou mettre NA si non applicable')
+        self._emit(found, present & ok & ~hors_plage & (val > 50), self._systemes(), 'Contraste_%', 'WARNING',
+                   'Contraste >50% inhabituel pour ODMR/ESR', contraste,
+                   'Vérifier si ce n est pas T2 ou autre paramètre')
+        self._emit(found, present & ~ok, self._systemes(), 'Contraste_%', 'ERROR',
+                   'Contraste non numérique', contraste,
+                   'Format attendu : nombre ou NA')
+    
+    def _ghz_where(self, freq, selection):
+        """Fréquence GHz extraite uniquement sur les lignes sélectionnées"""
+        import numpy as np
+        val = np.full(len(freq), np.nan)
+        trouve = np.zeros(len(freq), dtype=bool)
+        val[selection], trouve[selection] = self._extract_ghz(freq[selection])
+        return val, trouve
+    
+    def _col_nv_frequency(self, found: list):
+        import numpy as np
+        defaut = self._column('Defaut')
+        freq = self._column('Frequence')
+        selection = ((defaut == 'NV') & (freq != '')).to_numpy()
+        val, trouve = self._ghz_where(freq, selection)
+        self._emit(found, selection & trouve & (np.abs(val - 2.87) > 0.3), self._systemes(),
+                   'Frequence', 'ERROR',
+                   'NV doit être à 2.87±0.3 GHz (à B0~5 mT)', freq,
+                   'Vérifier source ou champ B0_Tesla')
+        self._emit(found, selection & ~trouve, self._systemes(), 'Frequence', 'WARNING',
+                   'Format fréquence non reconnu pour NV', freq,
+                   'Format attendu : "2.87 GHz"')
+    
+    def _col_sic_defaut(self, found: list):
+        systemes = self._systemes().str.lower()
+        defaut = self._column('Defaut')
+        self._emit(found, systemes.str.contains('sic', regex=False).to_numpy() & self._absent(defaut),
+                   systemes, 'Defaut', 'ERROR',
+                   'Système SiC sans défaut spécifié', defaut,
+                   'Renseigner VSi, VV, TiC ou autre')
+        
+        freq = self._column('Frequence')
+        selection = (defaut == 'VV').to_numpy() & ~self._absent(freq)
+        val, trouve = self._ghz_where(freq, selection)
+        self._emit(found, selection & trouve & ~((val >= 0.8) & (val <= 1.5)),
+                   systemes, 'Frequence', 'WARNING',
+                   lambda valeur: f'Fréquence {valeur} inhabituelle pour SiC-VV', freq,
+                   'VV sont typiquement entre 0.8 et 1.5 GHz. Vérifier source.')
+    
+    def _col_nmr_b0(self, found: list):
+        methode = self._column('Methode_lecture')
+        b0 = self._column('B0_Tesla')
+        self._emit(found, (methode == 'NMR').to_numpy() & (self._absent(b0) | (b0 == '0.0').to_numpy()),
+                   self._systemes(), 'B0_Tesla', 'ERROR',
+                   'Système NMR sans champ B0_Tesla', b0,
+                   'Renseigner champ du spectromètre (ex: 3.0 pour 3T)')
+    
+    def _col_hyperpol_t1(self, found: list):
+        hyperpol = self._column('Hyperpol_flag')
+        t1 = self._column('T1_s')
+        self._emit(found, (hyperpol == '1').to_numpy() & self._absent(t1),
+                   self._systemes(), 'T1_s', 'ERROR',
+                   'Hyperpolarisé sans T1_s (critique pour fenêtre temporelle)', t1,
+                   'Renseigner T1 en secondes (ex: 60 pour pyruvate)')
+    
+    def _col_temperature(self, found: list):
+        temp = self._column('Temperature_K')
+        in_vivo = self._column('In_vivo_flag')
+        qualite = self._column('Qualite')
+        present = ~self._absent(temp)
+        val, ok = self._parse_floats(temp)
+        numerique = present & ok
+        self._emit(found, numerique & (in_vivo == '1').to_numpy() & ((val < 290) | (val > 315)),
+                   self._systemes(), 'Temperature_K', 'WARNING',
+                   lambda valeur: f'Température in vivo inhabituelle : {valeur} K', temp,
+                   'In vivo typiquement 295-310 K')
+        self._emit(found, numerique & (val < 100) & (qualite != '1').to_numpy(),
+                   self._systemes(), 'Temperature_K', 'WARNING',
+                   lambda valeur: f'Cryogénique {valeur} K devrait avoir Qualite=1', temp,
+                   'Systèmes cryo non applicables biologie → Qualité 1')
+        self._emit(found, present & ~ok, self._systemes(), 'Temperature_K', 'ERROR',
+                   'Température non numérique', temp,
+                   'Format attendu : nombre en Kelvin')
+    
+    def _col_doi_format(self, found: list):
+        doi = self._column('DOI')
+        valide = self._map_unique(doi, lambda text: DOI_RE.match(text) is not None).astype(bool)
+        self._emit(found, (doi != '').to_numpy() & ~valide,
+                   self._systemes(), 'DOI', 'WARNING',
+                   'Format DOI potentiellement invalide', doi,
+                   'Format attendu : 10.xxxx/yyyyy')
+    
+    def _col_verification_status(self, found: list):
+        status = self._column('Verification_statut')
+        self._emit(found, ~status.isin(['verifie', 'a_confirmer']).to_numpy(),
+                   self._systemes(), 'Verification_statut', 'ERROR',
+                   lambda valeur: f'Statut invalide : {valeur}', status,
+                   'Valeurs autorisées : verifie, a_confirmer')
+    
+    def _col_source_provenance(self, found: list):
+        t2 = self._column('T2_us')
+        source_t2 = self._column('Source_T2')
+        self._emit(found, ~self._absent(t2) & self._absent(source_t2), self._systemes(),
+                   'Source_T2', 'WARNING',
+                   'T2 sans source de provenance', source_t2,
+                   'Ajouter DOI:xxx Fig.X ou estimation si calculé')
+        contraste = self._column('Contraste_%')
+        source_contraste = self._column('Source_Contraste')
+        self._emit(found, ~self._absent(contraste) & self._absent(source_contraste), self._systemes(),
+                   'Source_Contraste', 'WARNING',
+                   'Contraste sans source', source_contraste,
+                   'Ajouter référence publication')
+    
+    def _col_t2_t1_relation(self, found: list):
+        t1 = self._column('T1_s')
+        t2 = self._column('T2_us')
+        t1_s, ok_t1 = self._parse_floats(t1)
+        t2_us, ok_t2 = self._parse_floats(t2)
+        mask = ~self._absent(t1) & ~self._absent(t2) & ok_t1 & ok_t2 & (t2_us / 1e6 > 2 * t1_s)
+        self._emit(found, mask, self._systemes(), 'T2_us', 'WARNING',
+                   'T2 > 2×T1 (physiquement impossible)',
+                   lambda pos: f'T2={float(t2_us[pos])}µs, T1={float(t1_s[pos])}s',
+                   'Vérifier valeurs ou unités')
+    
+    def _timing(self, rule) -> RuleTiming:
+        return self.stats.regles.setdefault(rule.name, RuleTiming())
+    
+    def _check_rows(self):
+        """Moteur de référence : règles sélectionnées, ligne par ligne, sur self.data"""
+        timings = [(rule, self._timing(rule)) for rule in self.rules]
+        clock = time.perf_counter
+        for idx, row in enumerate(self.data):
+            for rule, timing in timings:
+                self._current_rule = rule.name
+                start = clock()
+                rule.check(self, row, idx)
+                timing.duree_s += clock() - start
+        self._current_rule = ""
+    
+    def _check_columnar(self):
+        """Moteur columnar : masques par règle sur self.frame, remis dans l'ordre du moteur rows"""
+        found = []
+        rows = None
+        for rank, rule in enumerate(self.rules):
+            start = time.perf_counter()
+            if rule.columnar is not None:
+                rule_found = []
+                rule.columnar(self, rule_found)
+            else:
+                # Règle sans implémentation columnar : évaluée ligne par ligne
+                if rows is None:
+                    rows = self.frame.to_dict('records')
+                scratch = QubitsLinter(self.csv_path, engine='rows', profile=self.profile)
+                scratch.data = rows
+                scratch.rules = [rule]
+                scratch._check_rows()
+                rule_found = [(issue.ligne - 2, issue) for issue in scratch.stats.issues]
+            self._timing(rule).duree_s += time.perf_counter() - start
+            for pos, issue in rule_found:
+                issue.regle = rule.name
+                found.append((pos, rank, issue))
+        
+        # Tri stable (ligne, règle) : conserve l'ordre des sous-checks d'une même règle
+        found.sort(key=lambda item: (item[0], item[1]))
+        for _, _, issue in found:
+            self.add_issue(issue.ligne, issue.systeme, issue.colonne, issue.severite,
+                           issue.message, issue.valeur_actuelle, issue.suggestion, issue.regle)
+    
+    # ------------------------------------------------------------------
+    # Mode incrémental : cache sidecar (hash du contenu brut d'un
+    # enregistrement → issues + infos du rapport). Les enregistrements
+    # connus ne sont ni parsés ni re-vérifiés ; le cache entier est
+    # invalidé dès que le code des règles change.
+    # ------------------------------------------------------------------
+    
+    def rules_fingerprint(self, columns: List[str]) -> str:
+        """Empreinte des règles sélectionnées (déclaration et source), motifs et en-tête CSV"""
+        digest = hashlib.sha256(f"v{CACHE_VERSION}|{GHZ_PATTERN}|{DOI_PATTERN}".encode('utf-8'))
+        digest.update('\x1f'.join(columns).encode('utf-8'))
+        for rule in self.rules:
+            digest.update(f"{rule.name}|{rule.columns}|{rule.severite}|{rule.cost}".encode('utf-8'))
+            for impl in (rule.check, rule.columnar):
+                if impl is not None:
+                    digest.update(inspect.getsource(impl).encode('utf-8'))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def record_hash(record: bytes) -> str:
+        """Hash du contenu brut d'un enregistrement CSV"""
+        return hashlib.blake2b(record, digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _parse_record(record: bytes) -> List[str]:
+        """Parse un enregistrement brut (éventuellement multi-lignes) en champs"""
+        lines = record.decode('utf-8').splitlines(keepends=True)
+        return next(csv.reader(lines), [])
+    
+    def load_records(self) -> List[bytes]:
+        """Découpe le CSV en enregistrements bruts sans les parser.
+        
+        Une ligne physique ouvre un enregistrement ; tant que le nombre de
+        guillemets cumulés est impair, un champ quoté continue sur la ligne
+        suivante. Les lignes vides sont ignorées comme le fait csv.
+        """
+        with open(self.csv_path, 'rb') as f:
+            raw = f.read()
+        
+        records = []
+        pending = None
+        quotes = 0
+        for line in raw.split(b'\n'):
+            if pending is None:
+                if line in (b'', b'\r'):
+                    continue
+                pending = [line]
+                quotes = line.count(b'"')
+            else:
+                pending.append(line)
+                quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                records.append(b'\n'.join(pending))
+                pending = None
+        if pending is not None:
+            records.append(b'\n'.join(pending))
+        
+        self.columns = self._parse_record(records[0]) if records else []
+        self.records = records[1:]
+        self.stats.total_lignes = len(self.records)
+        return self.records
+    
+    def _as_row(self, fields: List[str]) -> Dict:
+        """Champs → dict, exactement comme csv.DictReader"""
+        row = dict(zip(self.columns, fields))
+        if len(fields) > len(self.columns):
+            row[None] = fields[len(self.columns):]
+        for key in self.columns[len(fields):]:
+            row[key] = None
+        return row
+    
+    def _load_cache(self, fingerprint: str) -> Dict[str, Dict]:
+        """Lit le cache sidecar ; vide s'il est absent, illisible ou périmé"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('fingerprint') != fingerprint:
+            return {}
+        return cache.get('rows', {})
+    
+    def _save_cache(self, fingerprint: str, rows: Dict[str, Dict]):
+        """Écrit le cache (atomique) ; seuls les enregistrements encore présents sont conservés"""
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'rows': rows}, f, ensure_ascii=False,
+                      separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
+    
+    def _issues_for_rows(self, rows: List[Dict]) -> List[List[LintIssue]]:
+        """Lint d'un sous-ensemble de lignes avec le moteur courant → issues par ligne"""
+        scratch = QubitsLinter(self.csv_path, engine=self.engine, profile=self.profile)
+        scratch.rules = self.rules
+        if scratch.engine == 'columnar':
+            import pandas as pd
+            wanted = self.read_columns()
+            columns = [c for c in self.columns if c in wanted]
+            scratch.frame = pd.DataFrame([[row.get(c) for c in columns] for row in rows],
+                                         columns=columns, dtype=str).fillna('')
+            scratch.stats.total_lignes = len(rows)
+            scratch._check_columnar()
+        else:
+            scratch.data = rows
+            scratch._check_rows()
+        
+        for name, timing in scratch.stats.regles.items():
+            self.stats.regles.setdefault(name, RuleTiming()).duree_s += timing.duree_s
+        
+        by_row = [[] for _ in rows]
+        for issue in scratch.stats.issues:
+            by_row[issue.ligne - 2].append(issue)
+        return by_row
+    
+    def _check_incremental(self):
+        """Réutilise le cache pour les enregistrements inchangés, vérifie les autres"""
+        fingerprint = self.rules_fingerprint(self.columns)
+        cache = self._load_cache(fingerprint)
+        hashes = [self.record_hash(record) for record in self.records]
+        
+        # Un seul lint par contenu inconnu (les doublons exacts partagent l'entrée)
+        misses = {}
+        for idx, h in enumerate(hashes):
+            if h not in cache and h not in misses:
+                misses[h] = idx
+        if misses:
+            rows = [self._as_row(self._parse_record(self.records[idx])) for idx in misses.values()]
+            for h, row, issues in zip(misses, rows, self._issues_for_rows(rows)):
+                cache[h] = {
+                    'issues': [{k: v for k, v in asdict(issue).items() if k != 'ligne'}
+                               for issue in issues],
+                    'a_confirmer': ({k: row[k] for k in A_CONFIRMER_COLUMNS if k in row}
+                                    if row.get('Verification_statut') == 'a_confirmer' else None),
+                }
+        self.cache_hits = sum(1 for h in hashes if h not in misses)
+        
+        self._a_confirmer = []
+        for idx, h in enumerate(hashes):
+            entry = cache[h]
+            for issue in entry['issues']:
+                self.add_issue(idx + 2, issue['systeme'], issue['colonne'], issue['severite'],
+                               issue['message'], issue['valeur_actuelle'], issue['suggestion'],
+                               issue['regle'])
+            if entry['a_confirmer'] is not None:
+                self._a_confirmer.append(entry['a_confirmer'])
+        
+        self._save_cache(fingerprint, {h: cache[h] for h in hashes})
+        print(f"[CACHE] {self.cache_hits}/{len(hashes)} rows reused from {self.cache_path}")
+    
     def lint_all(self):
         """Exécute tous les checks"""
-        print(f"[LINT] Analysing {self.csv_path}...")
-        self.load_csv()
+        print(f"[LINT] Analysing {self.csv_path} (engine={self.engine}, profile={self.profile}, "
+              f"{len(self.rules)} rules)...")
+        self.stats.regles = {rule.name: RuleTiming() for rule in self.rules}
         
-        for idx, row in enumerate(self.data):
-            self.check_contraste(row, idx)
-            self.check_nv_frequency(row, idx)
-            self.check_sic_defaut(row, idx)
-            self.check_nmr_b0(row, idx)
-            self.check_hyperpol_t1(row, idx)
-            self.check_temperature(row, idx)
-            self.check_doi_format(row, idx)
-            self.check_verification_status(row, idx)
-            self.check_source_provenance(row, idx)
-            self.check_t2_t1_relation(row, idx)
+        if self.workers > 1:
+            return self._lint_parallel()
+        if self.cache_path:
+            self.load_records()
+            self._check_incremental()
+        elif self.engine == 'columnar':
+            self.load_columns()
+            self._check_columnar()
+        else:
+            self.load_csv()
+            self._check_rows()
+        
+        for issue in self.stats.issues:
+            self.stats.regles[issue.regle].issues += 1
         
         self.stats.systemes_ok = self.stats.total_lignes - len(set(
             issue.ligne for issue in self.stats.issues if issue.severite == 'ERROR'
         ))
         
+        self._print_summary()
+        return self.stats
+    
+    def _lint_parallel(self):
+        """Lint de shards alignés sur les enregistrements dans un ProcessPoolExecutor.
+        
+        Chaque processus reconstruit le registre à l'import du module : les
+        règles enregistrées dynamiquement ne sont visibles que sous fork.
+        """
+        shards = record_shards(self.csv_path, self.workers)
+        print(f"[LINT] {len(shards)} shards on {self.workers} workers")
+        n = len(shards)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(_lint_shard, [self.csv_path] * n, [self.engine] * n,
+                                    [self.profile] * n, shards))
+        
+        self.stats = merge_stats([stats for stats, _ in results], self.rules)
+        self._a_confirmer = [row for _, rows in results for row in rows]
+        self._print_summary()
+        return self.stats
+    
+    def _print_summary(self):
         print(f"[OK] Lint completed: {self.stats.total_lignes} systems analysed")
         print(f"   [ERROR] Errors: {self.stats.erreurs}")
         print(f"   [WARN]  Warnings: {self.stats.warnings}")
         print(f"   [INFO]  Infos: {self.stats.infos}")
         print(f"   [OK]    Systems OK: {self.stats.systemes_ok}")
+    
+    def _write_report_header(self, f):
+        """En-tête du rapport : statistiques et verdict (nécessite des compteurs finaux)"""
+        f.write("# 🔍 Rapport de Contrôle Qualité — Atlas des Qubits Biologiques v1.2\n\n")
+        f.write(f"**Date** : {self._get_date()}\n")
+        f.write(f"**Fichier** : `{self.csv_path}`\n\n")
         
-        return self.stats
+        f.write("## 📊 Statistiques\n\n")
+        f.write(f"- **Total systèmes analysés** : {self.stats.total_lignes}\n")
+        f.write(f"- **❌ Erreurs bloquantes** : {self.stats.erreurs}\n")
+        f.write(f"- **⚠️ Warnings** : {self.stats.warnings}\n")
+        f.write(f"- **ℹ️ Informations** : {self.stats.infos}\n")
+        f.write(f"- **✅ Systèmes sans erreur** : {self.stats.systemes_ok}\n\n")
+        
+        if self.stats.erreurs == 0:
+            f.write("### ✅ Aucune erreur bloquante détectée !\n\n")
+            f.write("Le dataset est prêt pour publication.\n\n")
+        else:
+            f.write("### ❌ Corrections requises\n\n")
+            f.write(f"{self.stats.erreurs} erreur(s) bloquante(s) doivent être corrigées avant publication.\n\n")
+    
+    @staticmethod
+    def _format_severity_heading(severite: str, count: int) -> str:
+        return f"## {SEVERITY_ICONS[severite]} {severite}S ({count})\n\n"
+    
+    @staticmethod
+    def _format_issue_md(issue: LintIssue) -> str:
+        """Bloc Markdown d'une issue"""
+        block = (f"### Ligne {issue.ligne} : {issue.systeme}\n\n"
+                 f"**Colonne** : `{issue.colonne}`\n\n"
+                 f"**Problème** : {issue.message}\n\n"
+                 f"**Valeur actuelle** : `{issue.valeur_actuelle}`\n\n")
+        if issue.suggestion:
+            block += f"**Suggestion** : {issue.suggestion}\n\n"
+        return block + "---\n\n"
+    
+    @staticmethod
+    def _format_a_confirmer_header(count: int) -> str:
+        return ("## 📝 Systèmes à confirmer (Verification_statut=a_confirmer)\n\n"
+                f"**Total** : {count} systèmes\n\n")
+    
+    @staticmethod
+    def _format_a_confirmer_md(row: Dict) -> str:
+        """Puce Markdown d'un système à confirmer"""
+        systeme = row.get('Systeme', 'Inconnu')
+        classe = row.get('Classe', '?')
+        doi = row.get('DOI', 'N/A')
+        return f"- **{systeme}** (Classe {classe}) — DOI: {doi}\n"
+    
+    def _write_report_footer(self, f):
+        f.write("\n")
+        self._write_rules_table(f)
+        
+        f.write("\n---\n\n")
+        f.write("*Rapport généré automatiquement par `qubits_linter.py`*\n")
     
     def generate_report_md(self, output_path: str = "QC_REPORT.md"):
         """Génère le rapport QC en Markdown"""
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("# 🔍 Rapport de Contrôle Qualité — Atlas des Qubits Biologiques v1.2\n\n")
-            f.write(f"**Date** : {self._get_date()}\n")
-            f.write(f"**Fichier** : `{self.csv_path}`\n\n")
-            
-            f.write("## 📊 Statistiques\n\n")
-            f.write(f"- **Total systèmes analysés** : {self.stats.total_lignes}\n")
-            f.write(f"- **❌ Erreurs bloquantes** : {self.stats.erreurs}\n")
-            f.write(f"- **⚠️ Warnings** : {self.stats.warnings}\n")
-            f.write(f"- **ℹ️ Informations** : {self.stats.infos}\n")
-            f.write(f"- **✅ Systèmes sans erreur** : {self.stats.systemes_ok}\n\n")
-            
-            if self.stats.erreurs == 0:
-                f.write("### ✅ Aucune erreur bloquante détectée !\n\n")
-                f.write("Le dataset est prêt pour publication.\n\n")
-            else:
-                f.write("### ❌ Corrections requises\n\n")
-                f.write(f"{self.stats.erreurs} erreur(s) bloquante(s) doivent être corrigées avant publication.\n\n")
+            self._write_report_header(f)
             
             # Issues par sévérité
-            for severite in ['ERROR', 'WARNING', 'INFO']:
+            for severite in SEVERITY_ICONS:
                 issues = [i for i in self.stats.issues if i.severite == severite]
                 if not issues:
                     continue
                 
-                icon = {'ERROR': '❌', 'WARNING': '⚠️', 'INFO': 'ℹ️'}[severite]
-                f.write(f"## {icon} {severite}S ({len(issues)})\n\n")
-                
+                f.write(self._format_severity_heading(severite, len(issues)))
                 for issue in issues:
-                    f.write(f"### Ligne {issue.ligne} : {issue.systeme}\n\n")
-                    f.write(f"**Colonne** : `{issue.colonne}`\n\n")
-                    f.write(f"**Problème** : {issue.message}\n\n")
-                    f.write(f"**Valeur actuelle** : `{issue.valeur_actuelle}`\n\n")
-                    if issue.suggestion:
-                        f.write(f"**Suggestion** : {issue.suggestion}\n\n")
-                    f.write("---\n\n")
+                    f.write(self._format_issue_md(issue))
             
             # Résumé des systèmes à confirmer
-            f.write("## 📝 Systèmes à confirmer (Verification_statut=a_confirmer)\n\n")
-            a_confirmer = [row for row in self.data if row.get('Verification_statut') == 'a_confirmer']
-            f.write(f"**Total** : {len(a_confirmer)} systèmes\n\n")
-            
+            a_confirmer = self._rows_a_confirmer()
+            f.write(self._format_a_confirmer_header(len(a_confirmer)))
             for row in a_confirmer:
-                systeme = row.get('Systeme', 'Inconnu')
-                classe = row.get('Classe', '?')
-                doi = row.get('DOI', 'N/A')
-                f.write(f"- **{systeme}** (Classe {classe}) — DOI: {doi}\n")
+                f.write(self._format_a_confirmer_md(row))
             
-            f.write("\n---\n\n")
-            f.write("*Rapport généré automatiquement par `qubits_linter.py`*\n")
+            self._write_report_footer(f)
         
         print(f"[OK] Report generated: {output_path}")
     
+    # ------------------------------------------------------------------
+    # Mode streaming : le CSV est lu par blocs de STREAM_CHUNK_ROWS lignes,
+    # les issues sont générées au fil de l'eau et déversées dans des
+    # fichiers temporaires par sévérité ; le rapport est assemblé en une
+    # passe séquentielle. Ni le dataset ni les issues ne restent en mémoire.
+    # ------------------------------------------------------------------
+    
+    def _iter_chunks(self) -> Iterator[Tuple[int, int]]:
+        """Charge le CSV bloc par bloc dans self.data / self.frame → (première ligne, taille)"""
+        start = 0
+        if self.engine == 'columnar':
+            import pandas as pd
+            wanted = self.read_columns()
+            reader = pd.read_csv(self._csv_source(), dtype=str, keep_default_na=False,
+                                 na_filter=False, encoding='utf-8',
+                                 usecols=lambda name: name in wanted, chunksize=STREAM_CHUNK_ROWS)
+            with reader:
+                for chunk in reader:
+                    self.frame = chunk.fillna('')
+                    self._columns = {}
+                    yield start, len(chunk)
+                    start += len(chunk)
+            self.frame = None
+        else:
+            with self._open_text() as f:
+                reader = csv.DictReader(f)
+                while True:
+                    self.data = []  # Libère le bloc précédent avant de lire le suivant
+                    self.data = list(itertools.islice(reader, STREAM_CHUNK_ROWS))
+                    if not self.data:
+                        break
+                    yield start, len(self.data)
+                    start += len(self.data)
+            self.data = []
+    
+    def iter_issues(self, on_a_confirmer: Optional[Callable[[Dict], None]] = None) -> Iterator[LintIssue]:
+        """Génère les issues dans l'ordre de lint_all sans les conserver.
+        
+        Les compteurs de self.stats sont à jour une fois le générateur épuisé
+        (self.stats.issues reste vide). on_a_confirmer reçoit chaque ligne
+        Verification_statut=a_confirmer.
+        """
+        self.stats = LintStats(regles={rule.name: RuleTiming() for rule in self.rules})
+        lignes_en_erreur = 0
+        
+        for start, size in self._iter_chunks():
+            self.stats.total_lignes = start + size
+            if self.engine == 'columnar':
+                self._check_columnar()
+            else:
+                self._check_rows()
+            if on_a_confirmer is not None:
+                for row in self._rows_a_confirmer():
+                    on_a_confirmer(row)
+            
+            issues, self.stats.issues = self.stats.issues, []
+            derniere_erreur = None
+            for issue in issues:
+                issue.ligne += start
+                self.stats.regles[issue.regle].issues += 1
+                if issue.severite == 'ERROR' and issue.ligne != derniere_erreur:
+                    lignes_en_erreur += 1
+                    derniere_erreur = issue.ligne
+                yield issue
+        
+        self.stats.systemes_ok = self.stats.total_lignes - lignes_en_erreur
+    
+    def generate_report_streaming(self, output_path: str = "QC_REPORT.md",
+                                  jsonl_path: Optional[str] = None, sarif_path: Optional[str] = None):
+        """Lint + rapport en mémoire constante (et exports JSONL/SARIF optionnels)"""
+        print(f"[LINT] Streaming {self.csv_path} (engine={self.engine}, profile={self.profile}, "
+              f"{len(self.rules)} rules, chunks of {STREAM_CHUNK_ROWS} rows)...")
+        
+        with contextlib.ExitStack() as stack:
+            spills = {severite: stack.enter_context(tempfile.TemporaryFile('w+', encoding='utf-8'))
+                      for severite in SEVERITY_ICONS}
+            counts = dict.fromkeys(SEVERITY_ICONS, 0)
+            confirmer = stack.enter_context(tempfile.TemporaryFile('w+', encoding='utf-8'))
+            n_confirmer = 0
+            
+            def on_a_confirmer(row):
+                nonlocal n_confirmer
+                confirmer.write(self._format_a_confirmer_md(row))
+                n_confirmer += 1
+            
+            exporter = stack.enter_context(IssueExporter(self, jsonl_path, sarif_path))
+            for issue in self.iter_issues(on_a_confirmer):
+                exporter.write(issue)
+                if issue.severite in spills:
+                    spills[issue.severite].write(self._format_issue_md(issue))
+                    counts[issue.severite] += 1
+            
+            self._print_summary()
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                self._write_report_header(f)
+                for severite, spill in spills.items():
+                    if not counts[severite]:
+                        continue
+                    f.write(self._format_severity_heading(severite, counts[severite]))
+                    spill.seek(0)
+                    shutil.copyfileobj(spill, f)
+                
+                f.write(self._format_a_confirmer_header(n_confirmer))
+                confirmer.seek(0)
+                shutil.copyfileobj(confirmer, f)
+                
+                self._write_report_footer(f)
+        
+        print(f"[OK] Report generated: {output_path}")
+        return self.stats
+    
+    def export_issues(self, jsonl_path: Optional[str] = None, sarif_path: Optional[str] = None):
+        """Exporte les issues de lint_all en JSONL et/ou SARIF"""
+        with IssueExporter(self, jsonl_path, sarif_path) as exporter:
+            for issue in self.stats.issues:
+                exporter.write(issue)
+    
+    def rules_summary(self) -> List[Dict]:
+        """Une entrée par règle exécutée, de la plus lente à la plus rapide"""
+        summary = []
+        for rule in self.rules:
+            timing = self.stats.regles.get(rule.name, RuleTiming())
+            summary.append({
+                'regle': rule.name,
+                'cout': rule.cost,
+                'severite': rule.severite,
+                'colonnes': list(rule.columns),
+                'issues': timing.issues,
+                'duree_ms': round(timing.duree_s * 1000, 3),
+            })
+        return sorted(summary, key=lambda entry: entry['duree_ms'], reverse=True)
+    
+    def _write_rules_table(self, f):
+        """Section Markdown : temps et nombre d'issues par règle"""
+        f.write(f"## ⏱️ Temps par règle (profil `{self.profile}`, moteur `{self.engine}`)\n\n")
+        if self.cache_path:
+            f.write(f"*{self.cache_hits}/{self.stats.total_lignes} lignes servies par le cache "
+                    f"incrémental (non re-vérifiées, non chronométrées).*\n\n")
+        f.write("| Règle | Coût | Sévérité max | Colonnes | Issues | Temps (ms) |\n")
+        f.write("|---|---|---|---|---:|---:|\n")
+        for entry in self.rules_summary():
+            colonnes = ', '.join(f"`{c}`" for c in entry['colonnes'])
+            f.write(f"| `{entry['regle']}` | {entry['cout']} | {entry['severite']} | {colonnes} "
+                    f"| {entry['issues']} | {entry['duree_ms']:.3f} |\n")
+    
+    def generate_rules_json(self, output_path: str = "QC_RULES.json"):
+        """Exporte le tableau temps/issues par règle en JSON"""
+        summary = self.rules_summary()
+        payload = {
+            'date': self._get_date(),
+            'fichier': self.csv_path,
+            'profil': self.profile,
+            'moteur': self.engine,
+            'total_ms': round(sum(entry['duree_ms'] for entry in summary), 3),
+            'regles': summary,
+        }
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        
+        print(f"[OK] Rule timings generated: {output_path}")
+    
+    def _rows_a_confirmer(self) -> List[Dict]:
+        """Lignes avec Verification_statut=a_confirmer (quel que soit le moteur)"""
+        if self.frame is not None:
+            if 'Verification_statut' not in self.frame.columns:
+                return []
+            # Seules les colonnes affichées sont matérialisées (to_dict('records') est coûteux)
+            selection = self.frame['Verification_statut'] == 'a_confirmer'
+            columns = [c for c in A_CONFIRMER_COLUMNS if c in self.frame.columns]
+            values = [self.frame.loc[selection, c].tolist() for c in columns]
+            return [dict(zip(columns, row)) for row in zip(*values)]
+        if self._a_confirmer is not None:
+            return self._a_confirmer
+        return [row for row in self.data if row.get('Verification_statut') == 'a_confirmer']
+    
     def _get_date(self) -> str:
         """Retourne la date actuelle"""
         from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M")
 
+def record_shards(csv_path: str, n_shards: int) -> List[Tuple[int, int, int]]:
+    """Découpe les données du CSV en au plus n_shards plages d'octets.
+    
+    Chaque coupure tombe sur une fin d'enregistrement : un saut de ligne
+    précédé d'un nombre pair de guillemets depuis le début du fichier (hors
+    champ quoté). Le fichier est parcouru par blocs, les guillemets comptés
+    en C ; seuls les voisinages des coupures visées sont examinés ligne à
+    ligne. Retourne des triplets (fin de l'en-tête, début, fin).
+    """
+    size = os.path.getsize(csv_path)
+    # La première cible (0) produit la fin de l'en-tête
+    targets = [0] + [size * k // n_shards for k in range(1, n_shards)]
+    cuts = []
+    quotes = 0  # guillemets avant le bloc courant
+    pos = 0  # offset du bloc courant
+    with open(csv_path, 'rb') as f:
+        while targets:
+            block = f.read(SHARD_SCAN_BYTES)
+            if not block:
+                break
+            scanned = 0  # guillemets de block[:scanned] déjà ajoutés à q
+            q = quotes
+            while targets and targets[0] < pos + len(block):
+                i = max(targets[0] - pos, scanned)
+                q += block.count(b'"', scanned, i)
+                scanned = i
+                cut = None
+                while cut is None:
+                    nl = block.find(b'\n', scanned)
+                    if nl == -1:
+                        break
+                    q += block.count(b'"', scanned, nl)
+                    scanned = nl + 1
+                    if q % 2 == 0:
+                        cut = pos + scanned
+                if cut is None:
+                    # Fin d'enregistrement dans un bloc suivant
+                    targets[0] = pos + len(block)
+                    break
+                cuts.append(cut)
+                while targets and targets[0] < cut:
+                    targets.pop(0)
+            quotes += block.count(b'"')
+            pos += len(block)
+    
+    header_end = cuts[0] if cuts else size
+    bounds = [header_end] + cuts[1:] + [size]
+    return [(header_end, start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def _lint_shard(csv_path: str, engine: str, profile: str,
+                byte_range: Tuple[int, int, int]) -> Tuple[LintStats, List[Dict]]:
+    """Worker : lint d'un shard → (stats aux lignes relatives, lignes a_confirmer)"""
+    linter = QubitsLinter(csv_path, engine=engine, profile=profile, byte_range=byte_range)
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = linter.lint_all()
+    a_confirmer = [{k: row[k] for k in A_CONFIRMER_COLUMNS if k in row}
+                   for row in linter._rows_a_confirmer()]
+    return stats, a_confirmer
+
+def merge_stats(shards: List[LintStats], rules: List["LintRule"]) -> LintStats:
+    """Fusionne les stats de shards consécutifs (numéros de ligne rendus absolus)"""
+    merged = LintStats(regles={rule.name: RuleTiming() for rule in rules})
+    for stats in shards:
+        for issue in stats.issues:
+            issue.ligne += merged.total_lignes
+            merged.issues.append(issue)
+        merged.total_lignes += stats.total_lignes
+        merged.erreurs += stats.erreurs
+        merged.warnings += stats.warnings
+        merged.infos += stats.infos
+        # Les lignes en erreur de shards distincts sont disjointes
+        merged.systemes_ok += stats.systemes_ok
+        for name, timing in stats.regles.items():
+            total = merged.regles.setdefault(name, RuleTiming())
+            total.duree_s += timing.duree_s
+            total.issues += timing.issues
+    return merged
+
+class IssueExporter:
+    """Exports machine des issues au fil de l'eau : JSONL (une issue par ligne) et SARIF 2.1.0"""
+    
+    def __init__(self, linter: QubitsLinter, jsonl_path: Optional[str] = None,
+                 sarif_path: Optional[str] = None):
+        self.linter = linter
+        self.jsonl_path = jsonl_path
+        self.sarif_path = sarif_path
+        self._jsonl = None
+        self._sarif = None
+        self._sarif_suffix = ""
+        self._first_result = True
+    
+    def __enter__(self):
+        if self.jsonl_path:
+            self._jsonl = open(self.jsonl_path, 'w', encoding='utf-8')
+        if self.sarif_path:
+            self._sarif = open(self.sarif_path, 'w', encoding='utf-8')
+            # Document SARIF complet avec "results" vide, découpé autour de ce tableau
+            prefix, self._sarif_suffix = json.dumps(self._sarif_skeleton(), ensure_ascii=False).rsplit('[]', 1)
+            self._sarif.write(prefix + '[')
+        return self
+    
+    def _sarif_skeleton(self) -> Dict:
+        rules = [{
+            'id': rule.name,
+            'shortDescription': {'text': (rule.check.__doc__ or rule.name).strip().splitlines()[0]},
+            'defaultConfiguration': {'level': SARIF_LEVELS.get(rule.severite, 'note')},
+            'properties': {'cost': rule.cost, 'columns': list(rule.columns)},
+        } for rule in self.linter.rules]
+        return {
+            '$schema': SARIF_SCHEMA,
+            'version': '2.1.0',
+            'runs': [{
+                'tool': {'driver': {'name': 'qubits_linter', 'rules': rules}},
+                'properties': {'profile': self.linter.profile, 'engine': self.linter.engine},
+                'results': [],
+            }],
+        }
+    
+    def write(self, issue: LintIssue):
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(asdict(issue), ensure_ascii=False) + '\n')
+        if self._sarif is not None:
+            result = {
+                'ruleId': issue.regle,
+                'level': SARIF_LEVELS.get(issue.severite, 'note'),
+                'message': {'text': issue.message},
+                'locations': [{'physicalLocation': {
+                    'artifactLocation': {'uri': self.linter.csv_path},
+                    'region': {'startLine': issue.ligne},
+                }}],
+                'properties': {
+                    'systeme': issue.systeme,
+                    'colonne': issue.colonne,
+                    'valeur_actuelle': issue.valeur_actuelle,
+                    'suggestion': issue.suggestion,
+                },
+            }
+            self._sarif.write(('' if self._first_result else ',') + json.dumps(result, ensure_ascii=False))
+            self._first_result = False
+    
+    def __exit__(self, *exc):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            print(f"[OK] Issues exported: {self.jsonl_path}")
+        if self._sarif is not None:
+            self._sarif.write(']' + self._sarif_suffix)
+            self._sarif.close()
+            print(f"[OK] Issues exported: {self.sarif_path}")
+        return False
+
+@dataclass(frozen=True)
+class LintRule:
+    """Règle du registre : colonnes lues, sévérité maximale, classe de coût, implémentations"""
+    name: str
+    columns: Tuple[str, ...]
+    severite: str  # Sévérité la plus haute que la règle peut produire
+    cost: str  # Une des COST_CLASSES
+    check: Callable  # check(linter, row, idx) — moteur rows (référence)
+    columnar: Optional[Callable] = None  # columnar(linter, found) — moteur columnar
+
+# Registre ordonné : l'ordre d'enregistrement fixe l'ordre des issues d'une ligne
+RULES: Dict[str, LintRule] = {}
+
+def register_rule(rule: LintRule) -> LintRule:
+    """Ajoute (ou remplace) une règle dans le registre"""
+    if rule.cost not in COST_CLASSES:
+        raise ValueError(f"Classe de coût inconnue : {rule.cost} ({', '.join(COST_CLASSES)})")
+    RULES[rule.name] = rule
+    return rule
+
+def select_rules(profile: str) -> List[LintRule]:
+    """Règles exécutées par un profil, dans l'ordre du registre"""
+    if profile not in PROFILES:
+        raise ValueError(f"Profil inconnu : {profile} ({', '.join(PROFILES)})")
+    return [rule for rule in RULES.values() if rule.cost in PROFILES[profile]]
+
+for _rule in [
+    LintRule('contraste', ('Systeme', 'Contraste_%'), 'ERROR', 'parse',
+             QubitsLinter.check_contraste, QubitsLinter._col_contraste),
+    LintRule('nv_frequency', ('Systeme', 'Defaut', 'Frequence'), 'ERROR', 'regex',
+             QubitsLinter.check_nv_frequency, QubitsLinter._col_nv_frequency),
+    LintRule('sic_defaut', ('Systeme', 'Defaut', 'Frequence'), 'ERROR', 'regex',
+             QubitsLinter.check_sic_defaut, QubitsLinter._col_sic_defaut),
+    LintRule('nmr_b0', ('Systeme', 'Methode_lecture', 'B0_Tesla'), 'ERROR', 'cheap',
+             QubitsLinter.check_nmr_b0, QubitsLinter._col_nmr_b0),
+    LintRule('hyperpol_t1', ('Systeme', 'Hyperpol_flag', 'T1_s'), 'ERROR', 'cheap',
+             QubitsLinter.check_hyperpol_t1, QubitsLinter._col_hyperpol_t1),
+    LintRule('temperature', ('Systeme', 'Temperature_K', 'In_vivo_flag', 'Qualite'), 'ERROR', 'parse',
+             QubitsLinter.check_temperature, QubitsLinter._col_temperature),
+    LintRule('doi_format', ('Systeme', 'DOI'), 'WARNING', 'regex',
+             QubitsLinter.check_doi_format, QubitsLinter._col_doi_format),
+    LintRule('verification_status', ('Systeme', 'Verification_statut'), 'ERROR', 'cheap',
+             QubitsLinter.check_verification_status, QubitsLinter._col_verification_status),
+    LintRule('source_provenance', ('Systeme', 'T2_us', 'Source_T2', 'Contraste_%', 'Source_Contraste'),
+             'WARNING', 'cheap',
+             QubitsLinter.check_source_provenance, QubitsLinter._col_source_provenance),
+    LintRule('t2_t1_relation', ('Systeme', 'T1_s', 'T2_us'), 'WARNING', 'parse',
+             QubitsLinter.check_t2_t1_relation, QubitsLinter._col_t2_t1_relation),
+]:
+    register_rule(_rule)
+
 def main():
     """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(description="Linter biological_qubits.csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Lint en N processus sur des shards du CSV (désactive le cache)")
+    args = parser.parse_args()
+    
     print(f"[QA] Validation mode: {QA_MODE.upper()}")
     
-    linter = QubitsLinter("biological_qubits.csv")
-    stats = linter.lint_all()
-    linter.generate_report_md("QC_REPORT.md")
+    csv_path = "biological_qubits.csv"
+    if QA_STREAM:
+        linter = QubitsLinter(csv_path, profile=QA_PROFILE)
+        stats = linter.generate_report_streaming("QC_REPORT.md", "QC_REPORT.jsonl", "QC_REPORT.sarif")
+    else:
+        cache_path = None
+        if QA_CACHE and args.workers <= 1:
+            cache_path = os.path.join(os.path.dirname(csv_path), CACHE_FILE.format(profile=QA_PROFILE))
+        linter = QubitsLinter(csv_path, cache_path=cache_path, profile=QA_PROFILE, workers=args.workers)
+        stats = linter.lint_all()
+        linter.generate_report_md("QC_REPORT.md")
+        linter.export_issues("QC_REPORT.jsonl", "QC_REPORT.sarif")
+    linter.generate_rules_json("QC_RULES.json")
     
     # Exit code logic depends on mode
     if QA_MODE == "stable":
@@ -11,69 +11,60 @@ Usage:
     python run_pipeline.py --build         # Build candidats uniquement
     python run_pipeline.py --qa            # QA uniquement
     python run_pipeline.py --quick         # Quick test (sample data)
+    python run_pipeline.py --max-parallel 1  # Exécution séquentielle
+
+Les stages déclarent leurs fichiers d'entrée/sortie ; les branches
+indépendantes (harvests FPbase / UniProt / PDB) tournent en parallèle et les
+scripts sont exécutés dans le processus courant (imports payés une fois).
+Les stages inchangés (script et modules importés + inputs + config) sont restaurés depuis
+data/cache/stages/ au lieu d'être relancés (--no-cache / --rerun STAGE).
 """
 
 import sys
-import subprocess
 from pathlib import Path
 import argparse
 from datetime import datetime
 
-# Scripts ETL
-HARVEST_SCRIPTS = [
-    "scripts/etl/fetch_fpbase_candidates.py",
-    "scripts/etl/fetch_uniprot_bulk.py",
-    "scripts/etl/fetch_pdb_pdbe_bulk.py",
-]
-
-BUILD_SCRIPTS = [
-    "scripts/etl/build_external_candidates.py",
-    "scripts/etl/classify_modality.py",
-]
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+from automation.pipeline_dag import Stage, PipelineDAG, StageCache  # noqa: E402
 
-CONTRAST_SCRIPTS = [
-    "scripts/etl/fetch_pmc_contrast.py",
-    "scripts/etl/compute_proxies.py",
-]
-
-TABLE_SCRIPTS = [
-    "scripts/etl/build_atlas_tables_v1_2.py",
-]
+CANDIDATES = "data/interim/external_candidates.parquet"
 
-QA_SCRIPTS = [
-    "scripts/qa/audit_fp_optical_v1_2.py",
+# Stages ETL : les dépendances sont déduites des fichiers lus/écrits
+PIPELINE = [
+    # Harvest (branches indépendantes)
+    Stage("fetch_fpbase", "scripts/etl/fetch_fpbase_candidates.py",
+          outputs=["data/raw/external/fpbase/fpbase_proteins.json"], group="harvest"),
+    Stage("fetch_uniprot", "scripts/etl/fetch_uniprot_bulk.py",
+          outputs=["data/raw/external/uniprot/uniprot_fluorescent_proteins.ndjson"], config=["uniprot"],
+          group="harvest"),
+    Stage("fetch_pdb", "scripts/etl/fetch_pdb_pdbe_bulk.py",
+          outputs=["data/raw/external/pdb/pdb_fluorescent_proteins.json"], config=["pdb"],
+          group="harvest"),
+    # Build candidats
+    Stage("build_candidates", "scripts/etl/build_external_candidates.py",
+          inputs=["data/raw/external/fpbase/fpbase_proteins.json",
+                  "data/raw/external/uniprot/uniprot_fluorescent_proteins.ndjson",
+                  "data/raw/external/pdb/pdb_fluorescent_proteins.json"],
+          outputs=[CANDIDATES], group="build"),
+    Stage("classify_modality", "scripts/etl/classify_modality.py",
+          inputs=[CANDIDATES], outputs=[CANDIDATES, "reports/MODALITY_SPLIT.md"], group="build"),
+    # Contraste
+    Stage("fetch_pmc_contrast", "scripts/etl/fetch_pmc_contrast.py",
+          inputs=[CANDIDATES], outputs=["data/interim/pmc_contrast_measurements.parquet"],
+          group="contrast"),
+    Stage("compute_proxies", "scripts/etl/compute_proxies.py",
+          inputs=[CANDIDATES, "data/interim/pmc_contrast_measurements.parquet"],
+          outputs=[CANDIDATES], group="contrast"),
+    # Tables
+    Stage("build_tables", "scripts/etl/build_atlas_tables_v1_2.py",
+          inputs=[CANDIDATES], outputs=["data/processed/atlas_fp_optical_v1_2.csv"],
+          group="tables"),
+    # QA
+    Stage("qa_audit", "scripts/qa/audit_fp_optical_v1_2.py",
+          inputs=["data/processed/atlas_fp_optical_v1_2.csv"], group="qa"),
 ]
 
-def run_script(script_path: str) -> int:
-    """Exécute un script Python."""
-    print("\n" + "=" * 70)
-    print(f"Running: {script_path}")
-    print("=" * 70)
-    
-    result = subprocess.run([sys.executable, script_path])
-    
-    if result.returncode != 0:
-        print(f"\nERROR: {script_path} failed with code {result.returncode}", file=sys.stderr)
-        return result.returncode
-    
-    print(f"\nOK {script_path} completed successfully")
-    return 0
-
-def run_stage(stage_name: str, scripts: list) -> int:
-    """Exécute un stage du pipeline."""
-    print("\n" + "#" * 70)
-    print(f"# STAGE: {stage_name}")
-    print("#" * 70)
-    
-    for script in scripts:
-        ret = run_script(script)
-        if ret != 0:
-            print(f"\nERROR STAGE '{stage_name}' FAILED", file=sys.stderr)
-            return ret
-    
-    print(f"\nOK STAGE '{stage_name}' COMPLETED")
-    return 0
-
 def main():
     """Point d'entrée principal."""
     parser = argparse.ArgumentParser(description="Atlas v1.2.0 FP Optical Pipeline Runner")
@@ -84,6 +75,14 @@ def main():
     parser.add_argument("--tables", action="store_true", help="Run table build only")
     parser.add_argument("--qa", action="store_true", help="Run QA audit only")
     parser.add_argument("--quick", action="store_true", help="Quick test mode (sample data)")
+    parser.add_argument("--max-parallel", type=int, default=4,
+                        help="Maximum number of stages running concurrently (default: 4)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run every stage in its own Python subprocess")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the stage cache (data/cache/stages/) and run every stage")
+    parser.add_argument("--rerun", action="append", default=[], metavar="STAGE",
+                        help="Force a stage to run even if its cache key is unchanged")
     
     args = parser.parse_args()
     
@@ -96,38 +95,19 @@ def main():
     print()
     
     # Determine what to run
-    run_all = args.full or not any([args.harvest, args.build, args.contrast, args.tables, args.qa])
-    
-    ret = 0
-    
-    # Harvest
-    if run_all or args.harvest:
-        ret = run_stage("HARVEST", HARVEST_SCRIPTS)
-        if ret != 0 and not args.full:
-            sys.exit(ret)
-    
-    # Build
-    if run_all or args.build:
-        ret = run_stage("BUILD CANDIDATES", BUILD_SCRIPTS)
-        if ret != 0 and not args.full:
-            sys.exit(ret)
-    
-    # Contrast
-    if run_all or args.contrast:
-        ret = run_stage("CONTRAST EXTRACTION", CONTRAST_SCRIPTS)
-        if ret != 0 and not args.full:
-            sys.exit(ret)
-    
-    # Tables
-    if run_all or args.tables:
-        ret = run_stage("BUILD TABLES", TABLE_SCRIPTS)
-        if ret != 0 and not args.full:
-            sys.exit(ret)
-    
-    # QA
-    if run_all or args.qa:
-        ret = run_stage("QA AUDIT", QA_SCRIPTS)
-        # Don't exit on QA failure, just report
+    selected = [g for g in ("harvest", "build", "contrast", "tables", "qa") if getattr(args, g)]
+    dag = PipelineDAG(PIPELINE)
+    if selected and not args.full:
+        dag = dag.subset(s.name for s in PIPELINE if s.group in selected)
+    
+    # Sans --full, plus aucun stage n'est lancé après le premier échec
+    # (les échecs QA sont seulement reportés : QA est le dernier stage)
+    cache = None if args.no_cache else StageCache()
+    dag.run(max_parallel=args.max_parallel, in_process=not args.isolate, keep_going=args.full,
+            cache=cache, rerun=args.rerun)
+    dag.print_summary()
+    
+    ret = dag.returncode
     
     # Summary
     end_time = datetime.now()
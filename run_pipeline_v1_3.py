@@ -9,61 +9,116 @@ Execute full pipeline:
 3. Build Tables
 4. QA Audit
 
+Les stages sont ordonnancés en graphe de dépendances (scripts/automation/
+pipeline_dag.py) : les harvests indépendants tournent en parallèle.
+
+Usage:
+    python run_pipeline_v1_3.py [--max-parallel N] [--isolate] [--no-cache] [--rerun STAGE]
+
+Un stage dont le script (et les modules locaux qu'il importe), les inputs et
+les sections de config/providers.yml sont inchangés n'est pas relancé : ses outputs sont restaurés depuis
+data/cache/stages/.
+
 Author: Biological Qubit Atlas Team
 License: MIT
 """
 
-import subprocess
+import argparse
 import sys
 from pathlib import Path
 
-def run_script(script_path: str, description: str) -> int:
-    """Run a Python script and return exit code."""
-    print("\n" + "=" * 70)
-    print(f"{description}")
-    print("=" * 70)
-    
-    result = subprocess.run([sys.executable, script_path])
-    
-    if result.returncode != 0:
-        print(f"\nERROR: {script_path} failed with code {result.returncode}")
-        return result.returncode
-    
-    print(f"\nOK {script_path} completed successfully")
-    return 0
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+from automation.pipeline_dag import Stage, PipelineDAG, StageCache  # noqa: E402
+
+PMC_CONTRASTS = "data/interim/pmc_contrasts.parquet"
+CANDIDATES = "data/interim/external_candidates_v1_3.parquet"
+ATLAS_CSV = "data/processed/atlas_fp_optical_v1_3.csv"
+ATLAS_PARQUET = "data/processed/atlas_fp_optical_v1_3.parquet"
+
+# Les harvests FPbase, spécialistes et PMC sont indépendants : seule la
+# branche PMC -> suppléments -> tableurs est séquentielle. `config` liste les
+# sections de config/providers.yml lues par le script (clé de cache).
+PIPELINE = [
+    Stage("fpbase_graphql", "scripts/etl/fetch_fpbase_graphql.py",
+          outputs=["data/raw/fpbase/fpbase_full.json"],
+          config=["fpbase", "logging"],
+          description="Step 1/7: Harvest FPbase GraphQL"),
+    Stage("specialist", "scripts/etl/fetch_specialist.py",
+          outputs=["data/raw/specialist/specialist_all.json"],
+          config=["specialist_dbs"],
+          description="Step 2/7: Harvest Specialist DBs"),
+    Stage("mine_pmc", "scripts/textmine/mine_pmc_fulltext.py",
+          inputs=["seed/seed_fp_names.csv"],
+          outputs=[PMC_CONTRASTS],
+          config=["europe_pmc"],
+          # Pool de processus pour l'extraction : sous-processus dédié
+          isolated=True,
+          description="Step 3/7: Mine PMC Full-Text"),
+    Stage("fetch_supplements", "scripts/textmine/fetch_supplements.py",
+          inputs=[PMC_CONTRASTS],
+          outputs=["data/raw/oa_supp/download_log.json"],
+          config=["europe_pmc"],
+          description="Step 4/7: Fetch Supplements"),
+    Stage("parse_supp_spreadsheets", "scripts/textmine/parse_supp_spreadsheets.py",
+          inputs=["data/raw/oa_supp/download_log.json"],
+          outputs=["data/interim/supplement_contrasts.parquet"],
+          # Pool de processus pour le parsing : sous-processus dédié
+          isolated=True,
+          description="Step 5/7: Parse Spreadsheets"),
+    Stage("build_candidates", "scripts/etl/build_external_candidates_v1_3.py",
+          inputs=["config/alias.yaml",
+                  "data/raw/fpbase/fpbase_full.json",
+                  "data/raw/specialist/specialist_all.json",
+                  PMC_CONTRASTS, "data/interim/supplement_contrasts.parquet"],
+          outputs=[CANDIDATES],
+          config=["evidence_tiers", "validation"],
+          description="Step 6/7: Reconcile & Deduplicate"),
+    Stage("build_tables", "scripts/etl/build_atlas_tables_v1_3.py",
+          inputs=[CANDIDATES],
+          outputs=[ATLAS_CSV,
+                   ATLAS_PARQUET,
+                   "data/processed/TRAINING.METADATA.v1.3.json",
+                   "data/processed/SHA256SUMS_v1.3.txt"],
+          # contrast_normalization : validation.contrast_normalization.mappings
+          config=["validation"],
+          description="Step 7/7: Build Final Tables"),
+    Stage("qa_audit", "scripts/qa/audit_fp_optical_v1_3.py",
+          inputs=[ATLAS_PARQUET],
+          outputs=["reports/AUDIT_v1.3_fp_optical.md"],
+          config=["thresholds", "validation"],
+          description="QA: Audit FP Optical v1.3"),
+]
 
 def main():
     """Main orchestrator."""
+    parser = argparse.ArgumentParser(description="Atlas v1.3 FP Optical Pipeline")
+    parser.add_argument("--max-parallel", type=int, default=4,
+                        help="Maximum number of stages running concurrently (default: 4)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run every stage in its own Python subprocess")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the stage cache (data/cache/stages/) and run every stage")
+    parser.add_argument("--rerun", action="append", default=[], metavar="STAGE",
+                        help="Force a stage to run even if its cache key is unchanged")
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("Atlas v1.3 FP Optical Expansion-200 Pipeline")
     print("=" * 70)
     
-    pipeline = [
-        ("scripts/etl/fetch_fpbase_graphql.py", "Step 1/7: Harvest FPbase GraphQL"),
-        ("scripts/etl/fetch_specialist.py", "Step 2/7: Harvest Specialist DBs"),
-        ("scripts/textmine/mine_pmc_fulltext.py", "Step 3/7: Mine PMC Full-Text"),
-        ("scripts/textmine/fetch_supplements.py", "Step 4/7: Fetch Supplements"),
-        ("scripts/textmine/parse_supp_spreadsheets.py", "Step 5/7: Parse Spreadsheets"),
-        ("scripts/etl/build_external_candidates_v1_3.py", "Step 6/7: Reconcile & Deduplicate"),
-        ("scripts/etl/build_atlas_tables_v1_3.py", "Step 7/7: Build Final Tables"),
-    ]
-    
-    for script_path, description in pipeline:
-        if not Path(script_path).exists():
-            print(f"\nERROR: Script not found: {script_path}")
-            return 1
-        
-        exit_code = run_script(script_path, description)
-        if exit_code != 0:
-            print(f"\nPipeline FAILED at: {description}")
-            return exit_code
+    dag = PipelineDAG(PIPELINE)
+    cache = None if args.no_cache else StageCache()
+    dag.run(max_parallel=args.max_parallel, in_process=not args.isolate, keep_going=False,
+            cache=cache, rerun=args.rerun)
+    dag.print_summary()
     
-    # Run QA audit
-    print("\n" + "=" * 70)
-    print("QA Audit")
-    print("=" * 70)
+    qa = dag.results["qa_audit"]
+    if qa.status == "skipped":
+        failed = next(r for r in dag.results.values() if r.status == "failed")
+        print(f"\nPipeline FAILED at: {failed.stage.description}")
+        return dag.returncode
     
-    qa_exit_code = run_script("scripts/qa/audit_fp_optical_v1_3.py", "QA: Audit FP Optical v1.3")
+    qa_exit_code = qa.returncode
     
     if qa_exit_code == 0:
         print("\n" + "=" * 70)
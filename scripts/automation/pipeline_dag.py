@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline DAG Executor
+=====================
+Exécuteur de pipeline ETL piloté par les dépendances de fichiers.
+
+Chaque stage déclare les fichiers qu'il lit (`inputs`) et ceux qu'il écrit
+(`outputs`). Les arêtes du graphe sont déduites dans l'ordre de déclaration :
+un stage dépend du dernier stage déclaré avant lui qui écrit l'un de ses
+inputs, et un stage qui réécrit un fichier attend les lecteurs précédents de
+ce fichier. Les branches indépendantes (ex. harvests FPbase / spécialistes /
+PMC) s'exécutent en parallèle, jusqu'à `max_parallel` stages à la fois.
+
+Par défaut les scripts tournent dans le processus courant (`runpy`), ce qui
+évite de payer l'import de pandas/yaml/requests à chaque stage. Un stage
+marqué `isolated=True` (ou l'exécuteur entier avec `in_process=False`) est
+lancé dans un sous-processus Python comme auparavant. Comme pour
+`python script`, tous les chemins sont relatifs au répertoire courant.
+
+Avec un `StageCache`, chaque stage est adressé par le contenu : la clé est
+le hash du source du script et des modules locaux qu'il importe
+(transitivement, ex. record_linkage.py, providers/http_cache.py), de ses
+inputs et de ses sections de config/providers.yml ; un stage sans inputs
+(moissonnage d'une API) y ajoute la tranche de temps de son `cache.ttl_hours`,
+pour être relancé à l'expiration. Si la clé est inchangée, le stage n'est pas relancé et
+ses outputs sont restaurés depuis data/cache/stages/ (manifeste au format
+SHA256SUMS, blobs dédupliqués par SHA256).
+
+Usage:
+    from automation.pipeline_dag import Stage, PipelineDAG, StageCache
+
+    dag = PipelineDAG([
+        Stage("mine_pmc", "scripts/textmine/mine_pmc_fulltext.py",
+              outputs=["data/interim/pmc_contrasts.parquet"]),
+        Stage("fetch_supp", "scripts/textmine/fetch_supplements.py",
+              inputs=["data/interim/pmc_contrasts.parquet"]),
+    ])
+    results = dag.run(max_parallel=4, cache=StageCache())
+    dag.print_summary()
+"""
+
+import ast
+import hashlib
+import io
+import json
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Statuts possibles d'un stage après run()
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+STATUS_CACHED = "cached"
+SUCCESS = (STATUS_OK, STATUS_CACHED)
+
+CACHE_DIR = Path("data/cache/stages")
+PROVIDERS_CONFIG = Path("config/providers.yml")
+# TTL des stages sans inputs ni section `cache` (défaut de providers/http_cache.py)
+HARVEST_TTL_HOURS = 24
+# Racine des scripts : les scripts ajoutent scripts/ ou scripts/<dossier>/
+# à sys.path pour importer les modules partagés
+SCRIPTS_DIR = Path("scripts")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Stage du pipeline : un script Python et ses fichiers d'entrée/sortie."""
+    name: str
+    script: str
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    description: str = ""
+    group: str = ""
+    isolated: bool = False
+    config: Tuple[str, ...] = ()  # sections de config/providers.yml lues
+
+    def __post_init__(self):
+        # Accepte des listes à la déclaration, stocke des tuples (hashable)
+        object.__setattr__(self, 'inputs', tuple(self.inputs))
+        object.__setattr__(self, 'outputs', tuple(self.outputs))
+        object.__setattr__(self, 'config', tuple(self.config))
+
+
+@dataclass
+class StageResult:
+    """Résultat d'exécution d'un stage (temps relatifs au début du run)."""
+    stage: Stage
+    status: str
+    returncode: int = 0
+    debut_s: float = 0.0
+    duree_s: float = 0.0
+    output: str = ""
+    missing_outputs: List[str] = field(default_factory=list)
+    raison: str = ""
+    cle: str = ""
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """
+    Flux stdout/stderr qui redirige l'écriture du thread courant vers un
+    tampon propre au stage (les logs de stages concurrents ne s'entremêlent
+    pas) et délègue au flux d'origine sinon.
+    """
+
+    def __init__(self, original, local: threading.local):
+        self._original = original
+        self._local = local
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        return self._original.write(text)
+
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self._original.flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def _imported_names(path: Path) -> List[Tuple[int, str]]:
+    """(niveau relatif, module) de chaque import d'un fichier Python."""
+    try:
+        tree = ast.parse(path.read_text(encoding='utf-8'))
+    except (OSError, SyntaxError, ValueError):
+        return []
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend((0, alias.name) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            names.append((node.level, base))
+            # from paquet import module
+            names.extend((node.level, f"{base}.{alias.name}" if base else alias.name)
+                         for alias in node.names)
+    return names
+
+
+def local_modules(script: Path) -> List[Path]:
+    """
+    Modules locaux importés par un script, transitivement (triés).
+
+    Un import est local s'il se résout en fichier .py sous le dossier du
+    script, scripts/ ou un sous-dossier de scripts/ ; la bibliothèque
+    standard et les dépendances ne sont jamais trouvées.
+    """
+    roots = [script.parent, SCRIPTS_DIR]
+    if SCRIPTS_DIR.is_dir():
+        roots.extend(sorted(d for d in SCRIPTS_DIR.iterdir() if d.is_dir() and d.name != "__pycache__"))
+    found = set()
+    pending = [script]
+    while pending:
+        current = pending.pop()
+        for level, name in _imported_names(current):
+            parts = [p for p in name.split(".") if p]
+            if level:
+                bases = [current.parents[level - 1]] if level <= len(current.parents) else []
+            else:
+                bases = roots
+            for base in bases:
+                candidate = base.joinpath(*parts) if parts else base
+                for path in (candidate.with_suffix(".py"), candidate / "__init__.py"):
+                    if path.is_file() and path.resolve() != script.resolve() and path not in found:
+                        found.add(path)
+                        pending.append(path)
+    return sorted(found)
+
+
+def _exit_code(exc: SystemExit) -> int:
+    """Code de retour équivalent à celui de l'interpréteur pour sys.exit(x)."""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+class StageCache:
+    """
+    Cache adressé par contenu des outputs de stages (façon Make/Bazel).
+
+    Arborescence sous `cache_dir` :
+        objects/<SHA256>                 contenu d'un output (dédupliqué)
+        <stage>/SHA256SUMS_<cle>.txt     manifeste "<SHA256>  <chemin>"
+        stat_cache.json                  (taille, mtime_ns) -> SHA256
+
+    Le mémo de stat évite de rehacher les fichiers inchangés : un rebuild
+    sans modification ne lit que les métadonnées des fichiers.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, config_path: Path = PROVIDERS_CONFIG):
+        self.cache_dir = Path(cache_dir)
+        self.objects = self.cache_dir / "objects"
+        self.config_path = Path(config_path)
+        self._config = None
+        self._lock = threading.Lock()
+        self._stat_path = self.cache_dir / "stat_cache.json"
+        try:
+            with open(self._stat_path, 'r', encoding='utf-8') as f:
+                self._stats: Dict[str, list] = json.load(f)
+        except (OSError, ValueError):
+            self._stats = {}
+
+    def digest(self, path: Path) -> Optional[str]:
+        """SHA256 (hex majuscule, comme SHA256SUMS) d'un fichier ou d'un répertoire."""
+        path = Path(path)
+        if path.is_dir():
+            sha = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                sha.update(f"{child.relative_to(path).as_posix()} {self.digest(child)}\n".encode())
+            return sha.hexdigest().upper()
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+
+        key = str(path)
+        with self._lock:
+            memo = self._stats.get(key)
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        value = sha.hexdigest().upper()
+        # Fichier modifié il y a moins de 2 s : une réécriture de même taille
+        # dans la même tranche de mtime serait invisible, on ne mémorise pas
+        if time.time_ns() - st.st_mtime_ns > 2_000_000_000:
+            with self._lock:
+                self._stats[key] = [st.st_size, st.st_mtime_ns, value]
+        return value
+
+    def _load_config(self) -> Dict:
+        if self._config is None:
+            import yaml
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                self._config = yaml.safe_load(f) or {}
+        return self._config
+
+    def _config_section(self, name: str) -> str:
+        return json.dumps(self._load_config().get(name), sort_keys=True, default=str)
+
+    def _harvest_bucket(self, stage: Stage) -> int:
+        """Tranche de temps courante, de la durée du plus court `cache.ttl_hours` du stage."""
+        ttls = []
+        for name in stage.config:
+            section = self._load_config().get(name)
+            cache = section.get('cache') if isinstance(section, dict) else None
+            if isinstance(cache, dict) and cache.get('ttl_hours'):
+                ttls.append(float(cache['ttl_hours']))
+        ttl_s = (min(ttls) if ttls else HARVEST_TTL_HOURS) * 3600
+        return int(time.time() // ttl_s)
+
+    def key(self, stage: Stage) -> str:
+        """
+        Clé du stage : script et modules locaux, inputs (contenu), sections de
+        config, outputs déclarés ; sans inputs, tranche de TTL du moissonnage.
+        """
+        script = Path(stage.script)
+        lines = [f"script {stage.script} {self.digest(script)}"]
+        for path in local_modules(script):
+            lines.append(f"module {path.as_posix()} {self.digest(path)}")
+        for path in stage.inputs:
+            lines.append(f"input {path} {self.digest(Path(path)) or 'MISSING'}")
+        with self._lock:
+            for name in stage.config:
+                section = self._config_section(name)
+                lines.append(f"config {name} {hashlib.sha256(section.encode()).hexdigest()}")
+            if not stage.inputs:
+                lines.append(f"harvest {self._harvest_bucket(stage)}")
+        lines.append("outputs " + " ".join(stage.outputs))
+        return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+    def _manifest(self, stage: Stage, key: str) -> Path:
+        return self.cache_dir / stage.name / f"SHA256SUMS_{key}.txt"
+
+    def restore(self, stage: Stage, key: str) -> bool:
+        """
+        Restaure les outputs d'une exécution antérieure de même clé. Les
+        fichiers déjà identiques ne sont pas recopiés. Retourne False si la
+        clé est inconnue ou si un blob manque.
+        """
+        manifest = self._manifest(stage, key)
+        if not manifest.exists():
+            return False
+
+        entries = []
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                checksum, path = line.rstrip("\n").split("  ", 1)
+                entries.append((checksum, Path(path)))
+
+        to_copy = [(c, p) for c, p in entries if self.digest(p) != c]
+        if any(not (self.objects / c).exists() for c, _ in to_copy):
+            return False
+        for checksum, path in to_copy:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.objects / checksum, path)
+            self.digest(path)
+        return True
+
+    def store(self, stage: Stage, key: str):
+        """Enregistre les outputs (fichiers) d'un stage réussi sous sa clé."""
+        entries = []
+        for path in map(Path, stage.outputs):
+            if not path.is_file():
+                return
+            checksum = self.digest(path)
+            blob = self.objects / checksum
+            if not blob.exists():
+                self.objects.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_suffix(f".tmp{threading.get_ident()}")
+                shutil.copyfile(path, tmp)
+                os.replace(tmp, blob)
+            entries.append(f"{checksum}  {path.as_posix()}\n")
+
+        manifest = self._manifest(stage, key)
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = manifest.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(entries)
+        os.replace(tmp, manifest)
+
+    def save(self):
+        """Persiste le mémo de stat (écriture atomique)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._stat_path.with_suffix(".tmp")
+        with self._lock:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._stats, f)
+        os.replace(tmp, self._stat_path)
+
+
+class PipelineDAG:
+    """Graphe de stages et ordonnanceur concurrent."""
+
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages: List[Stage] = list(stages)
+        self.by_name: Dict[str, Stage] = {}
+        for stage in self.stages:
+            if stage.name in self.by_name:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.by_name[stage.name] = stage
+        self.deps = self._build_deps()
+        self.results: Dict[str, StageResult] = {}
+        self.wall_s = 0.0
+
+    def _build_deps(self) -> Dict[str, List[str]]:
+        """
+        Déduit les dépendances à partir des fichiers déclarés, dans l'ordre de
+        déclaration (qui doit donc être un ordre topologique valide) :
+        lecture-après-écriture, écriture-après-écriture et écriture-après-lecture.
+        """
+        deps: Dict[str, List[str]] = {}
+        last_writer: Dict[str, str] = {}
+        readers: Dict[str, List[str]] = {}
+
+        for stage in self.stages:
+            wanted: List[str] = []
+            for path in stage.inputs:
+                if path in last_writer:
+                    wanted.append(last_writer[path])
+            for path in stage.outputs:
+                if path in last_writer:
+                    wanted.append(last_writer[path])
+                wanted.extend(readers.get(path, []))
+
+            deps[stage.name] = [d for d in dict.fromkeys(wanted) if d != stage.name]
+
+            for path in stage.inputs:
+                readers.setdefault(path, []).append(stage.name)
+            for path in stage.outputs:
+                last_writer[path] = stage.name
+                readers[path] = []
+
+        return deps
+
+    def subset(self, names: Iterable[str]) -> "PipelineDAG":
+        """
+        Sous-graphe restreint aux stages nommés ; les dépendances vers des
+        stages exclus sont considérées satisfaites (fichiers déjà présents).
+        """
+        keep = set(names)
+        unknown = keep - set(self.by_name)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        return PipelineDAG([s for s in self.stages if s.name in keep])
+
+    # ------------------------------------------------------------------
+    # Exécution d'un stage
+    # ------------------------------------------------------------------
+
+    def _run_in_process(self, script: Path) -> int:
+        """Exécute le script comme `python script` dans le processus courant."""
+        try:
+            runpy.run_path(str(script), run_name="__main__")
+        except SystemExit as exc:
+            return _exit_code(exc)
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            return 1
+        return 0
+
+    def _run_subprocess(self, script: Path, capture: bool) -> Tuple[int, str]:
+        """Exécute le script dans un interpréteur séparé."""
+        if not capture:
+            return subprocess.run([sys.executable, str(script)]).returncode, ""
+        proc = subprocess.run(
+            [sys.executable, str(script)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return proc.returncode, proc.stdout
+
+    def _execute(self, stage: Stage, t0: float, in_process: bool,
+                 capture: bool, local: threading.local,
+                 cache: Optional[StageCache]) -> StageResult:
+        """Exécute un stage (dans un thread du pool) et mesure sa durée."""
+        if not capture:
+            self._print_header(stage)
+        debut = time.perf_counter()
+        script = Path(stage.script)
+
+        if not script.exists():
+            return StageResult(stage, STATUS_FAILED, 1, debut - t0, 0.0,
+                               raison=f"Script not found: {stage.script}")
+
+        # Un stage sans output déclaré (ex. audit) est toujours exécuté
+        key = ""
+        if cache is not None and stage.outputs:
+            key = cache.key(stage)
+            if cache.restore(stage, key):
+                return StageResult(stage, STATUS_CACHED, 0, debut - t0,
+                                   time.perf_counter() - debut, cle=key)
+
+        output = ""
+        if in_process and not stage.isolated:
+            local.buffer = io.StringIO() if capture else None
+            try:
+                returncode = self._run_in_process(script)
+            finally:
+                if local.buffer is not None:
+                    output = local.buffer.getvalue()
+                local.buffer = None
+        else:
+            returncode, output = self._run_subprocess(script, capture)
+
+        fin = time.perf_counter()
+        result = StageResult(
+            stage,
+            STATUS_OK if returncode == 0 else STATUS_FAILED,
+            returncode,
+            debut - t0,
+            fin - debut,
+            output,
+            cle=key,
+        )
+        if returncode == 0:
+            result.missing_outputs = [p for p in stage.outputs if not Path(p).exists()]
+            if key and not result.missing_outputs:
+                cache.store(stage, key)
+        else:
+            result.raison = f"exit code {returncode}"
+        return result
+
+    @staticmethod
+    def _print_header(stage: Stage):
+        print("\n" + "=" * 70)
+        print(stage.description or f"Running: {stage.script}")
+        print("=" * 70)
+
+    def _report_stage(self, result: StageResult, header: bool):
+        """Affiche le bloc de log d'un stage terminé."""
+        stage = result.stage
+        if header:
+            self._print_header(stage)
+        if result.output:
+            print(result.output, end="" if result.output.endswith("\n") else "\n")
+        if result.status == STATUS_CACHED:
+            print(f"CACHED {stage.script} unchanged (key {result.cle[:12]}), outputs restored")
+        elif result.status == STATUS_OK:
+            print(f"\nOK {stage.script} completed successfully ({result.duree_s:.1f}s)")
+            for path in result.missing_outputs:
+                print(f"WARNING: declared output not produced: {path}")
+        else:
+            print(f"\nERROR: {stage.script} failed ({result.raison})", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # Ordonnancement
+    # ------------------------------------------------------------------
+
+    def run(self, max_parallel: int = 1, in_process: bool = True,
+            keep_going: bool = True, cache: Optional[StageCache] = None,
+            rerun: Iterable[str] = ()) -> Dict[str, StageResult]:
+        """
+        Exécute le graphe. Un stage démarre dès que toutes ses dépendances ont
+        réussi ; les descendants d'un stage en échec sont marqués `skipped`.
+        Si `keep_going` est faux, plus aucun stage n'est lancé après le premier
+        échec (les stages en cours se terminent).
+
+        Avec max_parallel > 1, la sortie de chaque stage est tamponnée et
+        affichée d'un bloc à sa fin. Avec `cache`, les stages dont la clé est
+        inchangée sont restaurés (`cached`) sauf ceux listés dans `rerun`.
+        """
+        if max_parallel < 1:
+            raise ValueError(f"max_parallel must be >= 1 (got {max_parallel})")
+
+        capture = max_parallel > 1
+        local = threading.local()
+        pending = list(self.stages)
+        running = {}
+        self.results = {}
+        failed = False
+        rerun = set(rerun)
+
+        # runpy remplace puis restaure sys.modules['__main__'] sans verrou : avec
+        # plusieurs stages in-process en parallèle, l'ordre des restaurations peut
+        # laisser le module d'un stage en place. On le restaure une fois pour toutes.
+        saved = sys.stdout, sys.stderr, sys.argv, sys.modules.get("__main__")
+        sys.stdout = _ThreadLocalStream(sys.stdout, local)
+        sys.stderr = _ThreadLocalStream(sys.stderr, local)
+        # Les scripts lancés in-process ne voient pas les options du runner
+        sys.argv = [sys.argv[0]]
+
+        t0 = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+                while pending or running:
+                    for stage in list(pending):
+                        dep_status = [self.results[d].status if d in self.results else None
+                                      for d in self.deps[stage.name] if d in self.by_name]
+                        upstream = any(s in (STATUS_FAILED, STATUS_SKIPPED) for s in dep_status)
+                        if upstream or (failed and not keep_going):
+                            pending.remove(stage)
+                            self.results[stage.name] = StageResult(
+                                stage, STATUS_SKIPPED,
+                                raison="upstream failure" if upstream else "pipeline stopped")
+                            continue
+                        if len(running) >= max_parallel:
+                            break
+                        if all(s in SUCCESS for s in dep_status):
+                            pending.remove(stage)
+                            stage_cache = None if stage.name in rerun else cache
+                            future = pool.submit(self._execute, stage, t0, in_process,
+                                                 capture, local, stage_cache)
+                            running[future] = stage
+
+                    if not running:
+                        continue
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        result = future.result()
+                        self.results[stage.name] = result
+                        self._report_stage(result, header=capture)
+                        if result.status == STATUS_FAILED:
+                            failed = True
+        finally:
+            self.wall_s = time.perf_counter() - t0
+            sys.stdout, sys.stderr, sys.argv, sys.modules["__main__"] = saved
+            if cache is not None:
+                cache.save()
+
+        # Ordre de déclaration pour l'appelant
+        self.results = {s.name: self.results[s.name] for s in self.stages}
+        return self.results
+
+    @property
+    def returncode(self) -> int:
+        """Code de retour du premier stage en échec (ordre de déclaration), 0 sinon."""
+        for result in self.results.values():
+            if result.status == STATUS_FAILED:
+                return result.returncode or 1
+        return 0
+
+    # ------------------------------------------------------------------
+    # Chemin critique
+    # ------------------------------------------------------------------
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Plus long chemin (en durée cumulée) parmi les stages exécutés : c'est
+        la borne basse du temps mural quel que soit `max_parallel`.
+        """
+        fin: Dict[str, float] = {}
+        prev: Dict[str, Optional[str]] = {}
+        for stage in self.stages:
+            result = self.results.get(stage.name)
+            if result is None or result.status == STATUS_SKIPPED:
+                continue
+            parents = [d for d in self.deps[stage.name] if d in fin]
+            best = max(parents, key=lambda d: fin[d]) if parents else None
+            prev[stage.name] = best
+            fin[stage.name] = (fin[best] if best else 0.0) + result.duree_s
+
+        if not fin:
+            return [], 0.0
+
+        end = max(fin, key=lambda n: fin[n])
+        chain = [end]
+        while prev[chain[-1]] is not None:
+            chain.append(prev[chain[-1]])
+        return chain[::-1], fin[end]
+
+    def print_summary(self):
+        """Tableau des stages, chemin critique et gain de parallélisme."""
+        chain, cp_s = self.critical_path()
+        total_s = sum(r.duree_s for r in self.results.values())
+
+        print("\n" + "=" * 70)
+        print("STAGE TIMINGS")
+        print("=" * 70)
+        print(f"{'Stage':<28} {'Status':<8} {'Start':>8} {'Duration':>9}  CP")
+        for name, result in self.results.items():
+            mark = "*" if name in chain else ""
+            if result.status == STATUS_SKIPPED:
+                print(f"{name:<28} {result.status:<8} {'-':>8} {'-':>9}  ({result.raison})")
+                continue
+            print(f"{name:<28} {result.status:<8} {result.debut_s:>7.1f}s "
+                  f"{result.duree_s:>8.1f}s  {mark}")
+
+        print()
+        print(f"Critical path: {' -> '.join(chain) if chain else '(none)'} ({cp_s:.1f}s)")
+        print(f"Wall time:     {self.wall_s:.1f}s")
+        cached = sum(r.status == STATUS_CACHED for r in self.results.values())
+        if cached:
+            print(f"Cached:        {cached}/{len(self.results)} stages restored from cache")
+        print(f"Stage time:    {total_s:.1f}s "
+              f"(parallelism x{total_s / self.wall_s if self.wall_s else 0:.2f})")
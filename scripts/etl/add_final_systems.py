@@ -8,6 +8,7 @@ Ajoute 3 systèmes finaux pour atteindre l'objectif de 250+.
 
 import pandas as pd
 from pathlib import Path
+from artifact_io import contract_schema, export_csv, read_artifact, write_artifact
 
 def add_final_systems():
     """Ajoute 3 systèmes finaux pour atteindre 250+"""
@@ -18,7 +19,8 @@ def add_final_systems():
     
     # Charger le dataset actuel
     training_path = Path("data/processed/TRAINING_TABLE_v2_2.csv")
-    df = pd.read_csv(training_path)
+    # L'artefact Parquet est la source lue par les stages suivants
+    df = read_artifact(training_path.with_suffix('.parquet'), schema=contract_schema())
     
     print(f"[LOAD] Dataset actuel: {len(df)} systèmes")
     
@@ -81,7 +83,8 @@ def add_final_systems():
     df_final = pd.concat([df, df_new], ignore_index=True)
     
     # Sauvegarder
-    df_final.to_csv(training_path, index=False, encoding='utf-8')
+    write_artifact(df_final, training_path.with_suffix('.parquet'), contract_schema())
+    export_csv(df_final, training_path)
     
     print(f"[SAVE] Dataset final: {len(df_final)} systèmes")
     print(f"  Ajoutés: {len(df_new)} systèmes")
@@ -11,6 +11,7 @@ import pandas as pd
 import json
 from pathlib import Path
 import datetime
+from artifact_io import contract_schema, export_csv, read_artifact, write_artifact
 
 # Nouveaux systèmes à ajouter (publications récentes 2024-2025)
 NEW_SYSTEMS = [
@@ -215,7 +216,7 @@ def add_new_systems():
         return
     
     # Charger les données existantes
-    df_training = pd.read_csv(training_path)
+    df_training = read_artifact(training_path.with_suffix('.parquet'), schema=contract_schema())
     df_atlas = pd.read_csv(atlas_path)
     
     print(f"\n[LOAD] Dataset existant:")
@@ -260,7 +261,8 @@ def add_new_systems():
     print(f"\n[SAVE] Sauvegarde...")
     
     # TRAINING_TABLE mis à jour
-    df_training_new.to_csv(training_path, index=False, encoding='utf-8')
+    write_artifact(df_training_new, training_path.with_suffix('.parquet'), contract_schema())
+    export_csv(df_training_new, training_path)
     print(f"  ✅ {training_path}")
     
     # Atlas complet mis à jour
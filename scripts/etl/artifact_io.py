@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Artifact I/O - schémas Arrow typés pour les échanges entre stages
+==================================================================
+
+- Types de colonnes : règles par nom (COLUMN_TYPE_RULES), appliquées aux
+  guaranteed_columns du contrat (TRAINING.METADATA_v2_2.json) ou à toute
+  liste de colonnes ; les autres colonnes gardent le type inféré par Arrow
+- write_artifact : Parquet (.parquet) ou Feather non compressé (.feather,
+  lisible par mmap sans copie) ; écriture atomique (.part puis rename)
+- read_artifact : lecture memory-mapped avec projection de colonnes ; repli
+  sur l'export CSV de même nom (converti au schéma) tant que l'artefact
+  Arrow n'existe pas
+- Les CSV restent des artefacts de publication (export_csv)
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+CONTRACT_PATH = Path("data/processed/TRAINING.METADATA_v2_2.json")
+
+# Type Arrow par nom de colonne (première règle qui correspond)
+COLUMN_TYPE_RULES = (
+    (r'_missing$', pa.bool_()),
+    (r'(_nm|_normalized|_value|_hours|_ns|_K)$', pa.float64()),
+    (r'^(quantum_yield|extinction_coef|brightness_relative|photostability|pka|pH|'
+     r'n|sd|sem|ci_low|ci_high|value|is_biosensor|year)$', pa.float64()),
+    (r'.', pa.string()),
+)
+
+PathLike = Union[str, Path]
+
+def column_type(name: str) -> pa.DataType:
+    """Type Arrow d'une colonne d'après son nom"""
+    for pattern, arrow_type in COLUMN_TYPE_RULES:
+        if re.search(pattern, name):
+            return arrow_type
+    return pa.string()
+
+def columns_schema(columns: Iterable[str]) -> pa.Schema:
+    """Schéma Arrow typé d'une liste de colonnes"""
+    return pa.schema([pa.field(name, column_type(name)) for name in columns])
+
+def contract_columns(metadata_path: PathLike = CONTRACT_PATH) -> List[str]:
+    """guaranteed_columns du contrat d'interface (TRAINING.METADATA)"""
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['contract_interface']['guaranteed_columns']
+
+def contract_schema(metadata_path: PathLike = CONTRACT_PATH) -> pa.Schema:
+    """Schéma Arrow de la table d'entraînement (contrat fp-qubit-design)"""
+    return columns_schema(contract_columns(metadata_path))
+
+def _conform_column(values: pd.Series, arrow_type: pa.DataType) -> pd.Series:
+    """Convertit une colonne pandas au type Arrow (valeurs invalides -> null)"""
+    if pa.types.is_floating(arrow_type):
+        return pd.to_numeric(values, errors='coerce').astype(float)
+    if pa.types.is_boolean(arrow_type):
+        if values.dtype == bool:
+            return values
+        text = values.astype(object).where(values.notna()).map(
+            lambda v: v if v is None or isinstance(v, (bool, float)) else str(v).strip().lower())
+        mapped = text.map({True: True, False: False, 'true': True, 'false': False,
+                           '1': True, '0': False, 1.0: True, 0.0: False})
+        return mapped.astype('boolean')
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return values.astype(object).where(values.notna(), None).map(
+            lambda v: v if v is None else str(v))
+    return values
+
+def to_table(df: pd.DataFrame, schema: Optional[pa.Schema] = None) -> pa.Table:
+    """
+    Table Arrow d'un DataFrame (index ignoré).
+
+    Les colonnes présentes dans `schema` sont converties à son type ; les
+    autres gardent le type inféré.
+    """
+    if schema is None:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    df = df.copy()
+    for field in schema:
+        if field.name in df.columns:
+            df[field.name] = _conform_column(df[field.name], field.type)
+    extra = [c for c in df.columns if c not in schema.names]
+    inferred = pa.Schema.from_pandas(df[extra], preserve_index=False) if extra else pa.schema([])
+    fields = {f.name: f for f in list(schema) + list(inferred)}
+    full_schema = pa.schema([fields[c] for c in df.columns])
+    return pa.Table.from_pandas(df, schema=full_schema, preserve_index=False)
+
+def write_artifact(df: pd.DataFrame, path: PathLike, schema: Optional[pa.Schema] = None) -> Path:
+    """
+    Écrit un artefact Parquet ou Feather (selon l'extension), atomiquement.
+
+    Args:
+        df: Données
+        path: .parquet ou .feather (Feather non compressé : mmap sans copie)
+        schema: Schéma des colonnes typées (optionnel)
+
+    Returns:
+        Chemin écrit
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = to_table(df, schema)
+    part = path.with_name(f"{path.name}.part")
+    if path.suffix in ('.feather', '.arrow'):
+        feather.write_feather(table, part, compression='uncompressed')
+    else:
+        pq.write_table(table, part)
+    os.replace(part, path)
+    return path
+
+def read_artifact(path: PathLike, columns: Optional[List[str]] = None,
+                  schema: Optional[pa.Schema] = None) -> pd.DataFrame:
+    """
+    Lit un artefact Parquet/Feather en memory-map, seulement `columns`.
+
+    Si l'artefact n'existe pas, lit l'export CSV de même nom et le convertit
+    à `schema` (repli le temps que l'amont produise l'artefact Arrow).
+
+    Raises:
+        FileNotFoundError: Ni l'artefact ni son export CSV n'existent
+    """
+    path = Path(path)
+    if path.exists():
+        if path.suffix in ('.feather', '.arrow'):
+            table = feather.read_table(path, columns=columns, memory_map=True)
+        else:
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    csv_path = path.with_suffix('.csv')
+    if not csv_path.exists():
+        raise FileNotFoundError(path)
+    df = pd.read_csv(csv_path, usecols=columns)
+    return to_table(df, schema).to_pandas() if schema is not None else df
+
+def export_csv(df: pd.DataFrame, path: PathLike) -> Path:
+    """Export CSV de publication (les stages lisent l'artefact Arrow)"""
+    path = Path(path)
+    df.to_csv(path, index=False, encoding='utf-8')
+    return path
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Atlas Dataset - accès aux tables versionnées (atlas v1.3 … v2.2.2)
+===================================================================
+
+- TABLES : nom -> artefact (Parquet écrit par les builders ; CSV pour les
+  tables qui n'existent qu'en export, ex. v2.2.2 full/balanced)
+- open_table : ouverture paresseuse (schéma seul) d'un pyarrow.dataset
+  memory-mapped ; réutilisé tant que le fichier ne change pas
+- AtlasTable.to_pandas(columns, where) : projection de colonnes et filtre
+  poussé dans le scan (statistiques de row groups en Parquet) ; seules les
+  colonnes et lignes demandées sont matérialisées
+- Une table disponible seulement en CSV est convertie une fois en Feather
+  non compressé sous data/cache/atlas/ (clé : taille + mtime du CSV), puis
+  lue en memory-map comme les artefacts Arrow
+"""
+
+import functools
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).parent))
+from artifact_io import contract_schema, write_artifact
+
+PathLike = Union[str, Path]
+# Expression pyarrow (pc.field('family') == 'Calcium') ou filtres DNF
+# ([('family', '==', 'Calcium')], même format que pd.read_parquet)
+Where = Union[ds.Expression, List[Tuple], List[List[Tuple]]]
+
+PROCESSED_DIR = Path("data/processed")
+CACHE_DIR = Path("data/cache/atlas")
+
+TABLES = {
+    'atlas_v1_3': PROCESSED_DIR / "atlas_fp_optical_v1_3.parquet",
+    # Le Parquet v2.0 versionné est périmé (différent du CSV de référence)
+    'atlas_v2_0': PROCESSED_DIR / "atlas_fp_optical_v2_0.csv",
+    'atlas_v2_1': PROCESSED_DIR / "atlas_fp_optical_v2_1.parquet",
+    'atlas_v2_2': PROCESSED_DIR / "atlas_fp_optical_v2_2.parquet",
+    'training_v2_1': PROCESSED_DIR / "TRAINING_TABLE_v2_1.parquet",
+    'training_v2_2': PROCESSED_DIR / "TRAINING_TABLE_v2_2.parquet",
+    'training_v2_2_2_full': PROCESSED_DIR / "TRAINING_TABLE_v2_2_2_full.csv",
+    'training_v2_2_2_balanced': PROCESSED_DIR / "TRAINING_TABLE_v2_2_2_balanced.csv",
+}
+
+ARROW_SUFFIXES = ('.feather', '.arrow')
+_MMAP_FS = pafs.LocalFileSystem(use_mmap=True)
+
+def resolve_path(table: PathLike) -> Path:
+    """
+    Fichier d'une table : nom de TABLES ou chemin.
+
+    Un artefact Arrow absent est remplacé par son export CSV de même nom.
+
+    Raises:
+        FileNotFoundError: Ni l'artefact ni son export CSV n'existent
+    """
+    path = TABLES.get(table, Path(table)) if isinstance(table, str) else Path(table)
+    if path.exists():
+        return path
+    csv_path = path.with_suffix('.csv')
+    if csv_path.exists():
+        return csv_path
+    raise FileNotFoundError(path)
+
+def cached_feather(csv_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """
+    Copie Feather (memory-mappable) d'un CSV, créée au premier accès.
+
+    Types : schéma du contrat pour ses colonnes, inférés pour les autres.
+    Les copies d'une version précédente du CSV sont supprimées.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    stat = csv_path.stat()
+    stem = csv_path.stem
+    feather_path = cache_dir / f"{stem}-{stat.st_size}-{stat.st_mtime_ns}.feather"
+    if not feather_path.exists():
+        write_artifact(pd.read_csv(csv_path), feather_path, contract_schema())
+        for stale in cache_dir.glob(f"{stem}-*.feather"):
+            if stale != feather_path:
+                stale.unlink(missing_ok=True)
+    return feather_path
+
+def to_expression(where: Optional[Where]) -> Optional[ds.Expression]:
+    """Expression pyarrow d'un filtre (DNF converti)"""
+    if where is None or isinstance(where, ds.Expression):
+        return where
+    return pq.filters_to_expression(where)
+
+class AtlasTable:
+    """
+    Table de l'atlas ouverte en pyarrow.dataset memory-mapped.
+
+    Rien n'est lu à la construction ; le dataset (schéma) est ouvert au
+    premier accès et les données au scan.
+    """
+
+    def __init__(self, path: PathLike, cache_dir: Optional[Path] = None):
+        self.path = Path(path)
+        self.cache_dir = cache_dir
+        self._dataset = None
+
+    @property
+    def dataset(self) -> ds.Dataset:
+        """Dataset Parquet/Feather (CSV converti via le cache Feather)"""
+        if self._dataset is None:
+            path = self.path
+            if path.suffix == '.csv':
+                path = cached_feather(path, self.cache_dir)
+            file_format = 'ipc' if path.suffix in ARROW_SUFFIXES else 'parquet'
+            self._dataset = ds.dataset(str(path.resolve()), format=file_format, filesystem=_MMAP_FS)
+        return self._dataset
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self.dataset.schema
+
+    @property
+    def columns(self) -> List[str]:
+        return self.schema.names
+
+    def available(self, columns: Sequence[str]) -> List[str]:
+        """Colonnes demandées présentes dans la table (ordre conservé)"""
+        names = set(self.columns)
+        return [c for c in columns if c in names]
+
+    def count_rows(self, where: Optional[Where] = None) -> int:
+        """Nombre de lignes (métadonnées seules en Parquet sans filtre)"""
+        return self.dataset.count_rows(filter=to_expression(where))
+
+    def to_table(self, columns: Optional[Sequence[str]] = None,
+                 where: Optional[Where] = None) -> pa.Table:
+        """Table Arrow des colonnes et lignes demandées"""
+        return self.dataset.to_table(columns=list(columns) if columns is not None else None,
+                                     filter=to_expression(where))
+
+    def to_pandas(self, columns: Optional[Sequence[str]] = None,
+                  where: Optional[Where] = None) -> pd.DataFrame:
+        """
+        DataFrame des colonnes et lignes demandées.
+
+        Args:
+            columns: Projection (None = toutes)
+            where: Filtre poussé dans le scan (lignes à null exclues)
+
+        Returns:
+            DataFrame (index 0..n-1, ordre du fichier)
+        """
+        return self.to_table(columns, where).to_pandas()
+
+@functools.lru_cache(maxsize=32)
+def _open_cached(path: Path, size: int, mtime_ns: int) -> AtlasTable:
+    return AtlasTable(path)
+
+def open_table(table: PathLike) -> AtlasTable:
+    """
+    Table de l'atlas (nom de TABLES ou chemin), ouverte paresseusement.
+
+    La même instance est renvoyée tant que le fichier n'a pas changé.
+
+    Raises:
+        FileNotFoundError: Table absente
+    """
+    path = resolve_path(table).resolve()
+    stat = path.stat()
+    return _open_cached(path, stat.st_size, stat.st_mtime_ns)
+
+def load_table(table: PathLike, columns: Optional[Sequence[str]] = None,
+               where: Optional[Where] = None) -> pd.DataFrame:
+    """Raccourci : open_table(table).to_pandas(columns, where)"""
+    return open_table(table).to_pandas(columns, where)
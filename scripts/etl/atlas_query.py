@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Atlas Query - recherches indexées sur une table de l'atlas
+===========================================================
+
+Utilisé par scripts/web/atlas_service.py (service HTTP local).
+
+- Index hachés (dict -> positions) : canonical_name et family, insensibles
+  à la casse
+- Index triés (argsort, NaN exclus) : excitation_nm, emission_nm,
+  contrast_normalized ; un intervalle = deux np.searchsorted
+- Les positions de chaque critère sont intersectées ; les résultats
+  (positions) sont gardés dans un cache LRU par requête (Query hashable)
+- Les lignes sont prises dans la table Arrow (projection de colonnes) ;
+  les NaN y sont remplacés par null
+"""
+
+import functools
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+sys.path.insert(0, str(Path(__file__).parent))
+from atlas_dataset import PathLike, open_table
+
+DEFAULT_TABLE = 'training_v2_2'
+HASHED_COLUMNS = ('canonical_name', 'family')
+SORTED_COLUMNS = ('excitation_nm', 'emission_nm', 'contrast_normalized')
+
+Range = Tuple[Optional[float], Optional[float]]
+
+@dataclass(frozen=True)
+class Query:
+    """
+    Critères d'une recherche (tous optionnels, combinés par ET).
+
+    Les intervalles sont fermés ; None = borne ouverte.
+    """
+    names: Tuple[str, ...] = ()
+    families: Tuple[str, ...] = ()
+    excitation_nm: Range = (None, None)
+    emission_nm: Range = (None, None)
+    contrast_normalized: Range = (None, None)
+    columns: Optional[Tuple[str, ...]] = None
+    limit: Optional[int] = None
+
+class SortedIndex:
+    """Index trié d'une colonne numérique (valeurs NaN exclues)"""
+
+    def __init__(self, values: np.ndarray):
+        present = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[present], kind='stable')
+        self.positions = present[order]
+        self.values = values[self.positions]
+
+    def range(self, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Positions (triées) des valeurs dans [low, high]"""
+        start = 0 if low is None else np.searchsorted(self.values, low, side='left')
+        stop = len(self.values) if high is None else np.searchsorted(self.values, high, side='right')
+        return np.sort(self.positions[start:stop])
+
+class HashIndex:
+    """Index haché d'une colonne texte (clés en minuscules)"""
+
+    def __init__(self, values: pd.Series):
+        keys = values.astype(object).where(values.notna(), None).map(
+            lambda v: v if v is None else str(v).strip().lower())
+        self.positions: Dict[str, np.ndarray] = {
+            key: np.asarray(pos, dtype=np.int64)
+            for key, pos in keys.groupby(keys.to_numpy(), sort=False).indices.items()}
+
+    def lookup(self, keys) -> np.ndarray:
+        """Positions (triées) des lignes dont la clé est dans keys"""
+        hits = [self.positions.get(str(k).strip().lower()) for k in keys]
+        hits = [h for h in hits if h is not None]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return hits[0] if len(hits) == 1 else np.unique(np.concatenate(hits))
+
+class AtlasQuery:
+    """
+    Recherches indexées sur une table de l'atlas.
+
+    Args:
+        table: Table Arrow (une ligne par système)
+        cache_size: Nombre de requêtes gardées dans le cache LRU
+    """
+
+    def __init__(self, table: pa.Table, cache_size: int = 4096):
+        # NaN -> null (réponses JSON valides)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_floating(field.type):
+                column = table.column(i)
+                table = table.set_column(i, field, pc.if_else(pc.is_nan(column), None, column))
+        self.table = table
+        columns = set(table.column_names)
+        self.hashed = {c: HashIndex(table.column(c).to_pandas()) for c in HASHED_COLUMNS if c in columns}
+        self.sorted = {c: SortedIndex(table.column(c).to_numpy(zero_copy_only=False).astype(float))
+                       for c in SORTED_COLUMNS if c in columns}
+        self.positions = functools.lru_cache(maxsize=cache_size)(self._positions)
+
+    @classmethod
+    def from_table(cls, table: PathLike = DEFAULT_TABLE, **kwargs) -> "AtlasQuery":
+        """Moteur sur une table de atlas_dataset.TABLES (ou un chemin)"""
+        return cls(open_table(table).to_table(), **kwargs)
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    def families(self) -> Dict[str, int]:
+        """Nombre de systèmes par famille"""
+        counts = self.table.column('family').value_counts().to_pylist()
+        return {c['values']: c['counts'] for c in counts if c['values'] is not None}
+
+    def _positions(self, query: Query) -> np.ndarray:
+        candidates = []
+        if query.names:
+            candidates.append(self._hash('canonical_name').lookup(query.names))
+        if query.families:
+            candidates.append(self._hash('family').lookup(query.families))
+        for column in SORTED_COLUMNS:
+            low, high = getattr(query, column)
+            if low is not None or high is not None:
+                candidates.append(self._sorted(column).range(low, high))
+
+        if not candidates:
+            positions = np.arange(self.num_rows)
+        else:
+            positions = functools.reduce(
+                lambda a, b: np.intersect1d(a, b, assume_unique=True),
+                sorted(candidates, key=len))
+        positions = positions[:query.limit] if query.limit is not None else positions
+        positions.flags.writeable = False  # partagé par le cache
+        return positions
+
+    def _hash(self, column: str) -> HashIndex:
+        if column not in self.hashed:
+            raise ValueError(f"Colonne absente de la table : {column}")
+        return self.hashed[column]
+
+    def _sorted(self, column: str) -> SortedIndex:
+        if column not in self.sorted:
+            raise ValueError(f"Colonne absente de la table : {column}")
+        return self.sorted[column]
+
+    def select(self, query: Query) -> pa.Table:
+        """
+        Lignes correspondant à la requête, dans l'ordre de la table.
+
+        Raises:
+            ValueError: Colonne inconnue (critère ou projection)
+        """
+        table = self.table
+        if query.columns is not None:
+            unknown = [c for c in query.columns if c not in table.column_names]
+            if unknown:
+                raise ValueError(f"Colonnes inconnues : {', '.join(unknown)}")
+            table = table.select(list(query.columns))
+        return table.take(self.positions(query))
+
+    def cache_info(self):
+        return self.positions.cache_info()
@@ -10,12 +10,12 @@ Crée deux exports :
 Objectif : limiter Calcium ≤ 35% dans balanced, sans duplication de lignes.
 """
 
-import pandas as pd
 import numpy as np
 import json
 import hashlib
 from pathlib import Path
 import datetime
+from atlas_dataset import open_table
 
 def load_current_dataset():
     """Charge le dataset actuel v2.2"""
@@ -24,13 +24,12 @@ def load_current_dataset():
     print("ATLAS v2.2.2 BALANCE & EXPORT PIPELINE")
     print("=" * 80)
     
-    training_path = Path("data/processed/TRAINING_TABLE_v2_2.csv")
-    
-    if not training_path.exists():
-        print(f"ERREUR: Fichier {training_path} non trouvé")
+    try:
+        df = open_table('training_v2_2').to_pandas()
+    except FileNotFoundError as e:
+        print(f"ERREUR: Fichier {e} non trouvé")
         return None
     
-    df = pd.read_csv(training_path)
     print(f"[LOAD] Dataset v2.2: {len(df)} systèmes")
     
     return df
@@ -316,8 +315,10 @@ def generate_hashes_and_sync(full_path, balanced_path):
     sync_dir = Path(".atlas_sync")
     sync_dir.mkdir(exist_ok=True)
     
-    # Charger les données pour sync
-    df_full = pd.read_csv(full_path)
+    # Charger les données pour sync et log (colonnes utilisées seulement)
+    full_table = open_table(full_path)
+    df_full = full_table.to_pandas(
+        columns=full_table.available(['provenance', 'canonical_name', 'family', 'low_support']))
     
     # Mettre à jour processed_dois.txt
     dois_path = sync_dir / "processed_dois.txt"
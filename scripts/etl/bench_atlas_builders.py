@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Atlas Builders Benchmark
+========================
+Mesure la durée des étapes coûteuses des builders de l'atlas sur des jeux
+synthétiques de grande taille (les tests unitaires n'en vérifient que le
+comportement, sur de petits jeux).
+
+Cas (--cases) :
+    fuzzy    rapprochement flou des noms (build_external_candidates_v1_3)
+    strict   déduplication stricte par nom normalisé (build_atlas_v2_2_strict_dedup)
+    linkage  composantes connexes sur deux clés, longues chaînes (record_linkage)
+    contrast normalisation des contrastes + filtre d'outliers par famille
+             (contrast_normalization)
+
+Usage:
+    python scripts/etl/bench_atlas_builders.py --cases fuzzy --scale 1
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+def bench_fuzzy(scale: float) -> Tuple[int, Callable[[], object]]:
+    """30 000 noms (3 familles de préfixes), seuil 2."""
+    import build_external_candidates_v1_3 as bec
+    bec.ALIAS_CONFIG = {"no_merge_variants": []}
+    names = [f"{stem}{i}" for i, stem in enumerate(["sensor_", "fp-", "camp"] * int(10_000 * scale))]
+    df = pd.DataFrame({"normalized_name": names})
+    return len(df), lambda: bec.fuzzy_match_names(df, threshold=2)
+
+def bench_strict(scale: float) -> Tuple[int, Callable[[], object]]:
+    """100 000 entrées, 40 000 noms distincts, champs à 40 % manquants."""
+    import build_atlas_v2_2_strict_dedup as dedup
+    rows = int(100_000 * scale)
+    rng = np.random.default_rng(3)
+    maybe = lambda values: np.where(rng.random(rows) < 0.4, np.nan, values)  # noqa: E731
+    df = pd.DataFrame({
+        'protein_name': [f"FP{i % (rows * 2 // 5)}" for i in range(rows)],
+        'source_priority': rng.integers(2, 4, rows),
+        'contrast_value': maybe(rng.uniform(1, 10, rows)),
+        'excitation_nm': maybe(rng.integers(400, 600, rows).astype(float)),
+        'emission_nm': maybe(rng.integers(450, 650, rows).astype(float)),
+        'doi': np.where(rng.random(rows) < 0.5, None, "10.1/x"),
+    })
+    return rows, lambda: dedup.strict_dedup(df.copy())
+
+def bench_linkage(scale: float) -> Tuple[int, Callable[[], object]]:
+    """200 000 entrées chaînées i ~ i+1 par la clé a ou b (deux composantes)."""
+    from record_linkage import RecordLinker
+    rows = int(200_000 * scale)
+    df = pd.DataFrame({'a': np.arange(rows) // 2, 'b': (np.arange(rows) + 1) // 2})
+    df.loc[rows // 2, ['a', 'b']] = [-1, -2]
+    return rows, lambda: RecordLinker(keys=['a', 'b']).link(df)
+
+def bench_contrast(scale: float) -> Tuple[int, Callable[[], object]]:
+    """1 000 000 de contrastes (3 unités + manquantes), 50 familles."""
+    import contrast_normalization as cn
+    rows = int(1_000_000 * scale)
+    rng = np.random.default_rng(2)
+    units = pd.Series(np.array(["fold", "deltaF/F0", "percent", None], dtype=object)[rng.integers(0, 4, rows)])
+    values = pd.Series(rng.uniform(0, 10, rows))
+    families = pd.Series(rng.integers(0, 50, rows))
+    return rows, lambda: cn.outlier_mask(cn.normalize_contrasts(values, units), families)
+
+CASES: Dict[str, Callable[[float], Tuple[int, Callable[[], object]]]] = {
+    'fuzzy': bench_fuzzy,
+    'strict': bench_strict,
+    'linkage': bench_linkage,
+    'contrast': bench_contrast,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des builders de l'atlas")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--scale", type=float, default=1.0, help="Facteur sur la taille des jeux")
+    args = parser.parse_args()
+
+    print("| Cas | Lignes | Durée (s) | Lignes/s |")
+    print("|---|---:|---:|---:|")
+    for name in args.cases:
+        rows, run = CASES[name](args.scale)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+        elapsed = time.perf_counter() - start
+        print(f"| {name} | {rows:,} | {elapsed:.2f} | {rows / elapsed:,.0f} |")
+
+if __name__ == "__main__":
+    main()
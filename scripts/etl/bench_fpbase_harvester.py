@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FPbase Harvester Benchmark
+==========================
+Mesure le débit (protéines/s) de fetch_fpbase_all_async selon le nombre de
+pages en vol, contre un serveur GraphQL local à latence fixe (aucun appel
+à FPbase, cache HTTP désactivé).
+
+Usage:
+    python scripts/etl/bench_fpbase_harvester.py --proteins 2000 --latency 0.1 --concurrency 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fetch_fpbase_graphql as fpbase  # noqa: E402
+from providers.http_cache import CachedSession  # noqa: E402
+
+def make_stub(total: int, latency: float):
+    """Handler GraphQL : `total` protéines, `latency` s par page."""
+
+    class StubGraphQL(BaseHTTPRequestHandler):
+        def do_POST(self):
+            variables = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["variables"]
+            offset, limit = variables["offset"], variables["limit"]
+            time.sleep(latency)
+            nodes = [{"name": f"FP{i:05d}", "slug": f"fp{i}"} for i in range(offset, min(offset + limit, total))]
+            body = json.dumps({"data": {"fluorescentProteins": {
+                "edges": [{"node": n} for n in nodes]}}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubGraphQL
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du harvester FPbase concurrent")
+    parser.add_argument("--proteins", type=int, default=2000, help="Taille du catalogue du stub")
+    parser.add_argument("--latency", type=float, default=0.1, help="Latence du stub par page (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_stub(args.proteins, args.latency))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/api/graphql/"
+    fpbase.HTTP = CachedSession("fpbase", enabled=False, offline=False)
+
+    print(f"Stub : {args.proteins} protéines, {args.latency * 1000:.0f} ms par page\n")
+    print("| Pages en vol | Durée (s) | Protéines/s | Speed-up |")
+    print("|---:|---:|---:|---:|")
+    baseline = None
+    try:
+        for concurrency in sorted(set(args.concurrency)):
+            fpbase.BREAKERS.clear()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = asyncio.run(fpbase.fetch_fpbase_all_async(
+                    max_proteins=args.proteins, concurrency=concurrency, api_url=url))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"| {concurrency} | {elapsed:.2f} | {result['count'] / elapsed:,.0f} | "
+                  f"{baseline / elapsed:.2f}x |")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+if __name__ == "__main__":
+    main()
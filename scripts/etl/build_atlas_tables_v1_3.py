@@ -26,6 +26,10 @@ import yaml
 import time
 import hashlib
 
+sys.path.insert(0, str(Path(__file__).parent))
+from artifact_io import contract_schema, export_csv, read_artifact, write_artifact
+from contrast_normalization import normalize_contrasts
+
 def load_config() -> dict:
     """Load configuration."""
     with open("config/providers.yml", 'r', encoding='utf-8') as f:
@@ -33,36 +37,6 @@ def load_config() -> dict:
 
 CONFIG = load_config()
 
-def normalize_contrast(row: pd.Series) -> float:
-    """
-    Normalize contrast to fold-change.
-    
-    Mappings:
-    - fold → fold
-    - deltaF_F0 → fold = deltaF_F0 + 1
-    - percent → fold = 1 + percent/100
-    
-    Args:
-        row: DataFrame row with contrast_value and contrast_unit
-        
-    Returns:
-        Normalized fold-change value
-    """
-    value = row.get('contrast_value')
-    unit = row.get('contrast_unit')
-    
-    if pd.isna(value):
-        return np.nan
-    
-    if unit == 'fold':
-        return value
-    elif unit in ['deltaF_F0', 'deltaR_R0']:
-        return value + 1.0
-    elif unit == 'percent':
-        return 1.0 + (value / 100.0)
-    else:
-        return value  # Unknown unit, keep as-is
-
 def assign_quality_tier(row: pd.Series) -> str:
     """
     Assign quality tier based on statistical info.
@@ -98,8 +72,10 @@ def build_fp_optical_table(candidates_df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         Final FP optical DataFrame
     """
-    # Normalize contrasts
-    candidates_df['contrast_normalized'] = candidates_df.apply(normalize_contrast, axis=1)
+    # Normalize contrasts (unknown or missing unit: value kept as-is)
+    units = candidates_df.get('contrast_unit', pd.Series(None, index=candidates_df.index))
+    candidates_df['contrast_normalized'] = normalize_contrasts(
+        candidates_df['contrast_value'], units, keep_unitless=True)
     
     # Assign quality tiers
     candidates_df['contrast_quality_tier'] = candidates_df.apply(assign_quality_tier, axis=1)
@@ -258,22 +234,20 @@ def main():
         print("Run scripts/etl/build_external_candidates_v1_3.py first")
         return 1
     
-    candidates_df = pd.read_parquet(candidates_path)
+    candidates_df = read_artifact(candidates_path)
     print(f"Loaded {len(candidates_df)} candidates")
     
     # Build table
     final_df = build_fp_optical_table(candidates_df)
     
-    # Save CSV
-    csv_path = Path("data/processed/atlas_fp_optical_v1_3.csv")
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    final_df.to_csv(csv_path, index=False)
-    print(f"\nOK CSV saved: {csv_path}")
+    # Save Parquet (read by the next stages; contract columns typed)
+    parquet_path = write_artifact(final_df, Path("data/processed/atlas_fp_optical_v1_3.parquet"),
+                                  contract_schema())
+    print(f"\nOK Parquet saved: {parquet_path}")
     
-    # Save Parquet
-    parquet_path = Path("data/processed/atlas_fp_optical_v1_3.parquet")
-    final_df.to_parquet(parquet_path, index=False)
-    print(f"OK Parquet saved: {parquet_path}")
+    # CSV export (publication artifact)
+    csv_path = export_csv(final_df, Path("data/processed/atlas_fp_optical_v1_3.csv"))
+    print(f"OK CSV saved: {csv_path}")
     
     # Build metadata
     metadata = build_training_metadata(final_df)
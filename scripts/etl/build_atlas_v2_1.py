@@ -17,6 +17,9 @@ import numpy as np
 from pathlib import Path
 import hashlib
 import json
+from artifact_io import columns_schema, export_csv, write_artifact
+from contrast_normalization import normalize_contrasts
+from record_linkage import RecordLinker
 
 def load_sources():
     """Charge les sources de données"""
@@ -37,21 +40,12 @@ def load_sources():
     
     return df_v2_0, df_lit
 
-def normalize_contrast(value, unit):
-    """Normalise contraste vers fold-change"""
-    if pd.isna(value) or pd.isna(unit):
-        return np.nan
-    
-    unit_lower = str(unit).lower()
-    
-    if 'fold' in unit_lower:
-        return float(value)
-    elif 'deltaf' in unit_lower or 'df/f' in unit_lower:
-        return 1.0 + float(value)
-    elif 'percent' in unit_lower or '%' in unit_lower:
-        return 1.0 + float(value) / 100.0
-    else:
-        return float(value)  # Assume fold
+def values_by_target(df_lit_enrich, column, keep='first'):
+    """Première (ou dernière) extraction avec `column` renseigné, par entrée v2.0 cible"""
+    if column not in df_lit_enrich.columns:
+        return df_lit_enrich.iloc[:0].set_index('target')
+    rows = df_lit_enrich[df_lit_enrich[column].notna()]
+    return rows.drop_duplicates('target', keep=keep).set_index('target')
 
 def merge_sources(df_v2_0, df_lit):
     """Fusionne les sources avec déduplication"""
@@ -62,52 +56,42 @@ def merge_sources(df_v2_0, df_lit):
     df_v2_0['name_lower'] = df_v2_0['protein_name'].str.lower().str.strip()
     df_lit['name_lower'] = df_lit['protein_name'].str.lower().str.strip()
     
-    # Séparer nouveaux vs enrichissements
-    existing_names = set(df_v2_0['name_lower'])
-    df_lit_new = df_lit[~df_lit['name_lower'].isin(existing_names)].copy()
-    df_lit_enrich = df_lit[df_lit['name_lower'].isin(existing_names)].copy()
+    # Entrée v2.0 liée à chaque extraction (même nom, première occurrence)
+    target = RecordLinker(keys=['name_lower']).match(df_lit, df_v2_0)
+    df_lit_new = df_lit[target.isna()].copy()
+    df_lit_enrich = df_lit[target.notna()].copy()
+    df_lit_enrich['target'] = target[target.notna()].astype(df_v2_0.index.dtype)
     
     print(f"  - Systèmes à enrichir: {len(df_lit_enrich)}")
     print(f"  - Nouveaux systèmes: {len(df_lit_new)}")
     
     # Enrichir systèmes existants
-    for idx, row_lit in df_lit_enrich.iterrows():
-        name_lower = row_lit['name_lower']
-        
-        # Trouver dans v2.0
-        mask = df_v2_0['name_lower'] == name_lower
-        v2_idx = df_v2_0[mask].index
-        
-        if len(v2_idx) > 0:
-            v2_idx = v2_idx[0]
-            
-            # Mettre à jour contrast si manquant
-            if pd.isna(df_v2_0.at[v2_idx, 'contrast_value']):
-                df_v2_0.at[v2_idx, 'contrast_value'] = row_lit['contrast_value']
-                df_v2_0.at[v2_idx, 'contrast_unit'] = row_lit['contrast_unit']
-                
-                # Normaliser
-                norm = normalize_contrast(row_lit['contrast_value'], row_lit['contrast_unit'])
-                df_v2_0.at[v2_idx, 'contrast_normalized'] = norm
-            
-            # Mettre à jour DOI si manquant
-            if pd.isna(df_v2_0.at[v2_idx, 'doi']) and pd.notna(row_lit['doi']):
-                df_v2_0.at[v2_idx, 'doi'] = row_lit['doi']
-            
-            # Ajouter source_note
-            if pd.notna(row_lit.get('source_note')):
-                df_v2_0.at[v2_idx, 'source_note'] = row_lit['source_note']
+    # Contrast manquant : première extraction mesurée
+    found = values_by_target(df_lit_enrich, 'contrast_value')
+    fill = found.index[df_v2_0.loc[found.index, 'contrast_value'].isna()]
+    df_v2_0.loc[fill, 'contrast_value'] = found.loc[fill, 'contrast_value']
+    df_v2_0.loc[fill, 'contrast_unit'] = found.loc[fill, 'contrast_unit']
+    df_v2_0.loc[fill, 'contrast_normalized'] = normalize_contrasts(
+        found.loc[fill, 'contrast_value'], found.loc[fill, 'contrast_unit'])
+    
+    # DOI manquant : premier DOI extrait
+    found = values_by_target(df_lit_enrich, 'doi')
+    fill = found.index[df_v2_0.loc[found.index, 'doi'].isna()]
+    df_v2_0.loc[fill, 'doi'] = found.loc[fill, 'doi']
+    
+    # source_note : dernière note extraite
+    found = values_by_target(df_lit_enrich, 'source_note', keep='last')
+    df_v2_0.loc[found.index, 'source_note'] = found['source_note']
     
     # Préparer nouveaux systèmes au format v2.0
     df_new_mapped = []
+    df_lit_new['contrast_normalized'] = normalize_contrasts(
+        df_lit_new['contrast_value'], df_lit_new['contrast_unit'])
     
     for idx, row_lit in df_lit_new.iterrows():
         # Générer SystemID
         system_id = f"FP_{len(df_v2_0) + len(df_new_mapped) + 1:04d}"
         
-        # Normaliser contrast
-        norm = normalize_contrast(row_lit['contrast_value'], row_lit['contrast_unit'])
-        
         new_row = {
             'SystemID': system_id,
             'protein_name': row_lit['protein_name'],
@@ -115,7 +99,7 @@ def merge_sources(df_v2_0, df_lit):
             'is_biosensor': row_lit.get('is_biosensor', 1.0),
             'contrast_value': row_lit['contrast_value'],
             'contrast_unit': row_lit['contrast_unit'],
-            'contrast_normalized': norm,
+            'contrast_normalized': row_lit['contrast_normalized'],
             'quality_tier': row_lit.get('quality_tier', 'B'),
             'context': row_lit.get('context', ''),
             'temperature_K': row_lit.get('temperature_K'),
@@ -385,13 +369,11 @@ def main():
     # Save
     print("\n[SAVE] Sauvegarde des fichiers...")
     
-    output_full = Path("data/processed/atlas_fp_optical_v2_1.csv")
-    df_merged.to_csv(output_full, index=False)
-    print(f"  - {output_full}")
-    
-    output_training = Path("data/processed/TRAINING_TABLE_v2_1.csv")
-    df_training.to_csv(output_training, index=False)
-    print(f"  - {output_training}")
+    # Parquet typé selon le contrat (lu par v2.2), CSV pour publication
+    schema = columns_schema(metadata['contract_interface']['guaranteed_columns'])
+    for df, name in ((df_merged, "atlas_fp_optical_v2_1"), (df_training, "TRAINING_TABLE_v2_1")):
+        print(f"  - {write_artifact(df, Path(f'data/processed/{name}.parquet'), schema)}")
+        print(f"  - {export_csv(df, Path(f'data/processed/{name}.csv'))}")
     
     output_metadata = Path("data/processed/TRAINING.METADATA_v2_1.json")
     with open(output_metadata, 'w', encoding='utf-8') as f:
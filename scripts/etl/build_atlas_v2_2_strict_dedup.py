@@ -4,10 +4,10 @@ Build Atlas v2.2 - STRICT DEDUP + Merge
 ========================================
 
 Features:
-- Fuzzy matching (Levenshtein distance ≤2)
+- Hash grouping on name_normalized, optional fuzzy stage (strict_dedup)
 - Canonical key : (name_normalized | uniprot_id | doi)
 - Priority resolution : FPbase > Lit > v2.1
-- Outliers removal (z-score >5)
+- Outliers removal (z-score >5 per family)
 - Coverage ≥85% enforced
 """
 
@@ -17,6 +17,9 @@ from pathlib import Path
 import json
 import re
 from difflib import SequenceMatcher
+from artifact_io import columns_schema, contract_schema, export_csv, read_artifact, write_artifact
+from contrast_normalization import normalize_contrasts, outlier_mask
+from record_linkage import RecordLinker, format_report
 
 def normalize_name(name):
     """Normalise nom pour matching"""
@@ -66,7 +69,8 @@ def load_sources():
     """Charge toutes les sources"""
     
     # v2.1 baseline
-    df_v21 = pd.read_csv("data/processed/atlas_fp_optical_v2_1.csv")
+    df_v21 = read_artifact("data/processed/atlas_fp_optical_v2_1.parquet",
+                           schema=contract_schema("data/processed/TRAINING.METADATA_v2_1.json"))
     df_v21['source_priority'] = 3  # Lowest
     df_v21['source_name'] = 'Atlas_v2.1'
     
@@ -85,79 +89,50 @@ def load_sources():
     
     return df_v21, df_lit
 
-def normalize_contrast(value, unit):
-    """Normalise contraste"""
-    if pd.isna(value) or pd.isna(unit):
-        return np.nan
-    
-    unit_lower = str(unit).lower()
-    
-    if 'fold' in unit_lower:
-        return float(value)
-    elif 'deltaf' in unit_lower or 'df/f' in unit_lower:
-        return 1.0 + float(value)
-    elif 'percent' in unit_lower or '%' in unit_lower:
-        return 1.0 + float(value) / 100.0
-    else:
-        return float(value)
+def completeness_score(df):
+    """Score de complétude : contraste (100) > excitation, émission (10) > DOI (1)"""
+    def present(col):
+        return df[col].notna().astype(int) if col in df.columns else 0
+    
+    return (present('contrast_value') * 100 + present('excitation_nm') * 10 +
+            present('emission_nm') * 10 + present('doi') * 1)
 
-def strict_dedup(df_combined):
-    """Déduplication stricte avec fuzzy matching"""
+def strict_dedup(df_combined, fuzzy_stage=None):
+    """
+    Déduplication stricte par groupement sur name_normalized.
+    
+    Les entrées de même nom normalisé forment un groupe (RecordLinker, ordre
+    de première apparition) ; on garde la meilleure de chaque groupe avec un
+    seul tri vectorisé : source_priority (asc) puis complétude (desc), à
+    égalité la première entrée.
+    
+    Args:
+        df_combined: Entrées fusionnées (protein_name, source_priority, ...)
+        fuzzy_stage: Étape floue optionnelle (désactivée par défaut, les
+            variants comme jGCaMP7a/b/c/d sont DIFFÉRENTS) : reçoit la Series
+            des noms normalisés uniques, renvoie la clé de groupe de chacun
+            (même longueur, même ordre)
+    
+    Returns:
+        DataFrame dédupliqué (index d'origine conservé)
+    """
     
     print("\n[DEDUP] Déduplication stricte...")
     
     # Normaliser noms
     df_combined['name_normalized'] = df_combined['protein_name'].apply(normalize_name)
     
-    # Grouper par nom similaire
-    groups = []
-    processed = set()
-    
-    for idx, row in df_combined.iterrows():
-        if idx in processed:
-            continue
-        
-        name = row['protein_name']
-        name_norm = row['name_normalized']
-        
-        # Trouver tous les matchs fuzzy
-        matches = [idx]
-        
-        for idx2, row2 in df_combined.iterrows():
-            if idx2 in processed or idx2 == idx:
-                continue
-            
-            if fuzzy_match(name, row2['protein_name'], threshold=2):
-                matches.append(idx2)
-                processed.add(idx2)
-        
-        if len(matches) > 1:
-            print(f"  Doublons détectés : {name} ({len(matches)} entrées)")
-        
-        groups.append(matches)
-        processed.add(idx)
+    # Clé de groupe : nom normalisé, ou clé fournie par l'étape floue
+    group_key = df_combined['name_normalized']
+    if fuzzy_stage is not None:
+        unique_names = pd.Series(group_key.unique())
+        group_key = group_key.map(dict(zip(unique_names, fuzzy_stage(unique_names))))
     
-    # Pour chaque groupe, garder la meilleure entrée
-    keep_indices = []
-    
-    for group in groups:
-        group_df = df_combined.loc[group]
-        
-        # Priorité : source_priority (plus faible = meilleur)
-        # Puis completeness (contrast + optical data)
-        group_df = group_df.copy()
-        group_df['completeness'] = (
-            (~group_df['contrast_value'].isna()).astype(int) * 100 +
-            (~group_df.get('excitation_nm', pd.Series([np.nan]*len(group_df))).isna()).astype(int) * 10 +
-            (~group_df.get('emission_nm', pd.Series([np.nan]*len(group_df))).isna()).astype(int) * 10 +
-            (~group_df['doi'].isna()).astype(int) * 1
-        )
-        
-        # Trier : source_priority (asc) puis completeness (desc)
-        best_idx = group_df.sort_values(['source_priority', 'completeness'], ascending=[True, False]).index[0]
-        keep_indices.append(best_idx)
-    
-    df_dedup = df_combined.loc[keep_indices].copy()
+    # Meilleure entrée par groupe : un tri stable puis drop_duplicates
+    linker = RecordLinker(keys=[group_key.rename('name_normalized')], source_column='source_name')
+    df_dedup, report = linker.deduplicate(
+        df_combined, rank_by=[('source_priority', True), (completeness_score(df_combined), False)])
+    print(format_report(report))
     
     n_removed = len(df_combined) - len(df_dedup)
     print(f"  Entrées initiales : {len(df_combined)}")
@@ -184,10 +159,8 @@ def merge_and_enrich(df_v21, df_lit):
     df_combined = pd.concat([df_v21, df_lit], ignore_index=True)
     
     # Normaliser contraste
-    df_combined['contrast_normalized'] = df_combined.apply(
-        lambda row: normalize_contrast(row.get('contrast_value'), row.get('contrast_unit')),
-        axis=1
-    )
+    df_combined['contrast_normalized'] = normalize_contrasts(
+        df_combined['contrast_value'], df_combined['contrast_unit'])
     
     # Dédup strict
     df_dedup = strict_dedup(df_combined)
@@ -225,25 +198,15 @@ def add_optical_fields(df):
     return df
 
 def filter_outliers(df):
-    """Filtre outliers extrêmes"""
+    """Filtre outliers extrêmes (z-score > 5 sur log1p du contraste, par famille)"""
     
     print("\n[OUTLIERS] Filtrage outliers...")
     
-    contrast = df['contrast_normalized'].dropna()
-    
-    if len(contrast) == 0:
+    if df['contrast_normalized'].notna().sum() == 0:
         return df
     
-    # Log transform
-    contrast_log = np.log1p(contrast)
-    
-    # Z-score
-    mean = contrast_log.mean()
-    std = contrast_log.std()
-    z_scores = np.abs((contrast_log - mean) / std)
-    
-    # Outliers z>5
-    outlier_indices = contrast[z_scores > 5].index
+    families = df['family'] if 'family' in df.columns else None
+    outlier_indices = df.index[outlier_mask(df['contrast_normalized'], families, z_max=5)]
     
     if len(outlier_indices) > 0:
         print(f"  Outliers détectés (z>5): {len(outlier_indices)}")
@@ -383,8 +346,11 @@ def main():
     # Save
     print("\n[SAVE] Sauvegarde...")
     
-    df_merged.to_csv("data/processed/atlas_fp_optical_v2_2.csv", index=False)
-    df_training.to_csv("data/processed/TRAINING_TABLE_v2_2.csv", index=False)
+    # Parquet typé selon le contrat (lu par les stages suivants), CSV pour publication
+    schema = columns_schema(metadata['contract_interface']['guaranteed_columns'])
+    for df, name in ((df_merged, "atlas_fp_optical_v2_2"), (df_training, "TRAINING_TABLE_v2_2")):
+        write_artifact(df, Path(f"data/processed/{name}.parquet"), schema)
+        export_csv(df, Path(f"data/processed/{name}.csv"))
     
     with open("data/processed/TRAINING.METADATA_v2_2.json", 'w') as f:
         json.dump(metadata, f, indent=2)
@@ -399,8 +365,8 @@ def main():
     with open("data/processed/TRAIN_MEASURED.METADATA_v2_2.json", 'w') as f:
         json.dump(measured_meta, f, indent=2)
     
-    print("  - data/processed/atlas_fp_optical_v2_2.csv")
-    print("  - data/processed/TRAINING_TABLE_v2_2.csv")
+    print("  - data/processed/atlas_fp_optical_v2_2.parquet (+ .csv)")
+    print("  - data/processed/TRAINING_TABLE_v2_2.parquet (+ .csv)")
     print("  - data/processed/TRAINING.METADATA_v2_2.json")
     print("  - data/processed/TRAIN_MEASURED.METADATA_v2_2.json")
     
@@ -6,7 +6,7 @@ ETL Script: Build External Candidates
 Fusionne les harvests FPbase + UniProt + PDB, normalise les noms/aliases,
 déduplique et crée la liste de candidats externes.
 
-Input: data/raw/external/{fpbase,uniprot,pdb}/*.json
+Input: data/raw/external/{fpbase,pdb}/*.json, data/raw/external/uniprot/*.ndjson
 Output: data/interim/external_candidates.parquet
 """
 
@@ -19,7 +19,8 @@ from typing import List, Dict, Any, Optional
 
 # Paths
 FPBASE_FILE = Path("data/raw/external/fpbase/fpbase_proteins.json")
-UNIPROT_FILE = Path("data/raw/external/uniprot/uniprot_fluorescent_proteins.json")
+UNIPROT_FILE = Path("data/raw/external/uniprot/uniprot_fluorescent_proteins.ndjson")
+UNIPROT_LEGACY_FILE = Path("data/raw/external/uniprot/uniprot_fluorescent_proteins.json")
 PDB_FILE = Path("data/raw/external/pdb/pdb_fluorescent_proteins.json")
 OUTPUT_FILE = Path("data/interim/external_candidates.parquet")
 
@@ -64,17 +65,25 @@ def load_fpbase() -> pd.DataFrame:
     print(f"Loaded {len(df)} candidates from FPbase")
     return df
 
+def iter_uniprot_entries():
+    """Entrées UniProt : NDJSON ligne à ligne, ou ancien export JSON (liste)."""
+    if UNIPROT_FILE.exists():
+        with open(UNIPROT_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif UNIPROT_LEGACY_FILE.exists():
+        with open(UNIPROT_LEGACY_FILE, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
 def load_uniprot() -> pd.DataFrame:
     """Charge et parse UniProt."""
-    if not UNIPROT_FILE.exists():
+    if not UNIPROT_FILE.exists() and not UNIPROT_LEGACY_FILE.exists():
         print(f"WARNING: {UNIPROT_FILE} not found, skipping")
         return pd.DataFrame()
     
-    with open(UNIPROT_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
     records = []
-    for entry in data:
+    for entry in iter_uniprot_entries():
         protein_name = entry.get('proteinDescription', {}).get('recommendedName', {}).get('fullName', {}).get('value', '')
         
         # Extraire organism
@@ -28,9 +28,12 @@ import pandas as pd
 import numpy as np
 import re
 from typing import List, Dict, Any, Optional
-from Levenshtein import distance as levenshtein_distance
 import yaml
 
+sys.path.insert(0, str(Path(__file__).parent))
+from artifact_io import read_artifact
+from record_linkage import RecordLinker, fuzzy_canonical_names, format_report
+
 def load_config() -> Dict:
     """Load configuration."""
     with open("config/providers.yml", 'r', encoding='utf-8') as f:
@@ -49,6 +52,12 @@ def load_alias_config() -> Dict:
 CONFIG = load_config()
 ALIAS_CONFIG = load_alias_config()
 
+# Linkage keys: canonical_name (after fuzzy matching) + validation.deduplication.keys;
+# rows without an evidence_type get the tier of their source
+LINKER = (RecordLinker.from_config(CONFIG, extra_keys=['canonical_name'], name_column='canonical_name')
+          .register_source('fpbase_graphql', tier=6)
+          .register_source('specialist', tier=7))
+
 def normalize_name(name: str) -> str:
     """Normalize protein name."""
     if not name or pd.isna(name):
@@ -178,67 +187,51 @@ def load_specialist() -> pd.DataFrame:
     return df
 
 def load_pmc_contrasts() -> pd.DataFrame:
-    """Load PMC full-text contrast measurements."""
-    pmc_path = Path("data/interim/pmc_contrasts.json")
+    """Load PMC full-text contrast measurements (best section per protein and PMCID)."""
+    pmc_path = Path("data/interim/pmc_contrasts.parquet")
     
     if not pmc_path.exists():
         print("WARNING: PMC contrasts not found, skipping")
         return pd.DataFrame()
     
-    with open(pmc_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    m = read_artifact(pmc_path)
+    
+    # Keep the first measurement of the best section per (protein, PMCID),
+    # in order of first appearance
+    section_priority = {'table': 1, 'caption': 2, 'paragraph': 3}
+    m['priority'] = m['section_type'].map(section_priority).fillna(4)
+    m['pair'] = m.groupby(['protein_name', 'pmcid'], sort=False).ngroup()
+    m = m.sort_values(['pair', 'priority'], kind='stable').drop_duplicates('pair')
+    
+    df = pd.DataFrame({
+        'protein_name': m['protein_name'],
+        'normalized_name': m['protein_name'].map(normalize_name),
+        'contrast_value': m['value'],
+        'contrast_unit': m['metric_type'],
+        'n': m['n'],
+        'sd': m['sd'],
+        'sem': m['sem'],
+        'ci_low': m['ci_low'],
+        'ci_high': m['ci_high'],
+        'condition_text': m['context'],
+        'evidence_type': m['section_type'],
+        'source': 'pmc_fulltext',
+        'source_refs': 'PMCID:' + m['pmcid'],
+        'license_source': 'CC BY/CC0 (PMC OA)'
+    }).reset_index(drop=True)
     
-    records = []
-    for protein_name, measurements in data.items():
-        # Group by PMCID and keep best measurement
-        best_per_pmcid = {}
-        for m in measurements:
-            pmcid = m['pmcid']
-            section_priority = {'table': 1, 'caption': 2, 'paragraph': 3}
-            priority = section_priority.get(m['section_type'], 4)
-            
-            if pmcid not in best_per_pmcid or priority < best_per_pmcid[pmcid]['priority']:
-                best_per_pmcid[pmcid] = {
-                    **m,
-                    'priority': priority,
-                    'protein_name': protein_name
-                }
-        
-        for pmcid, m in best_per_pmcid.items():
-            record = {
-                'protein_name': m['protein_name'],
-                'normalized_name': normalize_name(m['protein_name']),
-                'contrast_value': m['value'],
-                'contrast_unit': m['metric_type'],
-                'n': m.get('n'),
-                'sd': m.get('sd'),
-                'sem': m.get('sem'),
-                'ci_low': m.get('ci_low'),
-                'ci_high': m.get('ci_high'),
-                'condition_text': m.get('context'),
-                'evidence_type': m['section_type'],
-                'source': 'pmc_fulltext',
-                'source_refs': f"PMCID:{pmcid}",
-                'license_source': 'CC BY/CC0 (PMC OA)'
-            }
-            records.append(record)
-    
-    df = pd.DataFrame(records)
     print(f"Loaded {len(df)} from PMC full-text")
     return df
 
 def load_supplement_contrasts() -> pd.DataFrame:
     """Load supplementary spreadsheet contrasts."""
-    supp_path = Path("data/interim/supplement_contrasts.json")
+    supp_path = Path("data/interim/supplement_contrasts.parquet")
     
     if not supp_path.exists():
         print("WARNING: Supplement contrasts not found, skipping")
         return pd.DataFrame()
     
-    with open(supp_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    measurements = data.get('measurements', [])
+    measurements = pd.read_parquet(supp_path).to_dict('records')
     
     records = []
     for m in measurements:
@@ -267,6 +260,11 @@ def fuzzy_match_names(df: pd.DataFrame, threshold: int = 2) -> pd.DataFrame:
     """
     Fuzzy match protein names within a group, respecting no_merge_variants.
     
+    Each name joins the first canonical group (in creation order) within
+    `threshold` edits; only the candidates returned by
+    record_linkage.FuzzyNameIndex are scored, with a Levenshtein distance
+    capped at the threshold.
+    
     Args:
         df: DataFrame with normalized_name column
         threshold: Max Levenshtein distance
@@ -275,7 +273,6 @@ def fuzzy_match_names(df: pd.DataFrame, threshold: int = 2) -> pd.DataFrame:
         DataFrame with canonical_name column
     """
     unique_names = df['normalized_name'].unique()
-    name_groups = {}
     
     # Build no_merge set from config
     no_merge_pairs = set()
@@ -286,41 +283,22 @@ def fuzzy_match_names(df: pd.DataFrame, threshold: int = 2) -> pd.DataFrame:
             no_merge_pairs.add((n1, n2))
             no_merge_pairs.add((n2, n1))  # Bidirectional
     
-    for name in unique_names:
-        if not name:
-            continue
-        
-        # Find existing group within threshold
-        matched = False
-        for canonical, group in name_groups.items():
-            # Check if this pair is in no_merge list
-            if (name, canonical) in no_merge_pairs or (canonical, name) in no_merge_pairs:
-                continue  # Skip fuzzy match for this pair
-            
-            if levenshtein_distance(name, canonical) <= threshold:
-                group.append(name)
-                matched = True
-                break
-        
-        if not matched:
-            name_groups[name] = [name]
-    
-    # Create mapping
-    name_to_canonical = {}
-    for canonical, group in name_groups.items():
-        for name in group:
-            name_to_canonical[name] = canonical
+    name_to_canonical = fuzzy_canonical_names(unique_names, threshold, no_merge_pairs)
     
     df['canonical_name'] = df['normalized_name'].map(name_to_canonical)
     
-    print(f"Fuzzy matching: {len(unique_names)} names -> {len(name_groups)} canonical groups")
+    print(f"Fuzzy matching: {len(unique_names)} names -> {len(set(name_to_canonical.values()))} canonical groups")
     print(f"   Protected {len(no_merge_pairs)//2} variant pairs from merging")
     
     return df
 
 def deduplicate_advanced(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Advanced deduplication with evidence tiers.
+    Advanced deduplication with evidence tiers (record_linkage.RecordLinker).
+    
+    Rows sharing a canonical_name, fpbase_slug, uniprot_id or
+    name/family/year key are merged; within a group, values come from the
+    best evidence tier first.
     
     Priority:
     1. supplement_table
@@ -333,24 +311,9 @@ def deduplicate_advanced(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         Deduplicated DataFrame
     """
-    # Evidence tier mapping
-    evidence_tiers = CONFIG['evidence_tiers']
-    tier_map = {v: int(k) for k, v in evidence_tiers.items()}
-    
-    def get_tier(source, evidence_type):
-        if evidence_type:
-            return tier_map.get(evidence_type, 999)
-        elif source == 'fpbase_graphql':
-            return 6
-        elif 'specialist' in source:
-            return 7
-        else:
-            return 999
-    
-    df['tier'] = df.apply(lambda row: get_tier(row.get('source'), row.get('evidence_type')), axis=1)
-    
-    # Group by canonical_name and keep best row
-    df = df.sort_values(by=['canonical_name', 'tier', 'contrast_value'], na_position='last')
+    # Rows without a canonical name (empty protein name) are dropped
+    df = df[df['canonical_name'].notna()].copy()
+    df['tier'] = LINKER.evidence_tier(df)
     
     # Build aggregation dict dynamically based on available columns
     agg_dict = {
@@ -392,10 +355,14 @@ def deduplicate_advanced(df: pd.DataFrame) -> pd.DataFrame:
         if col in df.columns:
             agg_dict[col] = agg_func
     
-    # For rows with same canonical_name, merge data
-    grouped = df.groupby('canonical_name', as_index=False).agg(agg_dict)
+    # Link on canonical_name + config keys, then merge each group in
+    # resolution order: best tier first, then lowest contrast_value
+    grouped, report = LINKER.deduplicate(df, rank_by=[('tier', True), ('contrast_value', True)],
+                                         aggregate={'canonical_name': 'first', **agg_dict})
+    grouped = grouped.sort_values('canonical_name', kind='stable', ignore_index=True)
     
     print(f"Deduplication: {len(df)} rows -> {len(grouped)} unique systems")
+    print(format_report(report))
     
     return grouped
 
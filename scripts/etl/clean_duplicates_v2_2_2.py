@@ -7,8 +7,8 @@ Nettoie les doublons du dataset avant l'équilibrage.
 Garde la première occurrence de chaque système.
 """
 
-import pandas as pd
 from pathlib import Path
+from artifact_io import contract_schema, export_csv, read_artifact, write_artifact
 
 def clean_duplicates():
     """Nettoie les doublons du dataset"""
@@ -18,8 +18,8 @@ def clean_duplicates():
     print("=" * 80)
     
     # Charger le dataset
-    training_path = Path("data/processed/TRAINING_TABLE_v2_2.csv")
-    df = pd.read_csv(training_path)
+    training_path = Path("data/processed/TRAINING_TABLE_v2_2.parquet")
+    df = read_artifact(training_path, schema=contract_schema())
     
     print(f"[LOAD] Dataset original: {len(df)} systèmes")
     
@@ -39,15 +39,17 @@ def clean_duplicates():
         
         print(f"[CLEAN] Dataset nettoyé: {len(df_clean)} systèmes")
         print(f"  Systèmes supprimés: {len(df) - len(df_clean)}")
-        
-        # Sauvegarder le dataset nettoyé
-        df_clean.to_csv(training_path, index=False, encoding='utf-8')
-        print(f"[SAVE] Dataset nettoyé sauvegardé: {training_path}")
-        
-        return df_clean
     else:
         print("[CLEAN] Aucun doublon détecté")
-        return df
+        df_clean = df
+    
+    # Sauvegarder dans tous les cas : l'artefact Parquet et son export CSV
+    # restent synchrones (l'équilibrage lit le Parquet)
+    write_artifact(df_clean, training_path, contract_schema())
+    export_csv(df_clean, training_path.with_suffix('.csv'))
+    print(f"[SAVE] Dataset nettoyé sauvegardé: {training_path} (+ .csv)")
+    
+    return df_clean
 
 def main():
     """Fonction principale"""
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Contrast Normalization - normalisation vectorisée des contrastes (→ fold-change)
+=================================================================================
+
+Utilisé par build_atlas_v2_1, build_atlas_v2_2_strict_dedup et
+build_atlas_tables_v1_3.
+
+- Chaque unité distincte est classée une seule fois (Categorical) dans une
+  catégorie de validation.contrast_normalization.mappings (fold, deltaF_F0,
+  percent) ; les unités inconnues gardent leur valeur (fold supposé)
+- Les formules du config ("fold = 1 + percent/100") sont compilées une fois
+  et appliquées comme opérations sur tableaux, une par catégorie d'unité
+- Outliers : z-score sur log1p(contraste) par famille, en un seul groupby
+"""
+
+import ast
+import operator
+import re
+import pandas as pd
+import numpy as np
+import yaml
+from typing import Callable, Dict, Optional
+
+# Classement des unités (minuscules, sous-chaînes), dans l'ordre
+UNIT_PATTERNS = (
+    ('fold', ('fold',)),
+    ('deltaF_F0', ('deltaf', 'df/f', 'deltar', 'dr/r')),
+    ('percent', ('percent', '%')),
+)
+
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub,
+              ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+def load_config() -> Dict:
+    """Charge la configuration"""
+    with open("config/providers.yml", 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def _evaluate(node, x):
+    """Évalue une formule (nombres, variable, + - * /) ; x scalaire ou tableau"""
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, x)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        return x
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.left, x), _evaluate(node.right, x))
+    raise ValueError(f"Formule de conversion non supportée : {ast.dump(node)}")
+
+def compile_mapping(unit: str, formula: str) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Conversion vectorisée d'une formule du config.
+
+    "fold" -> x ; "fold = deltaF_F0 + 1" -> x + 1 ; "fold = 1 + percent/100" -> 1 + x/100
+    """
+    expression = formula.split('=', 1)[1] if '=' in formula else unit
+    tree = ast.parse(re.sub(r'[A-Za-z_]\w*', 'x', expression.strip()), mode='eval')
+    _evaluate(tree, 1.0)  # formule invalide : erreur au chargement
+    return lambda x: _evaluate(tree, x)
+
+def load_conversions(config: Optional[Dict] = None) -> Dict[str, Callable[[np.ndarray], np.ndarray]]:
+    """Conversions par catégorie d'unité (validation.contrast_normalization.mappings)"""
+    config = config or load_config()
+    mappings = config['validation']['contrast_normalization']['mappings']
+    return {unit: compile_mapping(unit, formula) for unit, formula in mappings.items()}
+
+CONVERSIONS = load_conversions()
+CATEGORIES = tuple(category for category, _ in UNIT_PATTERNS)
+
+def classify_unit(unit: str) -> Optional[str]:
+    """Catégorie d'une unité (None si inconnue)"""
+    lower = str(unit).lower()
+    for category, patterns in UNIT_PATTERNS:
+        if any(p in lower for p in patterns):
+            return category
+    return None
+
+def unit_codes(units: pd.Series) -> np.ndarray:
+    """Code de catégorie par entrée (indice dans CATEGORIES, len(CATEGORIES) = inconnue, -1 = absente)"""
+    units = pd.Series(units, dtype=object)
+    units = pd.Categorical(units.where(units.isna(), units.astype(str)))
+    lookup = [CATEGORIES.index(c) if c else len(CATEGORIES)
+              for c in map(classify_unit, units.categories)]
+    return np.asarray(lookup + [-1], dtype=int)[units.codes]
+
+def normalize_contrasts(values: pd.Series, units: pd.Series,
+                        conversions: Optional[Dict[str, Callable]] = None,
+                        keep_unitless: bool = False) -> pd.Series:
+    """
+    Contrastes normalisés en fold-change.
+
+    Args:
+        values: Valeurs (non numériques -> NaN)
+        units: Unités correspondantes
+        conversions: Catégorie -> conversion (CONVERSIONS par défaut)
+        keep_unitless: Garder la valeur telle quelle si l'unité manque (NaN sinon)
+
+    Returns:
+        Series alignée sur values
+    """
+    conversions = conversions or CONVERSIONS
+    codes = unit_codes(units)
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+    # Unité inconnue : valeur gardée (fold supposé)
+    normalized = numeric.copy()
+    if not keep_unitless:
+        normalized[codes == -1] = np.nan
+    for code, category in enumerate(CATEGORIES):
+        mask = codes == code
+        if category in conversions and mask.any():
+            normalized[mask] = conversions[category](numeric[mask])
+    return pd.Series(normalized, index=values.index)
+
+def outlier_mask(contrast: pd.Series, groups: Optional[pd.Series] = None,
+                 z_max: float = 5.0) -> pd.Series:
+    """
+    Outliers : |z| > z_max sur log1p(contraste), par groupe (famille).
+
+    Un seul groupby (moyenne, écart-type) ; les groupes sans écart-type
+    (une seule valeur) n'ont pas d'outlier.
+
+    Args:
+        contrast: Contrastes normalisés
+        groups: Clé de groupe alignée (None = population entière ; NaN = un groupe)
+        z_max: Seuil de z-score
+
+    Returns:
+        Masque booléen aligné sur contrast
+    """
+    log_contrast = np.log1p(contrast.astype(float))
+    if groups is None:
+        mean, std = log_contrast.mean(), log_contrast.std()
+    else:
+        grouped = log_contrast.groupby(groups, dropna=False)
+        mean, std = grouped.transform('mean'), grouped.transform('std')
+    z_scores = ((log_contrast - mean) / std).abs()
+    return (z_scores > z_max).fillna(False)
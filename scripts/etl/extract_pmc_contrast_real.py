@@ -12,8 +12,16 @@ Pour chaque protéine du seed:
 - Tag contrast_source="measured"
 
 AUCUNE valeur inventée. Extraction uniquement si chiffres trouvés.
+
+Avec --corpus, aucune requête réseau : les passages du texte intégral qui
+citent la protéine sont lus dans le corpus local SQLite FTS5
+(scripts/textmine/corpus_store.py), au lieu du titre + résumé Europe PMC.
+
+Usage:
+    python scripts/etl/extract_pmc_contrast_real.py [--corpus]
 """
 
+import argparse
 import sys
 from pathlib import Path
 import pandas as pd
@@ -22,6 +30,9 @@ import re
 import time
 from urllib.parse import quote
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "textmine"))
+from corpus_store import CORPUS_DB, OA_DIR, CorpusStore
+
 # Paths
 SEED_FILE = Path("seed/seed_fp_names.csv")
 ATLAS_FILE = Path("data/processed/atlas_fp_optical.csv")
@@ -134,8 +145,34 @@ def process_protein(protein_name, protein_type):
     
     return None
 
-def extract_contrasts():
-    """Extrait les contrastes pour toutes les protéines."""
+def process_protein_from_corpus(protein_name, store):
+    """Traite une protéine à partir du corpus local (sans réseau)."""
+    print(f"  Searching corpus for: {protein_name}")
+    
+    for pmcid in store.articles_mentioning(protein_name, limit=3):  # Limit to 3 articles max
+        # Passages citant la protéine, meilleur score bm25 d'abord
+        for passage in store.search(protein_name, pmcid=pmcid):
+            measurements = extract_contrast_from_text(passage.text)
+            
+            if measurements:
+                # Take first measurement
+                value, context = measurements[0]
+                
+                return {
+                    'protein_name': protein_name,
+                    'contrast_ratio': value,
+                    'condition_text': context.strip()[:200],
+                    'pmcid': pmcid,
+                    'doi': '',  # Le corpus ne conserve que le texte
+                    'source_refs': f"PMC:{pmcid}",
+                    'license_source': 'CC BY (PMC OA)',
+                    'contrast_source': 'measured'
+                }
+    
+    return None
+
+def extract_contrasts(store=None):
+    """Extrait les contrastes pour toutes les protéines (Europe PMC, ou corpus local si `store`)."""
     # Load seed
     seed_df = pd.read_csv(SEED_FILE)
     print(f"Processing {len(seed_df)} proteins")
@@ -147,12 +184,18 @@ def extract_contrasts():
         ptype = row['type']
         
         # Process
-        result = process_protein(name, ptype)
+        if store is not None:
+            result = process_protein_from_corpus(name, store)
+        else:
+            result = process_protein(name, ptype)
         
         if result:
             extracted.append(result)
             print(f"    OK Extracted contrast: {result['contrast_ratio']}")
         
+        if store is not None:
+            continue  # Pas de réseau : ni pause ni limite
+        
         time.sleep(1)  # Rate limiting
         
         # Limit to avoid long run (process first 40)
@@ -204,8 +247,21 @@ def main():
     print("Extract PMC Contrast — Real Data Only")
     print("=" * 70)
     
+    parser = argparse.ArgumentParser(description="Extract PMC contrasts")
+    parser.add_argument('--corpus', action='store_true',
+                        help=f"Lire les passages dans le corpus local ({CORPUS_DB}) au lieu d'Europe PMC")
+    args = parser.parse_args()
+    
     # Extract contrasts
-    extracted_df = extract_contrasts()
+    if args.corpus:
+        with CorpusStore(CORPUS_DB) as store:
+            if not store.refresh(OA_DIR):
+                print(f"ERROR: corpus local {CORPUS_DB} vide et aucun texte intégral sous {OA_DIR} "
+                      "(lancer d'abord sans --corpus pour le télécharger)")
+                return 1
+            extracted_df = extract_contrasts(store)
+    else:
+        extracted_df = extract_contrasts()
     
     if len(extracted_df) == 0:
         print("\nWARNING: No contrast measurements extracted!")
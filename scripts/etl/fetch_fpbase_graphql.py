@@ -5,18 +5,28 @@ FPbase GraphQL Provider - Full Implementation v1.3
 
 Complete GraphQL harvester with circuit-breaker, pagination, caching, and CSV fallback.
 
+Pages are fetched concurrently (asyncio) under a token bucket driven by
+rate_limit.requests_per_minute / requests_per_hour, with one circuit
+breaker per host (fetch_fpbase_all_async). fetch_fpbase_all is the
+sequential reference implementation.
+
 Author: Biological Qubit Atlas Team
 License: MIT
 """
 
+import asyncio
 import requests
 import json
 import time
 import yaml
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+from urllib.parse import urlparse
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from providers.http_cache import cached_session
+
 # Load config
 def load_config() -> Dict[str, Any]:
     """Load provider configuration."""
@@ -30,6 +40,7 @@ def load_config() -> Dict[str, Any]:
 
 CONFIG = load_config()
 FPBASE_CONFIG = CONFIG['fpbase']
+HTTP = cached_session("fpbase", CONFIG)
 
 # Configuration
 FPBASE_API_URL = FPBASE_CONFIG['api_url']
@@ -93,27 +104,34 @@ class CircuitBreaker:
         self.last_failure_time = None
         self.state = "closed"  # closed, open, half-open
     
-    def call(self, func, *args, **kwargs):
-        """Call function with circuit breaker protection."""
+    def allow(self):
+        """Raise if the circuit is open; move to half-open once the timeout elapsed."""
         if self.state == "open":
             if time.time() - self.last_failure_time > self.timeout:
                 self.state = "half-open"
                 print("Circuit breaker: half-open (testing)")
             else:
                 raise Exception("Circuit breaker is OPEN (API unavailable)")
+    
+    def record(self, result: Dict[str, Any]):
+        """Record the outcome of a call (result dict with a 'status' key)."""
+        if result.get("status") == "success":
+            self.failures = 0
+            self.state = "closed"
+        else:
+            self._record_failure()
+    
+    def call(self, func, *args, **kwargs):
+        """Call function with circuit breaker protection."""
+        self.allow()
         
         try:
             result = func(*args, **kwargs)
-            if result.get("status") == "success":
-                self.failures = 0
-                self.state = "closed"
-                return result
-            else:
-                self._record_failure()
-                return result
         except Exception as e:
             self._record_failure()
             raise e
+        self.record(result)
+        return result
     
     def _record_failure(self):
         """Record a failure."""
@@ -123,7 +141,8 @@ class CircuitBreaker:
             self.state = "open"
             print(f"Circuit breaker: OPEN (failures: {self.failures})")
 
-def fetch_fpbase_page(limit: int = 50, offset: int = 0, circuit_breaker: Optional[CircuitBreaker] = None) -> Dict[str, Any]:
+def fetch_fpbase_page(limit: int = 50, offset: int = 0, circuit_breaker: Optional[CircuitBreaker] = None,
+                      api_url: Optional[str] = None) -> Dict[str, Any]:
     """
     Fetch one page of fluorescent proteins data from FPbase GraphQL API.
     
@@ -131,6 +150,7 @@ def fetch_fpbase_page(limit: int = 50, offset: int = 0, circuit_breaker: Optiona
         limit: Number of proteins to fetch
         offset: Offset for pagination
         circuit_breaker: Optional circuit breaker instance
+        api_url: GraphQL endpoint (defaults to fpbase.api_url)
         
     Returns:
         Dict containing API response or error info
@@ -146,8 +166,8 @@ def fetch_fpbase_page(limit: int = 50, offset: int = 0, circuit_breaker: Optiona
     }
     
     try:
-        response = requests.post(
-            FPBASE_API_URL,
+        response = HTTP.post(
+            api_url or FPBASE_API_URL,
             headers=HEADERS,
             json=payload,
             timeout=FPBASE_CONFIG['circuit_breaker']['timeout_seconds']
@@ -203,6 +223,7 @@ def fetch_fpbase_all(max_proteins: int = 1000) -> Dict[str, Any]:
         retries = 0
         while retries < max_retries:
             try:
+                network_before = HTTP.stats['network']
                 result = circuit_breaker.call(fetch_fpbase_page, batch_size, offset)
                 
                 if result["status"] == "success":
@@ -221,7 +242,8 @@ def fetch_fpbase_all(max_proteins: int = 1000) -> Dict[str, Any]:
                     print(f"OK Fetched {len(proteins)} proteins (total: {len(all_proteins)})")
                     
                     offset += batch_size
-                    time.sleep(1)  # Rate limiting
+                    if HTTP.stats['network'] > network_before:
+                        time.sleep(1)  # Rate limiting (pas pour les réponses en cache)
                     break
                 else:
                     print(f"ERROR: {result['error']}")
@@ -249,6 +271,145 @@ def fetch_fpbase_all(max_proteins: int = 1000) -> Dict[str, Any]:
         "timestamp": time.time()
     }
 
+class TokenBucket:
+    """Asyncio token bucket: `rate` tokens per second, bursts up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until one token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def rate_limit_buckets(rate_limit: Dict[str, Any]) -> List[TokenBucket]:
+    """Token buckets for the per-minute and per-hour quotas of a provider."""
+    buckets = []
+    if rate_limit.get('requests_per_minute'):
+        rpm = rate_limit['requests_per_minute']
+        buckets.append(TokenBucket(rpm / 60.0, rpm))
+    if rate_limit.get('requests_per_hour'):
+        rph = rate_limit['requests_per_hour']
+        buckets.append(TokenBucket(rph / 3600.0, rph))
+    return buckets
+
+# One circuit breaker per API host, shared by every harvest in the process
+BREAKERS: Dict[str, CircuitBreaker] = {}
+
+async def fetch_fpbase_all_async(max_proteins: int = 1000, concurrency: int = 4,
+                                 api_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Fetch all fluorescent proteins, `concurrency` pages in flight at a time.
+    
+    Same result format and retry / circuit-breaker behaviour as
+    fetch_fpbase_all. Pages are requested in offset order; the first empty
+    page marks the end of the catalogue and no later offset is requested
+    once it has been seen.
+    
+    Args:
+        max_proteins: Maximum number of proteins to fetch
+        concurrency: Number of page requests in flight
+        api_url: GraphQL endpoint (defaults to fpbase.api_url)
+        
+    Returns:
+        Dict containing all proteins or error info
+    """
+    api_url = api_url or FPBASE_API_URL
+    breaker = BREAKERS.setdefault(urlparse(api_url).netloc, CircuitBreaker(
+        failure_threshold=FPBASE_CONFIG['circuit_breaker']['failure_threshold'],
+        timeout=FPBASE_CONFIG['circuit_breaker']['timeout_seconds']
+    ))
+    buckets = rate_limit_buckets(FPBASE_CONFIG['rate_limit'])
+    
+    batch_size = FPBASE_CONFIG['rate_limit']['max_batch_size']
+    max_retries = FPBASE_CONFIG['circuit_breaker']['max_retries']
+    retry_delay = FPBASE_CONFIG['circuit_breaker']['retry_delay_seconds']
+    
+    offsets = iter(range(0, max_proteins, batch_size))
+    pages: Dict[int, List[Dict[str, Any]]] = {}
+    end = [max_proteins]  # offset of the first empty page seen
+    errors: List[str] = []
+    
+    async def worker():
+        for offset in offsets:
+            retries = 0
+            while True:
+                if errors or offset >= end[0]:
+                    return
+                for bucket in buckets:
+                    await bucket.acquire()
+                if offset >= end[0]:
+                    return
+                
+                try:
+                    breaker.allow()
+                    result = await asyncio.to_thread(fetch_fpbase_page, batch_size, offset, None, api_url)
+                    breaker.record(result)
+                except Exception as e:
+                    errors.append(f"Circuit breaker exception: {e}")
+                    return
+                
+                if result["status"] == "success":
+                    edges = result["data"]["data"]["fluorescentProteins"]["edges"]
+                    if not edges:
+                        end[0] = min(end[0], offset)
+                    else:
+                        pages[offset] = [edge["node"] for edge in edges]
+                        print(f"OK Fetched {len(edges)} proteins at offset {offset}")
+                    break
+                
+                print(f"ERROR: {result['error']} (offset {offset})")
+                retries += 1
+                if retries >= max_retries:
+                    errors.append(result['error'])
+                    return
+                print(f"Retrying in {retry_delay}s... ({retries}/{max_retries})")
+                await asyncio.sleep(retry_delay)
+    
+    print(f"Fetching FPbase data (batch_size={batch_size}, max={max_proteins}, concurrency={concurrency})...")
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+    
+    # Contiguous pages only, in offset order
+    all_proteins = []
+    for offset in range(0, end[0], batch_size):
+        if offset not in pages:
+            break
+        all_proteins.extend(pages[offset])
+    
+    n_pages = len(pages)
+    print(f"Harvested {len(all_proteins)} proteins in {n_pages} pages, {duration:.2f}s "
+          f"({len(all_proteins) / duration if duration else 0:.0f} proteins/s, "
+          f"{n_pages / duration if duration else 0:.1f} pages/s)")
+    
+    if errors:
+        return {
+            "status": "error",
+            "error": errors[0],
+            "timestamp": time.time(),
+            "proteins_partial": all_proteins,
+            "count_partial": len(all_proteins)
+        }
+    
+    return {
+        "status": "success",
+        "proteins": all_proteins,
+        "count": len(all_proteins),
+        "timestamp": time.time()
+    }
+
 def fetch_fpbase_csv_fallback() -> Dict[str, Any]:
     """
     Fallback: fetch FPbase CSV export if GraphQL fails.
@@ -260,7 +421,7 @@ def fetch_fpbase_csv_fallback() -> Dict[str, Any]:
     print(f"Trying CSV fallback: {csv_url}")
     
     try:
-        response = requests.get(csv_url, headers=HEADERS, timeout=30)
+        response = HTTP.get(csv_url, headers=HEADERS, timeout=30)
         if response.status_code == 200:
             # Save CSV
             output_path = Path("data/raw/fpbase/fpbase_export.csv")
@@ -315,7 +476,7 @@ def main():
         sys.exit(1)
     
     # Try GraphQL first
-    result = fetch_fpbase_all(max_proteins=1000)
+    result = asyncio.run(fetch_fpbase_all_async(max_proteins=1000))
     
     if result["status"] == "success":
         print(f"OK FPbase GraphQL harvest successful")
@@ -324,6 +485,7 @@ def main():
         # Save
         filepath = save_fpbase_full(result)
         print(f"OK Saved to: {filepath}")
+        print(HTTP.summary())
         
     else:
         print(f"ERROR FPbase GraphQL failed: {result['error']}")
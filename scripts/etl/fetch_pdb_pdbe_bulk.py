@@ -6,24 +6,57 @@ ETL Script: Fetch PDB/PDBe Bulk
 Récupère les structures PDB pour les protéines fluorescentes.
 Licence: CC0 (domaine public)
 
+Les summaries PDBe sont récupérés par lots d'IDs (GET .../summary/ID1,ID2,...)
+dans un pool de workers borné par pdb.rate_limit.requests_per_second. La
+taille des lots s'adapte : elle grandit tant que la latence reste basse,
+diminue si elle monte ou sur un 413/414 (URL trop longue) ; un 429 suspend
+tous les workers (Retry-After). Chaque lot terminé est ajouté au checkpoint
+NDJSON, relu au démarrage pour reprendre après un crash.
+
+Le découpage en lots dépend de la latence : chaque summary reçu est donc
+aussi mis en cache sous l'URL de son seul ID (summary_url([ID])). Un nouveau
+lancement sert ces IDs depuis le cache, quels que soient les lots d'origine,
+et ne demande à PDBe que les IDs absents ou expirés.
+
 Output: data/raw/external/pdb/*.json
 Log: reports/EXTERNAL_HARVEST_LOG.md (append)
 """
 
 import json
 import hashlib
+import math
 import sys
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
 import requests
 import time
-from typing import List, Dict, Any
+import yaml
+from typing import List, Dict, Any, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from providers.http_cache import RateLimiter, cached_session
 
 # Configuration
+with open("config/providers.yml", 'r', encoding='utf-8') as f:
+    CONFIG = yaml.safe_load(f)
+
 RCSB_SEARCH_API = "https://search.rcsb.org/rcsbsearch/v2/query"
 PDBE_API_BASE = "https://www.ebi.ac.uk/pdbe/api"
 OUTPUT_DIR = Path("data/raw/external/pdb")
 LOG_FILE = Path("reports/EXTERNAL_HARVEST_LOG.md")
+CHECKPOINT_FILE = OUTPUT_DIR / "pdbe_summary.checkpoint.ndjson"
+HTTP = cached_session("pdb", CONFIG)
+
+REQUESTS_PER_SECOND = CONFIG['pdb']['rate_limit']['requests_per_second']
+LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+# Workers en vol : inutile d'en avoir plus que de requêtes autorisées par seconde
+MAX_WORKERS = 8
+MAX_ATTEMPTS = 5
+# Latence cible d'un lot : au-delà on réduit, en dessous de la moitié on grandit
+LATENCY_TARGET_S = 2.0
+
 
 def compute_sha256(data: str) -> str:
     """Calcule SHA256."""
@@ -74,7 +107,7 @@ def search_rcsb_pdb() -> List[str]:
     print("Searching RCSB PDB for fluorescent proteins...")
     
     try:
-        response = requests.post(RCSB_SEARCH_API, json=query, timeout=30)
+        response = HTTP.post(RCSB_SEARCH_API, json=query, timeout=30)
         response.raise_for_status()
         data = response.json()
         
@@ -87,40 +120,182 @@ def search_rcsb_pdb() -> List[str]:
         print(f"ERROR searching RCSB: {e}", file=sys.stderr)
         return []
 
-def fetch_pdbe_summary(pdb_ids: List[str]) -> List[Dict[str, Any]]:
-    """Récupère les summary depuis PDBe pour chaque PDB ID."""
-    summaries = []
-    
-    # PDBe permet des batch requests
-    # On fait des chunks de 20
-    chunk_size = 20
-    
-    for i in range(0, len(pdb_ids), chunk_size):
-        chunk = pdb_ids[i:i+chunk_size]
-        pdb_list = ','.join(chunk)
-        
-        url = f"{PDBE_API_BASE}/pdb/entry/summary/{pdb_list}"
-        
-        print(f"Fetching PDBe summaries {i+1}-{min(i+chunk_size, len(pdb_ids))}/{len(pdb_ids)}...")
-        
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            # data est un dict {pdb_id: [summary_info]}
-            for pdb_id, info_list in data.items():
-                if info_list:
-                    summaries.append({
-                        'pdb_id': pdb_id.upper(),
-                        'summary': info_list[0] if info_list else {}
-                    })
-            
-        except requests.exceptions.RequestException as e:
-            print(f"WARNING: Could not fetch PDBe summaries for chunk: {e}", file=sys.stderr)
-        
-        time.sleep(0.5)  # Rate limiting
-    
+class AdaptiveChunkSize:
+    """
+    Taille des lots d'IDs PDBe, ajustée au fil des réponses :
+    - latence < target/2 : x1.5 (au moins +1), dans la limite de `maximum` ;
+    - latence > target : divisée par 2 ;
+    - 413/414 : divisée par 2 et `maximum` abaissé sous la taille refusée.
+    """
+
+    def __init__(self, initial: int = 20, minimum: int = 1, maximum: int = 100,
+                 target_s: float = LATENCY_TARGET_S):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_s = target_s
+
+    def observe(self, latency_s: float):
+        if latency_s > self.target_s:
+            self.size = max(self.minimum, self.size // 2)
+        elif latency_s < self.target_s / 2:
+            self.size = min(self.maximum, max(self.size + 1, int(self.size * 1.5)))
+
+    def too_large(self, refused: int):
+        self.maximum = max(self.minimum, min(self.maximum, refused - 1))
+        self.size = max(self.minimum, min(self.maximum, refused // 2))
+
+
+def load_checkpoint(path: Path) -> Tuple[Set[str], List[Dict[str, Any]]]:
+    """IDs déjà traités et summaries déjà récupérés (une ligne par lot terminé)."""
+    done: Set[str] = set()
+    summaries: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return done, []
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                batch = json.loads(line)
+            except ValueError:
+                continue  # dernière ligne tronquée par un crash
+            done.update(batch['ids'])
+            for entry in batch['summaries']:
+                summaries[entry['pdb_id']] = entry
+    return done, list(summaries.values())
+
+
+def _retry_after(response: requests.Response, attempt: int) -> float:
+    """Délai demandé par un 429 (Retry-After en secondes), sinon backoff exponentiel."""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return min(60.0, 2.0 ** attempt)
+
+
+def summary_url(pdb_ids: List[str]) -> str:
+    """URL PDBe des summaries d'un lot d'IDs."""
+    return f"{PDBE_API_BASE}/pdb/entry/summary/{','.join(pdb_ids)}"
+
+
+def parse_summaries(data: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Entrées {'pdb_id', 'summary'} d'une réponse PDBe (IDs sans summary ignorés)."""
+    return [{'pdb_id': pdb_id.upper(), 'summary': info_list[0]}
+            for pdb_id, info_list in data.items() if info_list]
+
+
+def cache_per_id(chunk: List[str], data: Dict[str, List[Dict[str, Any]]]):
+    """Découpe la réponse d'un lot en entrées de cache par ID ({} = pas de summary)."""
+    by_id = {pdb_id.upper(): info_list for pdb_id, info_list in data.items()}
+    for pdb_id in chunk:
+        body = {pdb_id.lower(): by_id[pdb_id]} if by_id.get(pdb_id) else {}
+        HTTP.store(summary_url([pdb_id]), json.dumps(body, ensure_ascii=False).encode('utf-8'),
+                   headers={'Content-Type': 'application/json'})
+
+
+def _fetch_chunk(chunk: List[str]) -> Tuple[requests.Response, float]:
+    """GET d'un lot d'IDs ; renvoie la réponse et sa latence."""
+    url = summary_url(chunk)
+    if not HTTP.is_cached(url):
+        LIMITER.wait()
+    start = time.monotonic()
+    response = HTTP.get(url, timeout=30)
+    return response, time.monotonic() - start
+
+
+def fetch_pdbe_summary(pdb_ids: List[str], checkpoint: Path = None,
+                       max_workers: int = None) -> List[Dict[str, Any]]:
+    """
+    Récupère les summary depuis PDBe pour chaque PDB ID (concurrent, reprise
+    sur checkpoint ; IDs déjà en cache servis sans requête).
+    """
+    checkpoint = Path(checkpoint or CHECKPOINT_FILE)
+    ids = list(dict.fromkeys(pdb_id.upper() for pdb_id in pdb_ids))
+    done, summaries = load_checkpoint(checkpoint)
+    if done:
+        print(f"  Resuming from {checkpoint}: {len(done)} PDB IDs already fetched")
+
+    pending = deque()
+    for pdb_id in ids:
+        if pdb_id in done:
+            continue
+        cached = HTTP.lookup(summary_url([pdb_id]))
+        if cached is None:
+            pending.append(pdb_id)
+        else:
+            summaries.extend(parse_summaries(cached.json()))
+    if len(ids) - len(done) > len(pending):
+        print(f"  {len(ids) - len(done) - len(pending)} PDB IDs served from the per-ID cache")
+    workers = max_workers or max(1, min(MAX_WORKERS, math.ceil(REQUESTS_PER_SECOND)))
+    chunker = AdaptiveChunkSize()
+    attempts = Counter()
+    completed = len(ids) - len(pending)
+    start = time.monotonic()
+
+    def requeue(chunk: List[str]) -> int:
+        """Remet un lot en tête de file ; abandonne les IDs après MAX_ATTEMPTS."""
+        retry = [pdb_id for pdb_id in chunk if attempts[pdb_id] < MAX_ATTEMPTS]
+        pending.extendleft(reversed(retry))
+        return len(chunk) - len(retry)
+
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+    with open(checkpoint, 'a', encoding='utf-8') as log, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < workers:
+                chunk = [pending.popleft() for _ in range(min(chunker.size, len(pending)))]
+                in_flight[pool.submit(_fetch_chunk, chunk)] = chunk
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk = in_flight.pop(future)
+                attempts.update(chunk)
+                try:
+                    response, latency = future.result()
+                except requests.exceptions.RequestException as e:
+                    dropped = requeue(chunk)
+                    print(f"WARNING: Could not fetch PDBe summaries for chunk: {e}", file=sys.stderr)
+                    completed += dropped
+                    continue
+
+                if response.status_code in (413, 414):
+                    if len(chunk) > 1:
+                        # Refus lié à la taille : pas compté comme une tentative
+                        attempts.subtract(chunk)
+                    chunker.too_large(len(chunk))
+                    completed += requeue(chunk)
+                    continue
+                if response.status_code == 429:
+                    LIMITER.pause(_retry_after(response, attempts[chunk[0]]))
+                    completed += requeue(chunk)
+                    continue
+                if response.status_code >= 400 and response.status_code != 404:
+                    print(f"WARNING: PDBe returned HTTP {response.status_code} for chunk "
+                          f"{chunk[0]}..{chunk[-1]}", file=sys.stderr)
+                    completed += requeue(chunk)
+                    continue
+
+                # 404 : aucun des IDs du lot n'a de summary
+                data = response.json() if response.status_code == 200 else {}
+                batch = parse_summaries(data)
+                summaries.extend(batch)
+                cache_per_id(chunk, data)
+                log.write(json.dumps({'ids': chunk, 'summaries': batch}, ensure_ascii=False) + "\n")
+                log.flush()
+
+                if not response.from_cache:
+                    chunker.observe(latency)
+                completed += len(chunk)
+                print(f"Fetched PDBe summaries {completed}/{len(ids)} "
+                      f"(chunk={len(chunk)}, {latency:.2f}s, next chunk={chunker.size})")
+
+    elapsed = time.monotonic() - start
+    if elapsed > 0:
+        print(f"  {len(summaries)} summaries in {elapsed:.1f}s ({completed / elapsed:.1f} IDs/s, {workers} workers)")
+
+    order = {pdb_id: i for i, pdb_id in enumerate(ids)}
+    summaries.sort(key=lambda entry: order.get(entry['pdb_id'], len(order)))
     return summaries
 
 def save_results(summaries: List[Dict[str, Any]]) -> str:
@@ -171,8 +346,11 @@ def main():
         summaries = fetch_pdbe_summary(pdb_ids)
     
     sha256 = save_results(summaries)
+    # Harvest complet sauvegardé : le prochain lancement repart de zéro
+    CHECKPOINT_FILE.unlink(missing_ok=True)
     update_log(len(summaries), sha256)
     
+    print(HTTP.summary())
     print("\nOK PDB/PDBe harvest completed!")
     print(f"  Total structures: {len(summaries)}")
     
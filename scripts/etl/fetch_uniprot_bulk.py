@@ -6,23 +6,48 @@ ETL Script: Fetch UniProt Bulk
 Récupère les données UniProt pour les protéines fluorescentes.
 Licence: CC BY 4.0
 
-Output: data/raw/external/uniprot/*.json
+Chaque requête est paginée jusqu'au bout en suivant le curseur
+`Link: <...>; rel="next"` de l'API REST. Les requêtes de SEARCH_QUERIES
+tournent en parallèle ; les entrées sont dédupliquées par accession et
+écrites en NDJSON (une entrée par ligne) requête par requête, dans l'ordre
+de SEARCH_QUERIES : le fichier (et son SHA256) ne dépend pas de l'ordre
+d'arrivée des réponses. Une requête en avance garde au plus PREFETCH_PAGES
+pages en mémoire.
+
+Output: data/raw/external/uniprot/uniprot_fluorescent_proteins.ndjson
 Log: reports/EXTERNAL_HARVEST_LOG.md (append)
 """
 
 import json
 import hashlib
+import os
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import requests
-import time
-from typing import List, Dict, Any
+import yaml
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from providers.http_cache import RateLimiter, cached_session
 
 # Configuration
+with open("config/providers.yml", 'r', encoding='utf-8') as f:
+    CONFIG = yaml.safe_load(f)
+
 UNIPROT_API_BASE = "https://rest.uniprot.org/uniprotkb"
 OUTPUT_DIR = Path("data/raw/external/uniprot")
+OUTPUT_FILE = OUTPUT_DIR / "uniprot_fluorescent_proteins.ndjson"
 LOG_FILE = Path("reports/EXTERNAL_HARVEST_LOG.md")
+HTTP = cached_session("uniprot", CONFIG)
+
+# Taille de page maximale acceptée par l'API REST UniProt
+PAGE_SIZE = 500
+# Pages d'avance par requête en attente de son tour d'écriture (mémoire bornée)
+PREFETCH_PAGES = 4
+REQUESTS_PER_SECOND = CONFIG['uniprot']['rate_limit']['requests_per_second']
 
 # Requêtes pour trouver les FP
 SEARCH_QUERIES = [
@@ -32,70 +57,101 @@ SEARCH_QUERIES = [
     "name:\"fluorescent protein\" AND organism:*",
 ]
 
-def compute_sha256(data: str) -> str:
-    """Calcule le SHA256."""
-    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+LIMITER = RateLimiter(REQUESTS_PER_SECOND)
 
-def search_uniprot(query: str, max_results: int = 500) -> List[Dict[str, Any]]:
-    """Recherche dans UniProt."""
+def iter_uniprot_pages(query: str, page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Itère sur toutes les pages d'une recherche en suivant le curseur rel="next"."""
     url = f"{UNIPROT_API_BASE}/search"
     params = {
         'query': query,
         'format': 'json',
-        'size': min(max_results, 500)
+        'size': page_size or PAGE_SIZE
     }
     
+    while url:
+        # Réponse en cache : pas d'appel réseau, pas d'attente
+        if not HTTP.is_cached(url, params):
+            LIMITER.wait()
+        response = HTTP.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        yield response.json().get('results', [])
+        
+        # L'URL du curseur contient déjà query/format/size
+        url = response.links.get('next', {}).get('url')
+        params = None
+
+def search_uniprot(query: str, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Recherche dans UniProt (toutes les pages, ou les `max_results` premières entrées)."""
     print(f"Searching UniProt: {query[:60]}...")
     
+    results = []
     try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        results = data.get('results', [])
-        print(f"  Found {len(results)} entries")
-        
-        return results
-        
+        for page in iter_uniprot_pages(query):
+            results.extend(page)
+            if max_results is not None and len(results) >= max_results:
+                results = results[:max_results]
+                break
     except requests.exceptions.RequestException as e:
         print(f"ERROR searching UniProt: {e}", file=sys.stderr)
-        return []
+    
+    print(f"  Found {len(results)} entries")
+    return results
 
-def fetch_all_proteins() -> List[Dict[str, Any]]:
-    """Récupère toutes les protéines via multiples queries."""
-    all_proteins = []
+def _produce(query: str, pages: "queue.Queue"):
+    """Thread producteur : pousse les pages d'une requête puis un marqueur de fin."""
+    try:
+        for page in iter_uniprot_pages(query):
+            pages.put(page)
+    except requests.exceptions.RequestException as e:
+        print(f"ERROR searching UniProt ({query[:60]}): {e}", file=sys.stderr)
+    finally:
+        pages.put(None)
+
+def fetch_all_proteins(output_file: Path = OUTPUT_FILE) -> Tuple[int, str]:
+    """
+    Lance les requêtes en parallèle et écrit chaque nouvelle accession en
+    NDJSON, requête par requête dans l'ordre de SEARCH_QUERIES (la requête en
+    cours est écrite au fil de l'eau ; les suivantes prennent au plus
+    PREFETCH_PAGES pages d'avance, puis attendent leur tour).
+    Retourne (nombre d'entrées, SHA256 du fichier).
+    """
     seen_accessions = set()
-    
-    for query in SEARCH_QUERIES:
-        results = search_uniprot(query)
+    found = {query: 0 for query in SEARCH_QUERIES}
+    sha256 = hashlib.sha256()
+    count = 0
+    
+    # Une file bornée par requête : l'ordre d'écriture ne dépend pas des
+    # threads, et un producteur en avance attend au lieu d'accumuler ses pages
+    pages = {query: queue.Queue(maxsize=PREFETCH_PAGES) for query in SEARCH_QUERIES}
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = output_file.with_suffix(".ndjson.tmp")
+    
+    with open(tmp_file, 'w', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=len(SEARCH_QUERIES)) as pool:
+        for query in SEARCH_QUERIES:
+            print(f"Searching UniProt: {query[:60]}...")
+            pool.submit(_produce, query, pages[query])
         
-        for entry in results:
-            accession = entry.get('primaryAccession', '')
-            if accession and accession not in seen_accessions:
-                all_proteins.append(entry)
-                seen_accessions.add(accession)
-        
-        # Rate limiting
-        time.sleep(1)
-    
-    return all_proteins
-
-def save_results(proteins: List[Dict[str, Any]]) -> str:
-    """Sauvegarde les résultats."""
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    
-    output_file = OUTPUT_DIR / "uniprot_fluorescent_proteins.json"
-    json_str = json.dumps(proteins, indent=2, ensure_ascii=False)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(json_str)
-    
-    sha256 = compute_sha256(json_str)
-    
-    print(f"\nSaved {len(proteins)} proteins to {output_file}")
-    print(f"SHA256: {sha256}")
-    
-    return sha256
+        for query in SEARCH_QUERIES:
+            for page in iter(pages[query].get, None):
+                found[query] += len(page)
+                for entry in page:
+                    accession = entry.get('primaryAccession', '')
+                    if accession and accession not in seen_accessions:
+                        seen_accessions.add(accession)
+                        line = json.dumps(entry, ensure_ascii=False) + "\n"
+                        out.write(line)
+                        sha256.update(line.encode('utf-8'))
+                        count += 1
+    
+    os.replace(tmp_file, output_file)
+    
+    for query, n in found.items():
+        print(f"  Found {n} entries for: {query[:60]}")
+    print(f"\nSaved {count} proteins to {output_file}")
+    print(f"SHA256: {sha256.hexdigest()}")
+    
+    return count, sha256.hexdigest()
 
 def update_log(count: int, sha256: str):
     """Met à jour le log."""
@@ -107,8 +163,8 @@ def update_log(count: int, sha256: str):
         f.write(f"- **Licence**: CC BY 4.0\n")
         f.write(f"- **Items récupérés**: {count} protéines\n")
         f.write(f"- **SHA256**: `{sha256}`\n")
-        f.write(f"- **Fichier**: `data/raw/external/uniprot/uniprot_fluorescent_proteins.json`\n")
-        f.write(f"- **Queries**: {len(SEARCH_QUERIES)} recherches combinées\n")
+        f.write(f"- **Fichier**: `{OUTPUT_FILE.as_posix()}`\n")
+        f.write(f"- **Queries**: {len(SEARCH_QUERIES)} recherches combinées (pagination complète)\n")
         f.write("\n")
     
     print(f"Log updated: {LOG_FILE}")
@@ -119,20 +175,19 @@ def main():
     print("UniProt Harvest Pipeline")
     print("=" * 70)
     
-    proteins = fetch_all_proteins()
+    count, sha256 = fetch_all_proteins()
     
-    if not proteins:
+    if not count:
         print("WARNING: No proteins retrieved!", file=sys.stderr)
         # Continue anyway, ne pas fail
     
-    sha256 = save_results(proteins)
-    update_log(len(proteins), sha256)
+    update_log(count, sha256)
     
+    print(HTTP.summary())
     print("\nOK UniProt harvest completed!")
-    print(f"  Total unique proteins: {len(proteins)}")
+    print(f"  Total unique proteins: {count}")
     
     return 0
 
 if __name__ == "__main__":
     sys.exit(main())
-
@@ -12,6 +12,7 @@ from pathlib import Path
 import json
 import datetime
 import hashlib
+from artifact_io import contract_schema, export_csv, read_artifact, write_artifact
 
 def load_existing_dataset():
     """Charge le dataset existant"""
@@ -22,7 +23,7 @@ def load_existing_dataset():
         print(f"ERREUR: Fichier {training_path} non trouvé")
         return None
     
-    df = pd.read_csv(training_path)
+    df = read_artifact(training_path.with_suffix('.parquet'), schema=contract_schema())
     print(f"[LOAD] Dataset existant: {len(df)} systèmes")
     
     return df
@@ -303,7 +304,8 @@ def main():
     
     # Sauvegarder le dataset fusionné
     training_path = Path("data/processed/TRAINING_TABLE_v2_2.csv")
-    df_merged.to_csv(training_path, index=False, encoding='utf-8')
+    write_artifact(df_merged, training_path.with_suffix('.parquet'), contract_schema())
+    export_csv(df_merged, training_path)
     print(f"\n[SAVE] Dataset fusionné sauvegardé: {training_path}")
     
     # Mettre à jour les métadonnées
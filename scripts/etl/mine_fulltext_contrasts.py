@@ -12,8 +12,17 @@ Stratégie:
 4. Parser tables + figures pour trouver mesures de contraste
 5. Extraire valeur + contexte + DOI + licence
 6. Agréger meilleure mesure par protéine
+
+Avec --corpus, aucune requête réseau : les passages (tables, légendes,
+paragraphes) qui citent la protéine sont lus dans le corpus local SQLite FTS5
+(scripts/textmine/corpus_store.py) construit à partir des XML déjà téléchargés.
+
+Usage:
+    python scripts/etl/mine_fulltext_contrasts.py [--corpus]
 """
 
+import argparse
+
 import sys
 import re
 import time
@@ -24,7 +33,9 @@ from typing import List, Dict, Optional, Tuple
 
 # Add providers to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "textmine"))
 from providers.europe_pmc import EuropePMCProvider
+from corpus_store import CORPUS_DB, OA_DIR, CorpusStore
 
 # Paths
 SEED_FILE = Path("seed/seed_fp_names.csv")
@@ -181,6 +192,10 @@ def process_protein(protein_name: str, provider: EuropePMCProvider) -> Optional[
         
         time.sleep(0.5)  # Rate limiting
     
+    return select_best(protein_name, all_measurements)
+
+def select_best(protein_name: str, all_measurements: List[Dict]) -> Optional[Dict]:
+    """Retourne la meilleure mesure d'une protéine (table/figure d'abord, puis valeur max)."""
     if not all_measurements:
         return None
     
@@ -205,13 +220,48 @@ def process_protein(protein_name: str, provider: EuropePMCProvider) -> Optional[
         'source_section': best['source_section']
     }
 
-def mine_contrasts():
-    """Mine contrasts pour toutes les protéines."""
+# Sections du corpus local -> (source_section, evidence_type, mesures max par passage)
+CORPUS_SECTIONS = {
+    'table': ('table', 'xml_table', None),
+    'caption': ('figure', 'xml_figure', None),
+    'paragraph': ('paragraph', 'xml_text', 1),
+}
+
+def process_protein_from_corpus(protein_name: str, store: CorpusStore) -> Optional[Dict]:
+    """Traite une protéine à partir du corpus local (sans réseau)."""
+    print(f"\n  Processing (corpus): {protein_name}")
+    
+    pmcids = store.articles_mentioning(protein_name, limit=3)  # Limit to 3 articles
+    if not pmcids:
+        print(f"    No stored article mentions it")
+        return None
+    
+    all_measurements = []
+    for pmcid in pmcids:
+        for passage in store.search(protein_name, pmcid=pmcid):
+            source_section, evidence_type, max_found = CORPUS_SECTIONS[passage.section_type]
+            found = extract_numbers_from_text(passage.text)
+            for value, mtype, context in found[:max_found]:
+                all_measurements.append({
+                    'value': value,
+                    'measure_type': mtype,
+                    'context': context[:200],
+                    'source_section': source_section,
+                    'evidence_type': evidence_type,
+                    'pmcid': pmcid,
+                    'doi': '',  # Le corpus ne conserve que le texte
+                    'protein_name': protein_name
+                })
+    
+    return select_best(protein_name, all_measurements)
+
+def mine_contrasts(store: Optional[CorpusStore] = None):
+    """Mine contrasts pour toutes les protéines (Europe PMC, ou corpus local si `store`)."""
     # Load seed
     seed_df = pd.read_csv(SEED_FILE)
     print(f"Mining contrasts for {len(seed_df)} proteins...")
     
-    provider = EuropePMCProvider()
+    provider = EuropePMCProvider() if store is None else None
     
     results = []
     
@@ -219,6 +269,13 @@ def mine_contrasts():
     for idx, row in seed_df.iterrows():
         name = row['name']
         
+        if store is not None:
+            result = process_protein_from_corpus(name, store)
+            if result:
+                results.append(result)
+                print(f"    OK Extracted: {result['contrast_ratio']} ({result['measure_type']})")
+            continue
+        
         result = process_protein(name, provider)
         
         if result:
@@ -305,8 +362,21 @@ def main():
     print("Mine Full-Text Contrasts — Real Data Only")
     print("=" * 70)
     
+    parser = argparse.ArgumentParser(description="Mine full-text contrasts")
+    parser.add_argument('--corpus', action='store_true',
+                        help=f"Lire les passages dans le corpus local ({CORPUS_DB}) au lieu d'Europe PMC")
+    args = parser.parse_args()
+    
     # Mine contrasts
-    contrasts_df = mine_contrasts()
+    if args.corpus:
+        with CorpusStore(CORPUS_DB) as store:
+            if not store.refresh(OA_DIR):
+                print(f"ERROR: corpus local {CORPUS_DB} vide et aucun texte intégral sous {OA_DIR} "
+                      "(lancer d'abord sans --corpus pour le télécharger)")
+                return 1
+            contrasts_df = mine_contrasts(store)
+    else:
+        contrasts_df = mine_contrasts()
     
     if len(contrasts_df) == 0:
         print("\nWARNING: No contrasts extracted!")
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Record Linkage - moteur de dédoublonnage partagé des builders de l'atlas
+========================================================================
+
+Utilisé par build_atlas_v2_1, build_atlas_v2_2_strict_dedup et
+build_external_candidates_v1_3 (les dédoublonnages sur une seule clé exacte,
+clean_duplicates_v2_2_2 et qa/deduplicate_atlas_v2, gardent drop_duplicates).
+
+- Sources enregistrées avec une priorité (plus faible = meilleure) et un tier
+  d'évidence par défaut (register_source)
+- Clés de liaison : validation.deduplication.keys de config/providers.yml
+  (fpbase_slug, uniprot_id, name_family_year), ou toute colonne / tuple de
+  colonnes
+- Blocage par hachage : chaque clé est factorisée, les entrées de même valeur
+  sont liées ; les groupes (union de toutes les clés) sont les composantes
+  connexes, calculées par propagation vectorisée du plus petit identifiant
+  avec compression de chemins (O(n log n))
+- Étape floue optionnelle sur les noms (FuzzyNameIndex, filtre par partition)
+- Résolution des conflits vectorisée : tier d'évidence (evidence_tiers),
+  priorité de source, complétude ; un tri stable puis drop_duplicates (ou
+  agrégation groupby)
+- Rapport de liaison (liens par clé, groupes fusionnés, entrées gardées par source)
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from Levenshtein import distance as levenshtein_distance
+
+# Résolution par défaut : tier d'évidence (asc), priorité de source (asc), complétude (desc)
+DEFAULT_RANK = (('tier', True), ('source_priority', True), ('completeness', False))
+UNKNOWN_TIER = 999
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Normalise des noms pour matching (minuscules, sans ponctuation, espaces ni tirets)"""
+    return (names.fillna('').astype(str).str.lower().str.strip()
+            .str.replace(r'[^\w\s-]', '', regex=True)
+            .str.replace(r'[\s-]+', '', regex=True))
+
+def _clean(values: pd.Series) -> pd.Series:
+    """Valeurs de clé en texte, None si absentes ou vides"""
+    present = values.notna()
+    text = pd.Series(None, index=values.index, dtype=object)
+    text[present] = values[present].astype(str).str.strip()
+    return text.where(present & (text != ''), None)
+
+def _column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column in df.columns:
+        return _clean(df[column])
+    return pd.Series(None, index=df.index, dtype=object)
+
+def key_fpbase_slug(df: pd.DataFrame, linker: 'RecordLinker') -> pd.Series:
+    """Slug FPbase (insensible à la casse)"""
+    return _column(df, 'fpbase_slug').str.lower()
+
+def key_uniprot_id(df: pd.DataFrame, linker: 'RecordLinker') -> pd.Series:
+    """Accession UniProt (majuscules)"""
+    return _column(df, 'uniprot_id').str.upper()
+
+def key_name_family_year(df: pd.DataFrame, linker: 'RecordLinker') -> pd.Series:
+    """Nom normalisé + famille + année ; absent si le nom est absent"""
+    if linker.name_column not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    name = normalize_names(df[linker.name_column])
+    family = _column(df, 'family').str.lower().fillna('')
+    year_column = next((c for c in ('year', 'publication_year') if c in df.columns), None)
+    year = ''
+    if year_column:
+        year = pd.to_numeric(df[year_column], errors='coerce').astype('Int64').astype(str)
+        year = year.where(year != '<NA>', '')
+    key = name + '|' + family + '|' + year
+    return key.where(name != '', None)
+
+KEY_BUILDERS: Dict[str, Callable[[pd.DataFrame, 'RecordLinker'], pd.Series]] = {
+    'fpbase_slug': key_fpbase_slug,
+    'uniprot_id': key_uniprot_id,
+    'name_family_year': key_name_family_year,
+}
+
+Key = Union[str, Tuple[str, ...], pd.Series]
+
+def key_label(key: Key) -> str:
+    if isinstance(key, pd.Series):
+        return str(key.name)
+    return '+'.join(key) if isinstance(key, tuple) else key
+
+class FuzzyNameIndex:
+    """
+    Candidate generation for Levenshtein distance <= threshold (partition filter).
+
+    Each indexed name of length L is cut into threshold + 1 segments. Any
+    name within `threshold` edits keeps at least one segment intact, shifted
+    by at most `threshold` positions, so looking up the substrings of the
+    query at those positions (for every length within threshold of the
+    query's) returns a superset of the names within the threshold. Names
+    shorter than threshold + 1 have empty segments and are bucketed by length.
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.segments = {}   # (length, segment number, segment text) -> ids
+        self.short = {}      # length -> ids, for length <= threshold
+        self._partitions = {}
+
+    def _partition(self, length: int) -> List[tuple]:
+        """(start, size) of the threshold + 1 segments of a name of this length."""
+        if length not in self._partitions:
+            parts, start = [], 0
+            base, extra = divmod(length, self.threshold + 1)
+            for i in range(self.threshold + 1):
+                size = base + (1 if i >= self.threshold + 1 - extra else 0)
+                parts.append((start, size))
+                start += size
+            self._partitions[length] = parts
+        return self._partitions[length]
+
+    def add(self, ident: int, name: str):
+        """Index `name` under `ident`."""
+        length = len(name)
+        if length <= self.threshold:
+            self.short.setdefault(length, []).append(ident)
+            return
+        for i, (start, size) in enumerate(self._partition(length)):
+            self.segments.setdefault((length, i, name[start:start + size]), []).append(ident)
+
+    def candidates(self, name: str) -> set:
+        """Ids of indexed names that may be within the threshold of `name`."""
+        found = set()
+        k = self.threshold
+        for length in range(max(0, len(name) - k), len(name) + k + 1):
+            if length <= k:
+                found.update(self.short.get(length, ()))
+                continue
+            for i, (start, size) in enumerate(self._partition(length)):
+                for pos in range(max(0, start - k), min(len(name) - size, start + k) + 1):
+                    ids = self.segments.get((length, i, name[pos:pos + size]))
+                    if ids:
+                        found.update(ids)
+        return found
+
+def fuzzy_canonical_names(names: Sequence[str], threshold: int,
+                          no_merge_pairs: set = frozenset()) -> Dict[str, str]:
+    """
+    Groupe des noms à `threshold` éditions près.
+
+    Chaque nom rejoint le premier groupe canonique (ordre de création) à
+    distance <= threshold, hors paires de no_merge_pairs ; seuls les candidats
+    de FuzzyNameIndex sont évalués. Les noms vides n'ont pas de groupe.
+
+    Returns:
+        Dict nom -> nom canonique
+    """
+    index = FuzzyNameIndex(threshold)
+    canonicals = []  # id d'index -> nom canonique, ordre de création
+    name_to_canonical = {}
+
+    for name in names:
+        if not name or name in name_to_canonical:
+            continue
+
+        matched = None
+        for ident in sorted(index.candidates(name)):
+            canonical = canonicals[ident]
+            if (name, canonical) in no_merge_pairs:
+                continue
+            if levenshtein_distance(name, canonical, score_cutoff=threshold) <= threshold:
+                matched = canonical
+                break
+
+        if matched is None:
+            index.add(len(canonicals), name)
+            canonicals.append(name)
+            matched = name
+        name_to_canonical[name] = matched
+
+    return name_to_canonical
+
+def connected_groups(codes: List[np.ndarray], n: int) -> np.ndarray:
+    """
+    Composantes connexes des entrées liées par au moins un code commun.
+
+    Chaque entrée porte le plus petit indice de sa composante : propagation du
+    minimum par code (np.minimum.at), puis compression de chemins
+    (labels[labels]) jusqu'au point fixe.
+
+    Args:
+        codes: Un tableau de codes par clé (pd.factorize, -1 = clé absente)
+        n: Nombre d'entrées
+
+    Returns:
+        Identifiants de groupe 0..k-1, dans l'ordre de première apparition
+    """
+    labels = np.arange(n)
+    changed = True
+    while changed:
+        changed = False
+        for key_codes in codes:
+            valid = np.flatnonzero(key_codes >= 0)
+            if len(valid) == 0:
+                continue
+            c = key_codes[valid]
+            minimum = np.full(c.max() + 1, n)
+            np.minimum.at(minimum, c, labels[valid])
+            propagated = minimum[c]
+            if (propagated < labels[valid]).any():
+                labels[valid] = propagated
+                changed = True
+        jumped = labels[labels]
+        while (jumped != labels).any():
+            labels = jumped
+            jumped = labels[labels]
+    return pd.factorize(labels)[0]
+
+class RecordLinker:
+    """
+    Liaison d'entrées multi-sources sur des clés configurables.
+
+    Args:
+        keys: Clés de liaison ; noms de KEY_BUILDERS, colonnes, tuples de
+            colonnes (clé absente si toutes les composantes sont absentes), ou
+            Series de clés précalculées (alignée sur le df, prise telle quelle)
+        evidence_tiers: {tier: evidence_type} (section evidence_tiers du config)
+        name_column: Colonne de nom (name_family_year, étape floue)
+        fuzzy_threshold: Distance de Levenshtein de l'étape floue (None = désactivée)
+        no_merge_pairs: Paires de noms normalisés à ne jamais fusionner (étape floue)
+        source_column: Colonne de source pour les priorités et le rapport
+    """
+
+    def __init__(self, keys: Sequence[Key] = ('name_family_year',),
+                 evidence_tiers: Optional[Dict] = None, name_column: str = 'protein_name',
+                 fuzzy_threshold: Optional[int] = None, no_merge_pairs: Sequence = (),
+                 source_column: str = 'source'):
+        self.keys = [tuple(k) if isinstance(k, list) else k for k in keys]
+        self.tier_map = {str(v): int(k) for k, v in (evidence_tiers or {}).items()}
+        self.name_column = name_column
+        self.fuzzy_threshold = fuzzy_threshold
+        self.no_merge_pairs = {p for a, b in no_merge_pairs for p in ((a, b), (b, a))}
+        self.source_column = source_column
+        self.sources = {}  # nom -> (priorité, tier par défaut)
+
+    @classmethod
+    def from_config(cls, config: Dict, extra_keys: Sequence[Key] = (), **kwargs) -> 'RecordLinker':
+        """Linker sur validation.deduplication.keys (+ extra_keys) et evidence_tiers"""
+        keys = list(extra_keys) + list(config['validation']['deduplication']['keys'])
+        return cls(keys, evidence_tiers=config.get('evidence_tiers'), **kwargs)
+
+    def register_source(self, name: str, priority: Optional[int] = None,
+                        tier: Optional[int] = None) -> 'RecordLinker':
+        """
+        Enregistre une source.
+
+        Args:
+            name: Valeur de source_column (ou sous-chaîne de celle-ci)
+            priority: Priorité (plus faible = meilleure ; None = non classée)
+            tier: Tier d'évidence des entrées de cette source sans evidence_type
+        """
+        self.sources[name] = (priority, tier)
+        return self
+
+    def _source_lookup(self, df: pd.DataFrame, slot: int) -> pd.Series:
+        """Priorité (slot 0) ou tier (slot 1) des sources enregistrées, NaN sinon"""
+        result = pd.Series(np.nan, index=df.index)
+        if self.source_column not in df.columns:
+            return result
+        source = df[self.source_column].astype(object).where(df[self.source_column].notna(), '')
+        source = source.astype(str)
+        for name, values in self.sources.items():
+            if values[slot] is None:
+                continue
+            # Correspondance exacte prioritaire, puis sous-chaîne
+            exact = (source == name) & result.isna()
+            result[exact] = values[slot]
+        for name, values in self.sources.items():
+            if values[slot] is None:
+                continue
+            partial = source.str.contains(name, regex=False) & result.isna()
+            result[partial] = values[slot]
+        return result
+
+    def source_priority(self, df: pd.DataFrame) -> pd.Series:
+        """Priorité de source de chaque entrée (sources non enregistrées en dernier)"""
+        return self._source_lookup(df, 0).fillna(np.inf)
+
+    def evidence_tier(self, df: pd.DataFrame, evidence_column: str = 'evidence_type') -> pd.Series:
+        """Tier d'évidence : evidence_type, sinon tier de la source, sinon UNKNOWN_TIER"""
+        if evidence_column in df.columns:
+            evidence = _clean(df[evidence_column])
+            tier = evidence.map(self.tier_map).astype(float)
+            tier[evidence.notna() & tier.isna()] = UNKNOWN_TIER
+        else:
+            evidence = pd.Series(None, index=df.index, dtype=object)
+            tier = pd.Series(np.nan, index=df.index)
+        tier = tier.fillna(self._source_lookup(df, 1)).fillna(UNKNOWN_TIER)
+        return tier.astype(int)
+
+    def key_values(self, df: pd.DataFrame, key: Key) -> pd.Series:
+        """Valeurs d'une clé (None = absente, l'entrée n'est pas liée par cette clé)"""
+        if isinstance(key, pd.Series):
+            return key
+        if isinstance(key, tuple):
+            parts = [_column(df, column) for column in key]
+            present = pd.concat([p.notna() for p in parts], axis=1).any(axis=1)
+            joined = parts[0].fillna('')
+            for part in parts[1:]:
+                joined = joined + '\x1f' + part.fillna('')
+            return joined.where(present, None)
+        if key in KEY_BUILDERS:
+            return KEY_BUILDERS[key](df, self)
+        return _column(df, key)
+
+    def fuzzy_keys(self, df: pd.DataFrame) -> pd.Series:
+        """Nom canonique de l'étape floue (noms normalisés à fuzzy_threshold près)"""
+        names = normalize_names(df[self.name_column])
+        canonical = fuzzy_canonical_names(names.unique(), self.fuzzy_threshold, self.no_merge_pairs)
+        return names.map(canonical)
+
+    def link(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Groupe les entrées liées par au moins une clé (transitivement).
+
+        Returns:
+            (identifiants de groupe par position, entrées liées par chaque clé)
+        """
+        values = {key_label(key): self.key_values(df, key) for key in self.keys}
+        if self.fuzzy_threshold is not None:
+            values['fuzzy_name'] = self.fuzzy_keys(df)
+
+        codes, links = [], {}
+        for label, key_values in values.items():
+            key_codes = pd.factorize(key_values)[0]
+            counts = np.bincount(key_codes[key_codes >= 0])
+            links[label] = int(counts[counts > 1].sum())
+            codes.append(key_codes)
+        return connected_groups(codes, len(df)), links
+
+    def match(self, queries: pd.DataFrame, reference: pd.DataFrame) -> pd.Series:
+        """
+        Entrée de référence liée à chaque requête.
+
+        Returns:
+            Series alignée sur queries : index (dans reference) de la première
+            entrée de référence du groupe de la requête, NaN si aucune
+        """
+        groups, _ = self.link(pd.concat([reference, queries], ignore_index=True))
+        reference_groups = pd.Series(reference.index, index=groups[:len(reference)])
+        first_reference = reference_groups[~reference_groups.index.duplicated()]
+        return pd.Series(groups[len(reference):], index=queries.index).map(first_reference)
+
+    def rank_frame(self, df: pd.DataFrame, rank_by: Sequence) -> pd.DataFrame:
+        """Critères de résolution : colonnes du df, ou tier / source_priority / completeness"""
+        columns = {}
+        for i, (criterion, _) in enumerate(rank_by):
+            if isinstance(criterion, pd.Series):
+                values = criterion
+            elif criterion in df.columns:
+                values = df[criterion]
+            elif criterion == 'tier':
+                values = self.evidence_tier(df)
+            elif criterion == 'source_priority':
+                values = self.source_priority(df)
+            elif criterion == 'completeness':
+                values = df.notna().sum(axis=1)
+            else:
+                raise KeyError(f"Critère de résolution inconnu : {criterion}")
+            columns[f"rank_{i}"] = np.asarray(values)
+        return pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+
+    def deduplicate(self, df: pd.DataFrame, rank_by: Sequence = DEFAULT_RANK,
+                    aggregate: Optional[Dict] = None) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Lie puis résout chaque groupe.
+
+        Les entrées sont triées (tri stable) par groupe puis par rank_by ; à
+        égalité l'ordre d'entrée départage. Sans `aggregate`, on garde la
+        première entrée de chaque groupe (index d'origine conservé) ; avec, on
+        agrège chaque groupe (groupby.agg, 'first' = première valeur non nulle
+        dans l'ordre de résolution).
+
+        Args:
+            df: Entrées à dédoublonner
+            rank_by: (critère, ascendant) ; rank_by=() garde la première occurrence
+            aggregate: Dict colonne -> agrégation (optionnel)
+
+        Returns:
+            (DataFrame dédoublonné, rapport de liaison), groupes dans l'ordre de
+            première apparition
+        """
+        groups, links = self.link(df)
+        ranked = self.rank_frame(df, rank_by)
+        ranked.insert(0, 'group', groups)
+        ranked = ranked.sort_values(list(ranked.columns),
+                                    ascending=[True] + [bool(asc) for _, asc in rank_by],
+                                    kind='stable', na_position='last')
+        kept_positions = ranked.drop_duplicates('group').index.to_numpy()
+        if aggregate is None:
+            result = df.iloc[kept_positions].copy()
+        else:
+            ordered = df.iloc[ranked.index.to_numpy()]
+            result = ordered.groupby(ranked['group'].to_numpy(), sort=True).agg(aggregate)
+            result = result.reset_index(drop=True)
+
+        return result, self.report(df, groups, links, kept_positions)
+
+    def report(self, df: pd.DataFrame, groups: np.ndarray, links: Dict[str, int],
+               kept_positions: np.ndarray, top: int = 5) -> Dict:
+        """Rapport de liaison"""
+        sizes = np.bincount(groups) if len(groups) else np.array([], dtype=int)
+        largest = np.argsort(-sizes, kind='stable')[:top]
+        first_position = pd.Series(np.arange(len(groups))).groupby(groups).first()
+        labels = df[self.name_column] if self.name_column in df.columns else pd.Series(
+            range(len(df)), index=df.index)
+        report = {
+            'n_input': int(len(df)),
+            'n_output': int(len(sizes)),
+            'n_duplicates': int(len(df) - len(sizes)),
+            'n_groups_merged': int((sizes > 1).sum()),
+            'links_by_key': links,
+            'largest_groups': [(str(labels.iloc[first_position[g]]), int(sizes[g]))
+                               for g in largest if sizes[g] > 1],
+        }
+        if self.source_column in df.columns:
+            kept = df[self.source_column].iloc[kept_positions]
+            report['kept_by_source'] = {str(k): int(v) for k, v in kept.value_counts().items()}
+        return report
+
+def format_report(report: Dict) -> str:
+    """Rapport de liaison, une ligne par indicateur"""
+    lines = [f"  Entrées : {report['n_input']} -> {report['n_output']} "
+             f"({report['n_duplicates']} doublons, {report['n_groups_merged']} groupes fusionnés)"]
+    for key, count in report['links_by_key'].items():
+        lines.append(f"  Clé {key} : {count} entrées liées")
+    for name, size in report['largest_groups']:
+        lines.append(f"  Groupe {name} : {size} entrées")
+    for source, count in report.get('kept_by_source', {}).items():
+        lines.append(f"  Gardées ({source}) : {count}")
+    return '\n'.join(lines)
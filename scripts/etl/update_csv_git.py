@@ -12,6 +12,7 @@ from pathlib import Path
 import datetime
 import subprocess
 import sys
+from artifact_io import contract_schema, export_csv, read_artifact, write_artifact
 
 def add_unique_systems():
     """Ajoute des systèmes vraiment nouveaux (non doublons)"""
@@ -27,7 +28,7 @@ def add_unique_systems():
         print(f"ERREUR: Fichier {training_path} non trouve")
         return False
     
-    df = pd.read_csv(training_path)
+    df = read_artifact(training_path.with_suffix('.parquet'), schema=contract_schema())
     existing_names = set(df['canonical_name'].tolist())
     
     print(f"[LOAD] Dataset actuel: {len(df)} systemes")
@@ -105,7 +106,8 @@ def add_unique_systems():
     df_updated = pd.concat([df, df_new], ignore_index=True)
     
     # Sauvegarder
-    df_updated.to_csv(training_path, index=False, encoding='utf-8')
+    write_artifact(df_updated, training_path.with_suffix('.parquet'), contract_schema())
+    export_csv(df_updated, training_path)
     
     print(f"[SAVE] Dataset mis a jour: {len(df)} -> {len(df_updated)} systemes")
     
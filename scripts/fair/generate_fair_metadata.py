@@ -4,17 +4,22 @@ Génère métadonnées FAIR complètes (Schema.org, DCAT, DataCite)
 Licence: MIT
 """
 
-import pandas as pd
 import json
 import os
+import sys
+from pathlib import Path
 from datetime import datetime
 from typing import Dict
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+from atlas_dataset import open_table
+
 class FAIRMetadataGenerator:
     """Générateur métadonnées FAIR (Findable, Accessible, Interoperable, Reusable)"""
     
     def __init__(self, atlas_csv: str, version: str = "2.0.0"):
-        self.df = pd.read_csv(atlas_csv)
+        # Seul le nombre de systèmes est utilisé : pas de lecture des données
+        self.n_systems = open_table(atlas_csv).count_rows()
         self.version = version
         self.base_url = "https://github.com/Mythmaker28/Quantum-Sensors-Qubits-in-Biology"
         
@@ -112,7 +117,7 @@ class FAIRMetadataGenerator:
   </rightsList>
   <descriptions>
     <description descriptionType="Abstract">
-      Comprehensive catalog of {len(self.df)} quantum systems in biology with measured coherence times.
+      Comprehensive catalog of {self.n_systems} quantum systems in biology with measured coherence times.
     </description>
   </descriptions>
 </resource>
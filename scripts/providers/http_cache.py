@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP Cache — couche HTTP partagée des providers
+===============================================
+Session `requests` qui applique la section `cache:` de config/providers.yml
+(enabled, ttl_hours, path) pour un provider donné.
+
+- Réponses 200 stockées sous data/cache/<provider>/, clé = SHA256 de
+  méthode + URL (paramètres inclus) + corps de la requête.
+- Entrée plus jeune que `ttl_hours` : servie sans aucun appel réseau.
+- Entrée expirée : revalidée avec If-None-Match / If-Modified-Since
+  (ETag / Last-Modified) ; un 304 rafraîchit l'entrée sans retélécharger.
+- Erreur réseau avec une entrée expirée : l'entrée est servie (stale-if-error).
+- Mode hors-ligne (ATLAS_OFFLINE=1) : cache uniquement, un défaut de cache
+  lève OfflineCacheMiss (sous-classe de requests.RequestException, donc
+  traitée par les `except` existants des scripts).
+
+- lookup(url) / store(url, content) : lecture sans réseau et écriture
+  directe d'une entrée (ex. une réponse groupée découpée par identifiant).
+- download(url, path) : variante streamée, le corps est écrit par blocs dans
+  `path` (et copié de fichier à fichier dans le cache), jamais chargé en mémoire.
+
+Usage:
+    from providers.http_cache import cached_session
+
+    HTTP = cached_session("uniprot", CONFIG)
+    response = HTTP.get(url, params=params, timeout=30)
+    response.from_cache  # True si aucun corps n'a été téléchargé
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CACHE_ROOT = Path("data/cache")
+DEFAULT_TTL_HOURS = 24
+DOWNLOAD_CHUNK = 64 * 1024
+
+# En-têtes conservés avec le corps (revalidation + décodage)
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link", "Content-Encoding")
+
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """Requête absente du cache alors que le mode hors-ligne est actif."""
+
+
+class RateLimiter:
+    """Espacement minimal entre requêtes (requests_per_second), partagé entre threads."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second
+        self.next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Bloque jusqu'au prochain créneau libre et le réserve."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        """Repousse tous les créneaux (ex. Retry-After d'un 429)."""
+        with self._lock:
+            self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+
+def offline_mode() -> bool:
+    """Mode hors-ligne demandé via ATLAS_OFFLINE=1."""
+    return os.environ.get("ATLAS_OFFLINE", "0").lower() in ("1", "true", "yes")
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                body: Optional[bytes] = None) -> str:
+    """Clé de cache : méthode + URL complète (paramètres triés) + corps."""
+    full_url = url
+    if params:
+        full_url += ("&" if "?" in url else "?") + urlencode(sorted(params.items()), doseq=True)
+    sha = hashlib.sha256(f"{method.upper()} {full_url}\n".encode("utf-8"))
+    sha.update(body or b"")
+    return sha.hexdigest()
+
+
+class CachedSession:
+    """Session HTTP avec cache disque, TTL et revalidation conditionnelle."""
+
+    def __init__(self, provider: str, cache_dir: Optional[Path] = None,
+                 ttl_hours: float = DEFAULT_TTL_HOURS, enabled: bool = True,
+                 offline: Optional[bool] = None,
+                 session: Optional[requests.Session] = None):
+        self.provider = provider
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_ROOT / provider
+        self.ttl_s = float(ttl_hours) * 3600
+        self.enabled = enabled
+        self.offline = offline_mode() if offline is None else offline
+        self.session = session or requests.Session()
+        # network = requêtes réellement envoyées (pour le rate limiting)
+        self.stats = {"hits": 0, "revalidated": 0, "downloads": 0, "stale": 0, "network": 0}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Stockage
+    # ------------------------------------------------------------------
+
+    def _paths(self, key: str):
+        folder = self.cache_dir / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def _load_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if body_path.exists() else None
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        meta = self._load_meta(key)
+        if meta is None:
+            return None
+        try:
+            meta["content"] = self._paths(key)[1].read_bytes()
+        except OSError:
+            return None
+        return meta
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _store(self, key: str, method: str, response: requests.Response,
+               body_file: Optional[Path] = None) -> Dict[str, Any]:
+        """Enregistre une réponse 200 ; `body_file` : corps déjà écrit sur disque (download)."""
+        meta = {
+            "method": method.upper(),
+            "url": response.url,
+            "status_code": response.status_code,
+            "headers": {h: response.headers[h] for h in STORED_HEADERS if h in response.headers},
+            "stored_at": time.time(),
+        }
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        # Corps d'abord : une méta présente implique un corps complet
+        if body_file is None:
+            self._write_atomic(body_path, response.content)
+        else:
+            tmp = body_path.with_name(f"{body_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copyfile(body_file, tmp)
+            os.replace(tmp, body_path)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        return meta
+
+    def _touch(self, key: str, meta: Dict[str, Any], response: requests.Response):
+        """Rafraîchit une entrée après un 304 (nouveaux validateurs éventuels)."""
+        meta = {k: v for k, v in meta.items() if k != "content"}
+        for header in ("ETag", "Last-Modified"):
+            if header in response.headers:
+                meta["headers"][header] = response.headers[header]
+        meta["stored_at"] = time.time()
+        meta_path, _ = self._paths(key)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _as_response(meta: Dict[str, Any]) -> requests.Response:
+        """Reconstruit un requests.Response à partir d'une entrée du cache."""
+        response = requests.Response()
+        response.status_code = meta["status_code"]
+        response._content = meta.get("content", b"")
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.url = meta["url"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = "OK"
+        response.from_cache = True
+        return response
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                data=None, json_body=None, headers: Optional[Dict[str, str]] = None,
+                **kwargs) -> requests.Response:
+        """Équivalent de requests.request avec le cache du provider."""
+        if json_body is not None:
+            data = json.dumps(json_body).encode("utf-8")
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        if not self.enabled:
+            if self.offline:
+                raise OfflineCacheMiss(f"Offline mode: {self.provider} cache disabled ({url})")
+            self._count("network")
+            response = self.session.request(method, url, params=params, data=data,
+                                            headers=headers, **kwargs)
+            response.from_cache = False
+            return response
+
+        key = request_key(method, url, params, data)
+        meta = self._load(key)
+
+        if meta is not None and (self.offline or time.time() - meta["stored_at"] < self.ttl_s):
+            self._count("hits")
+            return self._as_response(meta)
+        if self.offline:
+            raise OfflineCacheMiss(f"Offline mode: no cached response for {method} {url}")
+
+        conditional = dict(headers or {})
+        if meta is not None:
+            if "ETag" in meta["headers"]:
+                conditional["If-None-Match"] = meta["headers"]["ETag"]
+            if "Last-Modified" in meta["headers"]:
+                conditional["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        self._count("network")
+        try:
+            response = self.session.request(method, url, params=params, data=data,
+                                            headers=conditional, **kwargs)
+        except requests.exceptions.RequestException:
+            if meta is None:
+                raise
+            self._count("stale")
+            return self._as_response(meta)
+
+        if response.status_code == 304 and meta is not None:
+            self._touch(key, meta, response)
+            self._count("revalidated")
+            return self._as_response(meta)
+
+        response.from_cache = False
+        if response.status_code == 200:
+            self._store(key, method, response)
+            self._count("downloads")
+        return response
+
+    def is_cached(self, url: str, params: Optional[Dict[str, Any]] = None, method: str = "GET") -> bool:
+        """Vrai si la requête serait servie par le cache sans appel réseau."""
+        if not self.enabled:
+            return False
+        meta = self._load_meta(request_key(method, url, params))
+        if meta is None:
+            return False
+        return self.offline or time.time() - meta["stored_at"] < self.ttl_s
+
+    def lookup(self, url: str, params: Optional[Dict[str, Any]] = None,
+               method: str = "GET") -> Optional[requests.Response]:
+        """Réponse en cache encore valide (aucun appel réseau), sinon None."""
+        if not self.enabled:
+            return None
+        meta = self._load(request_key(method, url, params))
+        if meta is None or not (self.offline or time.time() - meta["stored_at"] < self.ttl_s):
+            return None
+        self._count("hits")
+        return self._as_response(meta)
+
+    def store(self, url: str, content: bytes, params: Optional[Dict[str, Any]] = None,
+              method: str = "GET", headers: Optional[Dict[str, str]] = None):
+        """Enregistre un corps 200 pour une requête qui n'a pas été envoyée telle quelle."""
+        if not self.enabled:
+            return
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content
+        response.headers = CaseInsensitiveDict(headers or {})
+        response.url = url
+        self._store(request_key(method, url, params), method, response)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, data=None, json=None, **kwargs) -> requests.Response:
+        return self.request("POST", url, data=data, json_body=json, **kwargs)
+
+    def download(self, url: str, path: Path, params: Optional[Dict[str, Any]] = None,
+                 chunk_size: int = DOWNLOAD_CHUNK, **kwargs) -> requests.Response:
+        """
+        GET streamé vers `path` : mémoire bornée à `chunk_size` quelle que soit la
+        taille du corps. Mêmes règles de cache que request() ; un hit copie le
+        fichier du cache vers `path`. La réponse renvoyée n'a pas de corps
+        (il est dans `path`, écrit de façon atomique, seulement si 200).
+        """
+        path = Path(path)
+        key = request_key("GET", url, params)
+        meta = self._load_meta(key) if self.enabled else None
+
+        if self.offline and (meta is None or not self.enabled):
+            raise OfflineCacheMiss(f"Offline mode: no cached response for GET {url}")
+        if meta is not None and (self.offline or time.time() - meta["stored_at"] < self.ttl_s):
+            self._count("hits")
+            return self._copy_cached(key, meta, path)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if meta is not None:
+            if "ETag" in meta["headers"]:
+                headers["If-None-Match"] = meta["headers"]["ETag"]
+            if "Last-Modified" in meta["headers"]:
+                headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        self._count("network")
+        try:
+            response = self.session.get(url, params=params, headers=headers, stream=True, **kwargs)
+        except requests.exceptions.RequestException:
+            if meta is None:
+                raise
+            self._count("stale")
+            return self._copy_cached(key, meta, path)
+
+        with response:
+            if response.status_code == 304 and meta is not None:
+                self._touch(key, meta, response)
+                self._count("revalidated")
+                return self._copy_cached(key, meta, path)
+
+            response.from_cache = False
+            if response.status_code != 200:
+                response._content = b""
+                return response
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.part")
+            with open(tmp, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+            if self.enabled:
+                self._store(key, "GET", response, body_file=tmp)
+                self._count("downloads")
+            os.replace(tmp, path)
+            response._content = b""
+        return response
+
+    def _copy_cached(self, key: str, meta: Dict[str, Any], path: Path) -> requests.Response:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.part")
+        shutil.copyfile(self._paths(key)[1], tmp)
+        os.replace(tmp, path)
+        return self._as_response(meta)
+
+    def summary(self) -> str:
+        """Résumé lisible des compteurs (pour les logs de harvest)."""
+        s = self.stats
+        return (f"HTTP cache [{self.provider}]: {s['hits']} hits, {s['revalidated']} revalidated, "
+                f"{s['downloads']} downloads, {s['stale']} stale")
+
+
+def cached_session(provider: str, config: Optional[Dict[str, Any]] = None,
+                   section: Optional[str] = None) -> CachedSession:
+    """
+    Session pour `provider` selon config/providers.yml (section `section`,
+    par défaut le nom du provider). Sans section `cache:`, le cache est actif
+    avec le TTL par défaut sous data/cache/<provider>/.
+    """
+    if config is None:
+        import yaml
+        with open("config/providers.yml", 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+
+    settings = (config.get(section or provider) or {}).get("cache") or {}
+    return CachedSession(
+        provider,
+        cache_dir=settings.get("path") or CACHE_ROOT / provider,
+        ttl_hours=settings.get("ttl_hours", DEFAULT_TTL_HOURS),
+        enabled=settings.get("enabled", True),
+    )
@@ -20,6 +20,9 @@ from pathlib import Path
 import pandas as pd
 import yaml
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+from artifact_io import read_artifact
+
 def load_config() -> dict:
     """Load configuration."""
     with open("config/providers.yml", 'r', encoding='utf-8') as f:
@@ -201,13 +204,13 @@ def main():
     print("=" * 70)
     
     # Load data
-    data_path = Path("data/processed/atlas_fp_optical_v1_3.csv")
-    if not data_path.exists():
+    data_path = Path("data/processed/atlas_fp_optical_v1_3.parquet")
+    if not data_path.exists() and not data_path.with_suffix('.csv').exists():
         print(f"ERROR: {data_path} not found")
         print("Run scripts/etl/build_atlas_tables_v1_3.py first")
         return 1
     
-    df = pd.read_csv(data_path)
+    df = read_artifact(data_path)
     print(f"Loaded {len(df)} systems\n")
     
     # Run audits
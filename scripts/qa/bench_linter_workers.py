@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Linter Scaling Benchmark
+========================
+Mesure le débit de qubits_linter.py (lignes/s) selon le nombre de workers.
+
+Le catalogue synthétique est obtenu en répétant les lignes de
+biological_qubits.csv jusqu'à --rows lignes (fichier temporaire).
+
+Usage:
+    python scripts/qa/bench_linter_workers.py --rows 1000000 --workers 1 2 4 8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from qubits_linter import QubitsLinter  # noqa: E402
+
+SOURCE_FILE = ROOT / "biological_qubits.csv"
+
+def build_catalog(path: Path, n_rows: int):
+    """Répète les enregistrements du catalogue source jusqu'à n_rows lignes."""
+    with open(SOURCE_FILE, 'rb') as f:
+        header = f.readline()
+        records = [line for line in f if line.strip()]
+    with open(path, 'wb') as out:
+        out.write(header)
+        for i in range(n_rows):
+            out.write(records[i % len(records)])
+
+def run(path: Path, engine: str, workers: int) -> float:
+    """Durée (s) d'un lint complet, sans cache."""
+    linter = QubitsLinter(str(path), engine=engine, workers=workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        linter.lint_all()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du linter selon le nombre de workers")
+    parser.add_argument("--rows", type=int, default=500_000, help="Lignes du catalogue synthétique")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--engine", choices=["rows", "columnar"], default="columnar")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.csv"
+        build_catalog(path, args.rows)
+        size_mb = path.stat().st_size / 1e6
+        
+        print(f"Catalogue : {args.rows} lignes, {size_mb:.1f} MB, moteur {args.engine}\n")
+        print("| Workers | Durée (s) | Lignes/s | MB/s | Speed-up |")
+        print("|---:|---:|---:|---:|---:|")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            elapsed = run(path, args.engine, workers)
+            baseline = baseline or elapsed
+            print(f"| {workers} | {elapsed:.2f} | {args.rows / elapsed:,.0f} | "
+                  f"{size_mb / elapsed:.1f} | {baseline / elapsed:.2f}x |")
+
+if __name__ == "__main__":
+    main()
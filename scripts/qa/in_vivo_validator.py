@@ -7,9 +7,14 @@ Licence: MIT
 import pandas as pd
 import re
 import os
+import sys
+from pathlib import Path
 from typing import Dict
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+from atlas_dataset import open_table
+
 class InVivoValidator:
     """Validateur automatique contexte in vivo"""
     
@@ -22,8 +27,12 @@ class InVivoValidator:
         'human': r'(human|homo\s+sapiens|patient)',
     }
     
+    # Colonnes lues pour le scoring et le rapport
+    COLUMNS = ['SystemID', 'protein_name', 'context', 'notes', 'doi', 'method', 'contrast_value']
+    
     def __init__(self, atlas_csv: str):
-        self.df = pd.read_csv(atlas_csv)
+        atlas = open_table(atlas_csv)
+        self.df = atlas.to_pandas(columns=atlas.available(self.COLUMNS))
         
     def score_in_vivo(self, row: pd.Series) -> Dict:
         """
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Contrast Extraction Benchmark
+=============================
+
+Compares the compiled engine (contrast_engine.py) with the previous
+per-pattern extractor on the PMC full-text corpus (data/raw/oa/PMC*/fulltext.xml).
+Reports MB/s (best of --repeat runs) for the full XML path (parse + section
+text + regex) and for the text scan alone, and checks that both extractors
+return the same measurements.
+
+Usage:
+    python scripts/textmine/benchmark_contrast_engine.py [--repeat 5] [--corpus data/raw/oa]
+
+Author: Biological Qubit Atlas Team
+License: MIT
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, str(Path(__file__).parent))
+import contrast_engine
+
+# ----------------------------------------------------------------------
+# Reference: per-pattern extractor (mine_pmc_fulltext before the engine)
+# ----------------------------------------------------------------------
+
+LEGACY_CONTRAST_PATTERNS = [
+    (r'ΔF/F[₀0]\s*=\s*([0-9.]+)([%±]?\s*[0-9.]*)?', 'deltaF_F0'),
+    (r'dF/F[₀0]?\s*=\s*([0-9.]+)([%±]?\s*[0-9.]*)?', 'deltaF_F0'),
+    (r'ΔR/R[₀0]\s*=\s*([0-9.]+)([%±]?\s*[0-9.]*)?', 'deltaR_R0'),
+    (r'([0-9.]+)[-\s]fold\s+(?:change|increase|response)', 'fold'),
+    (r'fold[-\s]change\s*[:=]?\s*([0-9.]+)', 'fold'),
+    (r'([0-9.]+)%\s+(?:change|increase|response|ΔF)', 'percent'),
+    (r'percent\s+change\s*[:=]?\s*([0-9.]+)', 'percent'),
+    (r'dynamic\s+range\s*[:=]?\s*([0-9.]+)', 'fold'),
+    (r'on/off\s+ratio\s*[:=]?\s*([0-9.]+)', 'fold'),
+]
+
+LEGACY_STATS_PATTERNS = {
+    'n': r'n\s*=\s*([0-9]+)',
+    'sd': r'SD\s*=\s*([0-9.]+)',
+    'sem': r'SEM\s*=\s*([0-9.]+)',
+    'ci_low': r'\[([0-9.]+)[-–,]\s*[0-9.]+\]',
+    'ci_high': r'\[[0-9.]+[-–,]\s*([0-9.]+)\]',
+}
+
+
+def legacy_extract_from_text(text: str, pmcid: str, section_type: str) -> List[Dict]:
+    measurements = []
+    for pattern, metric_type in LEGACY_CONTRAST_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            try:
+                value = float(match.group(1))
+                start = max(0, match.start() - 50)
+                end = min(len(text), match.end() + 50)
+                context = text[start:end]
+                stats = {}
+                for stat_name, stat_pattern in LEGACY_STATS_PATTERNS.items():
+                    stat_match = re.search(stat_pattern, context, re.IGNORECASE)
+                    if stat_match:
+                        stats[stat_name] = float(stat_match.group(1))
+                measurements.append({
+                    'value': value, 'metric_type': metric_type, 'pmcid': pmcid,
+                    'section_type': section_type, 'context': context.strip(),
+                    **{k: stats.get(k) for k in contrast_engine.STATS_FIELDS}
+                })
+            except ValueError:
+                continue
+    return measurements
+
+
+def legacy_extract_from_xml(xml_content: str, pmcid: str) -> List[Dict]:
+    measurements = []
+    root = ET.fromstring(xml_content)
+    for tag, section_type in contrast_engine.SECTIONS:
+        for element in root.findall(f'.//{tag}'):
+            text = ET.tostring(element, encoding='unicode', method='text')
+            measurements.extend(legacy_extract_from_text(text, pmcid, section_type))
+    return measurements
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+def load_corpus(corpus_dir: Path) -> Dict[str, str]:
+    return {path.parent.name: path.read_text(encoding='utf-8')
+            for path in sorted(corpus_dir.glob('PMC*/fulltext.xml'))}
+
+
+def best_time(extract: Callable[[str, str], List[Dict]], corpus: Dict[str, str],
+              repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for pmcid, xml_content in corpus.items():
+            extract(xml_content, pmcid)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def section_texts(corpus: Dict[str, str]) -> Dict[str, List]:
+    """(section_type, text) of every mined section, per article."""
+    texts = {}
+    for pmcid, xml_content in corpus.items():
+        root = ET.fromstring(xml_content)
+        texts[pmcid] = [(section_type, ''.join(element.itertext()))
+                        for tag, section_type in contrast_engine.SECTIONS
+                        for element in root.iter(tag)]
+    return texts
+
+
+def text_scanner(extract_from_text: Callable[[str, str, str], List[Dict]],
+                 texts: Dict[str, List]) -> Callable[[str, str], List[Dict]]:
+    def scan(_xml_content: str, pmcid: str) -> List[Dict]:
+        return [m for section_type, text in texts[pmcid]
+                for m in extract_from_text(text, pmcid, section_type)]
+    return scan
+
+
+def as_multiset(measurements: List[Dict]) -> Counter:
+    return Counter(tuple(sorted(m.items())) for m in measurements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark contrast extraction on the PMC corpus")
+    parser.add_argument('--corpus', type=Path, default=Path('data/raw/oa'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"ERROR: no PMC*/fulltext.xml under {args.corpus}")
+        return 1
+    size_mb = sum(len(xml.encode('utf-8')) for xml in corpus.values()) / 1e6
+    print(f"Corpus: {len(corpus)} articles, {size_mb:.2f} MB ({args.corpus})")
+
+    texts = section_texts(corpus)
+    text_mb = sum(len(t.encode('utf-8')) for sections in texts.values() for _, t in sections) / 1e6
+    runs = [
+        ("XML", size_mb, legacy_extract_from_xml, contrast_engine.extract_contrast_from_xml),
+        ("text scan", text_mb, text_scanner(legacy_extract_from_text, texts),
+         text_scanner(contrast_engine.extract_contrast_from_text, texts)),
+    ]
+
+    print(f"{'Path':<10} {'MB':>6} {'per-pattern MB/s':>17} {'compiled MB/s':>14} {'speed-up':>9}")
+    for label, mb, before, after in runs:
+        legacy = best_time(before, corpus, args.repeat)
+        engine = best_time(after, corpus, args.repeat)
+        print(f"{label:<10} {mb:>6.2f} {mb / legacy:>17.2f} {mb / engine:>14.2f} {legacy / engine:>8.2f}x")
+
+    for pmcid, xml_content in corpus.items():
+        before = as_multiset(legacy_extract_from_xml(xml_content, pmcid))
+        after = as_multiset(contrast_engine.extract_contrast_from_xml(xml_content, pmcid))
+        status = "identical" if before == after else (
+            f"{sum((before - after).values())} only before, {sum((after - before).values())} only after")
+        print(f"  {pmcid}: {sum(after.values())} measurements ({status})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
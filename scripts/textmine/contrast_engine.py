@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Contrast Extraction Engine
+==========================
+
+Compiled regex engine behind the PMC full-text miner.
+
+- All contrast patterns are merged into one zero-width lookahead
+  alternation that only locates candidate offsets; a section is scanned
+  once instead of once per pattern. At each candidate every pattern is
+  tried with its own compiled regex, and a pattern is skipped until the end
+  of its previous hit. This yields exactly the hits of the nine separate
+  scans, overlapping spans across patterns included ("ΔF/F0 = 35%
+  response" gives both deltaF_F0 and percent).
+- Patterns are written in lowercase and matched against `text.lower()`
+  without re.IGNORECASE. The first character of every pattern is factored
+  into one leading character class, which lets `re` skip non-candidate
+  positions with its charset search instead of trying the nine branches at
+  every offset. Case-insensitive fallback when lowering changes the length
+  of the text (offsets would no longer line up).
+- n / SD / SEM / CI come from a single combined scan of the ±50-char window
+  around each hit (first occurrence of each field).
+- Section text is gathered with itertext() instead of re-serialising each
+  element with ET.tostring().
+- extract_contrast_from_file() streams a saved article with iterparse and
+  drops every subtree once no enclosing section needs it, so peak memory is
+  bounded by the largest section, not by the article size.
+
+This module has no side effects at import (no config, no HTTP), so the
+miner's extraction process pool can import it cheaply.
+
+Author: Biological Qubit Atlas Team
+License: MIT
+"""
+
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Union
+from xml.etree import ElementTree as ET
+
+# (value group, metric type, first character class, rest of the pattern).
+# Patterns are lowercase. For number-first patterns the value group holds
+# the digits after the first one (value = match start .. group end).
+# Hits starting at the same offset are reported in this order.
+NUMBER_LEAD = '0-9.'
+CONTRAST_PATTERNS = [
+    # ΔF/F₀ patterns
+    ('deltaF_F0', 'deltaF_F0', 'δ', r'f/f[₀0]\s*=\s*(?P<deltaF_F0>[0-9.]+)(?:[%±]?\s*[0-9.]*)?'),
+    ('dF_F0', 'deltaF_F0', 'd', r'f/f[₀0]?\s*=\s*(?P<dF_F0>[0-9.]+)(?:[%±]?\s*[0-9.]*)?'),
+    ('deltaR_R0', 'deltaR_R0', 'δ', r'r/r[₀0]\s*=\s*(?P<deltaR_R0>[0-9.]+)(?:[%±]?\s*[0-9.]*)?'),
+
+    # Fold change
+    ('fold_n', 'fold', NUMBER_LEAD, r'(?P<fold_n>[0-9.]*)[-\s]fold\s+(?:change|increase|response)'),
+    ('fold_change', 'fold', 'f', r'old[-\s]change\s*[:=]?\s*(?P<fold_change>[0-9.]+)'),
+
+    # Percent change
+    ('percent_n', 'percent', NUMBER_LEAD, r'(?P<percent_n>[0-9.]*)%\s+(?:change|increase|response|δf)'),
+    ('percent_change', 'percent', 'p', r'ercent\s+change\s*[:=]?\s*(?P<percent_change>[0-9.]+)'),
+
+    # Dynamic range
+    ('dynamic_range', 'fold', 'd', r'ynamic\s+range\s*[:=]?\s*(?P<dynamic_range>[0-9.]+)'),
+    ('on_off_ratio', 'fold', 'o', r'n/off\s+ratio\s*[:=]?\s*(?P<on_off_ratio>[0-9.]+)'),
+]
+
+# Statistical info, one named group per field (CI bounds share one bracket)
+STATS_PATTERNS = [
+    r'n\s*=\s*(?P<n>[0-9]+)',
+    r'sd\s*=\s*(?P<sd>[0-9.]+)',
+    r'sem\s*=\s*(?P<sem>[0-9.]+)',
+    r'\[(?P<ci_low>[0-9.]+)[-–,]\s*(?P<ci_high>[0-9.]+)\]',  # [low, high]
+]
+STATS_FIELDS = ('n', 'sd', 'sem', 'ci_low', 'ci_high')
+
+METRIC_TYPES = {name: metric for name, metric, _, _ in CONTRAST_PATTERNS}
+NUMBER_FIRST = {name for name, _, lead, _ in CONTRAST_PATTERNS if lead == NUMBER_LEAD}
+CONTEXT_CHARS = 50
+
+# Candidate offsets: zero-width, so hits of different patterns may overlap
+_CONTRAST_CANDIDATES = '(?=[{}](?:{}))'.format(
+    ''.join(dict.fromkeys(lead for _, _, lead, _ in CONTRAST_PATTERNS)),
+    '|'.join(f'(?<=[{lead}]){rest}' for _, _, lead, rest in CONTRAST_PATTERNS))
+CANDIDATE_RE = re.compile(_CONTRAST_CANDIDATES)
+CANDIDATE_RE_IGNORECASE = re.compile(_CONTRAST_CANDIDATES, re.IGNORECASE)
+PATTERN_RES = [(name, re.compile(f'[{lead}]{rest}')) for name, _, lead, rest in CONTRAST_PATTERNS]
+PATTERN_RES_IGNORECASE = [(name, re.compile(f'[{lead}]{rest}', re.IGNORECASE))
+                          for name, _, lead, rest in CONTRAST_PATTERNS]
+STATS_RE = re.compile('|'.join(STATS_PATTERNS))
+STATS_RE_IGNORECASE = re.compile('|'.join(STATS_PATTERNS), re.IGNORECASE)
+
+# Sections mined, in output order
+SECTIONS = (('table', 'table'), ('p', 'paragraph'), ('caption', 'caption'))
+SECTION_TYPES = dict(SECTIONS)
+
+
+def extract_contrast_from_text(text: str, pmcid: str, section_type: str) -> List[Dict]:
+    """
+    Extract contrast values from text with a single scan for candidate offsets.
+
+    Same hits as scanning each pattern separately: a pattern's hits do not
+    overlap each other, but may overlap hits of other patterns.
+
+    Args:
+        text: Text to search
+        pmcid: PMC ID
+        section_type: Type of section (table/paragraph/caption)
+
+    Returns:
+        List of measurements, in text order
+    """
+    scan_text = text.lower()
+    if len(scan_text) == len(text):
+        candidate_re, pattern_res, stats_re = CANDIDATE_RE, PATTERN_RES, STATS_RE
+    else:
+        scan_text = text
+        candidate_re, pattern_res, stats_re = CANDIDATE_RE_IGNORECASE, PATTERN_RES_IGNORECASE, STATS_RE_IGNORECASE
+
+    # End of the last hit of each pattern (its next hit starts at or after it)
+    resume = dict.fromkeys(METRIC_TYPES, 0)
+    hits = []
+    for candidate in candidate_re.finditer(scan_text):
+        pos = candidate.start()
+        for name, pattern_re in pattern_res:
+            if pos >= resume[name]:
+                match = pattern_re.match(scan_text, pos)
+                if match:
+                    resume[name] = match.end()
+                    hits.append((name, match))
+
+    measurements = []
+    for name, match in hits:
+        start = max(0, match.start() - CONTEXT_CHARS)
+        end = min(len(text), match.end() + CONTEXT_CHARS)
+
+        try:
+            if name in NUMBER_FIRST:
+                value = float(scan_text[match.start():match.end(name)])
+            else:
+                value = float(match.group(name))
+
+            stats = {}
+            for stat_match in stats_re.finditer(scan_text, start, end):
+                for field, stat in stat_match.groupdict().items():
+                    if stat is not None and field not in stats:
+                        stats[field] = float(stat)
+        except ValueError:
+            continue
+
+        measurements.append({
+            'value': value,
+            'metric_type': METRIC_TYPES[name],
+            'pmcid': pmcid,
+            'section_type': section_type,
+            'context': text[start:end].strip(),
+            **{field: stats.get(field) for field in STATS_FIELDS}
+        })
+
+    return measurements
+
+
+def extract_contrast_from_xml(xml_content: str, pmcid: str) -> List[Dict]:
+    """
+    Extract contrast measurements from PMC XML.
+
+    Args:
+        xml_content: Full-text XML content
+        pmcid: PMC ID
+
+    Returns:
+        List of contrast measurements (tables, then paragraphs, then captions)
+    """
+    measurements = []
+
+    try:
+        root = ET.fromstring(xml_content)
+    except ET.ParseError as e:
+        print(f"ERROR parsing XML for {pmcid}: {e}")
+        return measurements
+
+    for tag, section_type in SECTIONS:
+        for element in root.iter(tag):
+            text = ''.join(element.itertext())
+            measurements.extend(extract_contrast_from_text(text, pmcid, section_type))
+
+    return measurements
+
+
+def iter_sections(source: Union[str, Path, BinaryIO]) -> Iterator[Tuple[str, str]]:
+    """
+    Stream (section_type, text) for every table/p/caption of a PMC XML file.
+
+    Sections come in document order (a <p> inside a <caption> is yielded
+    before its caption). Once an element is closed and no enclosing section
+    is still open, it is cleared and detached from its parent.
+
+    Args:
+        source: Path or binary file object of a full-text XML
+
+    Yields:
+        (section_type, text) tuples
+    """
+    open_sections = 0
+    stack = []
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            if element.tag in SECTION_TYPES:
+                open_sections += 1
+            continue
+
+        stack.pop()
+        section_type = SECTION_TYPES.get(element.tag)
+        if section_type:
+            open_sections -= 1
+            yield section_type, ''.join(element.itertext())
+        if open_sections == 0 and stack:
+            element.clear()
+            stack[-1].remove(element)
+
+
+def extract_contrast_from_file(path: Union[str, Path], pmcid: str) -> List[Dict]:
+    """
+    Extract contrast measurements from a saved PMC XML file, streaming it.
+
+    Args:
+        path: data/raw/oa/<PMCID>/fulltext.xml
+        pmcid: PMC ID
+
+    Returns:
+        List of contrast measurements, in document order (sections parsed
+        before an XML error are kept)
+    """
+    measurements = []
+
+    try:
+        for section_type, text in iter_sections(path):
+            measurements.extend(extract_contrast_from_text(text, pmcid, section_type))
+    except (ET.ParseError, OSError) as e:
+        print(f"ERROR parsing XML for {pmcid}: {e}")
+
+    return measurements
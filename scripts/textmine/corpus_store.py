@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+PMC Local Corpus Store
+======================
+
+SQLite database of the full-text articles already saved under
+data/raw/oa/<PMCID>/fulltext.xml, one row per mined section (table,
+paragraph, caption) in an FTS5 table. The miners query candidate passages
+by protein name from this store instead of searching Europe PMC, so
+re-running extraction after a pattern change needs no network.
+
+- Indexing streams each XML file (contrast_engine.iter_sections) and is
+  incremental: files whose size and mtime are unchanged are skipped.
+- Protein names are matched as FTS5 phrases (token-based: "GFP" does not
+  match "EGFP"), ranked by bm25.
+
+Usage:
+    python scripts/textmine/corpus_store.py index [--oa-dir data/raw/oa] [--rebuild]
+    python scripts/textmine/corpus_store.py search "GCaMP6s"
+
+    from corpus_store import CorpusStore
+    with CorpusStore() as store:
+        store.index_corpus()
+        for passage in store.search("GCaMP6s"):
+            ...
+
+Author: Biological Qubit Atlas Team
+License: MIT
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+sys.path.insert(0, str(Path(__file__).parent))
+from contrast_engine import iter_sections
+
+CORPUS_DB = Path("data/cache/pmc_corpus.sqlite")
+OA_DIR = Path("data/raw/oa")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    pmcid TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    n_sections INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    text,
+    pmcid UNINDEXED,
+    section_type UNINDEXED,
+    seq UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+class Passage(NamedTuple):
+    """One indexed section."""
+    pmcid: str
+    section_type: str
+    seq: int
+    text: str
+
+
+def phrase_query(name: str) -> str:
+    """FTS5 phrase query for a protein name (quotes escaped)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class CorpusStore:
+    """SQLite FTS5 index of section-level full text."""
+
+    def __init__(self, db_path: Union[str, Path] = CORPUS_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "CorpusStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def is_current(self, pmcid: str, path: Path) -> bool:
+        """True if `path` is already indexed with the same size and mtime."""
+        st = path.stat()
+        row = self.conn.execute(
+            "SELECT size, mtime_ns FROM articles WHERE pmcid = ?", (pmcid,)).fetchone()
+        return row == (st.st_size, st.st_mtime_ns)
+
+    def index_article(self, pmcid: str, path: Union[str, Path]) -> int:
+        """(Re)index one article; returns the number of sections stored."""
+        path = Path(path)
+        st = path.stat()
+        rows = ((text, pmcid, section_type, seq)
+                for seq, (section_type, text) in enumerate(iter_sections(path)))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM sections WHERE pmcid = ?", (pmcid,))
+            cursor = self.conn.executemany(
+                "INSERT INTO sections (text, pmcid, section_type, seq) VALUES (?, ?, ?, ?)", rows)
+            count = cursor.rowcount
+            self.conn.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                (pmcid, str(path), st.st_size, st.st_mtime_ns, count, time.time()))
+        return count
+
+    def index_corpus(self, oa_dir: Union[str, Path] = OA_DIR, rebuild: bool = False) -> Tuple[int, int]:
+        """
+        Index every <oa_dir>/PMC*/fulltext.xml.
+
+        Returns:
+            (articles indexed, articles skipped as unchanged)
+        """
+        if rebuild:
+            with self.conn:
+                self.conn.execute("DELETE FROM sections")
+                self.conn.execute("DELETE FROM articles")
+
+        indexed = skipped = 0
+        for path in sorted(Path(oa_dir).glob("PMC*/fulltext.xml")):
+            pmcid = path.parent.name
+            if self.is_current(pmcid, path):
+                skipped += 1
+                continue
+            try:
+                self.index_article(pmcid, path)
+                indexed += 1
+            except Exception as e:
+                print(f"ERROR indexing {pmcid}: {e}")
+        return indexed, skipped
+
+    def refresh(self, oa_dir: Union[str, Path] = OA_DIR) -> int:
+        """Index new or changed XML under `oa_dir`; returns the number of articles in the store."""
+        self.index_corpus(oa_dir)
+        return self.stats()[0]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, name: str, limit: int = -1, pmcid: Optional[str] = None) -> Iterator[Passage]:
+        """Sections mentioning `name` (optionally within one article), best bm25 first."""
+        query = "SELECT pmcid, section_type, seq, text FROM sections WHERE sections MATCH ?"
+        params = [phrase_query(name)]
+        if pmcid is not None:
+            query += " AND pmcid = ?"
+            params.append(pmcid)
+        cursor = self.conn.execute(query + " ORDER BY rank LIMIT ?", (*params, limit))
+        return (Passage(*row) for row in cursor)
+
+    def articles_mentioning(self, name: str, limit: int = -1) -> List[str]:
+        """PMCIDs with at least one section mentioning `name`, best section first."""
+        cursor = self.conn.execute(
+            "SELECT pmcid, min(rank) AS best FROM sections WHERE sections MATCH ? "
+            "GROUP BY pmcid ORDER BY best LIMIT ?",
+            (phrase_query(name), limit))
+        return [row[0] for row in cursor]
+
+    def sections(self, pmcid: str) -> Iterator[Passage]:
+        """All sections of an article, in document order."""
+        cursor = self.conn.execute(
+            "SELECT pmcid, section_type, seq, text FROM sections WHERE pmcid = ? ORDER BY seq",
+            (pmcid,))
+        return (Passage(*row) for row in cursor)
+
+    def stats(self) -> Tuple[int, int]:
+        """(articles, sections) in the store."""
+        articles = self.conn.execute("SELECT count(*) FROM articles").fetchone()[0]
+        sections = self.conn.execute("SELECT count(*) FROM sections").fetchone()[0]
+        return articles, sections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PMC full-text corpus (SQLite FTS5)")
+    parser.add_argument('--db', type=Path, default=CORPUS_DB)
+    sub = parser.add_subparsers(dest='command', required=True)
+    index = sub.add_parser('index', help="Index saved full-text XML")
+    index.add_argument('--oa-dir', type=Path, default=OA_DIR)
+    index.add_argument('--rebuild', action='store_true')
+    search = sub.add_parser('search', help="Passages mentioning a protein name")
+    search.add_argument('name')
+    search.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    with CorpusStore(args.db) as store:
+        if args.command == 'index':
+            start = time.perf_counter()
+            indexed, skipped = store.index_corpus(args.oa_dir, rebuild=args.rebuild)
+            articles, sections = store.stats()
+            print(f"Indexed {indexed} articles ({skipped} unchanged) in "
+                  f"{time.perf_counter() - start:.2f}s")
+            print(f"Store {args.db}: {articles} articles, {sections} sections")
+        else:
+            for passage in store.search(args.name, limit=args.limit):
+                snippet = ' '.join(passage.text.split())[:160]
+                print(f"{passage.pmcid} [{passage.section_type} #{passage.seq}] {snippet}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
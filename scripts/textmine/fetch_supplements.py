@@ -5,17 +5,40 @@ PMC Supplementary Files Fetcher v1.3
 
 Download supplementary files (Excel, CSV, ZIP) from PMC Open Access articles.
 
+Downloads go through DownloadManager:
+- bodies are streamed to disk in DOWNLOAD_CHUNK blocks (memory is bounded by
+  the chunk size, not the file size) and hashed on the fly;
+- an interrupted download leaves <file>.part, resumed on the next run with
+  Range + If-Range (ETag or Last-Modified kept in <file>.part.json); the
+  file is fetched whole again if the server changed it or does not answer
+  from the expected offset;
+- a file whose size and mtime (or SHA256) match its download_log.json entry
+  is skipped without any request;
+- up to PER_HOST_WORKERS downloads run concurrently per host.
+
 Author: Biological Qubit Atlas Team
 License: MIT
 """
 
 import requests
+import hashlib
 import json
-from typing import Dict, List
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from urllib.parse import urlparse
 import time
 import yaml
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+from providers.http_cache import DOWNLOAD_CHUNK, RateLimiter, cached_session
+from artifact_io import read_artifact
+
 def load_config() -> Dict:
     """Load provider configuration."""
     with open("config/providers.yml", 'r', encoding='utf-8') as f:
@@ -24,6 +47,14 @@ def load_config() -> Dict:
 CONFIG = load_config()
 PMC_CONFIG = CONFIG['europe_pmc']
 PMC_API_URL = PMC_CONFIG['api_url']
+HTTP = cached_session("pmc", CONFIG, section="europe_pmc")
+LIMITER = RateLimiter(PMC_CONFIG['rate_limit']['requests_per_second'])
+
+SUPP_DIR = Path(PMC_CONFIG['supplements']['download_path'])
+SUPP_FORMATS = tuple(f".{ext}" for ext in PMC_CONFIG['supplements']['formats']) + ('.xls',)
+DOWNLOAD_LOG = SUPP_DIR / "download_log.json"
+PER_HOST_WORKERS = 4
+CONTENT_RANGE_RE = re.compile(r'bytes (?:(\d+)-\d+|\*)/(\d+)')
 
 def fetch_supplementary_files(pmcid: str) -> List[Dict]:
     """
@@ -38,7 +69,9 @@ def fetch_supplementary_files(pmcid: str) -> List[Dict]:
     url = f"{PMC_API_URL}{pmcid}/supplementaryFiles"
     
     try:
-        response = requests.get(url, timeout=30)
+        if not HTTP.is_cached(url):
+            LIMITER.wait()
+        response = HTTP.get(url, timeout=30)
         if response.status_code == 200:
             data = response.json()
             if 'result' in data:
@@ -48,32 +81,234 @@ def fetch_supplementary_files(pmcid: str) -> List[Dict]:
         print(f"ERROR fetching supplements for {pmcid}: {e}")
         return []
 
-def download_supplement(pmcid: str, filename: str, url: str) -> Optional[str]:
+def file_sha256(path: Path, chunk_size: int = DOWNLOAD_CHUNK) -> str:
+    """SHA256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_download_log(log_path: Path) -> Dict[str, Dict]:
+    """Previous download_log.json entries, keyed by file path (empty if absent or unreadable)."""
+    try:
+        with open(log_path, 'r', encoding='utf-8') as f:
+            return {item['path']: item for item in json.load(f).get('downloaded', [])}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+def resume_validator(response: requests.Response) -> Optional[str]:
+    """If-Range validator of a response: strong ETag, else Last-Modified (None if neither)."""
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+def content_range(response: requests.Response) -> Tuple[Optional[int], Optional[int]]:
+    """(first byte, total size) from a Content-Range header; None when absent."""
+    match = CONTENT_RANGE_RE.fullmatch(response.headers.get('Content-Range', '').strip())
+    if not match:
+        return None, None
+    return (int(match.group(1)) if match.group(1) else None), int(match.group(2))
+
+def load_part_validator(state_path: Path, url: str) -> Optional[str]:
+    """Validator saved with a .part file for this URL (None if absent or unreadable)."""
+    try:
+        state = json.loads(state_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return state.get('validator') if isinstance(state, dict) and state.get('url') == url else None
+
+def save_part_validator(state_path: Path, url: str, validator: Optional[str]):
+    """Keep the validator of a download in progress (a .part without one is never resumed)."""
+    if validator is None:
+        state_path.unlink(missing_ok=True)
+    else:
+        state_path.write_text(json.dumps({'url': url, 'validator': validator}), encoding='utf-8')
+
+class DownloadManager:
     """
-    Download a supplementary file.
+    Streaming, resumable, per-host concurrent file downloader.
+    
+    Each job is a dict with 'url' and 'path' (plus any extra keys, e.g.
+    pmcid/filename, copied into its log entry). Completed entries gain
+    'size', 'sha256' and 'mtime_ns', which later runs use to skip the file.
+    """
+
+    def __init__(self, log_path: Path = DOWNLOAD_LOG, per_host: int = PER_HOST_WORKERS,
+                 chunk_size: int = DOWNLOAD_CHUNK, timeout: float = 60,
+                 session: Optional[requests.Session] = None):
+        self.log_path = Path(log_path)
+        self.per_host = per_host
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.log = load_download_log(self.log_path)
+        self.stats = {'skipped': 0, 'downloaded': 0, 'resumed': 0, 'failed': 0, 'bytes': 0}
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def is_complete(self, job: Dict) -> bool:
+        """True if job['path'] exists and matches its log entry (size, then mtime or SHA256)."""
+        entry = self.log.get(str(job['path']))
+        path = Path(job['path'])
+        if entry is None or not path.exists() or entry.get('url', job['url']) != job['url']:
+            return False
+        st = path.stat()
+        if st.st_size != entry.get('size'):
+            return False
+        if st.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        return file_sha256(path, self.chunk_size) == entry.get('sha256')
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _fetch(self, job: Dict) -> Optional[Dict]:
+        """
+        Stream one file to <path>.part, then rename it.
+        
+        A .part left by an earlier run is resumed only with the validator
+        saved next to it (If-Range), and only from a 206 starting at its
+        size; any other answer downloads the whole file again.
+        """
+        path = Path(job['path'])
+        part = path.with_name(f"{path.name}.part")
+        state = path.with_name(f"{path.name}.part.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        digest = hashlib.sha256()
+        offset = 0
+        validator = load_part_validator(state, job['url']) if part.exists() else None
+        if validator:
+            with open(part, 'rb') as f:
+                for block in iter(lambda: f.read(self.chunk_size), b''):
+                    digest.update(block)
+                    offset += len(block)
+        
+        with self._host_slot(job['url']):
+            while True:
+                headers = {'Range': f"bytes={offset}-", 'If-Range': validator} if offset else {}
+                with self.session.get(job['url'], headers=headers, stream=True,
+                                      timeout=self.timeout) as response:
+                    start, total = content_range(response)
+                    if offset and ((response.status_code == 206 and start != offset) or
+                                   (response.status_code == 416 and total != offset)):
+                        # Not the range asked for: download the whole file instead
+                        digest, offset = hashlib.sha256(), 0
+                        continue
+                    if response.status_code == 416 and offset:
+                        pass  # .part already holds the whole file
+                    elif response.status_code == 206 and offset:
+                        self._count('resumed')
+                        self._write(response, part, 'ab', digest)
+                    elif response.status_code == 200:
+                        # Changed since the .part (If-Range), Range ignored, or nothing to resume
+                        digest = hashlib.sha256()
+                        save_part_validator(state, job['url'], resume_validator(response))
+                        self._write(response, part, 'wb', digest)
+                    else:
+                        print(f"ERROR downloading {path.name}: HTTP {response.status_code}")
+                        return None
+                break
+        
+        os.replace(part, path)
+        state.unlink(missing_ok=True)
+        st = path.stat()
+        self._count('downloaded')
+        return {**job, 'path': str(path),
+                'size': st.st_size, 'sha256': digest.hexdigest(), 'mtime_ns': st.st_mtime_ns}
+
+    def _write(self, response: requests.Response, part: Path, mode: str, digest) -> None:
+        with open(part, mode) as f:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                f.write(chunk)
+                digest.update(chunk)
+                self._count('bytes', len(chunk))
+
+    def _run(self, job: Dict) -> Optional[Dict]:
+        try:
+            return self._fetch(job)
+        except (requests.RequestException, OSError) as e:
+            # The .part file is kept: the next run resumes from it
+            print(f"ERROR downloading {Path(job['path']).name}: {e}")
+            return None
+
+    def download_all(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Download all jobs, skipping the ones already complete.
+        
+        Args:
+            jobs: Dicts with 'url' and 'path'
+            
+        Returns:
+            Log entries of every complete file (skipped or downloaded), in job order
+        """
+        entries = [None] * len(jobs)
+        pending = []
+        for i, job in enumerate(jobs):
+            if self.is_complete(job):
+                entries[i] = self.log[str(job['path'])]
+                self._count('skipped')
+            else:
+                pending.append(i)
+                
+        if pending:
+            hosts = {urlparse(jobs[i]['url']).netloc for i in pending}
+            with ThreadPoolExecutor(max_workers=min(len(pending), self.per_host * len(hosts))) as pool:
+                for i, entry in zip(pending, pool.map(self._run, [jobs[i] for i in pending])):
+                    entries[i] = entry
+                    if entry is None:
+                        self._count('failed')
+                        
+        for entry in entries:
+            if entry is not None:
+                self.log[entry['path']] = entry
+        return [entry for entry in entries if entry is not None]
+
+    def save_log(self):
+        """Write download_log.json with every known entry (this run and earlier ones)."""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.log_path.with_name(f"{self.log_path.name}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'downloaded': list(self.log.values()),
+                'count': len(self.log),
+                'timestamp': time.time()
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.log_path)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['downloaded']} downloaded ({s['resumed']} resumed, {s['bytes'] / 1e6:.1f} MB), "
+                f"{s['skipped']} already complete, {s['failed']} failed")
+
+def download_supplement(pmcid: str, filename: str, url: str,
+                        manager: Optional[DownloadManager] = None) -> Optional[str]:
+    """
+    Download a supplementary file (streamed, resumable, skipped if already complete).
     
     Args:
         pmcid: PMC ID
         filename: Name of the file
         url: Download URL
+        manager: Shared DownloadManager (a new one on DOWNLOAD_LOG by default)
         
     Returns:
         Path to downloaded file or None
     """
-    output_dir = Path(f"data/raw/oa_supp/{pmcid}")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    output_path = output_dir / filename
-    
-    try:
-        response = requests.get(url, timeout=60)
-        if response.status_code == 200:
-            output_path.write_bytes(response.content)
-            return str(output_path)
-        return None
-    except Exception as e:
-        print(f"ERROR downloading {filename}: {e}")
-        return None
+    manager = manager or DownloadManager()
+    entries = manager.download_all([{
+        'pmcid': pmcid, 'filename': filename, 'url': url, 'path': SUPP_DIR / pmcid / filename}])
+    return entries[0]['path'] if entries else None
 
 def main():
     """Main fetcher."""
@@ -82,16 +317,10 @@ def main():
     print("=" * 60)
     
     # Load PMC IDs from previous mining
-    pmc_contrasts_path = Path("data/interim/pmc_contrasts.json")
+    pmc_contrasts_path = Path("data/interim/pmc_contrasts.parquet")
     if pmc_contrasts_path.exists():
-        with open(pmc_contrasts_path, 'r', encoding='utf-8') as f:
-            pmc_data = json.load(f)
-        
-        # Extract unique PMC IDs
-        pmcids = set()
-        for protein, measurements in pmc_data.items():
-            for m in measurements:
-                pmcids.add(m['pmcid'])
+        # Unique PMC IDs (only the pmcid column is read)
+        pmcids = sorted(read_artifact(pmc_contrasts_path, columns=['pmcid'])['pmcid'].dropna().unique())
         
         print(f"Found {len(pmcids)} unique PMC IDs")
     else:
@@ -104,7 +333,7 @@ def main():
             'PMC7395770',  # GRAB-DA2 paper
         ]
     
-    downloaded = []
+    jobs = []
     
     for pmcid in pmcids:
         print(f"\nFetching supplements for {pmcid}...")
@@ -117,30 +346,22 @@ def main():
             url = supp.get('url', '')
             
             # Filter for data files only
-            if any(ext in filename.lower() for ext in ['.xlsx', '.xls', '.csv', '.zip']):
-                print(f"  Downloading {filename}...")
-                path = download_supplement(pmcid, filename, url)
-                if path:
-                    downloaded.append({
-                        'pmcid': pmcid,
-                        'filename': filename,
-                        'path': path
-                    })
-                    print(f"    OK Downloaded to {path}")
-        
-        time.sleep(1)  # Rate limiting
+            if url and any(ext in filename.lower() for ext in SUPP_FORMATS):
+                jobs.append({'pmcid': pmcid, 'filename': filename, 'url': url,
+                             'path': SUPP_DIR / pmcid / filename})
+    
+    print(f"\nDownloading {len(jobs)} data files ({PER_HOST_WORKERS} per host)...")
+    manager = DownloadManager()
+    downloaded = manager.download_all(jobs)
+    for entry in downloaded:
+        print(f"  OK {entry['path']} ({entry['size']} bytes)")
     
     # Save download log
-    log_path = Path("data/raw/oa_supp/download_log.json")
-    with open(log_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'downloaded': downloaded,
-            'count': len(downloaded),
-            'timestamp': time.time()
-        }, f, indent=2, ensure_ascii=False)
+    manager.save_log()
     
-    print(f"\nOK Total files downloaded: {len(downloaded)}")
-    print(f"OK Log saved to: {log_path}")
+    print(f"\nOK Total files available: {len(downloaded)} ({manager.summary()})")
+    print(f"OK Log saved to: {manager.log_path}")
+    print(HTTP.summary())
 
 if __name__ == "__main__":
     main()
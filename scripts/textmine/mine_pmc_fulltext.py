@@ -10,18 +10,48 @@ Extracts:
 - n, CI, SD if present
 - Context (temperature, pH, host, figure/table ref)
 
+All seed proteins are mined in one producer/consumer run:
+searches and XML downloads share the europe_pmc rate limit in thread pools,
+regex extraction (contrast_engine.py) runs in a process pool, and bounded
+queues between the stages apply back-pressure so memory stays flat however
+many seeds there are.
+
+Results go to data/interim/pmc_contrasts.parquet, one row per measurement
+(PMC_CONTRASTS_SCHEMA).
+
+With --corpus, nothing is fetched: articles are looked up by protein name
+in the local SQLite FTS5 store (corpus_store.py) built from the XML saved by
+previous runs, so re-running extraction after a pattern change takes seconds.
+
+Usage:
+    python scripts/textmine/mine_pmc_fulltext.py [--corpus]
+
 Author: Biological Qubit Atlas Team
 License: MIT
 """
 
+import argparse
 import requests
-import json
-import re
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import time
+import pandas as pd
+import pyarrow as pa
 import yaml
-from xml.etree import ElementTree as ET
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+sys.path.insert(0, str(Path(__file__).parent))
+from providers.http_cache import RateLimiter, cached_session
+from artifact_io import write_artifact
+from contrast_engine import STATS_FIELDS, extract_contrast_from_file, extract_contrast_from_text
+from corpus_store import CORPUS_DB, CorpusStore
 
 def load_config() -> Dict:
     """Load provider configuration."""
@@ -31,35 +61,29 @@ def load_config() -> Dict:
 CONFIG = load_config()
 PMC_CONFIG = CONFIG['europe_pmc']
 PMC_API_URL = PMC_CONFIG['api_url']
+HTTP = cached_session("pmc", CONFIG, section="europe_pmc")
+OA_DIR = Path(PMC_CONFIG['fulltext']['download_path'])
+LIMITER = RateLimiter(PMC_CONFIG['rate_limit']['requests_per_second'])
 
-# Contrast patterns (regex)
-CONTRAST_PATTERNS = [
-    # ΔF/F₀ patterns
-    (r'ΔF/F[₀0]\s*=\s*([0-9.]+)([%±]?\s*[0-9.]*)?', 'deltaF_F0'),
-    (r'dF/F[₀0]?\s*=\s*([0-9.]+)([%±]?\s*[0-9.]*)?', 'deltaF_F0'),
-    (r'ΔR/R[₀0]\s*=\s*([0-9.]+)([%±]?\s*[0-9.]*)?', 'deltaR_R0'),
-    
-    # Fold change
-    (r'([0-9.]+)[-\s]fold\s+(?:change|increase|response)', 'fold'),
-    (r'fold[-\s]change\s*[:=]?\s*([0-9.]+)', 'fold'),
-    
-    # Percent change
-    (r'([0-9.]+)%\s+(?:change|increase|response|ΔF)', 'percent'),
-    (r'percent\s+change\s*[:=]?\s*([0-9.]+)', 'percent'),
-    
-    # Dynamic range
-    (r'dynamic\s+range\s*[:=]?\s*([0-9.]+)', 'fold'),
-    (r'on/off\s+ratio\s*[:=]?\s*([0-9.]+)', 'fold'),
-]
+# Producer/consumer sizing
+MAX_ARTICLES_PER_PROTEIN = 5
+SEARCH_WORKERS = 2
+FETCH_WORKERS = 4
+EXTRACT_WORKERS = os.cpu_count() or 1
+QUEUE_SIZE = 32
+_DONE = None  # end-of-stream sentinel
 
-# Statistical info patterns
-STATS_PATTERNS = {
-    'n': r'n\s*=\s*([0-9]+)',
-    'sd': r'SD\s*=\s*([0-9.]+)',
-    'sem': r'SEM\s*=\s*([0-9.]+)',
-    'ci_low': r'\[([0-9.]+)[-–,]\s*[0-9.]+\]',  # [low, high]
-    'ci_high': r'\[[0-9.]+[-–,]\s*([0-9.]+)\]',
-}
+PMC_CONTRASTS = Path("data/interim/pmc_contrasts.parquet")
+PMC_CONTRASTS_SCHEMA = pa.schema(
+    [('protein_name', pa.string()), ('pmcid', pa.string()), ('value', pa.float64()),
+     ('metric_type', pa.string()), ('section_type', pa.string()), ('context', pa.string())]
+    + [(field, pa.float64()) for field in STATS_FIELDS])
+
+def rate_limited_get(url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+    """GET through the provider cache; only network requests consume a rate-limit slot."""
+    if not HTTP.is_cached(url, params):
+        LIMITER.wait()
+    return HTTP.get(url, params=params, **kwargs)
 
 def search_pmc_for_protein(protein_name: str, family: str = None) -> List[str]:
     """
@@ -91,7 +115,7 @@ def search_pmc_for_protein(protein_name: str, family: str = None) -> List[str]:
     }
     
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = rate_limited_get(url, params=params, timeout=30)
         if response.status_code == 200:
             data = response.json()
             if 'resultList' in data and 'result' in data['resultList']:
@@ -106,125 +130,33 @@ def search_pmc_for_protein(protein_name: str, family: str = None) -> List[str]:
         print(f"ERROR searching PMC for {protein_name}: {e}")
         return []
 
-def fetch_pmc_fulltext_xml(pmcid: str) -> Optional[str]:
+def fetch_pmc_fulltext_xml(pmcid: str) -> Optional[Path]:
     """
-    Fetch full-text XML from PMC.
+    Download full-text XML from PMC, streamed to OA_DIR/<PMCID>/fulltext.xml.
     
     Args:
         pmcid: PMC ID (e.g., 'PMC1234567')
         
     Returns:
-        XML content as string or None
+        Path of the saved XML or None
     """
     url = f"{PMC_API_URL}{pmcid}/fullTextXML"
+    xml_path = OA_DIR / pmcid / "fulltext.xml"
     
     try:
-        response = requests.get(url, timeout=30)
+        if not HTTP.is_cached(url):
+            LIMITER.wait()
+        response = HTTP.download(url, xml_path, timeout=30)
         if response.status_code == 200:
-            # Save to file
-            output_dir = Path(f"data/raw/oa/{pmcid}")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            xml_path = output_dir / "fulltext.xml"
-            xml_path.write_text(response.text, encoding='utf-8')
-            
-            return response.text
+            return xml_path
         return None
     except Exception as e:
         print(f"ERROR fetching XML for {pmcid}: {e}")
         return None
 
-def extract_contrast_from_xml(xml_content: str, pmcid: str) -> List[Dict]:
-    """
-    Extract contrast measurements from PMC XML.
-    
-    Args:
-        xml_content: Full-text XML content
-        pmcid: PMC ID
-        
-    Returns:
-        List of contrast measurements
-    """
-    measurements = []
-    
-    try:
-        root = ET.fromstring(xml_content)
-        
-        # Search in tables
-        for table in root.findall('.//table'):
-            table_text = ET.tostring(table, encoding='unicode', method='text')
-            hits = extract_contrast_from_text(table_text, pmcid, 'table')
-            measurements.extend(hits)
-        
-        # Search in paragraphs
-        for para in root.findall('.//p'):
-            para_text = ET.tostring(para, encoding='unicode', method='text')
-            hits = extract_contrast_from_text(para_text, pmcid, 'paragraph')
-            measurements.extend(hits)
-        
-        # Search in figure captions
-        for caption in root.findall('.//caption'):
-            caption_text = ET.tostring(caption, encoding='unicode', method='text')
-            hits = extract_contrast_from_text(caption_text, pmcid, 'caption')
-            measurements.extend(hits)
-    
-    except ET.ParseError as e:
-        print(f"ERROR parsing XML for {pmcid}: {e}")
-    
-    return measurements
-
-def extract_contrast_from_text(text: str, pmcid: str, section_type: str) -> List[Dict]:
-    """
-    Extract contrast values from text using regex patterns.
-    
-    Args:
-        text: Text to search
-        pmcid: PMC ID
-        section_type: Type of section (table/paragraph/caption)
-        
-    Returns:
-        List of measurements
-    """
-    measurements = []
-    
-    for pattern, metric_type in CONTRAST_PATTERNS:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            value_str = match.group(1)
-            try:
-                value = float(value_str)
-                
-                # Extract statistical info nearby (±50 chars)
-                start = max(0, match.start() - 50)
-                end = min(len(text), match.end() + 50)
-                context = text[start:end]
-                
-                stats = {}
-                for stat_name, stat_pattern in STATS_PATTERNS.items():
-                    stat_match = re.search(stat_pattern, context, re.IGNORECASE)
-                    if stat_match:
-                        stats[stat_name] = float(stat_match.group(1))
-                
-                measurements.append({
-                    'value': value,
-                    'metric_type': metric_type,
-                    'pmcid': pmcid,
-                    'section_type': section_type,
-                    'context': context.strip(),
-                    'n': stats.get('n'),
-                    'sd': stats.get('sd'),
-                    'sem': stats.get('sem'),
-                    'ci_low': stats.get('ci_low'),
-                    'ci_high': stats.get('ci_high')
-                })
-            except ValueError:
-                continue
-    
-    return measurements
-
 def mine_protein_contrasts(protein_name: str, family: str = None) -> List[Dict]:
     """
-    Mine contrast measurements for a protein.
+    Mine contrast measurements for a single protein, sequentially.
     
     Args:
         protein_name: Name of the protein
@@ -246,21 +178,208 @@ def mine_protein_contrasts(protein_name: str, family: str = None) -> List[Dict]:
     all_measurements = []
     
     # Fetch and mine each article
-    for pmcid in pmcids[:5]:  # Limit to 5 articles per protein
+    for pmcid in pmcids[:MAX_ARTICLES_PER_PROTEIN]:
         print(f"  Mining {pmcid}...")
         
-        xml_content = fetch_pmc_fulltext_xml(pmcid)
-        if xml_content:
-            measurements = extract_contrast_from_xml(xml_content, pmcid)
+        xml_path = fetch_pmc_fulltext_xml(pmcid)
+        if xml_path:
+            measurements = extract_contrast_from_file(xml_path, pmcid)
             all_measurements.extend(measurements)
             print(f"    Found {len(measurements)} measurements")
-        
-        time.sleep(1)  # Rate limiting
     
     return all_measurements
 
+class ThroughputCounter:
+    """Live progress line (searches, articles/s, MB/s, measurements), at most once per `interval`."""
+    
+    def __init__(self, total_seeds: int, interval: float = 1.0):
+        self.total_seeds = total_seeds
+        self.interval = interval
+        self.counts = {'searches': 0, 'articles': 0, 'bytes': 0, 'measurements': 0}
+        self.start = time.monotonic()
+        self.last_report = self.start
+        self._lock = threading.Lock()
+    
+    def add(self, **counts: int):
+        with self._lock:
+            for name, value in counts.items():
+                self.counts[name] += value
+    
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        c = self.counts
+        return (f"  [{elapsed:6.1f}s] searches {c['searches']}/{self.total_seeds} | "
+                f"articles {c['articles']} ({c['articles'] / elapsed:.2f}/s, "
+                f"{c['bytes'] / elapsed / 1e6:.2f} MB/s) | measurements {c['measurements']}")
+    
+    def report(self, force: bool = False):
+        now = time.monotonic()
+        if force or now - self.last_report >= self.interval:
+            self.last_report = now
+            print(self.line(), flush=True)
+
+def _start_threads(target, count: int, name: str) -> List[threading.Thread]:
+    # Daemon threads: a consumer failure must not leave producers blocked on a full queue
+    threads = [threading.Thread(target=target, name=f"{name}-{i}", daemon=True) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def mine_all_proteins(seeds: List[Dict], search_workers: int = None, fetch_workers: int = None,
+                      extract_workers: int = None) -> Dict[str, List[Dict]]:
+    """
+    Mine contrast measurements for every seed protein in one pipelined run.
+    
+    search threads -> [articles queue] -> download threads -> [documents queue]
+    -> extraction process pool. Both queues are bounded (QUEUE_SIZE) and at most
+    2 x extract_workers articles are parsed at once, so a slow stage throttles
+    the ones before it. Articles shared by several proteins are downloaded and
+    parsed once.
+    
+    Args:
+        seeds: Rows of seed/seed_fp_names.csv (name, family)
+        search_workers: Concurrent PMC searches (default SEARCH_WORKERS)
+        fetch_workers: Concurrent XML downloads (default FETCH_WORKERS)
+        extract_workers: Extraction processes (default EXTRACT_WORKERS)
+        
+    Returns:
+        Dict protein name -> measurements, in seed order (proteins without hits omitted)
+    """
+    search_workers = search_workers or SEARCH_WORKERS
+    fetch_workers = fetch_workers or FETCH_WORKERS
+    extract_workers = extract_workers or EXTRACT_WORKERS
+    
+    todo: "queue.Queue" = queue.Queue()
+    articles: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+    documents: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+    hits: Dict[str, List[str]] = {}
+    seen = set()
+    lock = threading.Lock()
+    counter = ThroughputCounter(len(seeds))
+    
+    for seed in seeds:
+        todo.put(seed)
+    for _ in range(search_workers):
+        todo.put(_DONE)
+    
+    def search():
+        while (seed := todo.get()) is not _DONE:
+            pmcids = search_pmc_for_protein(seed['name'], seed.get('family'))[:MAX_ARTICLES_PER_PROTEIN]
+            with lock:
+                hits[seed['name']] = pmcids
+                new = [pmcid for pmcid in pmcids if pmcid not in seen]
+                seen.update(new)
+            counter.add(searches=1)
+            for pmcid in new:
+                articles.put(pmcid)
+    
+    def download():
+        while (pmcid := articles.get()) is not _DONE:
+            xml_path = fetch_pmc_fulltext_xml(pmcid)
+            if xml_path:
+                documents.put((pmcid, xml_path))
+        documents.put(_DONE)
+    
+    def close_articles(searchers: List[threading.Thread]):
+        for thread in searchers:
+            thread.join()
+        for _ in range(fetch_workers):
+            articles.put(_DONE)
+    
+    searchers = _start_threads(search, search_workers, "pmc-search")
+    threading.Thread(target=close_articles, args=(searchers,), daemon=True).start()
+    _start_threads(download, fetch_workers, "pmc-fetch")
+    
+    extracted: Dict[str, List[Dict]] = {}
+    max_in_flight = 2 * extract_workers
+    downloads_left = fetch_workers
+    in_flight = {}
+    
+    # spawn: forking a process that already runs network threads is unsafe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=extract_workers, mp_context=context) as pool:
+        while downloads_left or in_flight:
+            accepting = downloads_left and len(in_flight) < max_in_flight
+            if accepting:
+                try:
+                    item = documents.get(timeout=0.05)
+                except queue.Empty:
+                    item = None
+                else:
+                    if item is _DONE:
+                        downloads_left -= 1
+                    else:
+                        # Only the path crosses the process boundary; workers stream the file
+                        pmcid, xml_path = item
+                        in_flight[pool.submit(extract_contrast_from_file, xml_path, pmcid)] = pmcid
+                        counter.add(articles=1, bytes=xml_path.stat().st_size)
+            
+            if in_flight:
+                done, _ = wait(in_flight, timeout=0 if accepting else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    pmcid = in_flight.pop(future)
+                    try:
+                        extracted[pmcid] = future.result()
+                    except Exception as e:
+                        print(f"ERROR extracting contrasts from {pmcid}: {e}")
+                        extracted[pmcid] = []
+                    counter.add(measurements=len(extracted[pmcid]))
+            counter.report()
+    
+    counter.report(force=True)
+    
+    results = {}
+    for seed in seeds:
+        measurements = [m for pmcid in hits.get(seed['name'], []) for m in extracted.get(pmcid, [])]
+        if measurements:
+            results[seed['name']] = measurements
+    return results
+
+def mine_from_corpus(seeds: List[Dict], store: CorpusStore) -> Dict[str, List[Dict]]:
+    """
+    Mine all seed proteins from the local corpus store, without network access.
+    
+    Each seed gets the MAX_ARTICLES_PER_PROTEIN stored articles that mention
+    its name (best bm25 match first); each article is extracted once from its
+    stored section text, however many seeds share it.
+    
+    Args:
+        seeds: Seed rows (dicts with 'name')
+        store: Indexed corpus store
+        
+    Returns:
+        {protein name: measurements}, in seed order
+    """
+    extracted = {}
+    results = {}
+    
+    for seed in seeds:
+        measurements = []
+        for pmcid in store.articles_mentioning(seed['name'], limit=MAX_ARTICLES_PER_PROTEIN):
+            if pmcid not in extracted:
+                extracted[pmcid] = [m for passage in store.sections(pmcid)
+                                    for m in extract_contrast_from_text(passage.text, pmcid,
+                                                                        passage.section_type)]
+            measurements.extend(extracted[pmcid])
+        if measurements:
+            results[seed['name']] = measurements
+    
+    print(f"Extracted {len(extracted)} stored articles")
+    return results
+
+def contrasts_frame(results: Dict[str, List[Dict]]) -> pd.DataFrame:
+    """One row per measurement (PMC_CONTRASTS_SCHEMA columns), in protein then extraction order."""
+    rows = [{**m, 'protein_name': name} for name, measurements in results.items() for m in measurements]
+    return pd.DataFrame(rows, columns=PMC_CONTRASTS_SCHEMA.names)
+
 def main():
     """Main miner."""
+    parser = argparse.ArgumentParser(description="PMC Full-Text Contrast Miner")
+    parser.add_argument('--corpus', action='store_true',
+                        help=f"Mine the local corpus store ({CORPUS_DB}) instead of Europe PMC")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("PMC Full-Text Contrast Miner v1.3")
     print("=" * 60)
@@ -278,26 +397,30 @@ def main():
     
     print(f"Mining {len(seeds)} proteins...")
     
-    all_results = {}
-    
-    for seed in seeds[:20]:  # Process first 20 for now
-        name = seed['name']
-        family = seed.get('family')
-        
-        measurements = mine_protein_contrasts(name, family)
-        if measurements:
-            all_results[name] = measurements
+    if args.corpus:
+        with CorpusStore(CORPUS_DB) as store:
+            if not store.refresh(OA_DIR):
+                print(f"ERROR: corpus store {CORPUS_DB} is empty and no full text was found "
+                      f"under {OA_DIR}; run without --corpus first to download it")
+                return
+            articles, sections = store.stats()
+            print(f"Corpus store: {articles} articles, {sections} sections")
+            all_results = mine_from_corpus(seeds, store)
+    else:
+        all_results = mine_all_proteins(seeds)
+        # Keep the local corpus in step with the XML just downloaded
+        with CorpusStore(CORPUS_DB) as store:
+            indexed, skipped = store.index_corpus(OA_DIR)
+            print(f"Corpus store: {indexed} articles indexed, {skipped} unchanged")
     
     # Save results
-    output_path = Path("data/interim/pmc_contrasts.json")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, indent=2, ensure_ascii=False)
+    output_path = write_artifact(contrasts_frame(all_results), PMC_CONTRASTS, PMC_CONTRASTS_SCHEMA)
     
     total_measurements = sum(len(m) for m in all_results.values())
     print(f"\nOK Total measurements extracted: {total_measurements}")
     print(f"OK Saved to: {output_path}")
+    if not args.corpus:
+        print(HTTP.summary())
 
 if __name__ == "__main__":
     main()
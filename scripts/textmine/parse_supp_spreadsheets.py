@@ -8,14 +8,34 @@ Parse contrast data from Excel/CSV supplementary files.
 Auto-detects columns with synonyms:
 - ΔF/F₀, dF/F0, delta_f_over_f0, fold_change, percent_change, etc.
 
+Columns are detected from each sheet's header alone; only the detected
+columns are then read (usecols) and converted column-wise with
+pd.to_numeric(errors='coerce'), giving one measurements DataFrame per file.
+
+Files are parsed in a process pool. Each file's sheets are cached as Parquet
+under data/cache/supp_sheets/, keyed by the file's SHA256 and the sheet, so
+unchanged supplements are never re-opened. Results are appended file by file
+(one row group each) to data/interim/supplement_contrasts.parquet.
+
+Usage:
+    python scripts/textmine/parse_supp_spreadsheets.py [--workers N]
+
 Author: Biological Qubit Atlas Team
 License: MIT
 """
 
+import argparse
+import hashlib
 import json
-from typing import Dict, List, Optional
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import re
 
 # Column synonyms for contrast metrics
@@ -67,95 +87,328 @@ def detect_column(df: pd.DataFrame, synonyms: List[str]) -> Optional[str]:
     
     return None
 
-def parse_spreadsheet(file_path: Path, pmcid: str) -> List[Dict]:
+# Output columns, in order
+MEASUREMENT_COLUMNS = [
+    'value', 'metric_type', 'protein_name', 'pmcid', 'source_file', 'sheet', 'row',
+    'n', 'sd', 'sem', 'ci_low', 'ci_high', 'evidence_type'
+]
+MEASUREMENT_SCHEMA = pa.schema([
+    ('value', pa.float64()), ('metric_type', pa.string()), ('protein_name', pa.string()),
+    ('pmcid', pa.string()), ('source_file', pa.string()), ('sheet', pa.string()),
+    ('row', pa.int64()), ('n', pa.float64()), ('sd', pa.float64()), ('sem', pa.float64()),
+    ('ci_low', pa.float64()), ('ci_high', pa.float64()), ('evidence_type', pa.string()),
+])
+
+DOWNLOAD_LOG = Path("data/raw/oa_supp/download_log.json")
+OUTPUT_PATH = Path("data/interim/supplement_contrasts.parquet")
+# Bump PARSER_VERSION whenever detection/extraction changes: old entries are then ignored
+PARSER_VERSION = 1
+SHEET_CACHE_DIR = Path("data/cache/supp_sheets") / f"v{PARSER_VERSION}"
+HASH_CHUNK = 1024 * 1024
+
+def detect_columns(df: pd.DataFrame) -> Optional[Dict]:
     """
-    Parse contrast data from a spreadsheet.
+    Detect the name, contrast and stats columns of a sheet from its header.
+    
+    Args:
+        df: DataFrame (only its columns are used, so a header-only read is enough)
+        
+    Returns:
+        {'name', 'contrast', 'metric_type', 'stats'} or None if no contrast column
+    """
+    # Detect contrast column
+    for metric, synonyms in CONTRAST_COLUMN_SYNONYMS.items():
+        contrast_col = detect_column(df, synonyms)
+        if contrast_col:
+            break
+    else:
+        return None  # No contrast data in this sheet
+    
+    # Detect stats columns
+    stats_cols = {}
+    for stat_name, synonyms in STATS_COLUMN_SYNONYMS.items():
+        col = detect_column(df, synonyms)
+        if col:
+            stats_cols[stat_name] = col
+    
+    return {
+        'name': detect_column(df, NAME_COLUMN_SYNONYMS),
+        'contrast': contrast_col,
+        'metric_type': metric,
+        'stats': stats_cols
+    }
+
+def extract_measurements(df: pd.DataFrame, columns: Dict, pmcid: str,
+                         source_file: str, sheet_name: str) -> pd.DataFrame:
+    """
+    Build the measurements of a sheet column-wise.
+    
+    Cells are converted with pd.to_numeric(errors='coerce'); rows whose
+    contrast value is not numeric are dropped, non-numeric stats become NaN.
+    
+    Args:
+        df: Sheet data (at least the columns in `columns`)
+        columns: Result of detect_columns()
+        pmcid: PMC ID for provenance
+        source_file: Spreadsheet file name
+        sheet_name: Sheet name
+        
+    Returns:
+        DataFrame with MEASUREMENT_COLUMNS, one row per measurement
+    """
+    values = pd.to_numeric(df[columns['contrast']], errors='coerce')
+    keep = values.notna().to_numpy()
+    
+    out = pd.DataFrame({
+        'value': values.to_numpy()[keep],
+        'metric_type': columns['metric_type'],
+        'protein_name': df[columns['name']].to_numpy()[keep] if columns['name'] else None,
+        'pmcid': pmcid,
+        'source_file': source_file,
+        'sheet': sheet_name,
+        'row': df.index.to_numpy()[keep] + 2,  # Excel row number
+    })
+    for stat_name in STATS_COLUMN_SYNONYMS:
+        stat_col = columns['stats'].get(stat_name)
+        out[stat_name] = (pd.to_numeric(df[stat_col], errors='coerce').to_numpy()[keep]
+                          if stat_col else float('nan'))
+    out['evidence_type'] = 'supplement_table'
+    
+    return out[MEASUREMENT_COLUMNS]
+
+def read_sheets(file_path: Path):
+    """
+    Yield (sheet name, header-only reader, full reader) for each sheet of a spreadsheet.
+    
+    The full reader takes `usecols` so only the detected columns are parsed.
+    """
+    if file_path.suffix.lower() in ['.xlsx', '.xls']:
+        # Try all sheets
+        xls = pd.ExcelFile(file_path)
+        for sheet in xls.sheet_names:
+            yield (sheet,
+                   lambda sheet=sheet: pd.read_excel(xls, sheet, nrows=0),
+                   lambda usecols, sheet=sheet: pd.read_excel(xls, sheet, usecols=usecols))
+    else:
+        yield ('data',
+               lambda: pd.read_csv(file_path, nrows=0),
+               lambda usecols: pd.read_csv(file_path, usecols=usecols))
+
+def parse_sheets(file_path: Path, pmcid: str) -> List[Tuple[str, pd.DataFrame]]:
+    """
+    Parse every sheet of a spreadsheet.
+    
+    Each sheet's header is read first; only the columns picked by
+    detect_column are then loaded.
     
     Args:
         file_path: Path to Excel or CSV file
         pmcid: PMC ID for provenance
         
     Returns:
-        List of extracted contrast measurements
+        (sheet name, measurements) for every sheet, in workbook order (empty
+        DataFrame for sheets without contrast data)
+    """
+    sheets = []
+    
+    for sheet_name, read_header, read_columns in read_sheets(file_path):
+        frame = pd.DataFrame(columns=MEASUREMENT_COLUMNS)
+        sheets.append((sheet_name, frame))
+        
+        header = read_header()
+        # Skip if too narrow
+        if header.shape[1] < 2:
+            continue
+        
+        columns = detect_columns(header)
+        if columns is None:
+            continue
+        
+        usecols = list(dict.fromkeys(
+            [c for c in (columns['name'], columns['contrast']) if c] +
+            list(columns['stats'].values())))
+        df = read_columns(usecols)
+        # Skip if too small
+        if df.shape[0] < 2:
+            continue
+        
+        sheets[-1] = (sheet_name, extract_measurements(df, columns, pmcid, file_path.name, sheet_name))
+    
+    return sheets
+
+def concat_measurements(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate measurement frames (empty frame with MEASUREMENT_COLUMNS if none)."""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=MEASUREMENT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+def parse_spreadsheet_frame(file_path: Path, pmcid: str) -> pd.DataFrame:
     """
-    measurements = []
+    Parse contrast data from a spreadsheet into a DataFrame.
     
+    Args:
+        file_path: Path to Excel or CSV file
+        pmcid: PMC ID for provenance
+        
+    Returns:
+        DataFrame with MEASUREMENT_COLUMNS (empty if nothing was found)
+    """
     try:
-        # Load spreadsheet
-        if file_path.suffix.lower() in ['.xlsx', '.xls']:
-            # Try all sheets
-            xls = pd.ExcelFile(file_path)
-            sheets = {sheet: pd.read_excel(xls, sheet) for sheet in xls.sheet_names}
-        else:
-            sheets = {'data': pd.read_csv(file_path)}
+        sheets = parse_sheets(file_path, pmcid)
+    except Exception as e:
+        print(f"ERROR parsing {file_path}: {e}")
+        return concat_measurements([])
+    
+    return concat_measurements([frame for _, frame in sheets])
+
+def parse_spreadsheet(file_path: Path, pmcid: str) -> List[Dict]:
+    """
+    Parse contrast data from a spreadsheet.
+    
+    Args:
+        file_path: Path to Excel or CSV file
+        pmcid: PMC ID for provenance
         
-        # Process each sheet
-        for sheet_name, df in sheets.items():
-            # Skip if too small
-            if df.shape[0] < 2 or df.shape[1] < 2:
-                continue
-            
-            # Detect protein name column
-            name_col = detect_column(df, NAME_COLUMN_SYNONYMS)
-            
-            # Detect contrast column
-            contrast_col = None
-            metric_type = None
-            for metric, synonyms in CONTRAST_COLUMN_SYNONYMS.items():
-                col = detect_column(df, synonyms)
-                if col:
-                    contrast_col = col
-                    metric_type = metric
-                    break
-            
-            if not contrast_col:
-                continue  # No contrast data in this sheet
-            
-            # Detect stats columns
-            stats_cols = {}
-            for stat_name, synonyms in STATS_COLUMN_SYNONYMS.items():
-                col = detect_column(df, synonyms)
-                if col:
-                    stats_cols[stat_name] = col
-            
-            # Extract rows
-            for idx, row in df.iterrows():
-                try:
-                    value = float(row[contrast_col])
-                    
-                    # Get name if available
-                    name = row[name_col] if name_col else None
-                    
-                    # Get stats if available
-                    stats = {}
-                    for stat_name, stat_col in stats_cols.items():
-                        try:
-                            stats[stat_name] = float(row[stat_col])
-                        except:
-                            pass
-                    
-                    measurements.append({
-                        'value': value,
-                        'metric_type': metric_type,
-                        'protein_name': name,
-                        'pmcid': pmcid,
-                        'source_file': file_path.name,
-                        'sheet': sheet_name,
-                        'row': idx + 2,  # Excel row number
-                        'n': stats.get('n'),
-                        'sd': stats.get('sd'),
-                        'sem': stats.get('sem'),
-                        'ci_low': stats.get('ci_low'),
-                        'ci_high': stats.get('ci_high'),
-                        'evidence_type': 'supplement_table'
-                    })
-                except (ValueError, TypeError):
-                    continue
+    Returns:
+        List of extracted contrast measurements (missing fields are None)
+    """
+    return records(parse_spreadsheet_frame(file_path, pmcid))
+
+def records(frame: pd.DataFrame) -> List[Dict]:
+    """Measurement dicts from a measurements DataFrame (NaN -> None)."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+def to_table(frame: pd.DataFrame) -> pa.Table:
+    """Arrow table with MEASUREMENT_SCHEMA (protein names as strings)."""
+    frame = frame.copy()
+    names = frame['protein_name']
+    frame['protein_name'] = names.where(names.isna(), names.astype(str))
+    frame = frame.astype({'value': float, 'n': float, 'sd': float, 'sem': float,
+                          'ci_low': float, 'ci_high': float})
+    return pa.Table.from_pandas(frame[MEASUREMENT_COLUMNS], schema=MEASUREMENT_SCHEMA,
+                                preserve_index=False)
+
+def file_sha256(path: Path) -> str:
+    """SHA256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def supplement_hash(item: Dict) -> str:
+    """
+    SHA256 of a logged supplement: taken from its download_log.json entry
+    when size and mtime still match, otherwise computed from the file.
+    """
+    path = Path(item['path'])
+    st = path.stat()
+    if item.get('sha256') and item.get('size') == st.st_size and item.get('mtime_ns') == st.st_mtime_ns:
+        return item['sha256']
+    return file_sha256(path)
+
+def load_cached_sheets(file_hash: str, cache_dir: Path) -> Optional[List[Tuple[str, pd.DataFrame]]]:
+    """Cached (sheet name, measurements) of a file, or None if not (fully) cached."""
+    entry = cache_dir / file_hash
+    try:
+        sheet_names = json.loads((entry / "sheets.json").read_text(encoding='utf-8'))
+        return [(name, pq.read_table(entry / f"{i:03d}.parquet").to_pandas())
+                for i, name in enumerate(sheet_names)]
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+def store_cached_sheets(file_hash: str, sheets: List[Tuple[str, pd.DataFrame]], cache_dir: Path):
+    """Cache each sheet's measurements as Parquet; sheets.json is written last (completeness marker)."""
+    entry = cache_dir / file_hash
+    entry.mkdir(parents=True, exist_ok=True)
+    for i, (_, frame) in enumerate(sheets):
+        tmp = entry / f"{i:03d}.parquet.{os.getpid()}.tmp"
+        pq.write_table(to_table(frame), tmp)
+        os.replace(tmp, entry / f"{i:03d}.parquet")
+    tmp = entry / f"sheets.json.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps([name for name, _ in sheets], ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, entry / "sheets.json")
+
+def parse_supplement(item: Dict, cache_dir: Path = SHEET_CACHE_DIR) -> Tuple[pd.DataFrame, bool]:
+    """
+    Measurements of one download_log.json entry, through the sheet cache.
     
+    Runs in the worker processes.
+    
+    Args:
+        item: Log entry ('path', 'pmcid', optionally 'sha256'/'size'/'mtime_ns')
+        cache_dir: Parsed-sheet cache root
+        
+    Returns:
+        (measurements, True if served from the cache)
+    """
+    file_path = Path(item['path'])
+    try:
+        file_hash = supplement_hash(item)
+        sheets = load_cached_sheets(file_hash, cache_dir)
+        cached = sheets is not None
+        if not cached:
+            sheets = parse_sheets(file_path, item['pmcid'])
     except Exception as e:
         print(f"ERROR parsing {file_path}: {e}")
+        return concat_measurements([]), False
+    if not cached:
+        store_cached_sheets(file_hash, sheets, cache_dir)
+    
+    frame = concat_measurements([frame for _, frame in sheets])
+    # Same bytes may be logged under another article or file name
+    frame['pmcid'] = item['pmcid']
+    frame['source_file'] = file_path.name
+    return frame, cached
+
+def parse_all_supplements(items: List[Dict], output_path: Path = OUTPUT_PATH,
+                          cache_dir: Path = SHEET_CACHE_DIR,
+                          workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Parse all logged supplements in a process pool and stream them to Parquet.
+    
+    Each file's measurements are appended as one row group, in download-log
+    order (results finished early are held until their turn), so the output
+    is identical between runs; it is renamed into place once complete.
+    
+    Args:
+        items: download_log.json entries
+        output_path: Parquet output
+        cache_dir: Parsed-sheet cache root
+        workers: Worker processes (default: CPU count; 1 parses in-process)
+        
+    Returns:
+        Counts: files, cached, measurements
+    """
+    items = [item for item in items if Path(item['path']).exists()]
+    workers = min(workers or os.cpu_count() or 1, max(len(items), 1))
+    counts = {'files': len(items), 'cached': 0, 'measurements': 0}
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(f"{output_path.name}.part")
+    with pq.ParquetWriter(tmp, MEASUREMENT_SCHEMA) as writer:
+        def append(item, result):
+            frame, cached = result
+            counts['cached'] += cached
+            counts['measurements'] += len(frame)
+            if len(frame):
+                writer.write_table(to_table(frame))
+                print(f"  {Path(item['path']).name}: {len(frame)} measurements"
+                      f"{' (cached)' if cached else ''}")
+        
+        if workers == 1:
+            for item in items:
+                append(item, parse_supplement(item, cache_dir))
+        else:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = pool.map(parse_supplement, items, [cache_dir] * len(items))
+                for item, result in zip(items, results):
+                    append(item, result)
     
-    return measurements
+    os.replace(tmp, output_path)
+    return counts
 
 def main():
     """Main parser."""
@@ -163,50 +416,30 @@ def main():
     print("Supplementary Spreadsheet Parser v1.3")
     print("=" * 60)
     
+    parser = argparse.ArgumentParser(description="Parse supplementary spreadsheets")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    
     # Load download log
-    log_path = Path("data/raw/oa_supp/download_log.json")
-    if not log_path.exists():
+    if not DOWNLOAD_LOG.exists():
         print("ERROR: No download log found")
         print("Run scripts/textmine/fetch_supplements.py first")
         return
     
-    with open(log_path, 'r', encoding='utf-8') as f:
+    with open(DOWNLOAD_LOG, 'r', encoding='utf-8') as f:
         log_data = json.load(f)
     
     downloaded = log_data.get('downloaded', [])
     print(f"Processing {len(downloaded)} supplementary files...")
     
-    all_measurements = []
+    start = time.perf_counter()
+    counts = parse_all_supplements(downloaded, workers=args.workers)
     
-    for item in downloaded:
-        file_path = Path(item['path'])
-        pmcid = item['pmcid']
-        
-        if not file_path.exists():
-            continue
-        
-        print(f"\nParsing {file_path.name}...")
-        measurements = parse_spreadsheet(file_path, pmcid)
-        
-        if measurements:
-            all_measurements.extend(measurements)
-            print(f"  Found {len(measurements)} measurements")
-    
-    # Save results
-    output_path = Path("data/interim/supplement_contrasts.json")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'measurements': all_measurements,
-            'count': len(all_measurements),
-            'timestamp': time.time()
-        }, f, indent=2, ensure_ascii=False)
-    
-    print(f"\nOK Total measurements extracted: {len(all_measurements)}")
-    print(f"OK Saved to: {output_path}")
+    print(f"\nOK Total measurements extracted: {counts['measurements']} "
+          f"({counts['files']} files, {counts['cached']} from cache, "
+          f"{time.perf_counter() - start:.1f}s)")
+    print(f"OK Saved to: {OUTPUT_PATH}")
 
 if __name__ == "__main__":
-    import time
     main()
-
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Service HTTP local (lecture seule) de requêtes sur l'atlas
+Licence: MIT
+
+Endpoints (GET uniquement) :
+    /health                       état du service
+    /families                     nombre de systèmes par famille
+    /systems?<critères>           recherche (voir parse_query)
+    /systems/<canonical_name>     un système par nom
+
+Critères : name, family (répétables ou séparés par des virgules),
+excitation_min/max, emission_min/max, contrast_min/max, columns, limit.
+Formats (format=) : json (défaut), ndjson (une ligne par système, lisible
+au fil de l'eau), arrow (flux Arrow IPC, application/vnd.apache.arrow.stream).
+
+Les recherches passent par les index de scripts/etl/atlas_query.py ; les
+réponses encodées sont gardées dans un cache LRU par (requête, format).
+
+Usage:
+    python scripts/web/atlas_service.py [--table training_v2_2] [--port 8765]
+"""
+
+import argparse
+import functools
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+from atlas_query import DEFAULT_TABLE, AtlasQuery, Query
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+RANGE_PARAMS = {
+    'excitation_nm': ('excitation_min', 'excitation_max'),
+    'emission_nm': ('emission_min', 'emission_max'),
+    'contrast_normalized': ('contrast_min', 'contrast_max'),
+}
+BATCH_ROWS = 1024
+
+class BadRequest(ValueError):
+    """Paramètre de requête invalide (réponse 400)"""
+
+def _values(params: Dict[str, List[str]], key: str) -> Tuple[str, ...]:
+    """Valeurs d'un paramètre répétable (virgules acceptées), triées"""
+    items = [v.strip() for raw in params.get(key, []) for v in raw.split(',')]
+    return tuple(sorted({v for v in items if v}))
+
+def _number(params: Dict[str, List[str]], key: str, cast=float):
+    if key not in params:
+        return None
+    try:
+        return cast(params[key][-1])
+    except ValueError:
+        raise BadRequest(f"{key} invalide : {params[key][-1]!r}")
+
+def parse_query(query_string: str) -> Tuple[Query, str]:
+    """
+    Requête et format d'une query string (forme canonique pour le cache).
+
+    Raises:
+        BadRequest: Nombre, limite ou format invalide
+    """
+    params = parse_qs(query_string)
+    ranges = {column: (_number(params, low), _number(params, high))
+              for column, (low, high) in RANGE_PARAMS.items()}
+    limit = _number(params, 'limit', int)
+    if limit is not None and limit < 0:
+        raise BadRequest("limit doit être positif")
+    fmt = params.get('format', ['json'])[-1]
+    if fmt not in CONTENT_TYPES:
+        raise BadRequest(f"format inconnu : {fmt} ({', '.join(CONTENT_TYPES)})")
+
+    columns = None
+    if 'columns' in params:
+        columns = tuple(c for raw in params['columns'] for c in raw.split(',') if c.strip())
+    query = Query(names=_values(params, 'name'), families=_values(params, 'family'),
+                  columns=columns, limit=limit, **ranges)
+    return query, fmt
+
+def encode(table: pa.Table, fmt: str) -> Tuple[bytes, ...]:
+    """Corps de réponse en morceaux (un par lot de BATCH_ROWS lignes)"""
+    batches = table.to_batches(max_chunksize=BATCH_ROWS)
+    if fmt == 'arrow':
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return (sink.getvalue().to_pybytes(),)
+
+    # to_pylist + json : valeurs exactes, plus rapide que pandas.to_json sur
+    # les petits résultats typiques d'une recherche
+    records = [batch.to_pylist() for batch in batches if batch.num_rows]
+    if fmt == 'ndjson':
+        return tuple(''.join(json.dumps(r) + '\n' for r in batch).encode('utf-8') for batch in records)
+    body = ','.join(json.dumps(batch)[1:-1] for batch in records)
+    return (b'[', body.encode('utf-8'), b']')
+
+class AtlasService:
+    """Moteur de requêtes + cache LRU des réponses encodées"""
+
+    def __init__(self, engine: AtlasQuery, cache_size: int = 4096):
+        self.engine = engine
+        self.response = functools.lru_cache(maxsize=cache_size)(self._response)
+
+    def _response(self, query: Query, fmt: str) -> Tuple[str, Tuple[bytes, ...]]:
+        return CONTENT_TYPES[fmt], encode(self.engine.select(query), fmt)
+
+    def handle(self, path: str) -> Tuple[int, str, Tuple[bytes, ...]]:
+        """
+        Réponse (statut, content-type, morceaux) à un GET.
+
+        Returns:
+            404 pour un chemin ou un nom inconnu, 400 pour un paramètre invalide
+        """
+        url = urlsplit(path)
+        route = url.path.rstrip('/')
+        if route == '/health':
+            return self._json(200, {'status': 'ok', 'rows': self.engine.num_rows,
+                                    'cache': self.response.cache_info()._asdict()})
+        if route == '/families':
+            return self._json(200, self.engine.families())
+        if route != '/systems' and not route.startswith('/systems/'):
+            return self._json(404, {'error': f"chemin inconnu : {url.path}"})
+
+        try:
+            query, fmt = parse_query(url.query)
+            name = unquote(route[len('/systems/'):]) if route.startswith('/systems/') else None
+            if name is not None:
+                query = Query(**{**query.__dict__, 'names': (name,)})
+            content_type, chunks = self.response(query, fmt)
+        except ValueError as e:
+            return self._json(400, {'error': str(e)})
+        if name is not None and not self.engine.positions(query).size:
+            return self._json(404, {'error': f"système inconnu : {name}"})
+        return 200, content_type, chunks
+
+    @staticmethod
+    def _json(status: int, payload) -> Tuple[int, str, Tuple[bytes, ...]]:
+        return status, CONTENT_TYPES['json'], (json.dumps(payload).encode('utf-8'),)
+
+def make_handler(service: AtlasService, verbose: bool = False):
+    """Classe de handler HTTP liée au service (keep-alive HTTP/1.1)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, Nagle
+        # et l'ACK retardé du client ajoutent ~40 ms par réponse
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            status, content_type, chunks = service.handle(self.path)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(sum(len(c) for c in chunks)))
+            self.end_headers()
+            for chunk in chunks:
+                self.wfile.write(chunk)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+def make_server(table: str = DEFAULT_TABLE, host: str = "127.0.0.1", port: int = 8765,
+                cache_size: int = 4096, verbose: bool = False) -> ThreadingHTTPServer:
+    """Serveur prêt à servir (port 0 = port libre, voir server.server_address)"""
+    service = AtlasService(AtlasQuery.from_table(table, cache_size=cache_size), cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service, verbose))
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP local de requêtes sur l'atlas")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help="Nom dans atlas_dataset.TABLES ou chemin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=4096, help="Requêtes gardées dans le cache LRU")
+    parser.add_argument("--verbose", action="store_true", help="Journaliser chaque requête")
+    args = parser.parse_args()
+
+    server = make_server(args.table, args.host, args.port, args.cache_size, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"[OK] Atlas {args.table} ({server.service.engine.num_rows} systemes) sur http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Atlas Service Load Test
+=======================
+Mesure le débit (requêtes/s) et la latence (p50/p99) du service de requêtes.
+
+1. In-process (sans HTTP) : index + encodage, sans puis avec cache LRU
+2. HTTP : le service est lancé dans un sous-processus (ou --url), puis
+   --clients processus clients enchaînent des GET en keep-alive
+
+Les requêtes sont tirées d'un jeu de --distinct requêtes construites depuis
+la table (noms, familles, intervalles d'excitation/émission, seuils de
+contraste), avec une répartition Zipf (quelques requêtes très fréquentes).
+
+Usage:
+    python scripts/web/bench_atlas_service.py --requests 20000 --clients 4
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "etl"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atlas_query import DEFAULT_TABLE, AtlasQuery  # noqa: E402
+from atlas_service import AtlasService  # noqa: E402
+
+def build_queries(engine: AtlasQuery, n: int, seed: int = 0) -> List[str]:
+    """n query strings variées tirées des valeurs de la table."""
+    rng = np.random.default_rng(seed)
+    df = engine.table.to_pandas()
+    names = df['canonical_name'].dropna().unique()
+    families = df['family'].dropna().unique()
+    queries = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            params = {'name': rng.choice(names)}
+        elif kind == 1:
+            params = {'family': rng.choice(families), 'columns': 'canonical_name,emission_nm,contrast_normalized'}
+        elif kind == 2:
+            low = int(rng.integers(350, 650))
+            params = {'excitation_min': low, 'excitation_max': low + int(rng.integers(10, 80)),
+                      'emission_min': low + 10}
+        else:
+            params = {'family': rng.choice(families), 'contrast_min': round(float(rng.uniform(1, 10)), 1)}
+        queries.append(urlencode(params))
+    return queries
+
+def zipf_sequence(n_queries: int, n_requests: int, seed: int = 1) -> np.ndarray:
+    """Indices de requêtes (loi de Zipf tronquée, a=1.1)."""
+    ranks = np.arange(1, n_queries + 1)
+    weights = 1.0 / ranks ** 1.1
+    return np.random.default_rng(seed).choice(n_queries, size=n_requests, p=weights / weights.sum())
+
+def summarize(label: str, latencies: np.ndarray, elapsed: float):
+    qps = len(latencies) / elapsed
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"  {label:<28} {qps:>10,.0f} req/s   p50 {p50:6.3f} ms   p99 {p99:6.3f} ms")
+
+def bench_in_process(engine: AtlasQuery, queries: List[str], sequence: np.ndarray):
+    """Débit du service sans HTTP (index + encodage JSON), sans puis avec cache LRU."""
+    paths = [f"/systems?{q}" for q in queries]
+    for label, cache_size in (("service (index, sans cache)", 0), ("service (index + LRU)", 4096)):
+        service = AtlasService(AtlasQuery(engine.table, cache_size=cache_size), cache_size)
+        latencies = np.empty(len(sequence))
+        start = time.perf_counter()
+        for i, idx in enumerate(sequence):
+            t0 = time.perf_counter()
+            service.handle(paths[idx])
+            latencies[i] = time.perf_counter() - t0
+        summarize(label, latencies, time.perf_counter() - start)
+
+def client_worker(args: Tuple[str, int, List[str]]) -> Tuple[List[float], int]:
+    """Enchaîne les GET sur une connexion keep-alive ; (latences, erreurs)."""
+    host, port, paths = args
+    conn = http.client.HTTPConnection(host, port)
+    latencies, errors = [], 0
+    for path in paths:
+        t0 = time.perf_counter()
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - t0)
+        errors += response.status != 200
+    conn.close()
+    return latencies, errors
+
+def start_service(table: str) -> Tuple[subprocess.Popen, str]:
+    """Lance atlas_service.py sur un port libre ; (processus, url)."""
+    proc = subprocess.Popen([sys.executable, str(Path(__file__).parent / "atlas_service.py"),
+                             "--table", table, "--port", "0"],
+                            cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    match = re.search(r'(http://\S+)', line)
+    if not match:
+        proc.kill()
+        raise RuntimeError(f"Service non démarré : {line!r}")
+    return proc, match.group(1)
+
+def bench_http(url: str, queries: List[str], sequence: np.ndarray, clients: int):
+    """Débit HTTP avec `clients` processus clients."""
+    parts = urlsplit(url)
+    paths = [f"/systems?{queries[i]}" for i in sequence]
+    shards = [(parts.hostname, parts.port, paths[k::clients]) for k in range(clients)]
+    # Passe de chauffe (cache LRU du service), non mesurée
+    client_worker((parts.hostname, parts.port, [f"/systems?{q}" for q in queries]))
+
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        results = pool.map(client_worker, shards)
+        elapsed = time.perf_counter() - start
+    latencies = np.concatenate([r[0] for r in results])
+    errors = sum(r[1] for r in results)
+    summarize(f"HTTP ({clients} clients)", latencies, elapsed)
+    if errors:
+        print(f"  [WARN] {errors} réponses non-200")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test du service de requêtes de l'atlas")
+    parser.add_argument("--table", default=DEFAULT_TABLE)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--distinct", type=int, default=500, help="Requêtes distinctes dans le jeu")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--url", help="Service déjà lancé (sinon démarré pour le test)")
+    args = parser.parse_args()
+
+    engine = AtlasQuery.from_table(args.table)
+    queries = build_queries(engine, args.distinct)
+    sequence = zipf_sequence(len(queries), args.requests)
+    print(f"Table {args.table} : {engine.num_rows} systemes, {len(queries)} requetes distinctes, "
+          f"{args.requests:,} requetes")
+
+    bench_in_process(engine, queries, sequence)
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_service(args.table)
+    try:
+        bench_http(url, queries, sequence, args.clients)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,15 @@ Génère dashboard HTML/D3.js avec visualisations interactives
 Licence: MIT
 """
 
-import pandas as pd
 import json
 import os
+import sys
+from pathlib import Path
 import numpy as np
+import pyarrow.compute as pc
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "etl"))
+from atlas_dataset import open_table
 
 def generate_dashboard_html(atlas_csv: str, output_html: str = "index_v2_interactive.html"):
     """
@@ -20,16 +25,16 @@ def generate_dashboard_html(atlas_csv: str, output_html: str = "index_v2_interac
     4. Statistiques en temps réel
     """
     
-    df = pd.read_csv(atlas_csv)
+    atlas = open_table(atlas_csv)
+    n_total = atlas.count_rows()
     
-    # PATCH 1 : Filtrage données aberrantes (avant génération JSON)
-    df_clean = df[
-        (df['temperature_K'] > 270) & (df['temperature_K'] < 320) &  # Biologique uniquement
-        (df['contrast_normalized'].notna()) &
-        (df['contrast_normalized'] > 0)
-    ].copy()
+    # PATCH 1 : Filtrage données aberrantes (avant génération JSON), poussé dans le scan
+    df_clean = atlas.to_pandas(
+        where=(pc.field('temperature_K') > 270) & (pc.field('temperature_K') < 320) &  # Biologique uniquement
+              (pc.field('contrast_normalized') > 0)
+    )
     
-    print(f"[FILTER] {len(df)} -> {len(df_clean)} systemes (aberrants exclus)")
+    print(f"[FILTER] {n_total} -> {len(df_clean)} systemes (aberrants exclus)")
     
     # PATCH 2 : Jitter coordonnées (éviter superposition exacte)
     np.random.seed(42)
@@ -425,7 +430,7 @@ def generate_dashboard_html(atlas_csv: str, output_html: str = "index_v2_interac
     
     print(f"[OK] Dashboard genere: {output_html}")
     print(f"[INFO] Ouvrir dans navigateur pour visualiser")
-    print(f"[INFO] {len(df)} systemes inclus dans les visualisations")
+    print(f"[INFO] {n_total} systemes inclus dans les visualisations")
 
 if __name__ == "__main__":
     # Utiliser version v2.0 (mise à jour)
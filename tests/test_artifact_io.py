@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Tests des artefacts Arrow typés entre stages (scripts/etl/artifact_io.py)"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+sys.path.insert(0, str(Path("scripts/textmine").resolve()))
+
+import artifact_io as aio  # noqa: E402
+
+
+def messy_training_frame():
+    """Types dérivés d'un aller-retour CSV : nombres et booléens en texte."""
+    return pd.DataFrame({
+        'canonical_name': ["ASAP3", "GCaMP6s", "EGFP"],
+        'family': ["Voltage", "Calcium", None],
+        'excitation_nm': [488, None, 488.0],
+        'emission_nm': ["512.0", "n/a", None],
+        'contrast_normalized': [1.3, 12, np.nan],
+        'emission_missing': ["False", "True", None],
+        'excitation_missing': [False, True, False],
+        'source_priority': [3, 2, 2],
+    })
+
+
+def test_contract_schema_types_guaranteed_columns():
+    schema = aio.contract_schema()
+
+    with open(aio.CONTRACT_PATH, encoding='utf-8') as f:
+        assert schema.names == json.load(f)['contract_interface']['guaranteed_columns']
+    assert schema.field('emission_nm').type == pa.float64()
+    assert schema.field('contrast_missing').type == pa.bool_()
+    assert schema.field('provenance').type == pa.string()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_typed_round_trip_with_column_projection(tmp_path, suffix):
+    path = aio.write_artifact(messy_training_frame(), tmp_path / f"training{suffix}", aio.contract_schema())
+
+    assert not list(tmp_path.glob("*.part"))
+    df = aio.read_artifact(path)
+    assert df['emission_nm'].tolist()[0] == 512.0 and df['emission_nm'].isna().tolist()[1:] == [True, True]
+    assert df['emission_missing'].tolist()[:2] == [False, True] and pd.isna(df['emission_missing'][2])
+    assert df['excitation_missing'].dtype == bool
+    assert df['source_priority'].dtype == np.int64  # hors contrat : type inféré
+    projected = aio.read_artifact(path, columns=['canonical_name', 'excitation_nm'])
+    assert list(projected.columns) == ['canonical_name', 'excitation_nm']
+    assert projected['excitation_nm'].dtype == float
+
+
+def test_falls_back_to_csv_export(tmp_path):
+    aio.export_csv(messy_training_frame(), tmp_path / "training.csv")
+
+    df = aio.read_artifact(tmp_path / "training.parquet", schema=aio.contract_schema())
+
+    assert df['emission_nm'].dtype == float and df['emission_nm'][0] == 512.0
+    with pytest.raises(FileNotFoundError):
+        aio.read_artifact(tmp_path / "missing.parquet")
+
+
+def test_pmc_contrasts_artifact_feeds_candidates(tmp_path, monkeypatch):
+    import build_external_candidates_v1_3 as bec
+    import mine_pmc_fulltext as miner
+
+    results = {
+        "GCaMP6s": [
+            {'value': 10.0, 'metric_type': 'deltaF_F0', 'pmcid': 'PMC1', 'section_type': 'paragraph',
+             'context': 'a', 'n': None, 'sd': None, 'sem': None, 'ci_low': None, 'ci_high': None},
+            {'value': 12.0, 'metric_type': 'deltaF_F0', 'pmcid': 'PMC1', 'section_type': 'table',
+             'context': 'b', 'n': 8, 'sd': 1.0, 'sem': None, 'ci_low': None, 'ci_high': None},
+            {'value': 3.0, 'metric_type': 'fold', 'pmcid': 'PMC2', 'section_type': 'caption',
+             'context': 'c', 'n': None, 'sd': None, 'sem': None, 'ci_low': None, 'ci_high': None},
+        ],
+        "EGFP": [
+            {'value': 2.0, 'metric_type': 'fold', 'pmcid': 'PMC1', 'section_type': 'table',
+             'context': 'd', 'n': None, 'sd': None, 'sem': None, 'ci_low': None, 'ci_high': None},
+        ],
+    }
+    monkeypatch.chdir(tmp_path)
+    aio.write_artifact(miner.contrasts_frame(results), miner.PMC_CONTRASTS, miner.PMC_CONTRASTS_SCHEMA)
+
+    assert pq.read_schema(miner.PMC_CONTRASTS).remove_metadata() == miner.PMC_CONTRASTS_SCHEMA
+    df = bec.load_pmc_contrasts()
+
+    # Meilleure section par (protéine, PMCID), ordre de première apparition
+    assert df[['protein_name', 'contrast_value', 'evidence_type', 'source_refs']].values.tolist() == [
+        ["GCaMP6s", 12.0, 'table', 'PMCID:PMC1'], ["GCaMP6s", 3.0, 'caption', 'PMCID:PMC2'],
+        ["EGFP", 2.0, 'table', 'PMCID:PMC1']]
+    assert df['n'].tolist()[0] == 8.0
+
+
+def test_added_systems_reach_parquet_readers(tmp_path, monkeypatch):
+    import add_final_systems
+    import clean_duplicates_v2_2_2
+
+    processed = tmp_path / "data" / "processed"
+    processed.mkdir(parents=True)
+    (processed / aio.CONTRACT_PATH.name).write_bytes(aio.CONTRACT_PATH.read_bytes())
+    monkeypatch.chdir(tmp_path)
+    training = Path("data/processed/TRAINING_TABLE_v2_2.parquet")
+    aio.write_artifact(messy_training_frame(), training, aio.contract_schema())
+
+    n_final = add_final_systems.add_final_systems()
+
+    # Les systèmes ajoutés sont dans l'artefact, pas seulement dans l'export CSV
+    assert len(aio.read_artifact(training)) == len(pd.read_csv(training.with_suffix('.csv'))) == n_final
+    assert len(clean_duplicates_v2_2_2.clean_duplicates()) == n_final
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Tests de l'accès paresseux aux tables de l'atlas (scripts/etl/atlas_dataset.py)"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.compute as pc
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import atlas_dataset as ad  # noqa: E402
+from artifact_io import write_artifact  # noqa: E402
+
+
+def training_frame():
+    return pd.DataFrame({
+        'canonical_name': ["GCaMP6s", "ASAP3", "jGCaMP7f", "EGFP"],
+        'family': ["Calcium", "Voltage", "Calcium", None],
+        'emission_nm': [512.0, 520.0, None, 507.0],
+        'contrast_normalized': [12.0, 1.3, 30.0, None],
+        'provenance': ["10.1/a", "10.1/b", "10.1/c", "10.1/d"],
+    })
+
+
+def test_projection_and_pushed_down_filter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_artifact(training_frame(), ad.TABLES['training_v2_2'])
+
+    table = ad.open_table('training_v2_2')
+
+    assert table.count_rows() == 4
+    assert table.count_rows([('family', '==', 'Calcium')]) == 2
+    df = table.to_pandas(columns=['canonical_name', 'contrast_normalized'],
+                         where=(pc.field('family') == 'Calcium') & (pc.field('contrast_normalized') > 20))
+    assert df.to_dict('records') == [{'canonical_name': "jGCaMP7f", 'contrast_normalized': 30.0}]
+    assert table.available(['notes', 'family', 'canonical_name']) == ['family', 'canonical_name']
+    assert ad.open_table('training_v2_2') is table
+
+
+def test_csv_tables_are_memory_mapped_through_feather_cache(tmp_path, monkeypatch):
+    (tmp_path / "data/processed").mkdir(parents=True)
+    shutil.copy("data/processed/TRAINING.METADATA_v2_2.json", tmp_path / "data/processed")
+    monkeypatch.chdir(tmp_path)
+    # Seul l'export CSV existe : repli depuis l'artefact Parquet
+    csv_path = ad.TABLES['atlas_v2_2'].with_suffix('.csv')
+    training_frame().to_csv(csv_path, index=False)
+
+    df = ad.load_table('atlas_v2_2', columns=['canonical_name', 'emission_nm'],
+                       where=[('family', '==', 'Calcium')])
+
+    assert df['canonical_name'].tolist() == ["GCaMP6s", "jGCaMP7f"]
+    assert df['emission_nm'].dtype == float
+    first = list(ad.CACHE_DIR.glob("*.feather"))
+    assert len(first) == 1
+
+    # CSV réécrit : nouvelle instance, copie Feather régénérée, l'ancienne supprimée
+    training_frame().iloc[:2].to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(0, csv_path.stat().st_mtime_ns + 10**9))
+    assert ad.open_table('atlas_v2_2').count_rows() == 2
+    cached = list(ad.CACHE_DIR.glob("*.feather"))
+    assert len(cached) == 1 and cached != first
+
+
+def test_in_vivo_validator_reads_only_scored_columns(tmp_path, monkeypatch):
+    from scripts.qa.in_vivo_validator import InVivoValidator
+
+    monkeypatch.setattr(ad, 'CACHE_DIR', tmp_path / "cache")
+    atlas = tmp_path / "atlas.csv"
+    pd.DataFrame([{'SystemID': 'TEST_001', 'protein_name': 'GCaMP6f', 'context': 'in_vivo(mouse)',
+                   'method': 'imaging', 'contrast_value': 15.5, 'doi': '10.1038/nature12354',
+                   'license': 'CC-BY', 'pH': 7.4}]).to_csv(atlas, index=False)
+
+    validator = InVivoValidator(str(atlas))
+
+    assert list(validator.df.columns) == ['SystemID', 'protein_name', 'context', 'doi', 'method', 'contrast_value']
+    assert validator.score_in_vivo(validator.df.iloc[0])['validated']
+    assert len(list((tmp_path / "cache").glob("atlas-*.feather"))) == 1
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Tests des recherches indexées et du service HTTP de l'atlas (atlas_query.py, atlas_service.py)"""
+
+import http.client
+import json
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+sys.path.insert(0, str(Path("scripts/web").resolve()))
+
+import atlas_query as aq  # noqa: E402
+import atlas_service  # noqa: E402
+from artifact_io import contract_schema, write_artifact  # noqa: E402
+
+
+def synthetic_atlas(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    families = np.array(["Calcium", "calcium", "Voltage", "GFP-like", None], dtype=object)
+    excitation = rng.uniform(350, 650, n).round()
+    excitation[::13] = np.nan
+    contrast = rng.lognormal(1, 1, n).round(2)
+    contrast[::7] = np.nan
+    return pd.DataFrame({
+        'canonical_name': [f"FP{i % 1500}" for i in range(n)],
+        'family': families[rng.integers(0, len(families), n)],
+        'excitation_nm': excitation,
+        'emission_nm': excitation + rng.uniform(5, 60, n).round(),
+        'contrast_normalized': contrast,
+    })
+
+
+def brute_force(df, query):
+    """Filtre pandas de référence (mêmes sémantiques que les index)."""
+    mask = pd.Series(True, index=df.index)
+    if query.names:
+        mask &= df['canonical_name'].str.lower().isin([n.lower() for n in query.names])
+    if query.families:
+        mask &= df['family'].str.lower().isin([f.lower() for f in query.families])
+    for column in aq.SORTED_COLUMNS:
+        low, high = getattr(query, column)
+        if low is not None:
+            mask &= df[column] >= low
+        if high is not None:
+            mask &= df[column] <= high
+    return np.flatnonzero(mask.to_numpy())[:query.limit]
+
+
+def test_indexed_lookups_match_brute_force():
+    df = synthetic_atlas()
+    engine = aq.AtlasQuery(pa.Table.from_pandas(df))
+    rng = np.random.default_rng(1)
+    queries = [aq.Query(names=("fp12", "FP1499", "absent")), aq.Query(families=("CALCIUM",)),
+               aq.Query(families=("Voltage", "GFP-like"), contrast_normalized=(2.0, None), limit=25)]
+    for _ in range(200):
+        low = float(rng.integers(350, 650))
+        queries.append(aq.Query(families=(str(rng.choice(["Calcium", "Voltage"])),) if rng.random() < 0.5 else (),
+                                excitation_nm=(low, low + 40), emission_nm=(None, float(rng.integers(400, 700))),
+                                contrast_normalized=(float(rng.uniform(1, 5)), None)))
+
+    for query in queries:
+        np.testing.assert_array_equal(engine.positions(query), brute_force(df, query))
+    selected = engine.select(aq.Query(names=("FP12",), columns=("canonical_name", "family")))
+    assert selected.column_names == ["canonical_name", "family"]
+    assert set(selected.column("canonical_name").to_pylist()) == {"FP12"}
+    with pytest.raises(ValueError):
+        engine.select(aq.Query(columns=("nope",)))
+
+
+def test_results_are_cached_per_query():
+    engine = aq.AtlasQuery(pa.Table.from_pandas(synthetic_atlas(200)), cache_size=2)
+    query = atlas_service.parse_query("family=Voltage,calcium&contrast_min=2")[0]
+
+    first = engine.positions(query)
+    # Forme canonique : ordre des familles indifférent
+    assert engine.positions(atlas_service.parse_query("family=calcium&family=Voltage&contrast_min=2")[0]) is first
+    assert engine.cache_info().hits == 1
+    assert not first.flags.writeable
+
+
+@pytest.fixture
+def service_url(tmp_path):
+    df = synthetic_atlas(300)
+    df.loc[0, ['canonical_name', 'family', 'emission_nm']] = ["GCaMP6s", "Calcium", 515.0]
+    path = write_artifact(df, tmp_path / "atlas.parquet", contract_schema())
+    server = atlas_service.make_server(str(path), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[:2], df
+    server.shutdown()
+    server.server_close()
+
+
+def get(address, path, method="GET"):
+    conn = http.client.HTTPConnection(*address)
+    conn.request(method, path)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response.status, response.getheader("Content-Type"), body
+
+
+def test_http_service_json_and_arrow(service_url):
+    address, df = service_url
+
+    status, content_type, body = get(address, "/systems?family=calcium&emission_min=500&emission_max=530")
+    expected = df.iloc[brute_force(df, aq.Query(families=("calcium",), emission_nm=(500.0, 530.0)))]
+    assert status == 200 and content_type == "application/json"
+    assert [r['canonical_name'] for r in json.loads(body)] == expected['canonical_name'].tolist()
+
+    status, content_type, body = get(address, "/systems?family=Voltage&columns=canonical_name,contrast_normalized&format=arrow")
+    table = pa.ipc.open_stream(body).read_all()
+    assert content_type == "application/vnd.apache.arrow.stream"
+    assert table.column_names == ["canonical_name", "contrast_normalized"]
+    assert table.num_rows == len(brute_force(df, aq.Query(families=("Voltage",))))
+
+    status, _, body = get(address, "/systems?limit=3&format=ndjson")
+    assert status == 200 and len(body.decode().splitlines()) == 3
+
+    assert json.loads(get(address, "/systems/GCaMP6s")[2])[0]['emission_nm'] == 515.0
+    assert get(address, "/systems/unknown")[0] == 404
+    assert get(address, "/systems?contrast_min=abc")[0] == 400
+    assert get(address, "/systems", method="POST")[0] == 501  # lecture seule
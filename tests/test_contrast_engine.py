@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Tests du moteur d'extraction de contrastes compilé (scripts/textmine/contrast_engine.py)"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts/textmine").resolve()))
+
+import benchmark_contrast_engine as bench  # noqa: E402
+import contrast_engine as engine  # noqa: E402
+
+TEXTS = [
+    "The sensor showed ΔF/F0 = 2.5 (n = 12, SD = 0.3) in HeLa cells.",
+    "GCaMP6s: dF/F = 12.3 [10.1, 14.5]; a 3.2-fold increase and 45% change (SEM = 1.1).",
+    "ratiometric ΔR/R₀ = 0.8, DYNAMIC RANGE: 7 and On/Off ratio = 15",
+    "Fold-change: 4 ; percent change = 33 ; 1.2.3-fold change (n = 4)",
+    "İstanbul group: ΔF/F0 = 1.7, N = 5",   # lower() allonge le texte : repli IGNORECASE
+    "no contrast here, only 5 cells and 20 °C",
+    # Plages qui se chevauchent entre motifs
+    "ΔF/F0 = 35% response",
+    "percent change 50% increase",
+    "dynamic range 10-fold change",
+    "on/off ratio = 12% ΔF and dF/F0 = 3-fold response",
+]
+
+
+def multiset(measurements):
+    return Counter(tuple(sorted(m.items())) for m in measurements)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_engine_matches_per_pattern_extractor(text):
+    before = bench.legacy_extract_from_text(text, "PMC1", "paragraph")
+    after = engine.extract_contrast_from_text(text, "PMC1", "paragraph")
+
+    assert multiset(after) == multiset(before)
+
+
+def test_hits_in_text_order_with_window_stats():
+    hits = engine.extract_contrast_from_text(TEXTS[1], "PMC1", "caption")
+
+    assert [(h["metric_type"], h["value"]) for h in hits] == [
+        ("deltaF_F0", 12.3), ("fold", 3.2), ("percent", 45.0)]
+    assert (hits[0]["ci_low"], hits[0]["ci_high"]) == (10.1, 14.5)
+    assert hits[2]["sem"] == 1.1 and hits[2]["n"] is None
+    assert hits[0]["context"].startswith("GCaMP6s")
+
+
+def test_overlapping_hits_of_different_patterns_are_kept():
+    hits = engine.extract_contrast_from_text("ΔF/F0 = 35% response", "PMC1", "paragraph")
+
+    assert [(h["metric_type"], h["value"]) for h in hits] == [("deltaF_F0", 35.0), ("percent", 35.0)]
+
+
+def test_xml_sections_single_pass():
+    xml = ("<article><body><p>Signal <italic>ΔF/F0 = 3.0</italic> (n = 8)</p>"
+           "<table-wrap><caption><p>2-fold response</p></caption>"
+           "<table><tr><td>dynamic range</td><td>: 9</td></tr></table></table-wrap>"
+           "</body></article>")
+
+    hits = engine.extract_contrast_from_xml(xml, "PMC2")
+
+    # Ordre et sections identiques à l'extracteur précédent (table, p, caption)
+    assert hits == bench.legacy_extract_from_xml(xml, "PMC2")
+    assert [(h["section_type"], h["value"]) for h in hits] == [
+        ("table", 9.0), ("paragraph", 3.0), ("paragraph", 2.0), ("caption", 2.0)]
+    assert engine.extract_contrast_from_xml("<article><p>", "PMC3") == []
+
+
+@pytest.mark.skipif(not list(Path("data/raw/oa").glob("PMC*/fulltext.xml")),
+                    reason="corpus PMC absent")
+def test_corpus_results_unchanged():
+    for pmcid, xml in bench.load_corpus(Path("data/raw/oa")).items():
+        assert multiset(engine.extract_contrast_from_xml(xml, pmcid)) == \
+            multiset(bench.legacy_extract_from_xml(xml, pmcid))
+
+
+def write_article(path, sections):
+    """Article JATS synthétique : `sections` <sec> de 20 paragraphes (~2 ko), une mesure par <sec>."""
+    para = "<p>Imaging of <italic>HeLa</italic> cells " + "lorem ipsum dolor sit amet " * 70 + "</p>"
+    hit = "<p>Imaging showed ΔF/F0 = 1.5 (n = 6)</p>"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<article><body>")
+        for _ in range(sections):
+            f.write("<sec><title>Results</title>" + hit + para * 20 + "</sec>")
+        f.write("<fig><caption><p>3-fold increase</p></caption></fig></body></article>")
+    return path
+
+
+def test_streamed_file_matches_tree_extraction(tmp_path):
+    xml = ("<article><body><sec><p>A ΔF/F0 = 2.0 (SD = 0.1)</p>"
+           "<table-wrap><caption><p>Table 1. <b>dynamic range</b> = 6</p></caption>"
+           "<table><tr><td>4.5% increase</td></tr></table></table-wrap></sec>"
+           "<fig><caption><p>10-fold response</p></caption></fig></body></article>")
+    path = tmp_path / "fulltext.xml"
+    path.write_text(xml, encoding="utf-8")
+
+    sections = list(engine.iter_sections(path))
+    assert sections[:3] == [("paragraph", "A ΔF/F0 = 2.0 (SD = 0.1)"),
+                            ("paragraph", "Table 1. dynamic range = 6"),
+                            ("caption", "Table 1. dynamic range = 6")]
+
+    streamed = engine.extract_contrast_from_file(path, "PMC4")
+    assert multiset(streamed) == multiset(engine.extract_contrast_from_xml(xml, "PMC4"))
+    assert len(streamed) == 6
+
+
+def test_streaming_memory_independent_of_article_size(tmp_path):
+    import tracemalloc
+
+    def peak(path):
+        tracemalloc.start()
+        hits = engine.extract_contrast_from_file(path, "PMC5")
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return len(hits), peak_bytes
+
+    small = write_article(tmp_path / "small.xml", sections=25)
+    large = write_article(tmp_path / "large.xml", sections=200)
+    small_hits, small_peak = peak(small)
+    large_hits, large_peak = peak(large)
+
+    assert large.stat().st_size > 7 * small.stat().st_size
+    assert large_hits == 8 * (small_hits - 2) + 2
+    # Pic mémoire : une section + les mesures, pas l'arbre de l'article
+    assert large_peak < large.stat().st_size / 20
+    assert large_peak - small_peak < 1000 * (large_hits - small_hits)
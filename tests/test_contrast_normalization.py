@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests de la normalisation vectorisée des contrastes (scripts/etl/contrast_normalization.py)"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import contrast_normalization as cn  # noqa: E402
+
+
+def legacy_normalize(value, unit):
+    """normalize_contrast ligne à ligne d'origine (build_atlas_v2_2)."""
+    if pd.isna(value) or pd.isna(unit):
+        return np.nan
+    unit_lower = str(unit).lower()
+    if 'fold' in unit_lower:
+        return float(value)
+    elif 'deltaf' in unit_lower or 'df/f' in unit_lower:
+        return 1.0 + float(value)
+    elif 'percent' in unit_lower or '%' in unit_lower:
+        return 1.0 + float(value) / 100.0
+    return float(value)
+
+
+def test_matches_row_by_row_normalisation():
+    rng = np.random.default_rng(0)
+    units = np.array(["fold", "Fold-Change", "deltaF/F0", "dF/F", "percent", "%", "a.u.", None], dtype=object)
+    values = rng.uniform(-50, 500, 2000)
+    values[::9] = np.nan
+    df = pd.DataFrame({'value': values, 'unit': units[rng.integers(0, len(units), 2000)]},
+                      index=rng.permutation(2000))
+
+    got = cn.normalize_contrasts(df['value'], df['unit'])
+
+    expected = [legacy_normalize(v, u) for v, u in zip(df['value'], df['unit'])]
+    np.testing.assert_array_equal(got.to_numpy(), expected)
+    assert got.index.equals(df.index)
+    kept = cn.normalize_contrasts(pd.Series([2.0, "n.d."]), pd.Series([None, "fold"]), keep_unitless=True)
+    assert kept.fillna(-1).tolist() == [2.0, -1]
+
+
+def test_mappings_come_from_config():
+    config = {'validation': {'contrast_normalization': {'mappings': {
+        'fold': "fold", 'deltaF_F0': "fold = deltaF_F0 * 2 - 1", 'percent': "fold = percent/10"}}}}
+    conversions = cn.load_conversions(config)
+
+    got = cn.normalize_contrasts(pd.Series([3.0, 3.0, 30.0]), pd.Series(["fold", "ΔF/F0 (deltaF)", "%"]),
+                                 conversions=conversions)
+
+    assert got.tolist() == [3.0, 5.0, 3.0]
+    with pytest.raises(ValueError):
+        cn.compile_mapping('percent', "fold = percent ** 2")
+
+
+def test_outliers_are_flagged_per_family():
+    rng = np.random.default_rng(1)
+    contrast = pd.Series(np.r_[rng.normal(2, 0.05, 60), 400.0, rng.lognormal(np.log(50), 1, 60), 400.0])
+    family = pd.Series(["GFP"] * 61 + ["GECI"] * 61)
+
+    mask = cn.outlier_mask(contrast, family, z_max=5)
+
+    # 400 est extrême pour GFP (~2), pas pour les GECI (très dispersés)
+    assert mask[mask].index.tolist() == [60]
+    assert not cn.outlier_mask(pd.Series([1.0, np.nan]), pd.Series(["A", None])).any()
+
+
+def test_large_merge_matches_row_by_row():
+    # Durée sur 1 000 000 de lignes : scripts/etl/bench_atlas_builders.py --cases contrast
+    rows = 10_000
+    rng = np.random.default_rng(2)
+    values = pd.Series(rng.uniform(0, 10, rows))
+    units = pd.Series(np.array(["fold", "deltaF/F0", "percent", None], dtype=object)[rng.integers(0, 4, rows)])
+
+    got = cn.normalize_contrasts(values, units)
+    mask = cn.outlier_mask(got, pd.Series(rng.integers(0, 50, rows)))
+
+    expected = [legacy_normalize(v, u) for v, u in zip(values, units)]
+    np.testing.assert_allclose(got.to_numpy(), expected)
+    assert got.isna().sum() == units.isna().sum()
+    assert len(mask) == rows and not mask[got.isna()].any()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests du corpus local SQLite FTS5 (scripts/textmine/corpus_store.py)"""
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path("scripts/textmine").resolve()))
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import contrast_engine as engine  # noqa: E402
+import extract_pmc_contrast_real as real  # noqa: E402
+import mine_fulltext_contrasts as fulltext  # noqa: E402
+import mine_pmc_fulltext as miner  # noqa: E402
+from corpus_store import CorpusStore  # noqa: E402
+
+ARTICLES = {
+    "PMC1": ("<article><body><sec><p>GCaMP6s imaging: ΔF/F0 = 12.5 (n = 8)</p>"
+             "<p>Unrelated paragraph, 3-fold increase</p>"
+             "<table-wrap><caption><p>Table 1. Sensors</p></caption>"
+             "<table><tr><td>GCaMP6s </td><td>dynamic range: 9</td></tr></table></table-wrap>"
+             "</sec></body></article>"),
+    "PMC2": ("<article><body><p>jGCaMP7f and GCaMP6s compared</p>"
+             "<fig><caption><p>GCaMP6s shows a 4.5-fold increase</p></caption></fig>"
+             "</body></article>"),
+    "PMC3": "<article><body><p>EGFP brightness, 2-fold change</p></body></article>",
+}
+
+
+def write_corpus(oa_dir):
+    for pmcid, xml in ARTICLES.items():
+        (oa_dir / pmcid).mkdir(parents=True)
+        (oa_dir / pmcid / "fulltext.xml").write_text(xml, encoding="utf-8")
+    return oa_dir
+
+
+def test_index_is_incremental(tmp_path):
+    oa_dir = write_corpus(tmp_path / "oa")
+    with CorpusStore(tmp_path / "corpus.sqlite") as store:
+        assert store.index_corpus(oa_dir) == (3, 0)
+        assert store.index_corpus(oa_dir) == (0, 3)
+
+        # Article modifié : seul celui-ci est réindexé, ses anciennes sections remplacées
+        path = oa_dir / "PMC3" / "fulltext.xml"
+        path.write_text("<article><p>EGFP only</p><p>mCherry</p></article>", encoding="utf-8")
+        os.utime(path, ns=(0, 1))
+        assert store.index_corpus(oa_dir) == (1, 2)
+        assert [p.text for p in store.sections("PMC3")] == ["EGFP only", "mCherry"]
+
+    # Les sections stockées sont celles du flux iterparse, dans l'ordre du document
+    with CorpusStore(tmp_path / "corpus.sqlite") as store:
+        stored = [(p.section_type, p.text) for p in store.sections("PMC1")]
+        assert stored == list(engine.iter_sections(oa_dir / "PMC1" / "fulltext.xml"))
+        assert store.stats() == (3, 10)
+
+
+def test_search_by_protein_name(tmp_path):
+    with CorpusStore(tmp_path / "corpus.sqlite") as store:
+        store.index_corpus(write_corpus(tmp_path / "oa"))
+
+        assert sorted(store.articles_mentioning("gcamp6s")) == ["PMC1", "PMC2"]
+        # Correspondance par jeton : "GFP" ne trouve pas "EGFP"
+        assert store.articles_mentioning("GFP") == []
+        assert {(p.pmcid, p.section_type) for p in store.search("GCaMP6s", pmcid="PMC2")} == {
+            ("PMC2", "paragraph"), ("PMC2", "caption")}
+        assert list(store.search('say "hi"')) == []
+
+
+def test_miners_run_offline_from_corpus(tmp_path, monkeypatch):
+    oa_dir = write_corpus(tmp_path / "oa")
+    with CorpusStore(tmp_path / "corpus.sqlite") as store:
+        store.index_corpus(oa_dir)
+
+        # Même résultat que l'extraction des fichiers XML, sans aucun accès réseau
+        results = miner.mine_from_corpus([{"name": "GCaMP6s"}, {"name": "mCherry"}], store)
+        expected = [m for pmcid in store.articles_mentioning("GCaMP6s")
+                    for m in engine.extract_contrast_from_file(oa_dir / pmcid / "fulltext.xml", pmcid)]
+        assert list(results) == ["GCaMP6s"]
+        assert results["GCaMP6s"] == expected
+
+        monkeypatch.setattr(fulltext, "SEED_FILE", tmp_path / "seed.csv")
+        monkeypatch.setattr(real, "SEED_FILE", tmp_path / "seed.csv")
+        pd.DataFrame({"name": ["GCaMP6s", "EGFP"], "type": ["sensor", "FP"]}).to_csv(
+            tmp_path / "seed.csv", index=False)
+
+        best = fulltext.mine_contrasts(store).set_index("protein_name")
+        assert best.loc["GCaMP6s", "source_section"] == "table"
+        assert best.loc["GCaMP6s", "contrast_ratio"] == 9.0
+        assert best.loc["EGFP", "measure_type"] == "fold_change"
+
+        first = real.extract_contrasts(store).set_index("protein_name")
+        assert first.loc["EGFP", "contrast_ratio"] == 2.0
+        assert first.loc["GCaMP6s", "pmcid"] in ("PMC1", "PMC2")
+
+
+def test_corpus_mode_refuses_empty_store(tmp_path, monkeypatch, capsys):
+    # Corpus jamais construit : échec explicite plutôt que « 0 extracted »
+    monkeypatch.chdir(tmp_path)
+    for module in (fulltext, real):
+        monkeypatch.setattr(sys, "argv", [module.__file__, "--corpus"])
+        assert module.main() == 1
+        assert "ERROR: corpus local" in capsys.readouterr().out
+        assert not module.OUTPUT_FILE.exists()
+
+    # refresh() indexe le texte intégral déjà téléchargé
+    with CorpusStore("data/cache/pmc_corpus.sqlite") as store:
+        assert store.refresh(write_corpus(tmp_path / "data/raw/oa")) == 3
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Tests du harvester FPbase GraphQL concurrent (scripts/etl/fetch_fpbase_graphql.py)"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import fetch_fpbase_graphql as fpbase  # noqa: E402
+from providers.http_cache import CachedSession  # noqa: E402
+
+
+class StubGraphQL(BaseHTTPRequestHandler):
+    """Stub GraphQL FPbase : `total` protéines, latence fixe, erreurs injectables."""
+
+    total = 230
+    latency = 0.05
+    fail_once = set()   # offsets en erreur 500 à la première requête
+    fail_always = False
+    offsets = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        offset = payload["variables"]["offset"]
+        limit = payload["variables"]["limit"]
+        cls = StubGraphQL
+        with cls.lock:
+            cls.offsets.append(offset)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(cls.latency)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        if cls.fail_always or offset in cls.fail_once:
+            cls.fail_once.discard(offset)
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b"boom")
+            return
+
+        nodes = [{"name": f"FP{i:04d}", "slug": f"fp{i}"}
+                 for i in range(offset, min(offset + limit, cls.total))]
+        body = json.dumps({"data": {"fluorescentProteins": {
+            "edges": [{"node": n} for n in nodes]}}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    StubGraphQL.total = 230
+    StubGraphQL.latency = 0.05
+    StubGraphQL.fail_once = set()
+    StubGraphQL.fail_always = False
+    StubGraphQL.offsets = []
+    StubGraphQL.max_in_flight = 0
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubGraphQL)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/api/graphql/"
+
+    # Pas de cache disque ni d'attente de retry pendant les tests
+    monkeypatch.setattr(fpbase, "HTTP", CachedSession("fpbase", enabled=False, offline=False))
+    monkeypatch.setattr(fpbase, "FPBASE_API_URL", url)
+    monkeypatch.setattr(fpbase, "BREAKERS", {})
+    monkeypatch.setitem(fpbase.FPBASE_CONFIG["circuit_breaker"], "retry_delay_seconds", 0.01)
+    # Rate limiting du harvester séquentiel neutralisé (le stub garde sa latence)
+    monkeypatch.setattr(fpbase, "time", SimpleNamespace(
+        time=time.time, monotonic=time.monotonic, perf_counter=time.perf_counter,
+        strftime=time.strftime, sleep=lambda s: None))
+    yield url
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_async_harvest_matches_sequential(stub):
+    expected = fpbase.fetch_fpbase_all(max_proteins=1000)
+    result = asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=1000, concurrency=4))
+
+    assert result["status"] == "success"
+    assert result["count"] == 230
+    assert result["proteins"] == expected["proteins"]
+
+
+def test_async_harvest_stops_at_first_empty_page(stub):
+    concurrency = 4
+    result = asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=1000, concurrency=concurrency))
+
+    assert [p["name"] for p in result["proteins"]] == [f"FP{i:04d}" for i in range(230)]
+    assert StubGraphQL.max_in_flight > 1
+    # Au plus `concurrency - 1` requêtes déjà en vol au-delà de la page vide (offset 250)
+    assert len([o for o in StubGraphQL.offsets if o > 250]) <= concurrency - 1
+    assert max(StubGraphQL.offsets) < 1000
+
+
+def test_concurrency_bounds_pages_in_flight(stub):
+    # Débit mesuré par scripts/etl/bench_fpbase_harvester.py, pas ici
+    StubGraphQL.total = 400
+    StubGraphQL.latency = 0.02
+
+    asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=400, concurrency=1))
+    assert StubGraphQL.max_in_flight == 1
+
+    StubGraphQL.max_in_flight = 0
+    result = asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=400, concurrency=4))
+    assert result["count"] == 400
+    assert 1 < StubGraphQL.max_in_flight <= 4
+
+
+def test_failed_page_is_retried(stub):
+    StubGraphQL.fail_once = {50}
+
+    result = asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=1000, concurrency=3))
+
+    assert result["count"] == 230
+    assert StubGraphQL.offsets.count(50) == 2
+
+
+def test_circuit_breaker_opens_per_host(stub):
+    StubGraphQL.fail_always = True
+
+    result = asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=200, concurrency=2))
+    assert result["status"] == "error"
+    assert result["count_partial"] == 0
+
+    breaker = fpbase.BREAKERS[urlparse(stub).netloc]
+    assert breaker.state == "open"
+
+    # Circuit ouvert : aucune requête n'est envoyée
+    sent = len(StubGraphQL.offsets)
+    again = asyncio.run(fpbase.fetch_fpbase_all_async(max_proteins=200, concurrency=2))
+    assert "OPEN" in again["error"]
+    assert len(StubGraphQL.offsets) == sent
+
+
+def test_token_bucket_enforces_rate():
+    async def take(n):
+        bucket = fpbase.TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 2 jetons en rafale puis 4 à 20/s : >= 0.2 s
+    assert asyncio.run(take(6)) >= 0.19
+
+    buckets = fpbase.rate_limit_buckets({"requests_per_minute": 60, "requests_per_hour": 1000})
+    assert [(b.rate, b.capacity) for b in buckets] == [(1.0, 60), (1000 / 3600, 1000)]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Tests du rapprochement flou indexé (scripts/etl/build_external_candidates_v1_3.py)"""
+
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import build_external_candidates_v1_3 as bec  # noqa: E402
+from record_linkage import FuzzyNameIndex  # noqa: E402
+from Levenshtein import distance as levenshtein_distance  # noqa: E402
+
+
+def brute_force_groups(names, threshold, no_merge_pairs):
+    """Boucle d'origine : chaque nom contre chaque groupe canonique, dans l'ordre."""
+    name_groups = {}
+    for name in names:
+        if not name:
+            continue
+        for canonical, group in name_groups.items():
+            if (name, canonical) in no_merge_pairs or (canonical, name) in no_merge_pairs:
+                continue
+            if levenshtein_distance(name, canonical) <= threshold:
+                group.append(name)
+                break
+        else:
+            name_groups[name] = [name]
+    return {name: canonical for canonical, group in name_groups.items() for name in group}
+
+
+def random_names(count, seed):
+    rng = random.Random(seed)
+    stems = ["gcamp", "rgeco", "egfp", "mcherry", "ase", "dlight", "grab", "jrcamp", "a", "ab"]
+    names = []
+    for _ in range(count):
+        name = rng.choice(stems) + "".join(rng.choice("0123456sfmx_-") for _ in range(rng.randint(0, 4)))
+        if rng.random() < 0.3 and names:
+            # Variante à 1-3 éditions d'un nom déjà vu
+            chars = list(rng.choice(names))
+            for _ in range(rng.randint(1, 3)):
+                op, pos = rng.randrange(3), rng.randrange(len(chars) + 1)
+                if op == 0:
+                    chars.insert(pos, rng.choice("abc7"))
+                elif chars and pos < len(chars):
+                    if op == 1:
+                        del chars[pos]
+                    else:
+                        chars[pos] = rng.choice("xyz8")
+            name = "".join(chars)
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 2, 3])
+@pytest.mark.parametrize("seed", [1, 2])
+def test_index_matches_brute_force_grouping(threshold, seed, monkeypatch):
+    names = random_names(1500, seed) + ["", "x", "xy"]
+    no_merge = [["gcamp6s", "gcamp6f"], ["a1", "ab"]]
+    monkeypatch.setattr(bec, "ALIAS_CONFIG", {"no_merge_variants": no_merge})
+    pairs = {p for a, b in no_merge for p in ((a, b), (b, a))}
+
+    df = bec.fuzzy_match_names(pd.DataFrame({"normalized_name": names}), threshold=threshold)
+
+    expected = brute_force_groups(list(dict.fromkeys(names)), threshold, pairs)
+    got = [None if pd.isna(c) else c for c in df["canonical_name"]]
+    assert got == [expected.get(n) for n in names]  # nom vide : pas de groupe
+
+
+def test_candidates_are_complete_for_short_and_long_names():
+    index = FuzzyNameIndex(2)
+    indexed = ["", "a", "ab", "abc", "gcamp6s", "jgcamp7f_long_name"]
+    for ident, name in enumerate(indexed):
+        index.add(ident, name)
+
+    for query in ["", "b", "xbc", "gcmp6", "gcamp6sfx", "jgcamp7_lng_name", "jgcamp7f_long_nameab"]:
+        within = {i for i, n in enumerate(indexed) if levenshtein_distance(query, n) <= 2}
+        assert within <= index.candidates(query)
+
+
+def test_large_name_set_matches_brute_force(monkeypatch):
+    # Durée sur 30 000 noms : scripts/etl/bench_atlas_builders.py --cases fuzzy
+    monkeypatch.setattr(bec, "ALIAS_CONFIG", {"no_merge_variants": []})
+    names = [f"{stem}{i}" for i, stem in enumerate(["sensor_", "fp-", "camp"] * 1_000)]
+
+    df = bec.fuzzy_match_names(pd.DataFrame({"normalized_name": names}), threshold=2)
+
+    expected = brute_force_groups(names, 2, set())
+    assert df["canonical_name"].tolist() == [expected[n] for n in names]
+    assert df["canonical_name"].nunique() < len(names)
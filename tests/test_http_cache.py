@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Tests de la couche HTTP partagée avec cache disque (scripts/providers/http_cache.py)"""
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path("scripts").resolve()))
+
+from providers.http_cache import (  # noqa: E402
+    CachedSession, OfflineCacheMiss, cached_session, request_key)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serveur stub : corps dépendant de l'URL/du corps, ETag fixe, compteur de requêtes."""
+
+    hits = []
+
+    def _reply(self, body: bytes):
+        StubHandler.hits.append((self.command, self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            StubHandler.hits.append((self.command, self.path, None))
+            self.send_response(404)
+            self.end_headers()
+            return
+        self._reply(f'{{"path": "{self.path}"}}'.encode())
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(self.rfile.read(length))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StubHandler.hits = []
+    httpd = HTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fresh_entry_served_without_network(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path, ttl_hours=1, offline=False)
+
+    first = http.get(f"{server}/search", params={"q": "GFP", "size": 10}, timeout=5)
+    # Mêmes paramètres dans un autre ordre : même clé
+    second = http.get(f"{server}/search", params={"size": 10, "q": "GFP"}, timeout=5)
+
+    assert first.from_cache is False and second.from_cache is True
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == '"v1"'
+    assert len(StubHandler.hits) == 1
+    assert http.stats["hits"] == 1 and http.stats["network"] == 1
+
+
+def test_stale_entry_revalidated_with_etag(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path, ttl_hours=0, offline=False)
+
+    http.get(f"{server}/entry/1abc", timeout=5)
+    again = http.get(f"{server}/entry/1abc", timeout=5)
+
+    assert again.from_cache is True
+    assert again.json() == {"path": "/entry/1abc"}
+    assert StubHandler.hits[-1] == ("GET", "/entry/1abc", '"v1"')
+    assert http.stats["revalidated"] == 1
+
+
+def test_post_body_is_part_of_the_key(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path, ttl_hours=1, offline=False)
+
+    page1 = http.post(f"{server}/graphql", json={"offset": 0}, timeout=5)
+    page2 = http.post(f"{server}/graphql", json={"offset": 50}, timeout=5)
+    cached = http.post(f"{server}/graphql", json={"offset": 0}, timeout=5)
+
+    assert page1.json() == {"offset": 0} and page2.json() == {"offset": 50}
+    assert cached.from_cache is True and cached.json() == {"offset": 0}
+    assert len(StubHandler.hits) == 2
+
+
+def test_errors_are_not_cached(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path, ttl_hours=1, offline=False)
+
+    assert http.get(f"{server}/missing", timeout=5).status_code == 404
+    assert http.get(f"{server}/missing", timeout=5).status_code == 404
+    assert len(StubHandler.hits) == 2
+
+
+def test_offline_mode_serves_cache_only(server, tmp_path, monkeypatch):
+    online = CachedSession("stub", cache_dir=tmp_path, ttl_hours=0, offline=False)
+    online.get(f"{server}/known", timeout=5)
+
+    monkeypatch.setenv("ATLAS_OFFLINE", "1")
+    offline = CachedSession("stub", cache_dir=tmp_path, ttl_hours=0)
+
+    # Entrée expirée servie telle quelle, sans revalidation
+    assert offline.get(f"{server}/known", timeout=5).json() == {"path": "/known"}
+    with pytest.raises(OfflineCacheMiss):
+        offline.get(f"{server}/unknown", timeout=5)
+    assert len(StubHandler.hits) == 1
+
+
+def test_stale_entry_served_on_network_error(tmp_path):
+    url = "http://127.0.0.1:9/unreachable"
+    http = CachedSession("stub", cache_dir=tmp_path, ttl_hours=0, offline=False)
+
+    # Entrée expirée pour une URL injoignable (port discard)
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"ok": true}'
+    response.url = url
+    http._store(request_key("GET", url), "GET", response)
+
+    assert http.get(url, timeout=1).json() == {"ok": True}
+    assert http.stats["stale"] == 1
+
+
+def test_stored_entry_looked_up_without_network(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path, ttl_hours=1, offline=False)
+    url = f"{server}/summary/1abc"
+
+    assert http.lookup(url) is None
+    http.store(url, b'{"1abc": []}', headers={"Content-Type": "application/json"})
+
+    assert http.lookup(url).json() == {"1abc": []}
+    assert http.get(url, timeout=5).from_cache is True
+    assert StubHandler.hits == []
+    assert CachedSession("stub", cache_dir=tmp_path, ttl_hours=0, offline=False).lookup(url) is None
+
+
+def test_cached_session_reads_provider_config(tmp_path):
+    config = {
+        "uniprot": {"cache": {"enabled": True, "ttl_hours": 168, "path": str(tmp_path / "u")}},
+        "europe_pmc": {"cache": {"enabled": False, "ttl_hours": 720}},
+        "pdb": {"cache": {"enabled": True, "ttl_hours": 168}},
+    }
+
+    uniprot = cached_session("uniprot", config)
+    assert uniprot.cache_dir == tmp_path / "u" and uniprot.ttl_s == 168 * 3600
+
+    assert cached_session("pmc", config, section="europe_pmc").enabled is False
+    assert cached_session("pdb", config).cache_dir == Path("data/cache/pdb")
+
+
+def test_download_streams_to_file_and_cache(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path / "cache", ttl_hours=1, offline=False)
+    target = tmp_path / "oa" / "PMC1" / "fulltext.xml"
+
+    first = http.download(f"{server}/PMC1/fullTextXML", target, timeout=5)
+    assert first.status_code == 200 and first.from_cache is False
+    assert target.read_text() == '{"path": "/PMC1/fullTextXML"}'
+    assert not target.with_name("fulltext.xml.part").exists()
+
+    # Même requête via get() ou download() : servie par le cache
+    target.unlink()
+    again = http.download(f"{server}/PMC1/fullTextXML", target, timeout=5)
+    assert again.from_cache is True and target.exists()
+    assert http.get(f"{server}/PMC1/fullTextXML", timeout=5).json() == {"path": "/PMC1/fullTextXML"}
+    assert len(StubHandler.hits) == 1
+
+    # Erreur : pas de fichier écrit
+    assert http.download(f"{server}/missing", tmp_path / "missing.xml", timeout=5).status_code == 404
+    assert not (tmp_path / "missing.xml").exists()
+
+
+def test_download_revalidates_stale_entry(server, tmp_path):
+    http = CachedSession("stub", cache_dir=tmp_path / "cache", ttl_hours=0, offline=False)
+    target = tmp_path / "body.json"
+
+    http.download(f"{server}/entry/2xyz", target, timeout=5)
+    target.write_text("corrupted")
+    http.download(f"{server}/entry/2xyz", target, timeout=5)
+
+    assert StubHandler.hits[-1] == ("GET", "/entry/2xyz", '"v1"')
+    assert target.read_text() == '{"path": "/entry/2xyz"}'
+    assert http.stats["revalidated"] == 1
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Tests du fetcher PDBe concurrent et adaptatif (scripts/etl/fetch_pdb_pdbe_bulk.py)"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import fetch_pdb_pdbe_bulk as pdbe  # noqa: E402
+from providers.http_cache import CachedSession, RateLimiter  # noqa: E402
+
+PDB_IDS = [f"{i}abc" for i in range(1, 61)]
+
+
+class StubPDBe(BaseHTTPRequestHandler):
+    """Stub /pdb/entry/summary/<ids> : 413 au-delà de `max_ids`, 429 injectables."""
+
+    max_ids = 8
+    latency = 0.0
+    throttle = 0        # nombre de 429 à renvoyer avant de répondre
+    requested = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = StubPDBe
+        ids = self.path.rsplit("/", 1)[1].split(",")
+        with cls.lock:
+            cls.requested.append(ids)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            throttled = cls.throttle > 0
+            cls.throttle -= throttled
+        time.sleep(cls.latency)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        if len(ids) > cls.max_ids:
+            self.send_response(413)
+            self.end_headers()
+            return
+        if throttled:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps({i.lower(): [{"title": f"Structure {i}"}] for i in ids}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    StubPDBe.max_ids = 8
+    StubPDBe.latency = 0.0
+    StubPDBe.throttle = 0
+    StubPDBe.requested = []
+    StubPDBe.max_in_flight = 0
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubPDBe)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(pdbe, "PDBE_API_BASE", f"http://127.0.0.1:{httpd.server_address[1]}")
+    monkeypatch.setattr(pdbe, "HTTP", CachedSession("pdb", enabled=False, offline=False))
+    monkeypatch.setattr(pdbe, "LIMITER", RateLimiter(1000))
+    yield tmp_path / "checkpoint.ndjson"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetched_ids():
+    return [i for ids in StubPDBe.requested for i in ids]
+
+
+def test_chunk_size_adapts_to_413(stub):
+    summaries = pdbe.fetch_pdbe_summary(PDB_IDS, checkpoint=stub, max_workers=2)
+
+    assert [s["pdb_id"] for s in summaries] == [i.upper() for i in PDB_IDS]
+    assert summaries[0]["summary"] == {"title": "Structure 1ABC"}
+    # Lots initiaux de 20 refusés, la taille converge vers la limite du serveur
+    sizes = [len(ids) for ids in StubPDBe.requested]
+    assert sizes[0] == 20
+    last_refused = max(i for i, size in enumerate(sizes) if size > 8)
+    assert last_refused < 10
+    assert max(sizes[last_refused + 1:]) == 8
+
+
+def test_throttled_requests_are_retried(stub):
+    StubPDBe.max_ids = 100
+    StubPDBe.throttle = 2
+
+    summaries = pdbe.fetch_pdbe_summary(PDB_IDS, checkpoint=stub, max_workers=2)
+
+    assert len(summaries) == 60
+    assert len(fetched_ids()) == 60 + sum(len(ids) for ids in StubPDBe.requested[:2])
+
+
+def test_resume_from_checkpoint_after_crash(stub, monkeypatch):
+    StubPDBe.max_ids = 5
+    fetch = pdbe._fetch_chunk
+    calls = []
+
+    def crashing(chunk):
+        calls.append(chunk)
+        if len(calls) == 6:
+            raise RuntimeError("crash")
+        return fetch(chunk)
+
+    monkeypatch.setattr(pdbe, "_fetch_chunk", crashing)
+    with pytest.raises(RuntimeError):
+        pdbe.fetch_pdbe_summary(PDB_IDS, checkpoint=stub, max_workers=1)
+    # Ligne tronquée en fin de checkpoint (écriture interrompue)
+    with open(stub, "a") as f:
+        f.write('{"ids": ["61ABC"')
+
+    done, saved = pdbe.load_checkpoint(stub)
+    assert done and len(saved) == len(done)
+
+    monkeypatch.setattr(pdbe, "_fetch_chunk", fetch)
+    StubPDBe.requested = []
+    summaries = pdbe.fetch_pdbe_summary(PDB_IDS, checkpoint=stub, max_workers=1)
+
+    assert [s["pdb_id"] for s in summaries] == [i.upper() for i in PDB_IDS]
+    assert not done & set(fetched_ids())
+
+
+def test_rerun_served_per_id_whatever_the_chunking(stub, monkeypatch, tmp_path):
+    monkeypatch.setattr(pdbe, "HTTP", CachedSession("pdb", cache_dir=tmp_path / "cache", offline=False))
+    StubPDBe.max_ids = 8
+    first = pdbe.fetch_pdbe_summary(PDB_IDS[:40], checkpoint=stub, max_workers=2)
+    stub.unlink()
+
+    # Autres lots (pas de 413) : les IDs déjà vus ne sont pas redemandés
+    StubPDBe.max_ids = 100
+    StubPDBe.requested = []
+    summaries = pdbe.fetch_pdbe_summary(PDB_IDS, checkpoint=stub, max_workers=2)
+
+    assert summaries[:40] == first
+    assert [s["pdb_id"] for s in summaries] == [i.upper() for i in PDB_IDS]
+    assert sorted(fetched_ids()) == sorted(i.upper() for i in PDB_IDS[40:])
+
+
+def test_workers_overlap_round_trips(stub):
+    StubPDBe.max_ids = 100
+    StubPDBe.latency = 0.1
+
+    summaries = pdbe.fetch_pdbe_summary(PDB_IDS, checkpoint=stub, max_workers=3)
+
+    assert len(summaries) == 60
+    assert 1 < StubPDBe.max_in_flight <= 3
+
+
+def test_adaptive_chunk_size():
+    chunker = pdbe.AdaptiveChunkSize(initial=20, maximum=50, target_s=1.0)
+
+    chunker.observe(0.1)
+    assert chunker.size == 30
+    chunker.observe(0.1)
+    chunker.observe(0.1)
+    assert chunker.size == 50
+    chunker.observe(0.7)
+    assert chunker.size == 50
+    chunker.observe(1.5)
+    assert chunker.size == 25
+
+    chunker.too_large(25)
+    assert (chunker.size, chunker.maximum) == (12, 24)
+    for _ in range(10):
+        chunker.observe(0.1)
+    assert chunker.size == 24
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Tests de l'exécuteur de pipeline en graphe (scripts/automation/pipeline_dag.py)"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts").resolve()))
+
+from automation.pipeline_dag import PipelineDAG, Stage, StageCache, local_modules  # noqa: E402
+
+import run_pipeline  # noqa: E402
+import run_pipeline_v1_3  # noqa: E402
+
+
+def write_script(root, name, body):
+    path = root / f"{name}.py"
+    path.write_text(body, encoding="utf-8")
+    return path.name
+
+
+def copy_script(root, name, src, dst, sleep=0.0):
+    """Script qui lit `src` (si fourni) et écrit `dst`."""
+    lines = ["import time", "from pathlib import Path", f"time.sleep({sleep})"]
+    text = "''" if src is None else f"Path({src!r}).read_text()"
+    lines.append(f"Path({dst!r}).write_text({text} + {name!r})")
+    lines.append(f"print('done {name}')")
+    return write_script(root, name, "\n".join(lines) + "\n")
+
+
+def test_dependencies_inferred_from_files():
+    dag = PipelineDAG(run_pipeline_v1_3.PIPELINE)
+
+    # Les trois harvests sont indépendants
+    for name in ("fpbase_graphql", "specialist", "mine_pmc"):
+        assert dag.deps[name] == []
+    assert dag.deps["fetch_supplements"] == ["mine_pmc"]
+    assert dag.deps["parse_supp_spreadsheets"] == ["fetch_supplements"]
+    assert set(dag.deps["build_candidates"]) == {
+        "fpbase_graphql", "specialist", "mine_pmc", "parse_supp_spreadsheets"}
+    assert dag.deps["qa_audit"] == ["build_tables"]
+
+
+def test_stages_declare_config_sections_they_read():
+    v1_2 = {s.name: set(s.config) for s in run_pipeline.PIPELINE}
+    v1_3 = {s.name: set(s.config) for s in run_pipeline_v1_3.PIPELINE}
+
+    # Sections de providers.yml lues (directement ou via cached_session)
+    assert v1_2["fetch_uniprot"] == {"uniprot"}
+    assert v1_2["fetch_pdb"] == {"pdb"}
+    assert v1_3["build_tables"] == {"validation"}
+    assert v1_3["qa_audit"] == {"thresholds", "validation"}
+
+
+def test_rewritten_file_orders_readers_and_writers():
+    dag = PipelineDAG(run_pipeline.PIPELINE)
+
+    # classify_modality réécrit les candidats lus par build_candidates
+    assert dag.deps["classify_modality"] == ["build_candidates"]
+    assert dag.deps["fetch_pmc_contrast"] == ["classify_modality"]
+    # compute_proxies réécrit un fichier lu par fetch_pmc_contrast (WAR)
+    assert set(dag.deps["compute_proxies"]) == {"classify_modality", "fetch_pmc_contrast"}
+    assert dag.deps["build_tables"] == ["compute_proxies"]
+
+
+def test_independent_branches_run_concurrently(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stages = [
+        Stage("a", copy_script(tmp_path, "a", None, "a.txt", sleep=0.5), outputs=["a.txt"]),
+        Stage("b", copy_script(tmp_path, "b", None, "b.txt", sleep=0.5), outputs=["b.txt"]),
+        Stage("c", copy_script(tmp_path, "c", "a.txt", "c.txt"),
+              inputs=["a.txt"], outputs=["c.txt"]),
+    ]
+
+    dag = PipelineDAG(stages)
+    main_module = sys.modules["__main__"]
+    results = dag.run(max_parallel=2)
+
+    assert [r.status for r in results.values()] == ["ok", "ok", "ok"]
+    assert (tmp_path / "c.txt").read_text() == "ac"
+    # a et b se chevauchent ; c attend la fin de a
+    assert results["b"].debut_s < results["a"].debut_s + results["a"].duree_s
+    assert results["c"].debut_s >= results["a"].debut_s + results["a"].duree_s
+    assert sys.modules["__main__"] is main_module
+    # Sortie tamponnée par stage
+    assert results["a"].output == "done a\n"
+
+    chain, duree = dag.critical_path()
+    assert chain == ["a", "c"]
+    assert duree == pytest.approx(results["a"].duree_s + results["c"].duree_s)
+
+
+def test_failure_skips_descendants_only(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    fail = write_script(tmp_path, "fail", "import sys\nprint('boom')\nsys.exit(3)\n")
+    stages = [
+        Stage("fail", fail, outputs=["x.txt"]),
+        Stage("after", copy_script(tmp_path, "after", "x.txt", "y.txt"), inputs=["x.txt"]),
+        Stage("other", copy_script(tmp_path, "other", None, "z.txt"), outputs=["z.txt"]),
+    ]
+
+    dag = PipelineDAG(stages)
+    results = dag.run(max_parallel=1)
+
+    assert results["fail"].status == "failed"
+    assert results["fail"].returncode == 3
+    assert results["after"].status == "skipped"
+    assert results["other"].status == "ok"
+    assert dag.returncode == 3
+    assert "boom" in capsys.readouterr().out
+
+    stopped = PipelineDAG(stages)
+    stopped.run(max_parallel=1, keep_going=False)
+    assert stopped.results["other"].status == "skipped"
+
+
+def test_isolated_and_in_process_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = write_script(tmp_path, "argv", "import sys\nprint(len(sys.argv))\n")
+    raising = write_script(tmp_path, "raising", "raise RuntimeError('oops')\n")
+    stages = [
+        Stage("inproc", script),
+        Stage("sub", script, isolated=True),
+        Stage("raising", raising),
+    ]
+
+    dag = PipelineDAG(stages)
+    results = dag.run(max_parallel=3)
+
+    assert results["inproc"].output == "1\n"
+    assert results["sub"].output == "1\n"
+    assert results["raising"].status == "failed"
+    assert "RuntimeError: oops" in results["raising"].output
+
+
+def test_missing_script_and_subset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    missing = PipelineDAG([Stage("ghost", "scripts/ghost.py")])
+    missing.run()
+    assert missing.results["ghost"].status == "failed"
+    assert missing.results["ghost"].raison == "Script not found: scripts/ghost.py"
+
+    dag = PipelineDAG(run_pipeline.PIPELINE).subset(
+        s.name for s in run_pipeline.PIPELINE if s.group == "qa")
+    assert [s.name for s in dag.stages] == ["qa_audit"]
+    assert dag.deps["qa_audit"] == []
+
+    with pytest.raises(ValueError):
+        dag.subset(["unknown"])
+    with pytest.raises(ValueError):
+        PipelineDAG([Stage("a", "a.py"), Stage("a", "b.py")])
+
+
+def counting_stages(tmp_path):
+    """a: src.txt -> a.txt ; b: a.txt -> b.txt ; chaque exécution est tracée dans runs.log."""
+    def script(name, src, dst):
+        body = (
+            "from pathlib import Path\n"
+            f"Path('runs.log').open('a').write({name!r})\n"
+            f"Path({dst!r}).write_text(Path({src!r}).read_text().upper())\n"
+        )
+        return write_script(tmp_path, name, body)
+
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "providers.yml").write_text("fpbase:\n  enabled: true\nuniprot: {}\n")
+    (tmp_path / "src.txt").write_text("v1")
+    return [
+        Stage("a", script("a", "src.txt", "a.txt"), inputs=["src.txt"], outputs=["a.txt"],
+              config=["fpbase"]),
+        Stage("b", script("b", "a.txt", "b.txt"), inputs=["a.txt"], outputs=["b.txt"]),
+    ]
+
+
+def test_stage_cache_skips_unchanged_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stages = counting_stages(tmp_path)
+    runs = tmp_path / "runs.log"
+
+    def run(**kwargs):
+        dag = PipelineDAG(stages)
+        dag.run(cache=StageCache(), **kwargs)
+        return [r.status for r in dag.results.values()]
+
+    assert run() == ["ok", "ok"]
+    assert run() == ["cached", "cached"]
+    assert runs.read_text() == "ab"
+
+    # Outputs supprimés : restaurés depuis le cache sans relancer
+    (tmp_path / "b.txt").unlink()
+    assert run() == ["cached", "cached"]
+    assert (tmp_path / "b.txt").read_text() == "V1"
+
+    # Input modifié : a relancé ; b relancé car son input a changé
+    (tmp_path / "src.txt").write_text("v2")
+    assert run() == ["ok", "ok"]
+    assert (tmp_path / "b.txt").read_text() == "V2"
+
+    # Retour à une version connue : tout est restauré
+    (tmp_path / "src.txt").write_text("v1")
+    assert run() == ["cached", "cached"]
+    assert (tmp_path / "b.txt").read_text() == "V1"
+
+    assert run(rerun=["b"]) == ["cached", "ok"]
+    assert runs.read_text() == "ababb"
+
+    manifest = next((tmp_path / "data/cache/stages/b").glob("SHA256SUMS_*.txt"))
+    checksum, path = manifest.read_text().rstrip("\n").split("  ")
+    assert path == "b.txt" and len(checksum) == 64 and checksum.isupper()
+
+
+def test_stage_cache_key_tracks_config_and_script(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stage_a, _ = counting_stages(tmp_path)
+    config = tmp_path / "config" / "providers.yml"
+
+    key = StageCache().key(stage_a)
+    # Une section non lue par le stage n'invalide pas la clé
+    config.write_text("fpbase:\n  enabled: true\nuniprot: {batch_size: 5}\n")
+    assert StageCache().key(stage_a) == key
+
+    config.write_text("fpbase:\n  enabled: false\nuniprot: {}\n")
+    key_config = StageCache().key(stage_a)
+    assert key_config != key
+
+    script = tmp_path / stage_a.script
+    script.write_text(script.read_text() + "# edit\n")
+    assert StageCache().key(stage_a) != key_config
+
+
+def test_stage_cache_key_expires_harvest_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stage_a, _ = counting_stages(tmp_path)
+    (tmp_path / "config" / "providers.yml").write_text("uniprot:\n  cache: {ttl_hours: 168}\n")
+    harvest = Stage("harvest", stage_a.script, outputs=["h.txt"], config=["uniprot"])
+    now = 1_000 * 168 * 3600.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    keys = StageCache().key(harvest), StageCache().key(stage_a)
+
+    # Dans la même tranche de TTL : clé stable
+    now += 167 * 3600
+    assert (StageCache().key(harvest), StageCache().key(stage_a)) == keys
+
+    # TTL du provider écoulé : seul le stage sans inputs est à relancer
+    now += 2 * 3600
+    assert StageCache().key(harvest) != keys[0]
+    assert StageCache().key(stage_a) == keys[1]
+
+
+def test_stage_cache_key_tracks_imported_local_modules(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    etl, providers = tmp_path / "scripts/etl", tmp_path / "scripts/providers"
+    etl.mkdir(parents=True)
+    providers.mkdir()
+    (etl / "stage.py").write_text("import json\nimport pandas\nfrom helper import run\nrun()\n")
+    (etl / "helper.py").write_text("from providers.http_cache import get\n\ndef run():\n    get()\n")
+    (providers / "http_cache.py").write_text("def get():\n    pass\n")
+    stage = Stage("stage", "scripts/etl/stage.py")
+
+    # Modules partagés importés transitivement ; stdlib et dépendances ignorées
+    assert [p.as_posix() for p in local_modules(Path(stage.script))] == [
+        "scripts/etl/helper.py", "scripts/providers/http_cache.py"]
+    key = StageCache().key(stage)
+    (providers / "http_cache.py").write_text("def get():\n    return 1\n")
+    assert StageCache().key(stage) != key
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Tests du miner PMC producteur/consommateur (scripts/textmine/mine_pmc_fulltext.py)"""
+
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts/textmine").resolve()))
+
+import mine_pmc_fulltext as miner  # noqa: E402
+from providers.http_cache import CachedSession, RateLimiter  # noqa: E402
+
+SEEDS = [{"name": f"FP{i}", "family": "GFP-like"} for i in range(12)]
+
+
+def articles_for(name):
+    """5 articles par protéine ; FPn et FPn+1 partagent un article."""
+    i = int(name[2:])
+    return [f"PMC{i}{k}" for k in range(4)] + [f"PMC{(i + 1) // 2}S"]
+
+
+class StubEuropePMC(BaseHTTPRequestHandler):
+    """Stub search + fullTextXML ; trace les requêtes pour mesurer la back-pressure."""
+
+    latency = 0.0
+    searches = []       # nombre d'articles servis au moment de chaque recherche
+    downloads = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = StubEuropePMC
+        url = urlparse(self.path)
+        if url.path.endswith("/search"):
+            name = re.match(r'"([^"]+)"', parse_qs(url.query)["query"][0]).group(1)
+            with cls.lock:
+                cls.searches.append(len(cls.downloads))
+            body = json.dumps({"resultList": {"result": [
+                {"pmcid": pmcid} for pmcid in articles_for(name)]}})
+            self._send(body, "application/json")
+            return
+
+        pmcid = url.path.split("/")[-2]
+        time.sleep(cls.latency)
+        with cls.lock:
+            cls.downloads.append(pmcid)
+        value = len(pmcid)
+        body = (f"<article><body><p>{pmcid}: ΔF/F0 = {value}.5 (n = 3)</p>"
+                f"<caption>Signal rose 2.0-fold increase</caption></body></article>")
+        self._send(body, "application/xml")
+
+    def _send(self, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    StubEuropePMC.latency = 0.0
+    StubEuropePMC.searches = []
+    StubEuropePMC.downloads = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubEuropePMC)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(miner, "OA_DIR", tmp_path / "oa")
+    monkeypatch.setattr(miner, "PMC_API_URL", f"http://127.0.0.1:{httpd.server_address[1]}/")
+    monkeypatch.setattr(miner, "HTTP", CachedSession("pmc", enabled=False, offline=False))
+    monkeypatch.setattr(miner, "LIMITER", RateLimiter(1000))
+    yield tmp_path
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_pipelined_run_matches_sequential_miner(stub, capsys):
+    expected = {}
+    for seed in SEEDS:
+        expected[seed["name"]] = miner.mine_protein_contrasts(seed["name"], seed["family"])
+    StubEuropePMC.downloads = []
+
+    results = miner.mine_all_proteins(SEEDS, search_workers=2, fetch_workers=3, extract_workers=2)
+
+    assert list(results) == [seed["name"] for seed in SEEDS]
+    assert results == expected
+    assert results["FP3"][0]["value"] == 5.5 and results["FP3"][0]["n"] == 3
+    # Articles partagés entre protéines téléchargés une seule fois
+    assert len(StubEuropePMC.downloads) == len(set(StubEuropePMC.downloads)) == 12 * 4 + 7
+    assert (stub / "oa/PMC00/fulltext.xml").exists()
+    assert "searches 12/12 | articles 55" in capsys.readouterr().out
+
+
+def test_bounded_queues_throttle_searches(stub, monkeypatch):
+    StubEuropePMC.latency = 0.02
+    monkeypatch.setattr(miner, "QUEUE_SIZE", 2)
+
+    results = miner.mine_all_proteins(SEEDS, search_workers=1, fetch_workers=1, extract_workers=1)
+
+    assert len(results) == 12
+    # Sans back-pressure, les 12 recherches partiraient avant les premiers téléchargements.
+    # Avec une file de 2 articles, une recherche attend que le retard retombe sous
+    # file + téléchargement en cours + articles de la recherche précédente.
+    discovered = 0
+    for served in StubEuropePMC.searches:
+        assert discovered - served <= 2 + 1 + 5
+        discovered += 5
+
+
+def test_throughput_counter_line():
+    counter = miner.ThroughputCounter(total_seeds=67, interval=60)
+    counter.add(searches=3, articles=2, bytes=2_000_000, measurements=7)
+
+    line = counter.line()
+    assert "searches 3/67" in line and "articles 2" in line and "measurements 7" in line
+    assert "MB/s" in line
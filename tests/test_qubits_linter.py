@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Tests du linter biological_qubits.csv (parité des moteurs rows / columnar)"""
+
+import csv
+import io
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+import qubits_linter
+from qubits_linter import QubitsLinter
+
+CATALOG_FILE = Path("biological_qubits.csv")
+
+COLUMNS = ['Systeme', 'Classe', 'Methode_lecture', 'Frequence', 'B0_Tesla', 'Defaut',
+           'T1_s', 'T2_us', 'Contraste_%', 'Temperature_K', 'Source_T2', 'Source_Contraste',
+           'Hyperpol_flag', 'In_vivo_flag', 'Qualite', 'DOI', 'Verification_statut']
+
+# Une ligne par branche de chaque check_*
+EDGE_ROWS = [
+    {'Systeme': 'NV ok', 'Defaut': 'NV', 'Frequence': '2.87 GHz', 'Contraste_%': '12',
+     'Source_Contraste': 'DOI:x', 'DOI': '10.1038/abc', 'Verification_statut': 'verifie'},
+    {'Systeme': 'NV décalé', 'Defaut': 'NV', 'Frequence': '3.5 GHz', 'Verification_statut': 'verifie'},
+    {'Systeme': 'NV format', 'Defaut': 'NV', 'Frequence': 'NA', 'Verification_statut': 'a_confirmer'},
+    {'Systeme': 'Contraste hors plage', 'Contraste_%': '150', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Contraste élevé', 'Contraste_%': ' 75 ', 'Source_Contraste': 'NA',
+     'Verification_statut': 'verifie'},
+    {'Systeme': 'Contraste texte', 'Contraste_%': 'élevé', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Contraste nan', 'Contraste_%': 'nan', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Nanoparticules SiC', 'Defaut': 'NA', 'Verification_statut': 'verifie'},
+    {'Systeme': 'SiC divacancy', 'Defaut': 'VV', 'Frequence': '2.1 GHz', 'Verification_statut': 'verifie'},
+    {'Systeme': 'SiC divacancy ok', 'Defaut': 'VV', 'Frequence': '1.10-1.35 GHz',
+     'Verification_statut': 'verifie'},
+    {'Systeme': 'NMR sans B0', 'Methode_lecture': 'NMR', 'B0_Tesla': '0.0', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Hyperpol sans T1', 'Hyperpol_flag': '1', 'T1_s': 'NA', 'Verification_statut': 'verifie'},
+    {'Systeme': 'In vivo froid', 'Temperature_K': '280', 'In_vivo_flag': '1', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Cryo', 'Temperature_K': '4', 'In_vivo_flag': '1', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Cryo qualité 1', 'Temperature_K': '77', 'Qualite': '1', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Température texte', 'Temperature_K': 'ambiante', 'Verification_statut': 'verifie'},
+    {'Systeme': 'DOI invalide', 'DOI': 'doi.org/123', 'Verification_statut': 'verifie'},
+    {'Systeme': 'Statut invalide', 'Verification_statut': 'peut-être'},
+    {'Systeme': 'T2 sans source', 'T2_us': '5', 'T1_s': '1e-6', 'Verification_statut': 'verifie'},
+    {'Systeme': 'T1 texte', 'T2_us': '5', 'T1_s': 'long', 'Source_T2': 'DOI:y',
+     'Verification_statut': 'verifie'},
+    {'Systeme': '', 'Contraste_%': '-3', 'Verification_statut': ''},
+    {'Systeme': 'Nom "cité"\nsur deux lignes', 'Contraste_%': '60', 'Verification_statut': 'a_confirmer'},
+]
+
+
+def write_catalog(path: Path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def lint(path, engine):
+    linter = QubitsLinter(str(path), engine=engine)
+    return linter, linter.lint_all()
+
+
+def report_text(linter, path):
+    """Rapport généré, sans la section de temps (non déterministe)"""
+    linter._get_date = lambda: "2025-01-01 00:00"
+    linter.generate_report_md(str(path))
+    text = path.read_text(encoding='utf-8')
+    return text[:text.index("## ⏱️")]
+
+
+def assert_same_stats(reference, candidate):
+    assert [asdict(i) for i in candidate.issues] == [asdict(i) for i in reference.issues]
+    assert (candidate.total_lignes, candidate.erreurs, candidate.warnings,
+            candidate.infos, candidate.systemes_ok) == \
+           (reference.total_lignes, reference.erreurs, reference.warnings,
+            reference.infos, reference.systemes_ok)
+
+
+def test_engine_parity_on_catalog():
+    pytest.importorskip("pandas")
+    _, reference = lint(CATALOG_FILE, "rows")
+    _, candidate = lint(CATALOG_FILE, "columnar")
+    assert_same_stats(reference, candidate)
+
+
+def test_engine_parity_on_edge_cases(tmp_path):
+    pytest.importorskip("pandas")
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    _, reference = lint(path, "rows")
+    _, candidate = lint(path, "columnar")
+    # Chaque branche doit réellement produire une issue
+    assert reference.erreurs > 0 and reference.warnings > 0
+    assert_same_stats(reference, candidate)
+
+
+def test_report_identical_across_engines(tmp_path):
+    pytest.importorskip("pandas")
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    reports = []
+    for engine in ("rows", "columnar"):
+        linter, _ = lint(path, engine)
+        reports.append(report_text(linter, tmp_path / f"QC_{engine}.md"))
+    assert reports[0] == reports[1]
+
+
+def test_unknown_engine_rejected():
+    with pytest.raises(ValueError):
+        QubitsLinter(str(CATALOG_FILE), engine="simd")
+
+
+@pytest.mark.parametrize("engine", ["rows", "columnar"])
+def test_incremental_cache_matches_full_run(tmp_path, engine):
+    if engine == "columnar":
+        pytest.importorskip("pandas")
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    cache = tmp_path / ".qubits_linter_cache.json"
+    _, reference = lint(path, "rows")
+
+    cold = QubitsLinter(str(path), engine=engine, cache_path=str(cache))
+    assert_same_stats(reference, cold.lint_all())
+    assert cold.cache_hits == 0 and cache.exists()
+
+    warm = QubitsLinter(str(path), engine=engine, cache_path=str(cache))
+    assert_same_stats(reference, warm.lint_all())
+    assert warm.cache_hits == len(EDGE_ROWS)
+
+
+def test_incremental_cache_rechecks_only_edited_rows(tmp_path):
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    cache = tmp_path / ".qubits_linter_cache.json"
+    QubitsLinter(str(path), engine="rows", cache_path=str(cache)).lint_all()
+
+    edited = [dict(row) for row in EDGE_ROWS]
+    edited[3]['Contraste_%'] = '42'
+    write_catalog(path, edited)
+    _, reference = lint(path, "rows")
+
+    linter = QubitsLinter(str(path), engine="rows", cache_path=str(cache))
+    assert_same_stats(reference, linter.lint_all())
+    assert linter.cache_hits == len(EDGE_ROWS) - 1
+
+
+def test_incremental_cache_invalidated_by_rule_change(tmp_path, monkeypatch):
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    cache = tmp_path / ".qubits_linter_cache.json"
+    QubitsLinter(str(path), engine="rows", cache_path=str(cache)).lint_all()
+
+    monkeypatch.setattr(QubitsLinter, "rules_fingerprint", lambda self, columns: "autres-regles")
+    linter = QubitsLinter(str(path), engine="rows", cache_path=str(cache))
+    linter.lint_all()
+    assert linter.cache_hits == 0
+
+
+def test_incremental_report_identical_to_full_run(tmp_path):
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS + EDGE_ROWS[:3])
+    cache = tmp_path / ".qubits_linter_cache.json"
+    reports = []
+    for cache_path in (None, cache, cache):
+        linter = QubitsLinter(str(path), engine="rows", cache_path=cache_path and str(cache_path))
+        linter.lint_all()
+        reports.append(report_text(linter, tmp_path / "QC_REPORT.md"))
+    assert reports[0] == reports[1] == reports[2]
+
+
+@pytest.mark.parametrize("engine", ["rows", "columnar"])
+def test_quick_profile_runs_only_cheap_rules(tmp_path, engine):
+    if engine == "columnar":
+        pytest.importorskip("pandas")
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    _, full = lint(path, "rows")
+    linter = QubitsLinter(str(path), engine=engine, profile="quick")
+    stats = linter.lint_all()
+
+    assert linter.rules and all(rule.cost == "cheap" for rule in linter.rules)
+    expected = [asdict(i) for i in full.issues if i.regle in stats.regles]
+    assert [asdict(i) for i in stats.issues] == expected
+    assert set(stats.regles) == {rule.name for rule in linter.rules}
+
+
+def test_rule_timings_exported(tmp_path):
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    linter, stats = lint(path, "rows")
+    linter.generate_rules_json(str(tmp_path / "QC_RULES.json"))
+    payload = json.loads((tmp_path / "QC_RULES.json").read_text(encoding='utf-8'))
+
+    assert payload['profil'] == linter.profile
+    assert {entry['regle'] for entry in payload['regles']} == {rule.name for rule in linter.rules}
+    assert sum(entry['issues'] for entry in payload['regles']) == len(stats.issues)
+
+    linter.generate_report_md(str(tmp_path / "QC_REPORT.md"))
+    report = (tmp_path / "QC_REPORT.md").read_text(encoding='utf-8')
+    assert "## ⏱️ Temps par règle" in report
+    assert all(f"| `{rule.name}` |" in report for rule in linter.rules)
+
+
+def test_registered_rule_runs_in_both_engines(tmp_path, monkeypatch):
+    pytest.importorskip("pandas")
+
+    def check_classe(linter, row, idx):
+        if row.get('Classe', '').strip() == '':
+            linter.add_issue(idx + 2, row.get('Systeme', 'Inconnu'), 'Classe', 'INFO',
+                             'Classe non renseignée', '')
+
+    monkeypatch.setattr(qubits_linter, "RULES", dict(qubits_linter.RULES))
+    qubits_linter.register_rule(qubits_linter.LintRule('classe', ('Systeme', 'Classe'), 'INFO',
+                                                       'cheap', check_classe))
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    _, reference = lint(path, "rows")
+    _, candidate = lint(path, "columnar")
+
+    assert reference.infos == len(EDGE_ROWS)
+    assert_same_stats(reference, candidate)
+
+
+def test_unknown_profile_rejected():
+    with pytest.raises(ValueError):
+        QubitsLinter(str(CATALOG_FILE), profile="nightly")
+
+
+@pytest.mark.parametrize("engine", ["rows", "columnar"])
+def test_streaming_report_matches_classic_report(tmp_path, monkeypatch, engine):
+    if engine == "columnar":
+        pytest.importorskip("pandas")
+    # Petits blocs : les numéros de ligne doivent traverser les frontières de blocs
+    monkeypatch.setattr(qubits_linter, "STREAM_CHUNK_ROWS", 4)
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS)
+    classic, reference = lint(path, "rows")
+    expected = report_text(classic, tmp_path / "QC_classic.md")
+
+    linter = QubitsLinter(str(path), engine=engine)
+    linter._get_date = lambda: "2025-01-01 00:00"
+    stats = linter.generate_report_streaming(str(tmp_path / "QC_stream.md"),
+                                             str(tmp_path / "QC.jsonl"), str(tmp_path / "QC.sarif"))
+    streamed = (tmp_path / "QC_stream.md").read_text(encoding='utf-8')
+
+    assert streamed[:streamed.index("## ⏱️")] == expected
+    assert stats.issues == []
+    assert (stats.total_lignes, stats.erreurs, stats.warnings, stats.infos, stats.systemes_ok) == \
+           (reference.total_lignes, reference.erreurs, reference.warnings,
+            reference.infos, reference.systemes_ok)
+
+    lines = (tmp_path / "QC.jsonl").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [asdict(i) for i in reference.issues]
+
+    sarif = json.loads((tmp_path / "QC.sarif").read_text(encoding='utf-8'))
+    results = sarif['runs'][0]['results']
+    assert sarif['version'] == "2.1.0"
+    assert [(r['ruleId'], r['locations'][0]['physicalLocation']['region']['startLine'])
+            for r in results] == [(i.regle, i.ligne) for i in reference.issues]
+    assert {r['id'] for r in sarif['runs'][0]['tool']['driver']['rules']} == set(stats.regles)
+
+
+def test_sarif_export_without_issues(tmp_path):
+    path = write_catalog(tmp_path / "ok.csv", EDGE_ROWS[:1])
+    linter, stats = lint(path, "rows")
+    assert stats.issues == []
+    linter.export_issues(str(tmp_path / "QC.jsonl"), str(tmp_path / "QC.sarif"))
+    sarif = json.loads((tmp_path / "QC.sarif").read_text(encoding='utf-8'))
+    assert sarif['runs'][0]['results'] == []
+    assert (tmp_path / "QC.jsonl").read_text(encoding='utf-8') == ""
+
+
+@pytest.mark.parametrize("scan_bytes", [7, 64, 1 << 20])
+def test_record_shards_align_on_records(tmp_path, monkeypatch, scan_bytes):
+    monkeypatch.setattr(qubits_linter, "SHARD_SCAN_BYTES", scan_bytes)
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS * 3)
+    with open(path, encoding='utf-8', newline='') as f:
+        expected = list(csv.reader(f))
+
+    for n_shards in (1, 2, 5, 40):
+        shards = qubits_linter.record_shards(str(path), n_shards)
+        assert 1 <= len(shards) <= n_shards
+        raw = path.read_bytes()
+        header_end = shards[0][0]
+        records = list(csv.reader(io.StringIO(raw[:header_end].decode('utf-8'), newline='')))
+        for _, start, end in shards:
+            chunk = raw[start:end].decode('utf-8')
+            records.extend(csv.reader(io.StringIO(chunk, newline='')))
+        assert shards[0][1] == header_end and shards[-1][2] == len(raw)
+        assert records == expected
+
+
+@pytest.mark.parametrize("engine", ["rows", "columnar"])
+def test_parallel_lint_matches_single_process(tmp_path, engine):
+    if engine == "columnar":
+        pytest.importorskip("pandas")
+    path = write_catalog(tmp_path / "edge.csv", EDGE_ROWS * 4)
+    single, reference = lint(path, "rows")
+    linter = QubitsLinter(str(path), engine=engine, workers=3)
+    stats = linter.lint_all()
+
+    assert_same_stats(reference, stats)
+    assert {name: t.issues for name, t in stats.regles.items()} == \
+           {name: t.issues for name, t in reference.regles.items()}
+    assert report_text(linter, tmp_path / "QC_parallel.md") == report_text(single, tmp_path / "QC.md")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Tests du moteur de dédoublonnage partagé (scripts/etl/record_linkage.py)"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import record_linkage as rl  # noqa: E402
+
+CONFIG = {
+    'validation': {'deduplication': {'keys': ["fpbase_slug", "uniprot_id", "name_family_year"]}},
+    'evidence_tiers': {1: "supplement_table", 2: "main_table", 6: "paragraph_measured"},
+}
+
+
+def test_config_keys_link_transitively():
+    df = pd.DataFrame({
+        'protein_name': ["EGFP", "eGFP", "GFP-enhanced", "mCherry", "GCaMP6s", "GCaMP6s", None],
+        'family': ["GFP", "gfp", "GFP", "RFP", "GECI", "GECI", None],
+        'fpbase_slug': [None, "egfp", "EGFP", None, None, None, None],
+        'uniprot_id': [None, None, "p42212", None, "Q1", "q1 ", None],
+        'year': [2000, 2000.0, None, 2004, 2013, 2016, None],
+    }, index=[10, 11, 12, 13, 14, 15, 16])
+    linker = rl.RecordLinker.from_config(CONFIG)
+
+    groups, links = linker.link(df)
+
+    # EGFP ~ eGFP (nom/famille/année), eGFP ~ GFP-enhanced (slug) ; GCaMP6s (UniProt)
+    assert groups.tolist() == [0, 0, 0, 1, 2, 2, 3]
+    assert links == {'fpbase_slug': 2, 'uniprot_id': 2, 'name_family_year': 2}
+    assert rl.connected_groups([np.array([-1, -1])], 2).tolist() == [0, 1]
+
+
+def test_resolution_by_tier_priority_and_completeness():
+    df = pd.DataFrame({
+        'protein_name': ["GCaMP6s"] * 4 + ["EGFP"] * 2,
+        'source': ["fpbase_graphql", "pmc_fulltext", "pmc_supplement", "pmc_fulltext",
+                   "fpbase_graphql", "specialist_geci"],
+        'evidence_type': [None, "paragraph_measured", "supplement_table", "unknown", None, None],
+        'contrast_value': [np.nan, 10.0, 12.0, 9.0, np.nan, 2.0],
+        'doi': [None, "10.1/a", None, "10.1/b", "10.1/c", None],
+    })
+    linker = (rl.RecordLinker.from_config(CONFIG)
+              .register_source('fpbase_graphql', priority=1, tier=6)
+              .register_source('specialist', priority=2, tier=7))
+
+    assert linker.evidence_tier(df).tolist() == [6, 6, 1, rl.UNKNOWN_TIER, 6, 7]
+    assert linker.source_priority(df).tolist() == [1, np.inf, np.inf, np.inf, 1, 2]
+
+    best, report = linker.deduplicate(df)
+    assert best.index.tolist() == [2, 4]
+    assert report['n_duplicates'] == 4 and report['n_groups_merged'] == 2
+    assert report['kept_by_source'] == {'pmc_supplement': 1, 'fpbase_graphql': 1}
+    assert report['largest_groups'] == [("GCaMP6s", 4), ("EGFP", 2)]
+
+    # Tier égal : complétude ; agrégation 'first' = première valeur non nulle
+    merged, _ = linker.deduplicate(df, rank_by=[('tier', True), ('completeness', False)],
+                                   aggregate={'contrast_value': 'first', 'doi': 'first'})
+    assert merged.to_dict('list') == {'contrast_value': [12.0, 2.0], 'doi': ["10.1/a", "10.1/c"]}
+
+
+def test_first_occurrence_and_match_agree_with_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'protein_name': rng.choice(["A", "B", "C", "D"], 300),
+                       'doi': rng.choice(["x", "y", "z"], 300),
+                       'SystemID': rng.integers(0, 120, 300)})
+
+    got, report = rl.RecordLinker(keys=[('protein_name', 'doi')]).deduplicate(df, rank_by=())
+    pd.testing.assert_frame_equal(got, df.drop_duplicates(['protein_name', 'doi']))
+    assert report['n_output'] == 12
+
+    reference = pd.DataFrame({'name_lower': ["a", "b", "a"]}, index=[5, 6, 7])
+    queries = pd.DataFrame({'name_lower': ["a", "c", "b", None]})
+    target = rl.RecordLinker(keys=['name_lower']).match(queries, reference)
+    assert target.fillna(-1).tolist() == [5, -1, 6, -1]
+
+
+def test_fuzzy_stage_respects_no_merge_pairs():
+    df = pd.DataFrame({'protein_name': ["GCaMP6s", "GCaMP6f", "GCaMP-6s", "jRGECO1a", "jRGECO1b"]})
+    linker = rl.RecordLinker(keys=[], fuzzy_threshold=1, no_merge_pairs=[("jrgeco1b", "jrgeco1a")])
+
+    groups, links = linker.link(df)
+
+    assert groups.tolist() == [0, 0, 0, 1, 2]
+    assert links == {'fuzzy_name': 3}
+
+
+def test_long_chains_link_transitively():
+    # Durée sur 200 000 lignes : scripts/etl/bench_atlas_builders.py --cases linkage
+    rows = 2_000
+    # Chaîne : i ~ i+1 par la clé a (i pair) ou b (i impair) -> une seule composante
+    df = pd.DataFrame({'a': np.arange(rows) // 2, 'b': (np.arange(rows) + 1) // 2})
+    df.loc[rows // 2, ['a', 'b']] = [-1, -2]  # coupure au milieu
+
+    groups, _ = rl.RecordLinker(keys=['a', 'b']).link(df)
+
+    assert groups[:rows // 2].max() == 0 and groups[rows // 2] == 1
+    assert (groups[rows // 2 + 1:] == 2).all()
+
+
+def test_external_candidates_merge_by_slug_and_evidence_tier():
+    import build_external_candidates_v1_3 as bec
+
+    df = pd.DataFrame({
+        'protein_name': ["GCaMP6s", "GCaMP6s", "GCaMP6-slow", "EGFP", ""],
+        'normalized_name': ["gcamp6s", "gcamp6s", "gcamp6slow", "egfp", ""],
+        'canonical_name': ["gcamp6s", "gcamp6s", "gcamp6slow", "egfp", np.nan],
+        'fpbase_slug': ["gcamp6s", None, "gcamp6s", "egfp", None],
+        'source': ["fpbase_graphql", "pmc_supplement", "specialist_geci", "fpbase_graphql", "pmc_fulltext"],
+        'evidence_type': [None, "supplement_table", None, None, "paragraph_measured"],
+        'contrast_value': [np.nan, 13.0, 20.0, np.nan, 1.0],
+        'source_refs': ["fpbase", "PMC1", "geci_db", "fpbase", "PMC2"],
+        'license_source': ["CC BY"] * 5,
+        'is_biosensor': [1, 1, 1, 0, 1],
+    })
+
+    out = bec.deduplicate_advanced(df)
+
+    assert out['canonical_name'].tolist() == ["egfp", "gcamp6s"]
+    gcamp = out.iloc[1]
+    assert (gcamp['contrast_value'], gcamp['tier'], gcamp['source']) == (13.0, 1, "pmc_supplement")
+    assert gcamp['source_refs'] == "PMC1; fpbase; geci_db"
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests de la déduplication stricte par hachage (scripts/etl/build_atlas_v2_2_strict_dedup.py)"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import build_atlas_v2_2_strict_dedup as dedup  # noqa: E402
+
+
+def legacy_strict_dedup(df_combined):
+    """Double boucle iterrows() d'origine (référence)."""
+    df_combined['name_normalized'] = df_combined['protein_name'].apply(dedup.normalize_name)
+    groups, processed = [], set()
+    for idx, row in df_combined.iterrows():
+        if idx in processed:
+            continue
+        matches = [idx]
+        for idx2, row2 in df_combined.iterrows():
+            if idx2 in processed or idx2 == idx:
+                continue
+            if dedup.fuzzy_match(row['protein_name'], row2['protein_name']):
+                matches.append(idx2)
+                processed.add(idx2)
+        groups.append(matches)
+        processed.add(idx)
+
+    keep = []
+    for group in groups:
+        group_df = df_combined.loc[group].copy()
+        group_df['completeness'] = (
+            (~group_df['contrast_value'].isna()).astype(int) * 100 +
+            (~group_df['excitation_nm'].isna()).astype(int) * 10 +
+            (~group_df['emission_nm'].isna()).astype(int) * 10 +
+            (~group_df['doi'].isna()).astype(int) * 1)
+        keep.append(group_df.sort_values(['source_priority', 'completeness'],
+                                         ascending=[True, False]).index[0])
+    return df_combined.loc[keep].copy()
+
+
+def random_atlas(rows, seed):
+    rng = np.random.default_rng(seed)
+    names = np.array(["GCaMP6s", "gcamp-6s", "jGCaMP7a", "jGCaMP7b", "EGFP", "e gfp", "mCherry", None])
+    maybe = lambda values: np.where(rng.random(rows) < 0.4, np.nan, values)  # noqa: E731
+    return pd.DataFrame({
+        'protein_name': names[rng.integers(0, len(names), rows)],
+        'source_priority': rng.integers(2, 4, rows),
+        'contrast_value': maybe(rng.uniform(1, 10, rows)),
+        'excitation_nm': maybe(rng.integers(400, 600, rows).astype(float)),
+        'emission_nm': maybe(rng.integers(450, 650, rows).astype(float)),
+        'doi': np.where(rng.random(rows) < 0.5, None, "10.1/x"),
+        'row_id': np.arange(rows),
+    }, index=rng.permutation(rows) * 3)
+
+
+def test_matches_nested_loop_dedup():
+    for seed in range(5):
+        df = random_atlas(120, seed)
+        expected = legacy_strict_dedup(df.copy())
+        got = dedup.strict_dedup(df.copy())
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_pluggable_fuzzy_stage():
+    df = random_atlas(60, 7)
+    # Étape floue de démonstration : jgcamp7a/jgcamp7b regroupés
+    got = dedup.strict_dedup(df.copy(), fuzzy_stage=lambda names: names.str.rstrip('ab'))
+
+    assert (got['name_normalized'].str.startswith('jgcamp7')).sum() == 1
+    assert len(got) == 5
+    assert dedup.strict_dedup(df.copy(), fuzzy_stage=None).shape[0] == 6
+
+
+def test_large_merge_keeps_one_row_per_name():
+    # Durée sur 100 000 lignes : scripts/etl/bench_atlas_builders.py --cases strict
+    rows = 2_000
+    df = random_atlas(rows, 3)
+    df['protein_name'] = [f"FP{i % 800}" for i in range(rows)]
+
+    got = dedup.strict_dedup(df)
+
+    assert len(got) == 800
+    assert got['name_normalized'].is_unique
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Tests de l'extraction vectorisée des tableurs supplémentaires (scripts/textmine/parse_supp_spreadsheets.py)"""
+
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path("scripts/textmine").resolve()))
+
+import parse_supp_spreadsheets as supp  # noqa: E402
+
+
+def legacy_rows(df, columns, pmcid, source_file, sheet_name):
+    """Boucle iterrows() d'origine (référence), lignes à valeur NaN exclues."""
+    rows = []
+    for idx, row in df.iterrows():
+        try:
+            value = float(row[columns['contrast']])
+        except (ValueError, TypeError):
+            continue
+        if math.isnan(value):
+            continue
+        stats = {}
+        for stat_name, stat_col in columns['stats'].items():
+            try:
+                stats[stat_name] = float(row[stat_col])
+            except (ValueError, TypeError):
+                pass
+        rows.append({
+            'value': value, 'metric_type': columns['metric_type'],
+            'protein_name': row[columns['name']] if columns['name'] else None,
+            'pmcid': pmcid, 'source_file': source_file, 'sheet': sheet_name, 'row': idx + 2,
+            **{k: stats.get(k) for k in supp.STATS_COLUMN_SYNONYMS},
+            'evidence_type': 'supplement_table'})
+    return rows
+
+
+def normalise(records):
+    return [{k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in r.items()}
+            for r in records]
+
+
+def test_matches_row_by_row_extraction(tmp_path):
+    path = tmp_path / "table_s1.csv"
+    path.write_text(
+        "Sensor,Notes,dF/F0,SD,n,Unused\n"
+        "GCaMP6s,ok,12.5,1.1,8,a\n"
+        "GCaMP6f,,n.d.,0.9,6,b\n"       # valeur non numérique : ligne ignorée
+        "jRGECO1a,, 4.2 ,x,,c\n"        # stats non numériques / vides : None
+        ",,7,,,d\n",
+        encoding="utf-8")
+
+    records = supp.parse_spreadsheet(path, "PMC1")
+
+    df = pd.read_csv(path)
+    columns = supp.detect_columns(df)
+    assert columns == {'name': 'Sensor', 'contrast': 'dF/F0', 'metric_type': 'deltaF_F0',
+                       'stats': {'n': 'n', 'sd': 'SD'}}
+    assert records == normalise(legacy_rows(df, columns, "PMC1", path.name, "data"))
+    assert [(r['protein_name'], r['value'], r['row'], r['sd'], r['n']) for r in records] == [
+        ('GCaMP6s', 12.5, 2, 1.1, 8.0), ('jRGECO1a', 4.2, 4, None, None), (None, 7.0, 5, None, None)]
+
+
+def test_reads_only_detected_columns(tmp_path, monkeypatch):
+    path = tmp_path / "wide.csv"
+    pd.DataFrame({'variant': ['A', 'B'], 'fold_change': [2, 3], 'comment': ['x', 'y']}).to_csv(
+        path, index=False)
+    reads = []
+    original = pd.read_csv
+
+    def spy(*args, **kwargs):
+        reads.append((kwargs.get('nrows'), kwargs.get('usecols')))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(supp.pd, "read_csv", spy)
+    frame = supp.parse_spreadsheet_frame(path, "PMC2")
+
+    assert reads == [(0, None), (None, ['variant', 'fold_change'])]
+    assert list(frame.columns) == supp.MEASUREMENT_COLUMNS
+    assert frame['value'].tolist() == [2.0, 3.0]
+    # Pas de colonne de contraste : aucune lecture au-delà de l'en-tête
+    pd.DataFrame({'gene': ['A', 'B'], 'comment': ['x', 'y']}).to_csv(path, index=False)
+    reads.clear()
+    assert supp.parse_spreadsheet_frame(path, "PMC2").empty
+    assert reads == [(0, None)]
+
+
+def test_large_table(tmp_path):
+    rows = 100_000
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0.1, 50, rows).round(3).astype(str)
+    values[::7] = "n.d."
+    path = tmp_path / "large.csv"
+    pd.DataFrame({'construct': [f"FP{i}" for i in range(rows)], 'ΔF/F0': values,
+                  'SEM': rng.uniform(0, 1, rows).round(3), 'extra': 'x'}).to_csv(path, index=False)
+
+    frame = supp.parse_spreadsheet_frame(path, "PMC3")
+
+    assert len(frame) == rows - len(values[::7])
+    assert frame['row'].iloc[0] == 3 and frame['protein_name'].iloc[0] == "FP1"
+    assert frame['sem'].notna().all() and frame['n'].isna().all()
+
+
+def write_supplements(tmp_path, count):
+    items = []
+    for i in range(count):
+        path = tmp_path / "oa_supp" / f"PMC{i}" / f"table_s{i}.csv"
+        path.parent.mkdir(parents=True)
+        pd.DataFrame({'indicator': [f"S{i}a", f"S{i}b", 7], 'fold_change': [i + 1, 'n.d.', 2.5],
+                      'SEM': [0.1, 0.2, None]}).to_csv(path, index=False)
+        items.append({'pmcid': f"PMC{i}", 'filename': path.name, 'path': str(path)})
+    return items
+
+
+def test_parallel_parse_streams_parquet_and_reuses_sheet_cache(tmp_path, monkeypatch):
+    items = write_supplements(tmp_path, 4)
+    output = tmp_path / "supplement_contrasts.parquet"
+    cache_dir = tmp_path / "cache"
+
+    counts = supp.parse_all_supplements(items, output, cache_dir, workers=2)
+
+    table = pq.read_table(output)
+    assert table.schema == supp.MEASUREMENT_SCHEMA
+    assert counts == {'files': 4, 'cached': 0, 'measurements': 8}
+    assert pq.ParquetFile(output).num_row_groups == 4  # une écriture par fichier
+    expected = supp.concat_measurements(
+        [supp.parse_spreadsheet_frame(Path(item['path']), item['pmcid']) for item in items])
+    # Row groups dans l'ordre du download log, quel que soit l'ordre de fin
+    got = table.to_pandas()
+    assert got['protein_name'].tolist() == ['S0a', '7', 'S1a', '7', 'S2a', '7', 'S3a', '7']
+    assert got['value'].tolist() == expected['value'].tolist()
+
+    # Relance : fichiers inchangés -> aucune ouverture de tableur
+    monkeypatch.setattr(supp, "read_sheets", lambda *_: pytest.fail("re-parsed"))
+    # Copie identique sous un autre article : même hash, provenance propre
+    items.append({**items[0], 'pmcid': "PMC9"})
+    counts = supp.parse_all_supplements(items, output, cache_dir, workers=1)
+    assert counts == {'files': 5, 'cached': 5, 'measurements': 10}
+    assert pq.read_table(output).to_pandas()['pmcid'].tolist()[-2:] == ["PMC9", "PMC9"]
+
+    # Contenu modifié : nouveau hash, nouveau parsing
+    monkeypatch.undo()
+    Path(items[1]['path']).write_text("indicator,fold_change\nX,3\nY,4\nZ,5\n", encoding="utf-8")
+    counts = supp.parse_all_supplements(items[:2], output, cache_dir, workers=1)
+    assert counts == {'files': 2, 'cached': 1, 'measurements': 5}
+
+    # Fichier illisible (supprimé après le filtrage) : ignoré, pas d'exception
+    missing = {**items[0], 'path': str(tmp_path / "absent.csv")}
+    assert supp.parse_supplement(missing, cache_dir)[0].empty
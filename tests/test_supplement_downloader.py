@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Tests du gestionnaire de téléchargement des suppléments (scripts/textmine/fetch_supplements.py)"""
+
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts/textmine").resolve()))
+
+import fetch_supplements as fs  # noqa: E402
+
+FILES = {f"/supp/table{i}.xlsx": bytes(range(256)) * (200 + i) for i in range(6)}
+
+
+class StubFileServer(BaseHTTPRequestHandler):
+    """Sert FILES (ETag), honore `Range: bytes=N-` / If-Range, trace requêtes et concurrence."""
+
+    latency = 0.0
+    etag = '"v1"'
+    range_offset = 0  # décale le Content-Range des 206 (serveur non conforme)
+    requests = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = StubFileServer
+        with cls.lock:
+            cls.requests.append((self.path, self.headers.get("Range"), self.headers.get("If-Range")))
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(cls.latency)
+            match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range") or "")
+            if self.headers.get("If-Range", cls.etag) != cls.etag:
+                match = None  # fichier modifié : réponse complète
+            start = int(match.group(1)) - cls.range_offset if match else 0
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.end_headers()
+                return
+            self.send_response(206 if match else 200)
+            self.send_header("ETag", cls.etag)
+            if match:
+                self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            self.wfile.write(body[start:])
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StubFileServer.requests = []
+    StubFileServer.max_active = 0
+    StubFileServer.latency = 0.0
+    StubFileServer.etag = '"v1"'
+    StubFileServer.range_offset = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubFileServer)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def jobs_for(base, out_dir):
+    return [{"pmcid": "PMC1", "filename": Path(p).name, "url": base + p,
+             "path": out_dir / Path(p).name} for p in FILES]
+
+
+def test_streams_all_files_concurrently_then_rerun_is_free(server, tmp_path):
+    StubFileServer.latency = 0.2
+    log_path = tmp_path / "download_log.json"
+    manager = fs.DownloadManager(log_path, per_host=3, chunk_size=1024)
+
+    entries = manager.download_all(jobs_for(server, tmp_path))
+    manager.save_log()
+
+    assert [Path(e["path"]).read_bytes() for e in entries] == list(FILES.values())
+    assert [e["sha256"] for e in entries] == [hashlib.sha256(b).hexdigest() for b in FILES.values()]
+    assert StubFileServer.max_active == 3  # borné par hôte
+    assert not list(tmp_path.glob("*.part*"))
+
+    # Relance : tailles et mtime identiques au journal -> aucune requête
+    StubFileServer.requests = []
+    rerun = fs.DownloadManager(log_path, per_host=3)
+    assert rerun.download_all(jobs_for(server, tmp_path)) == entries
+    assert StubFileServer.requests == []
+    assert rerun.stats["skipped"] == len(FILES)
+
+    # Le journal reste lisible par parse_supp_spreadsheets
+    logged = json.loads(log_path.read_text(encoding="utf-8"))
+    assert logged["count"] == len(FILES)
+    assert {item["pmcid"] for item in logged["downloaded"]} == {"PMC1"}
+
+
+def partial_download(tmp_path, server, url_path, size, validator='"v1"'):
+    """.part de `size` octets laissé par une exécution interrompue."""
+    target = tmp_path / Path(url_path).name
+    target.with_name(target.name + ".part").write_bytes(FILES[url_path][:size])
+    if validator is not None:
+        target.with_name(target.name + ".part.json").write_text(
+            json.dumps({"url": server + url_path, "validator": validator}), encoding="utf-8")
+    return {"url": server + url_path, "path": target}
+
+
+def test_resumes_partial_file_with_range(server, tmp_path):
+    url_path, body = "/supp/table3.xlsx", FILES["/supp/table3.xlsx"]
+    job = partial_download(tmp_path, server, url_path, 10000)
+    manager = fs.DownloadManager(tmp_path / "log.json", chunk_size=4096)
+
+    [entry] = manager.download_all([job])
+
+    assert StubFileServer.requests == [(url_path, "bytes=10000-", '"v1"')]
+    assert job["path"].read_bytes() == body
+    assert entry["sha256"] == hashlib.sha256(body).hexdigest()
+    assert manager.stats["resumed"] == 1
+    assert manager.stats["bytes"] == len(body) - 10000
+    assert not list(tmp_path.glob("*.part*"))
+
+
+@pytest.mark.parametrize("case", ["changed", "bad_range", "no_validator"])
+def test_unsafe_resume_downloads_whole_file(server, tmp_path, case):
+    url_path, body = "/supp/table2.xlsx", FILES["/supp/table2.xlsx"]
+    job = partial_download(tmp_path, server, url_path, 10000,
+                           validator=None if case == "no_validator" else '"v1"')
+    if case == "changed":
+        StubFileServer.etag = '"v2"'  # If-Range ne correspond plus -> 200
+    elif case == "bad_range":
+        StubFileServer.range_offset = 5000  # 206 qui ne commence pas à l'offset
+
+    manager = fs.DownloadManager(tmp_path / "log.json", chunk_size=4096)
+    [entry] = manager.download_all([job])
+
+    assert job["path"].read_bytes() == body
+    assert entry["sha256"] == hashlib.sha256(body).hexdigest()
+    assert manager.stats["resumed"] == 0
+    expected = {"changed": [(url_path, "bytes=10000-", '"v1"')],
+                "bad_range": [(url_path, "bytes=10000-", '"v1"'), (url_path, None, None)],
+                "no_validator": [(url_path, None, None)]}[case]
+    assert StubFileServer.requests == expected
+
+
+def test_changed_or_missing_files_are_fetched_again(server, tmp_path):
+    log_path = tmp_path / "log.json"
+    manager = fs.DownloadManager(log_path)
+    manager.download_all(jobs_for(server, tmp_path))
+    manager.save_log()
+
+    # Même taille, contenu différent : le SHA256 ne correspond plus
+    (tmp_path / "table0.xlsx").write_bytes(b"x" * len(FILES["/supp/table0.xlsx"]))
+    (tmp_path / "table1.xlsx").unlink()
+    # Simple `touch` : mtime différent mais SHA256 identique -> pas de requête
+    (tmp_path / "table2.xlsx").write_bytes(FILES["/supp/table2.xlsx"])
+
+    StubFileServer.requests = []
+    rerun = fs.DownloadManager(log_path)
+    rerun.download_all(jobs_for(server, tmp_path) + [
+        {"url": server + "/supp/missing.xlsx", "path": tmp_path / "missing.xlsx"}])
+
+    assert sorted(p for p, _, _ in StubFileServer.requests) == [
+        "/supp/missing.xlsx", "/supp/table0.xlsx", "/supp/table1.xlsx"]
+    assert (tmp_path / "table0.xlsx").read_bytes() == FILES["/supp/table0.xlsx"]
+    assert not (tmp_path / "missing.xlsx").exists()
+    assert rerun.stats["failed"] == 1
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Tests de la pagination par curseur UniProt (scripts/etl/fetch_uniprot_bulk.py)"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path("scripts/etl").resolve()))
+
+import build_external_candidates  # noqa: E402
+import fetch_uniprot_bulk as uniprot  # noqa: E402
+from providers.http_cache import CachedSession, RateLimiter  # noqa: E402
+
+# Accessions renvoyées par requête (les requêtes se recouvrent)
+RESULTS = {
+    "q1": [f"P{i:05d}" for i in range(0, 7)],
+    "q2": [f"P{i:05d}" for i in range(5, 12)],
+    "q3": [],
+}
+
+
+class StubUniProt(BaseHTTPRequestHandler):
+    """Stub /search : pages de `size` entrées, curseur dans l'en-tête Link."""
+
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        args = {k: v[0] for k, v in parse_qs(url.query).items()}
+        StubUniProt.requests.append(args)
+        accessions = RESULTS[args["query"]]
+        start = int(args.get("cursor", 0))
+        size = int(args["size"])
+        page = accessions[start:start + size]
+
+        body = json.dumps({"results": [
+            {"primaryAccession": a, "proteinDescription": {"recommendedName": {
+                "fullName": {"value": f"Protein {a}"}}}} for a in page]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if start + size < len(accessions):
+            host = f"http://{self.headers['Host']}"
+            nxt = f"{host}{url.path}?query={args['query']}&format=json&size={size}&cursor={start + size}"
+            self.send_header("Link", f'<{nxt}>; rel="next"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    StubUniProt.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubUniProt)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(uniprot, "UNIPROT_API_BASE", f"http://127.0.0.1:{httpd.server_address[1]}")
+    monkeypatch.setattr(uniprot, "HTTP", CachedSession("uniprot", enabled=False, offline=False))
+    monkeypatch.setattr(uniprot, "LIMITER", RateLimiter(1000))
+    monkeypatch.setattr(uniprot, "SEARCH_QUERIES", list(RESULTS))
+    monkeypatch.setattr(uniprot, "PAGE_SIZE", 3)
+    monkeypatch.setattr(uniprot, "PREFETCH_PAGES", 1)  # q2 attend que q1 soit écrite
+    yield
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_search_follows_next_cursor(stub):
+    pages = list(uniprot.iter_uniprot_pages("q1", page_size=3))
+
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert [e["primaryAccession"] for p in pages for e in p] == RESULTS["q1"]
+    assert [r.get("cursor") for r in StubUniProt.requests] == [None, "3", "6"]
+
+    assert len(uniprot.search_uniprot("q2", max_results=4)) == 4
+
+
+def test_concurrent_queries_written_as_deduplicated_ndjson(stub, tmp_path):
+    output = tmp_path / "uniprot.ndjson"
+
+    count, sha256 = uniprot.fetch_all_proteins(output)
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    accessions = [json.loads(line)["primaryAccession"] for line in lines]
+    assert count == len(lines) == 12
+    # Ordre de SEARCH_QUERIES (q1 puis les nouvelles de q2), quel que soit le thread le plus rapide
+    assert accessions == [f"P{i:05d}" for i in range(12)]
+    assert uniprot.hashlib.sha256(output.read_bytes()).hexdigest() == sha256
+    assert not (tmp_path / "uniprot.ndjson.tmp").exists()
+    # Pagination complète de chaque requête (q1 : 3 pages, q2 : 3 pages, q3 : 1 page)
+    assert len(StubUniProt.requests) == 7
+
+
+def test_cached_pages_skip_rate_limiter(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(uniprot, "HTTP", CachedSession("uniprot", cache_dir=tmp_path, offline=False))
+    waits = []
+    monkeypatch.setattr(uniprot.LIMITER, "wait", lambda: waits.append(1))
+
+    first = list(uniprot.iter_uniprot_pages("q1", page_size=3))
+    assert len(waits) == 3
+    assert list(uniprot.iter_uniprot_pages("q1", page_size=3)) == first
+    assert len(waits) == 3 and len(StubUniProt.requests) == 3
+
+
+def test_candidates_builder_reads_ndjson(stub, tmp_path, monkeypatch):
+    output = tmp_path / "uniprot.ndjson"
+    uniprot.fetch_all_proteins(output)
+    monkeypatch.setattr(build_external_candidates, "UNIPROT_FILE", output)
+
+    df = build_external_candidates.load_uniprot()
+
+    assert len(df) == 12
+    assert set(df["uniprot_id"]) == {f"P{i:05d}" for i in range(12)}